@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Backfill message token columns and conversation running totals.
+
+Run once after migration b3f92d6e1a47. Legacy messages only stored a total
+in tokens_used; as before, assistant messages report it as output tokens.
+Conversations are processed in id order, one transaction per batch, so the
+job can be stopped and re-run safely.
+
+Usage:
+    python scripts/backfill_conversation_tokens.py [--batch-size 500]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import and_, func, select, update  # noqa: E402
+
+import src.models.batch_job  # noqa: E402,F401  (registers every mapper relationship target)
+from src.db.session import SessionLocal  # noqa: E402
+from src.models.conversation import Conversation  # noqa: E402
+from src.models.message import Message  # noqa: E402
+
+
+async def backfill(batch_size: int) -> None:
+    last_id = None
+    processed = 0
+
+    while True:
+        async with SessionLocal() as db:
+            query = select(Conversation.id).order_by(Conversation.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(Conversation.id > last_id)
+            ids = list((await db.execute(query)).scalars().all())
+            if not ids:
+                break
+
+            # Legacy rows: move tokens_used into output_tokens for assistant messages
+            await db.execute(
+                update(Message)
+                .where(
+                    and_(
+                        Message.conversation_id.in_(ids),
+                        Message.role == "assistant",
+                        Message.input_tokens == 0,
+                        Message.output_tokens == 0,
+                        Message.tokens_used > 0,
+                    )
+                )
+                .values(output_tokens=Message.tokens_used, updated_at=Message.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+
+            totals = (
+                select(
+                    Message.conversation_id,
+                    func.coalesce(func.sum(Message.input_tokens), 0).label("input_tokens"),
+                    func.coalesce(func.sum(Message.output_tokens), 0).label("output_tokens"),
+                    func.count(Message.id).label("message_count"),
+                )
+                .where(Message.conversation_id.in_(ids))
+                .group_by(Message.conversation_id)
+                .subquery()
+            )
+
+            # Conversations without messages keep their zero defaults
+            await db.execute(
+                update(Conversation)
+                .where(Conversation.id == totals.c.conversation_id)
+                .values(
+                    total_input_tokens=totals.c.input_tokens,
+                    total_output_tokens=totals.c.output_tokens,
+                    message_count=totals.c.message_count,
+                    # Keep conversation ordering (by updated_at) unchanged
+                    updated_at=Conversation.updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+        processed += len(ids)
+        last_id = ids[-1]
+        print(f"Backfilled {processed} conversation(s)")
+
+    print("Done")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(backfill(args.batch_size))
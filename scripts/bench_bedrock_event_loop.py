@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Measure event-loop lag while Bedrock calls are in flight.
+
+Uses a stub bedrock-runtime client whose calls block for a fixed time, so no
+AWS credentials are needed. Compares calling the client inline (how the
+provider used to work) with BedrockProvider, which runs calls on its thread
+pool.
+
+Usage:
+    python scripts/bench_bedrock_event_loop.py [--calls 20] [--latency-ms 200]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.llm.base import LLMMessage  # noqa: E402
+from src.llm.bedrock_provider import BedrockProvider  # noqa: E402
+
+RESPONSE = {
+    "content": [{"text": "ok"}],
+    "usage": {"input_tokens": 10, "output_tokens": 2},
+    "stop_reason": "end_turn",
+}
+
+
+class StubClient:
+    """Blocking stand-in for the boto3 bedrock-runtime client."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke_model(self, **kwargs):
+        time.sleep(self.latency)
+        return {"body": io.BytesIO(json.dumps(RESPONSE).encode())}
+
+
+async def measure_lag(work, interval: float = 0.01) -> tuple[float, float, float]:
+    """Run work while a ticker measures how late the loop wakes it up.
+
+    Returns:
+        (wall seconds, max lag ms, mean lag ms)
+    """
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+
+    done.set()
+    await tick
+    lags = lags or [0.0]
+    return elapsed, max(lags) * 1000, sum(lags) / len(lags) * 1000
+
+
+async def main(calls: int, latency_ms: int, concurrency: int) -> None:
+    client = StubClient(latency_ms / 1000)
+    provider = BedrockProvider(model="stub", max_concurrency=concurrency)
+    provider.client = client
+    messages = [LLMMessage(role="user", content="ping")]
+
+    async def blocking_call():
+        # Previous behaviour: the boto3 call ran directly on the event loop
+        response = client.invoke_model(modelId="stub", body="{}")
+        return json.loads(response["body"].read())
+
+    async def inline():
+        await asyncio.gather(*(blocking_call() for _ in range(calls)))
+
+    async def offloaded():
+        await asyncio.gather(*(provider.generate(messages) for _ in range(calls)))
+
+    print(f"{calls} calls, {latency_ms} ms each, pool size {concurrency}")
+    print(f"{'mode':<12}{'wall s':>10}{'max lag ms':>14}{'mean lag ms':>14}")
+    for name, work in (("inline", inline), ("thread pool", offloaded)):
+        elapsed, max_lag, mean_lag = await measure_lag(work)
+        print(f"{name:<12}{elapsed:>10.2f}{max_lag:>14.1f}{mean_lag:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--latency-ms", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.latency_ms, args.concurrency))
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Count database round trips per chat turn.
+
+Runs chat turns against the configured database with a stub LLM, counting
+SQL statements (before_cursor_execute) and commits. The previous write path
+(commit + refresh per message, separate ownership check and history
+select) is replayed alongside for comparison.
+
+Creates a throwaway user and conversation, and deletes them afterwards.
+
+Usage:
+    python scripts/bench_chat_round_trips.py [--turns 20]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, event, select  # noqa: E402
+
+import src.models.batch_job  # noqa: E402,F401  (registers every mapper relationship target)
+from src.db.session import SessionLocal, engine  # noqa: E402
+from src.llm.base import LLMMessage, LLMResponse  # noqa: E402
+from src.models.conversation import Conversation  # noqa: E402
+from src.models.message import Message  # noqa: E402
+from src.models.user import User  # noqa: E402
+from src.services.chat_service import ChatService  # noqa: E402
+
+
+class StubLLMService:
+    """Answers instantly so only database time is measured."""
+
+    providers: list = []
+
+    async def generate(self, messages: list[LLMMessage], **kwargs) -> LLMResponse:
+        return LLMResponse(
+            content="stub answer", provider="stub", model="stub", input_tokens=10, output_tokens=5
+        )
+
+
+class Counter:
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    def on_execute(self, *args):
+        self.statements += 1
+
+    def on_commit(self, *args):
+        self.commits += 1
+
+
+async def legacy_turn(db, conversation_id: uuid.UUID, user_id: uuid.UUID, llm) -> None:
+    """Replay the old per-message commit/refresh flow."""
+    owned = await db.execute(
+        select(Conversation).where(Conversation.id == conversation_id, Conversation.user_id == user_id)
+    )
+    assert owned.scalar_one_or_none() is not None
+
+    user_message = Message(conversation_id=conversation_id, role="user", content="hello")
+    db.add(user_message)
+    await db.commit()
+    await db.refresh(user_message)
+
+    ids = await db.execute(
+        select(Message.id)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.created_at.desc())
+        .limit(10)
+    )
+    history = await db.execute(
+        select(Message).where(Message.id.in_([row[0] for row in ids.all()])).order_by(Message.created_at)
+    )
+    messages = [LLMMessage(role=m.role, content=m.content) for m in history.scalars().all()]
+
+    response = await llm.generate(messages)
+    assistant_message = Message(
+        conversation_id=conversation_id, role="assistant", content=response.content
+    )
+    db.add(assistant_message)
+    await db.commit()
+    await db.refresh(assistant_message)
+
+
+async def main(turns: int) -> None:
+    counter = Counter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter.on_execute)
+    event.listen(engine.sync_engine, "commit", counter.on_commit)
+
+    llm = StubLLMService()
+    async with SessionLocal() as db:
+        user = User(email=f"bench-{uuid.uuid4().hex[:8]}@example.com", password_hash="x")
+        db.add(user)
+        await db.flush()
+        conversation = Conversation(user_id=user.id, title="round trip benchmark")
+        db.add(conversation)
+        await db.commit()
+        user_id, conversation_id = user.id, conversation.id
+
+    async def run(name, turn):
+        counter.statements = counter.commits = 0
+        started = time.perf_counter()
+        for _ in range(turns):
+            async with SessionLocal() as db:
+                await turn(db)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:<14}{counter.statements / turns:>12.1f}{counter.commits / turns:>10.1f}"
+            f"{elapsed / turns * 1000:>12.2f}"
+        )
+
+    print(f"{turns} turns per path")
+    print(f"{'path':<14}{'stmts/turn':>12}{'commits':>10}{'ms/turn':>12}")
+    await run("legacy", lambda db: legacy_turn(db, conversation_id, user_id, llm))
+    await run(
+        "unit of work",
+        lambda db: ChatService(db, llm_service=llm).send_message(conversation_id, user_id, "hello"),
+    )
+
+    async with SessionLocal() as db:
+        # Conversations and messages go with the user (ON DELETE CASCADE)
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns))
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark Textract block parsing.
+
+Synthesizes a multi-page invoice response (every page carries a line-item
+table and a set of key/value pairs) and parses it with the indexed parser
+and with the previous approach, which resolved each relationship id by
+scanning the whole block list. The legacy tables are replayed with cell
+text read from WORD children, so both sides do the same work.
+
+Usage:
+    python scripts/bench_textract_parser.py [--pages 10] [--rows 40] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.textract_parser import parse_textract_blocks  # noqa: E402
+
+
+def synthesize(pages: int, rows: int, fields: int = 12) -> list[dict]:
+    """Build an AnalyzeDocument block list for a synthetic invoice."""
+    blocks: list[dict] = []
+    counter = 0
+
+    def add(block_type: str, page: int, **fields_) -> str:
+        nonlocal counter
+        counter += 1
+        block_id = f"b{counter}"
+        blocks.append({"BlockType": block_type, "Id": block_id, "Page": page, **fields_})
+        return block_id
+
+    def words(text: str, page: int) -> list[str]:
+        return [add("WORD", page, Text=w, Confidence=99.0) for w in text.split()]
+
+    for page in range(1, pages + 1):
+        line_ids = []
+        for i in range(fields):
+            text = f"Field {i}: value {page}-{i}"
+            line_ids.append(
+                add(
+                    "LINE",
+                    page,
+                    Text=text,
+                    Confidence=98.0,
+                    Relationships=[{"Type": "CHILD", "Ids": words(text, page)}],
+                )
+            )
+            value_id = add(
+                "KEY_VALUE_SET",
+                page,
+                EntityTypes=["VALUE"],
+                Relationships=[{"Type": "CHILD", "Ids": words(f"value {page}-{i}", page)}],
+            )
+            add(
+                "KEY_VALUE_SET",
+                page,
+                EntityTypes=["KEY"],
+                Relationships=[
+                    {"Type": "VALUE", "Ids": [value_id]},
+                    {"Type": "CHILD", "Ids": words(f"Field {i}:", page)},
+                ],
+            )
+
+        cell_ids = []
+        for row in range(1, rows + 2):
+            for column, text in enumerate(
+                ["Item", "Quantity", "Price"] if row == 1 else [f"sku-{row}", str(row), "9.99"],
+                start=1,
+            ):
+                cell_ids.append(
+                    add(
+                        "CELL",
+                        page,
+                        RowIndex=row,
+                        ColumnIndex=column,
+                        RowSpan=1,
+                        ColumnSpan=1,
+                        Relationships=[{"Type": "CHILD", "Ids": words(text, page)}],
+                    )
+                )
+        table_id = add("TABLE", page, Relationships=[{"Type": "CHILD", "Ids": cell_ids}])
+        add("PAGE", page, Relationships=[{"Type": "CHILD", "Ids": line_ids + [table_id]}])
+
+    return blocks
+
+
+def legacy_parse(blocks: list[dict]) -> dict:
+    """Previous algorithm: every id lookup scans the full block list."""
+
+    def find(block_id):
+        for block in blocks:
+            if block["Id"] == block_id:
+                return block
+        return None
+
+    def child_text(block):
+        text = []
+        for relationship in block.get("Relationships", []):
+            if relationship["Type"] == "CHILD":
+                for child_id in relationship["Ids"]:
+                    child = find(child_id)
+                    if child and child["BlockType"] == "WORD":
+                        text.append(child["Text"])
+        return " ".join(text)
+
+    lines, tables, forms = [], [], {}
+    for block in blocks:
+        if block["BlockType"] == "LINE":
+            lines.append(block["Text"])
+        elif block["BlockType"] == "TABLE":
+            cells = []
+            for relationship in block.get("Relationships", []):
+                if relationship["Type"] == "CHILD":
+                    cells.extend(find(cell_id) for cell_id in relationship["Ids"])
+            by_row: dict[int, list] = {}
+            for cell in cells:
+                by_row.setdefault(cell["RowIndex"], []).append(cell)
+            rows = [
+                [child_text(c) for c in sorted(by_row[r], key=lambda c: c["ColumnIndex"])]
+                for r in sorted(by_row)
+            ]
+            tables.append({"columns": rows[0], "rows": [dict(zip(rows[0], r)) for r in rows[1:]]})
+        elif block["BlockType"] == "KEY_VALUE_SET" and "KEY" in block.get("EntityTypes", []):
+            key = child_text(block)
+            value = ""
+            for relationship in block.get("Relationships", []):
+                if relationship["Type"] == "VALUE":
+                    for value_id in relationship["Ids"]:
+                        value += child_text(find(value_id))
+            if key and value:
+                forms[key] = value
+
+    return {"text": "\n".join(lines), "tables": tables, "forms": forms}
+
+
+def timed(fn, blocks: list[dict], repeat: int) -> tuple[float, dict]:
+    best = float("inf")
+    result = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(blocks)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(pages: int, rows: int, repeat: int) -> None:
+    blocks = synthesize(pages, rows)
+    print(f"{len(blocks)} blocks ({pages} page(s), {rows} table rows per page)")
+
+    legacy_time, legacy = timed(legacy_parse, blocks, max(repeat // 5, 1))
+    indexed_time, indexed = timed(parse_textract_blocks, blocks, repeat)
+
+    assert legacy["forms"] == indexed["forms"]
+    assert [t["rows"] for t in legacy["tables"]] == [t["rows"] for t in indexed["tables"]]
+
+    print(f"{'parser':<10}{'ms':>12}")
+    print(f"{'legacy':<10}{legacy_time * 1000:>12.2f}")
+    print(f"{'indexed':<10}{indexed_time * 1000:>12.2f}")
+    print(f"speedup: {legacy_time / indexed_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.pages, args.rows, args.repeat)
@@ -1,6 +1,7 @@
 """Batch processing API routes."""
 
 import logging
+import os
 from typing import List, Optional
 from uuid import UUID
 
@@ -10,7 +11,9 @@ from fastapi.responses import JSONResponse
 from src.dependencies import CurrentUser, DatabaseSession
 from src.models.user import User
 from src.services.batch_processing_service import BatchProcessingService
+from src.services.extractors import get_spec, supported_mime_types
 from src.services.job_queue import job_queue
+from src.services.upload_spool import UploadTooLargeError, spool_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/batch", tags=["batch"])
@@ -29,6 +32,7 @@ async def create_batch_job(
     - CSV, TXT, PDF, DOCX, Images
     - Maximum 10MB per file
     """
+    spooled = []
     try:
         if not files or len(files) == 0:
             raise HTTPException(
@@ -40,59 +44,43 @@ async def create_batch_job(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Maximum 10 files per batch"
             )
 
-        # Validate files
-        allowed_types = [
-            "text/plain",
-            "text/csv",
-            "text/markdown",
-            "application/pdf",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            "image/png",
-            "image/jpeg",
-            "image/jpg",
-        ]
+        # Validate files against the registered extractors
+        allowed_types = supported_mime_types()
 
         file_metadata = []
         total_size = 0
 
         for file in files:
-            # Read file content to validate
-            content = await file.read()
-            file_size = len(content)
-
-            # Reset file pointer for potential reuse
-            await file.seek(0)
-
             # Validate file type
             is_allowed = file.content_type in allowed_types
-            is_csv_file = (
+            is_known_extension = (
                 file.content_type == "application/octet-stream"
                 and file.filename
-                and file.filename.lower().endswith(".csv")
+                and get_spec(os.path.splitext(file.filename)[1]) is not None
             )
 
-            if not (is_allowed or is_csv_file):
-                supported_types = allowed_types + ["text/csv (detected by filename)"]
+            if not (is_allowed or is_known_extension):
+                supported_types = allowed_types + ["application/octet-stream (detected by filename)"]
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Unsupported file type for '{file.filename}': {file.content_type}. Supported: {', '.join(supported_types)}",
                 )
 
-            # Validate file size
-            if file_size > 10 * 1024 * 1024:  # 10MB
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"File '{file.filename}' too large. Maximum size: 10MB",
-                )
-
-            total_size += file_size
+            # Stream to disk; the size limit is enforced as the file arrives
+            try:
+                upload = await spool_upload(file)
+            except UploadTooLargeError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            spooled.append(upload)
+            total_size += upload.size
 
             file_metadata.append(
                 {
-                    "filename": file.filename,
-                    "content_type": file.content_type,
-                    "size": file_size,
-                    "temp_path": None,  # Will be set during processing
+                    "filename": upload.filename,
+                    "content_type": upload.content_type,
+                    "size": upload.size,
+                    "temp_path": upload.path,  # Removed once the file is processed
+                    "sha256": upload.sha256,
                 }
             )
 
@@ -119,8 +107,14 @@ async def create_batch_job(
             "status_url": f"/api/v1/batch/status/{batch_job.id}",
         }
 
+    except HTTPException:
+        for upload in spooled:
+            upload.cleanup()
+        raise
     except Exception as e:
         logger.error(f"Error creating batch job: {e}")
+        for upload in spooled:
+            upload.cleanup()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create batch job: {str(e)}",
@@ -1,10 +1,11 @@
 """Chat API endpoints."""
 
+import json
 import logging
-from typing import Annotated
+from typing import Annotated, AsyncIterator, Callable, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -14,14 +15,18 @@ from src.api.schemas.chat import (
     ConversationResponse,
     ConversationWithMessages,
     MessageCreate,
+    MessagePage,
     MessageResponse,
 )
 from src.dependencies import CurrentUser, DatabaseSession
 from src.services.chat_service import ChatService
+from src.services.stream_checkpoint import StreamCheckpoint, get_live_stream
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+MAX_MESSAGE_PAGE_SIZE = 200
+
 
 @router.post(
     "/conversations", response_model=ConversationResponse, status_code=status.HTTP_201_CREATED
@@ -74,11 +79,23 @@ async def get_conversation(
     conversation_id: UUID,
     user: CurrentUser,
     db: DatabaseSession,
+    message_limit: Optional[int] = None,
 ):
-    """Get conversation with messages."""
+    """Get conversation with messages.
+
+    Pass ``message_limit`` to include only the most recent messages; older
+    ones can be fetched from the paginated messages endpoint.
+    """
+    if message_limit is not None and message_limit < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="message_limit must be positive"
+        )
+
     try:
         chat_service = ChatService(db)
-        result = await chat_service.get_conversation_with_messages(conversation_id, user.id)
+        result = await chat_service.get_conversation_with_messages(
+            conversation_id, user.id, message_limit=message_limit
+        )
         return {
             **result["conversation"].__dict__,
             "messages": result["messages"],
@@ -95,6 +112,47 @@ async def get_conversation(
         )
 
 
+@router.get("/conversations/{conversation_id}/messages", response_model=MessagePage)
+async def list_messages(
+    conversation_id: UUID,
+    user: CurrentUser,
+    db: DatabaseSession,
+    limit: int = 50,
+    before: Optional[UUID] = None,
+    after: Optional[UUID] = None,
+):
+    """Page through a conversation's messages with keyset cursors.
+
+    Without a cursor the most recent page is returned. To scroll back, pass
+    the id of the oldest message on screen as ``before``; to catch up, pass
+    the newest as ``after``.
+    """
+    if before and after:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Use either before or after, not both"
+        )
+    if not 1 <= limit <= MAX_MESSAGE_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"limit must be between 1 and {MAX_MESSAGE_PAGE_SIZE}",
+        )
+
+    try:
+        chat_service = ChatService(db)
+        return await chat_service.get_message_page(
+            conversation_id, user.id, limit=limit, before=before, after=after
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to list messages: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to list messages",
+        )
+
+
 @router.post("/conversations/{conversation_id}/messages", response_model=ChatResponse)
 async def send_message(
     conversation_id: UUID,
@@ -123,6 +181,43 @@ async def send_message(
         )
 
 
+def _sse(data: dict | str, event_id: Optional[int] = None, event: Optional[str] = None) -> str:
+    """Format one server-sent event with a JSON (or literal) data payload."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    payload = data if isinstance(data, str) else json.dumps(data)
+    lines.append(f"data: {payload}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _stream_events(
+    events: AsyncIterator[tuple[int, str]], message_id: UUID, final_status: Callable[[], dict]
+) -> AsyncIterator[str]:
+    """Turn (event id, chunk) pairs into SSE frames, ending with a done event."""
+    try:
+        async for event_id, chunk in events:
+            yield _sse({"content": chunk}, event_id=event_id)
+
+        status_info = final_status()
+        if status_info.get("status") == "error":
+            yield _sse({"error": status_info.get("error") or "Streaming failed"}, event="error")
+        yield _sse({"message_id": str(message_id), **status_info}, event="done")
+        yield _sse("[DONE]")
+    except Exception as e:
+        logger.error(f"Streaming error: {e}")
+        yield _sse({"error": str(e)}, event="error")
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Stop reverse proxies from buffering the stream
+}
+
+
 @router.post("/conversations/{conversation_id}/messages/stream")
 async def stream_message(
     conversation_id: UUID,
@@ -130,36 +225,16 @@ async def stream_message(
     user: CurrentUser,
     db: DatabaseSession,
 ):
-    """Stream AI response for a message."""
+    """Stream AI response for a message as server-sent events.
+
+    The first event (``start``) carries the assistant message id. Each chunk
+    is a ``data: {"content": ...}`` event whose id is its position in the
+    stream. Generation continues if the client disconnects; reconnect to
+    the resume endpoint with the message id and ``Last-Event-ID``.
+    """
     try:
         chat_service = ChatService(db)
-
-        async def generate():
-            try:
-                async for chunk in chat_service.stream_message(
-                    conversation_id, user.id, data.content
-                ):
-                    # Escape the chunk for JSON
-                    escaped_chunk = (
-                        chunk.replace("\\", "\\\\")
-                        .replace('"', '\\"')
-                        .replace("\n", "\\n")
-                        .replace("\r", "\\r")
-                    )
-                    yield f'data: {{"content": "{escaped_chunk}"}}\n\n'
-                yield "data: [DONE]\n\n"
-            except Exception as e:
-                logger.error(f"Streaming error: {e}")
-                yield f'data: {{"error": "{str(e)}"}}\n\n'
-
-        return StreamingResponse(
-            generate(),
-            media_type="text/plain",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-            },
-        )
+        live = await chat_service.start_stream(conversation_id, user.id, data.content)
 
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -170,6 +245,87 @@ async def stream_message(
             detail="Failed to stream message",
         )
 
+    async def generate():
+        yield _sse(
+            {"message_id": str(live.message_id), "conversation_id": str(conversation_id)},
+            event_id=0,
+            event="start",
+        )
+        async for frame in _stream_events(
+            live.subscribe(),
+            live.message_id,
+            lambda: {"status": live.status, "error": live.error},
+        ):
+            yield frame
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/conversations/{conversation_id}/messages/{message_id}/stream")
+async def resume_stream(
+    conversation_id: UUID,
+    message_id: UUID,
+    user: CurrentUser,
+    db: DatabaseSession,
+    last_event_id: Annotated[Optional[int], Header(alias="Last-Event-ID")] = None,
+):
+    """Resume a streamed response after a disconnect.
+
+    Replays chunks after ``Last-Event-ID`` (0 or absent = from the start),
+    then follows the stream until it ends. Works from any worker while the
+    stream's checkpoint is in Redis; afterwards the saved message is sent
+    as a single event.
+    """
+    after = max(last_event_id or 0, 0)
+
+    # Generated by this worker: follow it in memory
+    live = get_live_stream(message_id)
+    if live and live.conversation_id == conversation_id and live.user_id == user.id:
+        events = _stream_events(
+            live.subscribe(after),
+            message_id,
+            lambda: {"status": live.status, "error": live.error},
+        )
+        return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+    # Generated elsewhere (or finished recently): follow the Redis checkpoint
+    meta = await StreamCheckpoint.load(message_id)
+    if meta:
+        if meta.get("conversation_id") != str(conversation_id) or meta.get("user_id") != str(
+            user.id
+        ):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stream not found")
+
+        final_meta: dict = {}
+
+        async def checkpoint_events():
+            async for event_id, chunk in StreamCheckpoint.follow(message_id, after):
+                yield event_id, chunk
+            latest = await StreamCheckpoint.load(message_id) or {}
+            final_meta.update({"status": latest.get("status"), "error": latest.get("error")})
+
+        return StreamingResponse(
+            _stream_events(checkpoint_events(), message_id, lambda: final_meta),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+
+    # Checkpoint expired: fall back to the saved message
+    chat_service = ChatService(db)
+    try:
+        message = await chat_service.get_message(conversation_id, user.id, message_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    async def saved():
+        # Chunk boundaries are gone, so a client that already has part of the
+        # message is told to replace it with the saved content
+        yield _sse({"content": message.content, "replace": after > 0}, event_id=1)
+        yield _sse({"message_id": str(message_id), "status": "done"}, event="done")
+        yield _sse("[DONE]")
+
+    return StreamingResponse(saved(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 
 @router.delete("/conversations/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_conversation(
@@ -1,64 +1,118 @@
 """Export API endpoints for data export in multiple formats."""
 
+import asyncio
 import json
 import csv
-from typing import Dict, Any
-from io import StringIO, BytesIO
+import tempfile
+from itertools import chain
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List
+from io import StringIO
 
 from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.responses import StreamingResponse, JSONResponse
 
 from src.dependencies import CurrentUser
-from src.services.extraction_service import ExtractionService
+from src.services.table_store import StoredRows, TableNotFoundError, get_table_store
 
 router = APIRouter(prefix="/export", tags=["export"])
 
+CHUNK_CHARS = 64 * 1024  # Text buffered before a chunk is sent
+CHUNK_BYTES = 1024 * 1024  # Bytes of a built file sent per chunk
 
-@router.post("/csv")
-async def export_csv(data: Dict[str, Any], user: CurrentUser) -> StreamingResponse:
-    """Export data as CSV file.
 
-    Handles both tabular data and text-only data.
+async def _load_tables(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace the previews of stored tables with all of their rows.
+
+    Stored rows are read as the export is written (see StoredRows), so a
+    table is never held in memory whole.
+
+    Raises:
+        HTTPException: 410 if a stored table has expired
     """
     try:
-        # Create CSV content
-        output = StringIO()
-        writer = csv.writer(output)
+        return await asyncio.to_thread(get_table_store().with_rows, data)
+    except TableNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Stored table has expired; extract the file again",
+        )
 
-        # Check if we have tabular data
-        if data.get("tables") and len(data["tables"]) > 0:
-            # Use first table for CSV export
-            table = data["tables"][0]
 
-            # Write headers
-            writer.writerow(table["columns"])
+def _row_batches(rows: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """A table's rows in batches: a record batch at a time for stored tables."""
+    if isinstance(rows, StoredRows):
+        return rows.batches()
+    return iter([rows] if rows else [])
 
-            # Write data rows
-            for row in table["rows"]:
-                csv_row = [str(row.get(col, "")) for col in table["columns"]]
-                writer.writerow(csv_row)
-        else:
-            # Handle text-only data - create a simple single-column table
-            writer.writerow(["Content"])
 
-            # Add text content if available
-            if data.get("text"):
-                # Split text into lines and create rows
-                lines = data["text"].split("\n")
-                for line in lines:
-                    if line.strip():  # Skip empty lines
-                        writer.writerow([line.strip()])
+def _buffered(parts: Iterable[str]) -> Iterator[str]:
+    """Join small pieces of output into chunks of about CHUNK_CHARS."""
+    buffer: List[str] = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= CHUNK_CHARS:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
 
-            # If no text either, add a placeholder
-            if not data.get("text"):
-                writer.writerow(["No content available"])
+def _file_chunks(file: BinaryIO) -> Iterator[bytes]:
+    """Stream a built file from its start, closing it at the end."""
+    with file:
+        file.seek(0)
+        while chunk := file.read(CHUNK_BYTES):
+            yield chunk
+
+
+@router.post("/csv")
+async def export_csv(data: Dict[str, Any], user: CurrentUser) -> StreamingResponse:
+    """Export data as CSV file.
 
-        csv_content = output.getvalue()
-        output.close()
+    Handles both tabular data and text-only data.
+    """
+    data = await _load_tables(data)
+    try:
 
-        # Create streaming response
         def generate():
-            yield csv_content
+            output = StringIO()
+            writer = csv.writer(output)
+
+            # Check if we have tabular data
+            if data.get("tables") and len(data["tables"]) > 0:
+                # Use first table for CSV export
+                table = data["tables"][0]
+
+                # Write headers
+                writer.writerow(table["columns"])
+
+                # Write data rows, a batch per chunk
+                for rows in _row_batches(table["rows"]):
+                    for row in rows:
+                        csv_row = [str(row.get(col, "")) for col in table["columns"]]
+                        writer.writerow(csv_row)
+                    yield output.getvalue()
+                    output.seek(0)
+                    output.truncate()
+            else:
+                # Handle text-only data - create a simple single-column table
+                writer.writerow(["Content"])
+
+                # Add text content if available
+                if data.get("text"):
+                    # Split text into lines and create rows
+                    lines = data["text"].split("\n")
+                    for line in lines:
+                        if line.strip():  # Skip empty lines
+                            writer.writerow([line.strip()])
+
+                # If no text either, add a placeholder
+                if not data.get("text"):
+                    writer.writerow(["No content available"])
+
+            yield output.getvalue()
 
         # Set filename based on available data
         if data.get("tables") and len(data["tables"]) > 0:
@@ -78,17 +132,40 @@ async def export_csv(data: Dict[str, Any], user: CurrentUser) -> StreamingRespon
         )
 
 
+def _json_chunks(data: Dict[str, Any]) -> Iterator[str]:
+    """The document as indented JSON, with stored tables' rows encoded a batch at a time."""
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+    stored: Dict[str, StoredRows] = {}
+    tables = []
+    for table in data.get("tables") or []:
+        if isinstance(table, dict) and isinstance(table.get("rows"), StoredRows):
+            # Encoded in place of the marker string, which the encoder yields as one chunk
+            marker = f"\0stored rows {len(stored)}"
+            stored[encoder.encode(marker)] = table["rows"]
+            table = {**table, "rows": marker}
+        tables.append(table)
+    if stored:
+        data = {**data, "tables": tables}
+
+    for chunk in encoder.iterencode(data):
+        if chunk not in stored:
+            yield chunk
+            continue
+        separator = "["
+        for rows in stored[chunk].batches():
+            for row in rows:
+                yield separator + json.dumps(row, ensure_ascii=False)
+                separator = ", "
+        yield "[]" if separator == "[" else "]"
+
+
 @router.post("/json")
 async def export_json(data: Dict[str, Any], user: CurrentUser) -> StreamingResponse:
     """Export data as JSON file."""
+    data = await _load_tables(data)
     try:
-        json_content = json.dumps(data, indent=2, ensure_ascii=False)
-
-        def generate():
-            yield json_content
-
         return StreamingResponse(
-            generate(),
+            _buffered(_json_chunks(data)),
             media_type="application/json",
             headers={"Content-Disposition": "attachment; filename=export.json"},
         )
@@ -100,80 +177,91 @@ async def export_json(data: Dict[str, Any], user: CurrentUser) -> StreamingRespo
         )
 
 
-@router.post("/excel")
-async def export_excel(data: Dict[str, Any], user: CurrentUser) -> StreamingResponse:
-    """Export data as Excel file (.xlsx)."""
-    try:
-        # Create Excel file using openpyxl
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, PatternFill
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Extracted Data"
+def _write_workbook(data: Dict[str, Any]) -> BinaryIO:
+    """Write the document to an .xlsx temporary file.
 
-        # Check if we have tabular data
-        if data.get("tables") and len(data["tables"]) > 0:
-            # Process each table
-            for table_idx, table in enumerate(data["tables"]):
-                if table_idx > 0:
-                    # Create new sheet for additional tables
-                    ws = wb.create_sheet(title=f"Table {table_idx + 1}")
-
-                # Write headers with styling
-                header_font = Font(bold=True, color="FFFFFF")
-                header_fill = PatternFill(
-                    start_color="366092", end_color="366092", fill_type="solid"
+    The workbook is write-only, so rows go straight to disk instead of
+    being kept as cells; column widths are therefore sized from a table's
+    first batch of rows.
+    """
+    # Create Excel file using openpyxl
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+
+    # Check if we have tabular data
+    if data.get("tables") and len(data["tables"]) > 0:
+        # Process each table
+        for table_idx, table in enumerate(data["tables"]):
+            # One sheet per table
+            ws = wb.create_sheet(
+                title="Extracted Data" if table_idx == 0 else f"Table {table_idx + 1}"
+            )
+            columns = table["columns"]
+            batches = _row_batches(table["rows"])
+            first = next(batches, [])
+
+            # Auto-adjust column widths (set before any row is written)
+            for col_idx, col_name in enumerate(columns, 1):
+                max_length = max(
+                    (len(str(row_data.get(col_name, ""))) for row_data in first), default=10
                 )
+                max_length = max(max_length, len(col_name))
+                ws.column_dimensions[get_column_letter(col_idx)].width = min(max_length + 2, 50)
+
+            # Write headers with styling
+            header_font = Font(bold=True, color="FFFFFF")
+            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            headers = []
+            for col_name in columns:
+                cell = WriteOnlyCell(ws, value=col_name)
+                cell.font = header_font
+                cell.fill = header_fill
+                headers.append(cell)
+            ws.append(headers)
 
-                for col_idx, col_name in enumerate(table["columns"], 1):
-                    cell = ws.cell(row=1, column=col_idx, value=col_name)
-                    cell.font = header_font
-                    cell.fill = header_fill
-
-                # Write data rows
-                for row_idx, row_data in enumerate(table["rows"], 2):
-                    for col_idx, col_name in enumerate(table["columns"], 1):
-                        value = row_data.get(col_name, "")
-                        ws.cell(row=row_idx, column=col_idx, value=value)
-
-                # Auto-adjust column widths
-                for col_idx, col_name in enumerate(table["columns"], 1):
-                    column_letter = ws.cell(row=1, column=col_idx).column_letter
-                    max_length = (
-                        max(len(str(row_data.get(col_name, ""))) for row_data in table["rows"])
-                        if table["rows"]
-                        else 10
-                    )
-                    max_length = max(max_length, len(col_name))
-                    ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
-        else:
-            # Handle text-only data - create a simple single-column sheet
-            ws.cell(row=1, column=1, value="Content")
-
-            # Add text content if available
-            if data.get("text"):
-                # Split text into lines and create rows
-                lines = data["text"].split("\n")
-                for row_idx, line in enumerate(lines, 2):
-                    if line.strip():  # Skip empty lines
-                        ws.cell(row=row_idx, column=1, value=line.strip())
-
-            # Auto-adjust column width
-            ws.column_dimensions["A"].width = 50
+            # Write data rows
+            for rows in chain([first], batches):
+                for row_data in rows:
+                    ws.append([row_data.get(col_name, "") for col_name in columns])
+    else:
+        # Handle text-only data - create a simple single-column sheet
+        ws = wb.create_sheet(title="Extracted Data")
+
+        # Auto-adjust column width
+        ws.column_dimensions["A"].width = 50
+        ws.append(["Content"])
+
+        # Add text content if available
+        if data.get("text"):
+            # Split text into lines and create rows
+            lines = data["text"].split("\n")
+            for line in lines:
+                # Empty lines are left as empty rows
+                ws.append([line.strip()] if line.strip() else [])
 
-        # Save to BytesIO
-        excel_buffer = BytesIO()
-        wb.save(excel_buffer)
-        excel_buffer.seek(0)
+    excel_file = tempfile.TemporaryFile()
+    try:
+        wb.save(excel_file)
+    except BaseException:
+        excel_file.close()
+        raise
+    return excel_file
 
-        def generate():
-            yield excel_buffer.getvalue()
 
+@router.post("/excel")
+async def export_excel(data: Dict[str, Any], user: CurrentUser) -> StreamingResponse:
+    """Export data as Excel file (.xlsx)."""
+    data = await _load_tables(data)
+    try:
+        excel_file = await asyncio.to_thread(_write_workbook, data)
         filename = "export.xlsx"
 
         return StreamingResponse(
-            generate(),
+            _file_chunks(excel_file),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={"Content-Disposition": f"attachment; filename={filename}"},
         )
@@ -190,42 +278,31 @@ async def export_excel(data: Dict[str, Any], user: CurrentUser) -> StreamingResp
         )
 
 
+def _xml_parts(obj: Any, name: str) -> Iterator[str]:
+    """Convert a value to XML, piece by piece (stored rows are read as they are reached)."""
+    if isinstance(obj, dict):
+        yield f"<{name}>"
+        for key, value in obj.items():
+            yield from _xml_parts(value, key)
+        yield f"</{name}>"
+    elif isinstance(obj, (list, StoredRows)):
+        for item in obj:
+            yield from _xml_parts(item, "item")
+    else:
+        # Escape XML characters
+        value_str = str(obj).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        yield f"<{name}>{value_str}</{name}>"
+
+
 @router.post("/xml")
 async def export_xml(data: Dict[str, Any], user: CurrentUser) -> StreamingResponse:
     """Export data as XML file."""
+    data = await _load_tables(data)
     try:
-
-        def dict_to_xml(data_dict, root_name="data"):
-            """Convert dictionary to XML string."""
-
-            def _convert(obj, name):
-                if isinstance(obj, dict):
-                    xml_parts = [f"<{name}>"]
-                    for key, value in obj.items():
-                        xml_parts.append(_convert(value, key))
-                    xml_parts.append(f"</{name}>")
-                    return "".join(xml_parts)
-                elif isinstance(obj, list):
-                    xml_parts = []
-                    for item in obj:
-                        xml_parts.append(_convert(item, "item"))
-                    return "".join(xml_parts)
-                else:
-                    # Escape XML characters
-                    value_str = (
-                        str(obj).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-                    )
-                    return f"<{name}>{value_str}</{name}>"
-
-            return f'<?xml version="1.0" encoding="UTF-8"?>\n{_convert(data_dict, root_name)}'
-
-        xml_content = dict_to_xml(data)
-
-        def generate():
-            yield xml_content
+        xml_parts = _xml_parts(data, "data")
 
         return StreamingResponse(
-            generate(),
+            _buffered(chain(['<?xml version="1.0" encoding="UTF-8"?>\n'], xml_parts)),
             media_type="application/xml",
             headers={"Content-Disposition": "attachment; filename=export.xml"},
         )
@@ -236,92 +313,92 @@ async def export_xml(data: Dict[str, Any], user: CurrentUser) -> StreamingRespon
         )
 
 
-@router.post("/html")
-async def export_html(data: Dict[str, Any], user: CurrentUser) -> StreamingResponse:
-    """Export data as HTML file with table formatting."""
-    try:
-        html_parts = [
-            "<!DOCTYPE html>",
-            '<html lang="en">',
-            "<head>",
-            '    <meta charset="UTF-8">',
-            '    <meta name="viewport" content="width=device-width, initial-scale=1.0">',
-            "    <title>Extracted Data</title>",
-            "    <style>",
-            "        body { font-family: Arial, sans-serif; margin: 20px; }",
-            "        h1 { color: #333; }",
-            "        table { border-collapse: collapse; width: 100%; margin: 20px 0; }",
-            "        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }",
-            "        th { background-color: #f2f2f2; font-weight: bold; }",
-            "        tr:nth-child(even) { background-color: #f9f9f9; }",
-            "        .metadata { background-color: #e8f4f8; padding: 15px; border-radius: 5px; margin: 20px 0; }",
-            "        .text-content { background-color: #f8f8f8; padding: 15px; border-radius: 5px; margin: 20px 0; white-space: pre-wrap; }",
-            "    </style>",
-            "</head>",
-            "<body>",
-            "    <h1>Extracted Data Report</h1>",
-        ]
-
-        # Add metadata if available
-        if data.get("metadata"):
-            html_parts.append('    <div class="metadata">')
-            html_parts.append("        <h2>Document Metadata</h2>")
-            html_parts.append("        <ul>")
-            for key, value in data["metadata"].items():
-                html_parts.append(f"            <li><strong>{key}:</strong> {value}</li>")
-            html_parts.append("        </ul>")
-            html_parts.append("    </div>")
-
-        # Add extracted text if available
-        if data.get("text"):
-            html_parts.append('    <div class="text-content">')
-            html_parts.append("        <h2>Extracted Text</h2>")
-            html_parts.append(f"        <p>{data['text'].replace(chr(10), '<br>')}</p>")
-            html_parts.append("    </div>")
-
-        # Add tables
-        if data.get("tables"):
-            for table_idx, table in enumerate(data["tables"]):
-                html_parts.append(
-                    f"    <h2>Table {table_idx + 1}: {table.get('name', 'Data')}</h2>"
-                )
-                html_parts.append("    <table>")
-                html_parts.append("        <thead>")
-                html_parts.append("            <tr>")
-
-                # Table headers
+def _html_lines(data: Dict[str, Any]) -> Iterator[str]:
+    """The HTML report, line by line (stored rows are read as their table is reached)."""
+    yield from [
+        "<!DOCTYPE html>",
+        '<html lang="en">',
+        "<head>",
+        '    <meta charset="UTF-8">',
+        '    <meta name="viewport" content="width=device-width, initial-scale=1.0">',
+        "    <title>Extracted Data</title>",
+        "    <style>",
+        "        body { font-family: Arial, sans-serif; margin: 20px; }",
+        "        h1 { color: #333; }",
+        "        table { border-collapse: collapse; width: 100%; margin: 20px 0; }",
+        "        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }",
+        "        th { background-color: #f2f2f2; font-weight: bold; }",
+        "        tr:nth-child(even) { background-color: #f9f9f9; }",
+        "        .metadata { background-color: #e8f4f8; padding: 15px; border-radius: 5px; margin: 20px 0; }",
+        "        .text-content { background-color: #f8f8f8; padding: 15px; border-radius: 5px; margin: 20px 0; white-space: pre-wrap; }",
+        "    </style>",
+        "</head>",
+        "<body>",
+        "    <h1>Extracted Data Report</h1>",
+    ]
+
+    # Add metadata if available
+    if data.get("metadata"):
+        yield '    <div class="metadata">'
+        yield "        <h2>Document Metadata</h2>"
+        yield "        <ul>"
+        for key, value in data["metadata"].items():
+            yield f"            <li><strong>{key}:</strong> {value}</li>"
+        yield "        </ul>"
+        yield "    </div>"
+
+    # Add extracted text if available
+    if data.get("text"):
+        yield '    <div class="text-content">'
+        yield "        <h2>Extracted Text</h2>"
+        yield f"        <p>{data['text'].replace(chr(10), '<br>')}</p>"
+        yield "    </div>"
+
+    # Add tables
+    if data.get("tables"):
+        for table_idx, table in enumerate(data["tables"]):
+            yield f"    <h2>Table {table_idx + 1}: {table.get('name', 'Data')}</h2>"
+            yield "    <table>"
+            yield "        <thead>"
+            yield "            <tr>"
+
+            # Table headers
+            for col in table["columns"]:
+                yield f"                <th>{col}</th>"
+            yield "            </tr>"
+            yield "        </thead>"
+            yield "        <tbody>"
+
+            # Table rows
+            for row in table["rows"]:
+                yield "            <tr>"
                 for col in table["columns"]:
-                    html_parts.append(f"                <th>{col}</th>")
-                html_parts.append("            </tr>")
-                html_parts.append("        </thead>")
-                html_parts.append("        <tbody>")
-
-                # Table rows
-                for row in table["rows"]:
-                    html_parts.append("            <tr>")
-                    for col in table["columns"]:
-                        value = row.get(col, "")
-                        html_parts.append(f"                <td>{value}</td>")
-                    html_parts.append("            </tr>")
+                    value = row.get(col, "")
+                    yield f"                <td>{value}</td>"
+                yield "            </tr>"
 
-                html_parts.append("        </tbody>")
-                html_parts.append("    </table>")
+            yield "        </tbody>"
+            yield "    </table>"
 
-        # Add note if available
-        if data.get("note"):
-            html_parts.append('    <div class="metadata">')
-            html_parts.append(f"        <p><strong>Note:</strong> {data['note']}</p>")
-            html_parts.append("    </div>")
+    # Add note if available
+    if data.get("note"):
+        yield '    <div class="metadata">'
+        yield f"        <p><strong>Note:</strong> {data['note']}</p>"
+        yield "    </div>"
 
-        html_parts.extend(["</body>", "</html>"])
+    yield from ["</body>", "</html>"]
 
-        html_content = "\n".join(html_parts)
 
-        def generate():
-            yield html_content
+@router.post("/html")
+async def export_html(data: Dict[str, Any], user: CurrentUser) -> StreamingResponse:
+    """Export data as HTML file with table formatting."""
+    data = await _load_tables(data)
+    try:
+        lines = _html_lines(data)
+        html_chunks = _buffered(chain([next(lines)], ("\n" + line for line in lines)))
 
         return StreamingResponse(
-            generate(),
+            html_chunks,
             media_type="text/html",
             headers={"Content-Disposition": "attachment; filename=export.html"},
         )
@@ -1,20 +1,25 @@
 """Extraction API endpoints with file upload support."""
 
+import asyncio
 import logging
 import os
-import tempfile
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, status, UploadFile, File, Depends
 from fastapi.responses import JSONResponse
 
 from src.dependencies import CurrentUser
-from src.services.extraction_service import ExtractionService
+from src.services.extraction_service import get_extraction_service
+from src.services.extractors import get_spec, supported_mime_types
 from src.services.processing_status import processing_tracker
+from src.services.table_store import TableNotFoundError, get_table_store
+from src.services.upload_spool import UploadTooLargeError, remove_spool_file, spool_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/extraction", tags=["extraction"])
 
+MAX_ROW_PAGE_SIZE = 1000
+
 
 @router.post("/extract")
 async def extract_data(user: CurrentUser, file: UploadFile = File(...)):
@@ -29,57 +34,35 @@ async def extract_data(user: CurrentUser, file: UploadFile = File(...)):
 
     Returns job ID immediately, use /processing/status/{job_id} for real-time updates.
     """
-    # Validate file type
-    allowed_types = [
-        "text/plain",
-        "text/csv",
-        "text/markdown",
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "image/png",
-        "image/jpeg",
-        "image/jpg"
-    ]
-
-    # Check if file type is allowed or if it's a CSV file (which may come as application/octet-stream)
+    # Validate file type against the registered extractors
+    allowed_types = supported_mime_types()
+
+    # Generic uploads (e.g. CSV sent as application/octet-stream) are matched by extension
     is_allowed = file.content_type in allowed_types
-    is_csv_file = (
-        file.content_type == "application/octet-stream" and
-        file.filename and
-        file.filename.lower().endswith('.csv')
+    is_known_extension = (
+        file.content_type == "application/octet-stream"
+        and file.filename
+        and get_spec(os.path.splitext(file.filename)[1]) is not None
     )
 
-    if not (is_allowed or is_csv_file):
-        supported_types = allowed_types + ["text/csv (detected by filename)"]
+    if not (is_allowed or is_known_extension):
+        supported_types = allowed_types + ["application/octet-stream (detected by filename)"]
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Unsupported file type: {file.content_type}. Supported: {', '.join(supported_types)}",
         )
 
-    # Validate file size (10MB limit)
-    max_size = 10 * 1024 * 1024  # 10MB
-    file_content = await file.read()
-    if len(file_content) > max_size:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="File too large. Maximum size: 10MB"
-        )
-
-    # Save file temporarily
-    with tempfile.NamedTemporaryFile(
-        delete=False, suffix=os.path.splitext(file.filename or "file")[1]
-    ) as temp_file:
-        temp_file.write(file_content)
-        temp_file_path = temp_file.name
+    # Stream to disk, enforcing the size limit and hashing as the file arrives
+    try:
+        upload = await spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     # Create processing job
-    job_id = processing_tracker.create_job(
-        file.filename or "uploaded_file",
-        len(file_content)
-    )
+    job_id = processing_tracker.create_job(upload.filename, upload.size)
 
     # Start background processing
-    import asyncio
-    asyncio.create_task(process_file_background(temp_file_path, job_id))
+    asyncio.create_task(process_file_background(upload.path, job_id, upload.sha256))
 
     return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={
         "message": "File upload accepted, processing started",
@@ -89,11 +72,12 @@ async def extract_data(user: CurrentUser, file: UploadFile = File(...)):
     })
 
 
-async def process_file_background(file_path: str, job_id: str):
+async def process_file_background(
+    file_path: str, job_id: str, content_sha256: Optional[str] = None
+):
     """Process file in background and update job status."""
     try:
-        extraction_service = ExtractionService()
-        result = await extraction_service.extract_text(file_path, job_id)
+        await get_extraction_service().extract_text(file_path, job_id, content_sha256)
 
         # Job completion is handled in the extraction service
 
@@ -102,105 +86,74 @@ async def process_file_background(file_path: str, job_id: str):
         processing_tracker.fail_job(job_id, str(e))
 
     finally:
-        # Clean up temporary file
-        try:
-            os.unlink(file_path)
-        except Exception as e:
-            logger.warning(f"Failed to clean up temp file {file_path}: {e}")
-
-        if not (is_allowed or is_csv_file):
-            supported_types = allowed_types + ["text/csv (detected by filename)"]
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Unsupported file type: {file.content_type}. Supported: {', '.join(supported_types)}",
-            )
-
-        # Validate file size (10MB limit)
-        max_size = 10 * 1024 * 1024  # 10MB
-        file_content = await file.read()
-        if len(file_content) > max_size:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="File too large. Maximum size: 10MB"
-            )
-
-        # Save file temporarily
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=os.path.splitext(file.filename or "file")[1]
-        ) as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
-
-        # Create processing job
-        job_id = processing_tracker.create_job(
-            file.filename or "uploaded_file",
-            len(file_content)
+        # Clean up the spooled upload
+        remove_spool_file(file_path)
+
+
+@router.get("/{job_id}/rows")
+async def get_extracted_rows(
+    job_id: str,
+    user: CurrentUser,
+    table: int = 0,
+    offset: int = 0,
+    limit: int = 100,
+):
+    """Page through the rows of a table extracted by a completed job.
+
+    Extraction results only carry a preview of large tables (CSV files);
+    the full table is read from columnar storage here.
+    """
+    if offset < 0 or not 1 <= limit <= MAX_ROW_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"offset must be >= 0 and limit between 1 and {MAX_ROW_PAGE_SIZE}",
         )
 
-        # Start background processing
-        import asyncio
-        asyncio.create_task(process_file_background(temp_file_path, job_id))
-
-        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={
-            "message": "File upload accepted, processing started",
-            "job_id": job_id,
-            "status_url": f"/api/v1/processing/status/{job_id}",
-            "estimated_time": "10-30 seconds"
-        })
-
-    
-
-async def process_file_background(file_path: str, job_id: str):
-    """Process file in background and update job status."""
-    try:
-        extraction_service = ExtractionService()
-        result = await extraction_service.extract_text(file_path, job_id)
-
-        # Job completion is handled in the extraction service
+    job = processing_tracker.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Processing job {job_id} not found"
+        )
+    if job.status != "completed" or not job.result:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Processing job {job_id} has not completed (status: {job.status})",
+        )
 
-    except Exception as e:
-        logger.error(f"Background processing failed for job {job_id}: {e}")
-        processing_tracker.fail_job(job_id, str(e))
+    tables = job.result.get("tables", [])
+    if not 0 <= table < len(tables):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Table {table} not found in job {job_id}"
+        )
+    table_data = tables[table]
 
-    finally:
-        # Clean up temporary file
+    if table_data.get("table_id"):
         try:
-            os.unlink(file_path)
-        except Exception as e:
-            logger.warning(f"Failed to clean up temp file {file_path}: {e}")
-
-        if not (is_allowed or is_csv_file):
-            supported_types = allowed_types + ["text/csv (detected by filename)"]
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Unsupported file type: {file.content_type}. Supported: {', '.join(supported_types)}",
+            page = await asyncio.to_thread(
+                get_table_store().read_rows, table_data["table_id"], offset, limit
             )
-
-        # Validate file size (10MB limit)
-        max_size = 10 * 1024 * 1024  # 10MB
-        file_content = await file.read()
-        if len(file_content) > max_size:
+        except TableNotFoundError:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="File too large. Maximum size: 10MB"
+                status_code=status.HTTP_410_GONE,
+                detail="Stored table has expired; extract the file again",
             )
-
-        # Save file temporarily
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=os.path.splitext(file.filename or "file")[1]
-        ) as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
-
-        try:
-            # Extract text
-            extraction_service = ExtractionService()
-            result = await extraction_service.extract_text(temp_file_path)
-
-            return JSONResponse(status_code=status.HTTP_200_OK, content=result)
-
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_file_path)
-            except Exception as e:
-                logger.warning(f"Failed to clean up temp file {temp_file_path}: {e}")
-
+    else:
+        # Tables small enough to live entirely in the result (e.g. Textract tables)
+        rows = table_data.get("rows", [])
+        page = {
+            "rows": rows[offset : offset + limit],
+            "total_rows": len(rows),
+            "has_more": offset + limit < len(rows),
+        }
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "job_id": job_id,
+            "table": table,
+            "columns": table_data.get("columns", []),
+            "offset": offset,
+            "limit": limit,
+            **page,
+        },
+    )
@@ -5,6 +5,8 @@ from sqlalchemy import text
 
 from src.db.redis import ping_redis
 from src.db.session import SessionLocal
+from src.services.extraction_cache import get_extraction_cache
+from src.services.llm_service import get_llm_service
 
 router = APIRouter()
 
@@ -17,6 +19,7 @@ async def health_check():
     - API is running
     - Database connection
     - Redis connection
+    - LLM provider circuit breakers
 
     Returns:
         Health status with component checks
@@ -27,7 +30,9 @@ async def health_check():
             "api": "up",
             "database": "unknown",
             "redis": "unknown",
+            "llm": "unknown",
         },
+        "llm_providers": [],
     }
 
     # Check database
@@ -51,4 +56,25 @@ async def health_check():
         health_status["components"]["redis"] = f"down: {str(e)}"
         health_status["status"] = "degraded"
 
+    # Check LLM providers (same breaker state that routes requests)
+    try:
+        llm_service = get_llm_service()
+        health_status["llm_providers"] = llm_service.get_provider_health()
+        health_status["llm_cache"] = llm_service.get_cache_stats()
+        health_status["llm_coalescing"] = llm_service.get_coalescing_stats()
+        if llm_service.get_available_providers():
+            health_status["components"]["llm"] = "up"
+        else:
+            health_status["components"]["llm"] = "down: all provider circuits open"
+            health_status["status"] = "degraded"
+    except Exception as e:
+        health_status["components"]["llm"] = f"down: {str(e)}"
+        health_status["status"] = "degraded"
+
+    # Extraction cache counters (informational; the cache degrades to misses)
+    try:
+        health_status["extraction_cache"] = get_extraction_cache().stats
+    except Exception as e:
+        health_status["extraction_cache"] = f"unavailable: {str(e)}"
+
     return health_status
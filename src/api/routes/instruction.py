@@ -1,21 +1,22 @@
 """AI instruction processing routes."""
 
+import asyncio
 import logging
 from typing import Dict, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 
 from src.dependencies import get_current_user
 from src.core.logging import get_logger
 from src.models.user import User
-from src.services.llm_service import LLMService
+from src.services.llm_service import get_llm_service
+from src.services.table_store import TableNotFoundError, get_table_store
 from src.services.transformation_service import TransformationService, TransformationRule
 
 logger = get_logger(__name__)
 router = APIRouter()
 
-llm_service = LLMService()
 transformation_service = TransformationService()
 
 
@@ -46,6 +47,15 @@ async def process_instruction(
     Returns:
         Transformed data and explanation
     """
+    # Transform whole tables, not the previews extraction results carry
+    try:
+        data = await asyncio.to_thread(get_table_store().with_rows, request.data)
+    except TableNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Stored table has expired; extract the file again",
+        )
+
     try:
         logger.info(
             f"Processing instruction for user {current_user.id}: {request.instruction[:50]}..."
@@ -53,7 +63,7 @@ async def process_instruction(
 
         # Use LLM to convert natural language instruction to transformation rules
         try:
-            raw_rules = await llm_service.process_instruction(request.instruction, request.data)
+            raw_rules = await get_llm_service().process_instruction(request.instruction, request.data)
             logger.info(f"LLM returned rules: {raw_rules}")
         except Exception as llm_error:
             logger.warning(f"LLM service failed: {llm_error}. Using fallback transformations.")
@@ -68,9 +78,7 @@ async def process_instruction(
                     {
                         "type": "extract",
                         "description": "Extract email addresses from text",
-                        "parameters": {
-                            "pattern": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-                        },
+                        "parameters": {"entity": "email"},
                     }
                 )
             elif (
@@ -103,7 +111,7 @@ async def process_instruction(
                     {
                         "type": "extract",
                         "description": "Extract phone numbers from text",
-                        "parameters": {"pattern": r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b"},
+                        "parameters": {"entity": "phone"},
                     }
                 )
             elif "uppercase" in instruction_lower or "upper" in instruction_lower:
@@ -127,15 +135,15 @@ async def process_instruction(
                 transformation_rules.append(rule)
 
         # Apply transformations
-        transformed_data = transformation_service.apply_transformations(
-            request.data, transformation_rules
-        )
+        transformed_data = transformation_service.apply_transformations(data, transformation_rules)
 
         # Generate explanation
         if transformation_rules:
             explanation = f"Applied {len(transformation_rules)} transformations based on instruction: {request.instruction}"
         else:
             explanation = f"No specific transformations found for instruction: {request.instruction}. Data returned unchanged."
+        if transformed_data.get("transformation_notes"):
+            explanation += f" Skipped: {'; '.join(transformed_data['transformation_notes'])}."
 
         return InstructionResponse(transformed_data=transformed_data, explanation=explanation)
 
@@ -54,6 +54,13 @@ class ConversationWithMessages(ConversationResponse):
     token_stats: dict
 
 
+class MessagePage(BaseModel):
+    """Response schema for one page of conversation messages."""
+
+    messages: list[MessageResponse]  # Chronological order
+    has_more: bool  # More messages exist beyond this page in the direction of travel
+
+
 class ChatResponse(BaseModel):
     """Response schema for chat completion."""
 
@@ -35,6 +35,41 @@ class Settings(BaseSettings):
     aws_secret_access_key: Optional[str] = None
     aws_default_region: str = "us-east-1"
     openai_api_key: Optional[str] = None
+    bedrock_max_concurrency: int = 8  # Bedrock calls in flight per process
+
+    # LLM request hedging
+    llm_hedging_enabled: bool = False
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_default_delay_ms: int = 2000  # Used until enough latency samples exist
+    llm_hedge_min_delay_ms: int = 250
+    llm_hedge_max_delay_ms: int = 10000
+
+    # LLM provider circuit breakers
+    llm_breaker_failure_threshold: int = 3  # Consecutive failures that open the circuit
+    llm_breaker_error_rate_threshold: float = 0.5
+    llm_breaker_open_seconds: float = 30.0  # Cool-down before a probe request
+    llm_breaker_slow_call_seconds: float = 30.0  # Slower successes count as failures
+    llm_health_ewma_alpha: float = 0.2
+
+    # LLM response cache (routes opt in per call)
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 3600
+    llm_cache_max_entries: int = 1000
+    llm_cache_redis_enabled: bool = True
+    llm_cache_semantic_enabled: bool = False  # Embedding-similarity tier, temperature 0 only
+    llm_cache_semantic_threshold: float = 0.97
+
+    # LLM request coalescing (identical concurrent calls share one upstream call)
+    llm_coalescing_enabled: bool = True
+    llm_coalescing_redis_enabled: bool = False  # Also coalesce across workers
+    llm_coalescing_lock_ttl_ms: int = 60000
+    llm_coalescing_wait_timeout_seconds: float = 60.0
+
+    # Chat context assembly
+    chat_context_token_budget: int = 8000  # Prompt tokens per chat request (capped per model)
+    chat_summary_max_tokens: int = 500
+    chat_stream_checkpoint_chunks: int = 16  # Flush streamed output to Redis every N chunks
+    chat_stream_checkpoint_ttl_seconds: int = 3600  # Resume window after a stream ends
 
     # External Services
     firecrawl_api_key: Optional[str] = None
@@ -63,6 +98,49 @@ class Settings(BaseSettings):
     s3_bucket_name: Optional[str] = None
     s3_region: str = "us-east-1"
 
+    # Uploads (streamed to spool files; None = system temp dir)
+    max_upload_mb: int = 10
+    upload_spool_dir: Optional[str] = None
+
+    # Textract PDF analysis (larger PDFs go through S3 and an asynchronous job)
+    textract_sync_max_pages: int = 10  # PDFs up to this many pages are analyzed page by page
+    textract_max_concurrency: int = 4  # Synchronous page calls in flight per document
+    textract_poll_interval_seconds: float = 2.0
+    textract_job_timeout_seconds: float = 900.0
+    textract_s3_prefix: str = "textract-input/"
+
+    # Comprehend text analysis (whole documents, in chunks through the batch APIs)
+    comprehend_max_concurrency: int = 4  # Batch calls in flight per document
+
+    # Local OCR for images without Textract (needs pytesseract, Pillow and tesseract)
+    local_ocr_enabled: bool = True
+    local_ocr_language: str = "eng"  # Tesseract language code(s), e.g. "eng+deu"
+    local_ocr_detect_tables: bool = True
+    local_ocr_max_image_side: int = 3000  # Larger images are downscaled first, 0 disables
+
+    # Local document parsing (PyPDF2 / python-docx run in a process pool)
+    extraction_pool_workers: int = 0  # 0 = min(CPU count, 4)
+    extraction_pool_max_tasks_per_child: int = 50  # Replace workers after this many tasks
+    extraction_task_timeout_seconds: float = 120.0
+    extraction_worker_memory_mb: int = 1024  # Address-space limit per worker, 0 disables
+
+    # Extraction result cache (keyed on file SHA-256 + options; index in Redis)
+    extraction_cache_enabled: bool = True
+    extraction_cache_backend: Literal["local", "s3"] = "local"  # "s3" stores blobs in S3_BUCKET_NAME
+    extraction_cache_dir: str = "./extraction_cache"
+    extraction_cache_s3_prefix: str = "extraction-cache/"
+    extraction_cache_max_mb: int = 1024  # Compressed size kept before LRU eviction
+
+    # Extracted tables (CSV rows live in Arrow files; results carry a preview)
+    extraction_table_dir: str = "./extraction_tables"
+    extraction_table_ttl_hours: int = 24
+    extraction_preview_rows: int = 100
+
+    # Table transformations ("auto"/"columnar" run large tables on pandas kernels)
+    transformation_engine: Literal["auto", "rows", "columnar"] = "rows"
+    transformation_columnar_min_rows: int = 20000  # Smallest table "auto" converts to a frame
+    transformation_sort_run_rows: int = 250000  # Rows sorted in memory before spilling to disk
+
     # CORS
     cors_origins: str = (
         "http://localhost:3000,http://localhost:3001,http://localhost:3002,http://localhost:8000"
@@ -0,0 +1,96 @@
+"""In-process caching primitives."""
+
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """Least-recently-used cache with optional per-entry TTL.
+
+    Not thread-safe; intended for use from a single event loop.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: Optional[float] = None):
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum entries before the least recently used is evicted
+            ttl_seconds: Default time-to-live for entries (None = no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[Optional[float], V]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Get a value and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl_seconds: Overrides the default TTL for this entry
+        """
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        """Remove and return a value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Removed value, or None if missing
+        """
+        entry = self._entries.pop(key, None)
+        return entry[1] if entry else None
+
+    def values(self) -> list[V]:
+        """Get all unexpired values, least recently used first."""
+        now = time.monotonic()
+        return [
+            value
+            for expires_at, value in self._entries.values()
+            if expires_at is None or now < expires_at
+        ]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
@@ -0,0 +1,26 @@
+"""add conversation rolling summary
+
+Revision ID: 7c1e4a9d2f60
+Revises: 240f6dc265cb
+Create Date: 2026-10-16 09:12:31.402113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e4a9d2f60'
+down_revision = '240f6dc265cb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('conversations', sa.Column('summary_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('conversations', 'summary_until')
+    op.drop_column('conversations', 'summary')
@@ -0,0 +1,35 @@
+"""add message token columns and conversation totals
+
+Revision ID: b3f92d6e1a47
+Revises: 7c1e4a9d2f60
+Create Date: 2026-10-16 11:04:52.918370
+
+Existing rows start at zero; run scripts/backfill_conversation_tokens.py
+after upgrading to populate them.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f92d6e1a47'
+down_revision = '7c1e4a9d2f60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('messages', sa.Column('input_tokens', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('messages', sa.Column('output_tokens', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('total_input_tokens', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('total_output_tokens', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('conversations', 'message_count')
+    op.drop_column('conversations', 'total_output_tokens')
+    op.drop_column('conversations', 'total_input_tokens')
+    op.drop_column('messages', 'output_tokens')
+    op.drop_column('messages', 'input_tokens')
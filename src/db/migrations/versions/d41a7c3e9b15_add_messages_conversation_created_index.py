@@ -0,0 +1,29 @@
+"""add messages (conversation_id, created_at) index
+
+Revision ID: d41a7c3e9b15
+Revises: b3f92d6e1a47
+Create Date: 2026-10-16 13:37:08.250914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a7c3e9b15'
+down_revision = 'b3f92d6e1a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_messages_conversation_id_created_at',
+        'messages',
+        ['conversation_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_id_created_at', table_name='messages')
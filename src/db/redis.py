@@ -1,6 +1,9 @@
 """Redis client management."""
 
+from typing import Optional
+
 import redis
+import redis.asyncio as aioredis
 from redis.connection import ConnectionPool
 
 from src.config import get_settings
@@ -17,12 +20,31 @@ redis_pool = ConnectionPool.from_url(
 # Create Redis client
 redis_client = redis.Redis(connection_pool=redis_pool)
 
+# Async client for use inside request handlers (created lazily on first use)
+_async_redis_client: Optional[aioredis.Redis] = None
+
 
 def get_redis():
     """Get Redis client (FastAPI dependency)."""
     return redis_client
 
 
+def get_async_redis() -> aioredis.Redis:
+    """Get shared asyncio Redis client.
+
+    Returns:
+        Async Redis client backed by its own connection pool
+    """
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = aioredis.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            decode_responses=True,
+        )
+    return _async_redis_client
+
+
 def ping_redis() -> bool:
     """Check if Redis is available."""
     try:
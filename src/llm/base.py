@@ -3,7 +3,7 @@
 from abc import ABC, abstractmethod
 from typing import Any, AsyncIterator, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class LLMMessage(BaseModel):
@@ -23,6 +23,13 @@ class LLMResponse(BaseModel):
     output_tokens: int = 0
     total_tokens: int = 0
     finish_reason: Optional[str] = None
+    cached: bool = False  # Served from the LLM response cache
+    coalesced: bool = False  # Shared from an identical in-flight request
+
+    # Hedging report (set by LLMService when a request is hedged)
+    hedged: bool = False
+    hedge_cost_tokens: int = 0  # Tokens spent (or, for cancelled calls, estimated) on losers
+    attempted_providers: list[str] = Field(default_factory=list)
 
 
 class BaseLLMProvider(ABC):
@@ -95,3 +102,11 @@ class BaseLLMProvider(ABC):
             True if provider has native streaming support
         """
         return False
+
+    def supports_cancellation(self) -> bool:
+        """Check if cancelling a call stops it upstream.
+
+        Returns:
+            False if a cancelled call still runs (and is billed) to completion
+        """
+        return True
@@ -1,15 +1,76 @@
-"""AWS Bedrock LLM provider implementation."""
+"""AWS Bedrock LLM provider implementation.
 
+boto3 is synchronous, so every Bedrock call runs on a shared, bounded
+thread pool instead of the event loop. Streaming responses are read on a
+pool thread and bridged back to the event loop through an asyncio queue.
+
+A running boto3 call cannot be interrupted: cancelling the coroutine that
+awaits it (a hedge loser, a client disconnect) leaves the call running to
+completion on its thread. Concurrency slots are therefore held until the
+pool call finishes, not until its caller stops waiting.
+"""
+
+import asyncio
 import json
 import logging
-from typing import Any, AsyncIterator, Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Optional
 
 import boto3
+from botocore.config import Config
 
 from src.llm.base import BaseLLMProvider, LLMMessage, LLMResponse
 
 logger = logging.getLogger(__name__)
 
+# Shared across provider instances: one executor and one client per region
+_executor: Optional[ThreadPoolExecutor] = None
+_clients: dict[str, Any] = {}
+_pool_lock = threading.Lock()
+
+# Marks the end of a bridged stream
+_STREAM_END = object()
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Get the shared Bedrock thread pool, creating it on first use.
+
+    Args:
+        max_workers: Pool size (only used when the pool is created)
+
+    Returns:
+        Shared ThreadPoolExecutor
+    """
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bedrock")
+        return _executor
+
+
+def _get_client(region_name: str, max_connections: int) -> Any:
+    """Get the shared bedrock-runtime client for a region.
+
+    boto3 clients are thread-safe, so one client (and its HTTP connection
+    pool) serves every pool thread.
+
+    Args:
+        region_name: AWS region
+        max_connections: HTTP connection pool size
+
+    Returns:
+        boto3 bedrock-runtime client
+    """
+    with _pool_lock:
+        if region_name not in _clients:
+            _clients[region_name] = boto3.client(
+                "bedrock-runtime",
+                region_name=region_name,
+                config=Config(max_pool_connections=max_connections),
+            )
+        return _clients[region_name]
+
 
 class BedrockProvider(BaseLLMProvider):
     """AWS Bedrock LLM provider.
@@ -32,6 +93,7 @@ class BedrockProvider(BaseLLMProvider):
         region_name: str = "us-east-1",
         guardrail_id: Optional[str] = None,
         guardrail_version: str = "DRAFT",
+        max_concurrency: int = 8,
     ):
         """Initialize Bedrock provider.
 
@@ -42,9 +104,14 @@ class BedrockProvider(BaseLLMProvider):
             region_name: AWS region
             guardrail_id: Optional guardrail ID for content filtering
             guardrail_version: Guardrail version
+            max_concurrency: Maximum Bedrock calls in flight (pool threads and connections)
         """
         super().__init__(model, temperature, max_tokens)
-        self.client = boto3.client("bedrock-runtime", region_name=region_name)
+        self.client = _get_client(region_name, max_concurrency)
+        self.executor = _get_executor(max_concurrency)
+        # Callers beyond the limit wait here rather than queueing inside the pool;
+        # a slot is released when its pool call finishes (see _submit)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
         self.guardrail_id = guardrail_id
         self.guardrail_version = guardrail_version
         logger.info(f"Initialized Bedrock provider with model: {model}")
@@ -58,6 +125,38 @@ class BedrockProvider(BaseLLMProvider):
         """Bedrock supports streaming."""
         return True
 
+    def supports_cancellation(self) -> bool:
+        """A boto3 call runs to completion on its pool thread even when cancelled."""
+        return False
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Run a function on the pool once a concurrency slot is free.
+
+        The slot is released by the pool future's done-callback, so it stays
+        taken while the call runs even if the awaiting coroutine is cancelled.
+
+        Args:
+            fn: Blocking function
+            *args: Its arguments
+
+        Returns:
+            The pool future (await it through asyncio.wrap_future)
+        """
+        loop = asyncio.get_running_loop()
+        await self.semaphore.acquire()
+
+        def release(_: Future) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self.semaphore.release)
+
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        future.add_done_callback(release)
+        return future
+
     def _convert_messages(self, messages: list[LLMMessage]) -> tuple[str, list[dict]]:
         """Convert LLMMessage format to Claude format.
 
@@ -117,11 +216,9 @@ class BedrockProvider(BaseLLMProvider):
                 invoke_kwargs["guardrailIdentifier"] = self.guardrail_id
                 invoke_kwargs["guardrailVersion"] = self.guardrail_version
 
-            # Call Bedrock
-            response = self.client.invoke_model(**invoke_kwargs)
-
-            # Parse response
-            response_body = json.loads(response["body"].read())
+            # Call Bedrock on the thread pool so the event loop stays free
+            future = await self._submit(self._invoke, invoke_kwargs)
+            response_body = await asyncio.wrap_future(future)
 
             content = response_body["content"][0]["text"]
             input_tokens = response_body["usage"]["input_tokens"]
@@ -146,6 +243,60 @@ class BedrockProvider(BaseLLMProvider):
             logger.error(f"Bedrock generation failed: {e}")
             raise
 
+    def _invoke(self, invoke_kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Call invoke_model and parse the body (runs on the thread pool).
+
+        Args:
+            invoke_kwargs: Arguments for invoke_model
+
+        Returns:
+            Parsed response body
+        """
+        response = self.client.invoke_model(**invoke_kwargs)
+        return json.loads(response["body"].read())
+
+    def _pump_stream(
+        self,
+        invoke_kwargs: dict[str, Any],
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue,
+        stop: threading.Event,
+    ) -> None:
+        """Read a Bedrock response stream and forward text deltas (runs on the thread pool).
+
+        Args:
+            invoke_kwargs: Arguments for invoke_model_with_response_stream
+            loop: Event loop that owns the queue
+            queue: Receives text chunks, then an exception or _STREAM_END
+            stop: Set by the consumer to abandon the stream early
+        """
+
+        def put(item: Any) -> None:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        try:
+            response = self.client.invoke_model_with_response_stream(**invoke_kwargs)
+            stream = response.get("body")
+            if stream:
+                for event in stream:
+                    if stop.is_set():
+                        stream.close()
+                        break
+
+                    chunk = event.get("chunk")
+                    if chunk:
+                        chunk_data = json.loads(chunk.get("bytes").decode())
+
+                        # Extract content delta
+                        if chunk_data["type"] == "content_block_delta":
+                            delta = chunk_data.get("delta", {})
+                            if delta.get("type") == "text_delta":
+                                put(delta["text"])
+        except Exception as e:
+            put(e)
+        finally:
+            put(_STREAM_END)
+
     async def stream(self, messages: list[LLMMessage], **kwargs: Any) -> AsyncIterator[str]:
         """Stream a response using Bedrock.
 
@@ -174,24 +325,31 @@ class BedrockProvider(BaseLLMProvider):
             if system_message:
                 body["system"] = system_message
 
-            # Stream from Bedrock
-            response = self.client.invoke_model_with_response_stream(
-                modelId=self.model, body=json.dumps(body)
+            # Read the stream on a pool thread and hand chunks over through a queue
+            loop = asyncio.get_running_loop()
+            queue: asyncio.Queue = asyncio.Queue()
+            stop = threading.Event()
+
+            await self._submit(
+                self._pump_stream,
+                {"modelId": self.model, "body": json.dumps(body)},
+                loop,
+                queue,
+                stop,
             )
 
-            # Process stream
-            stream = response.get("body")
-            if stream:
-                for event in stream:
-                    chunk = event.get("chunk")
-                    if chunk:
-                        chunk_data = json.loads(chunk.get("bytes").decode())
-
-                        # Extract content delta
-                        if chunk_data["type"] == "content_block_delta":
-                            delta = chunk_data.get("delta", {})
-                            if delta.get("type") == "text_delta":
-                                yield delta["text"]
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is _STREAM_END:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                # Also reached when the consumer stops early: tell the thread to quit
+                # (its slot frees once it notices, at the next stream event)
+                stop.set()
 
             logger.debug("Bedrock stream completed")
 
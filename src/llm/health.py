@@ -0,0 +1,291 @@
+"""Per-provider health tracking for LLM providers.
+
+Each provider gets a circuit breaker plus exponentially weighted moving
+averages (EWMAs) of its error rate and latency. The LLM service uses this
+state to skip failing providers and to try the healthiest provider first.
+
+Breaker states:
+- closed: requests flow normally
+- open: provider is skipped until the cool-down expires
+- half_open: a single probe request is allowed; success closes the circuit,
+  failure re-opens it
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence, TypeVar
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of recent successful call latencies for one provider.
+
+    Keeps the last ``window_size`` samples and answers percentile queries,
+    which the LLM service uses to decide when to hedge a slow request.
+    """
+
+    def __init__(self, window_size: int = 100, min_samples: int = 5):
+        """Initialize tracker.
+
+        Args:
+            window_size: Number of recent samples to keep
+            min_samples: Samples required before percentiles are reported
+        """
+        self.samples: deque[float] = deque(maxlen=window_size)
+        self.min_samples = min_samples
+
+    def record(self, latency_seconds: float) -> None:
+        """Record a successful call latency.
+
+        Args:
+            latency_seconds: Wall-clock duration of the call
+        """
+        self.samples.append(latency_seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Get a latency percentile over the current window.
+
+        Args:
+            pct: Percentile between 0 and 100 (e.g. 95.0)
+
+        Returns:
+            Latency in seconds, or None if there are not enough samples yet
+        """
+        if len(self.samples) < self.min_samples:
+            return None
+
+        ordered = sorted(self.samples)
+        rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+        return ordered[rank]
+
+
+@dataclass
+class ProviderHealth:
+    """Health state for a single provider."""
+
+    name: str
+    priority: int  # Position in the configured provider order
+    latency: LatencyTracker = field(default_factory=LatencyTracker)
+    state: str = CLOSED
+    error_rate: float = 0.0  # EWMA of failures (1) vs successes (0)
+    latency_ewma: Optional[float] = None  # EWMA of successful call latency, seconds
+    consecutive_failures: int = 0
+    opened_at: Optional[float] = None
+    probe_in_flight: bool = False
+    successes: int = 0
+    failures: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for the health endpoint."""
+        return {
+            "name": self.name,
+            "state": self.state,
+            "error_rate": round(self.error_rate, 3),
+            "latency_ewma_ms": (
+                round(self.latency_ewma * 1000) if self.latency_ewma is not None else None
+            ),
+            "latency_p95_ms": (
+                round(p95 * 1000) if (p95 := self.latency.percentile(95.0)) is not None else None
+            ),
+            "consecutive_failures": self.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
+
+
+class ProviderHealthMonitor:
+    """Circuit breakers and latency/error EWMAs for a set of providers."""
+
+    def __init__(
+        self,
+        provider_names: Sequence[str],
+        alpha: float = 0.2,
+        failure_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+        slow_call_seconds: float = 30.0,
+    ):
+        """Initialize monitor.
+
+        Args:
+            provider_names: Provider names in configured priority order
+            alpha: EWMA smoothing factor (higher reacts faster)
+            failure_threshold: Consecutive failures that open a circuit
+            error_rate_threshold: Error-rate EWMA that opens a circuit
+            open_seconds: Cool-down before an open circuit allows a probe
+            slow_call_seconds: Successful calls slower than this count as failures
+        """
+        self.providers = {
+            name: ProviderHealth(name=name, priority=i) for i, name in enumerate(provider_names)
+        }
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+
+    def is_available(self, name: str) -> bool:
+        """Check whether a provider would currently accept a request.
+
+        Unlike acquire(), this does not reserve the half-open probe slot.
+
+        Args:
+            name: Provider name
+
+        Returns:
+            True if the circuit is closed or ready for a probe
+        """
+        health = self.providers[name]
+        if health.state == CLOSED:
+            return True
+        if health.state == OPEN:
+            return self._cooldown_expired(health)
+        return not health.probe_in_flight
+
+    def acquire(self, name: str) -> bool:
+        """Ask to send a request to a provider.
+
+        An open circuit whose cool-down has expired moves to half-open and
+        hands out a single probe slot.
+
+        Args:
+            name: Provider name
+
+        Returns:
+            True if the request may be sent
+        """
+        health = self.providers[name]
+
+        if health.state == CLOSED:
+            return True
+
+        if health.state == OPEN:
+            if not self._cooldown_expired(health):
+                return False
+            health.state = HALF_OPEN
+            health.probe_in_flight = False
+
+        if health.probe_in_flight:
+            return False
+
+        health.probe_in_flight = True
+        return True
+
+    def record_success(self, name: str, latency_seconds: Optional[float] = None) -> None:
+        """Record a successful call.
+
+        Args:
+            name: Provider name
+            latency_seconds: Call duration, if meaningful (None for streams)
+        """
+        health = self.providers[name]
+
+        if latency_seconds is not None:
+            health.latency.record(latency_seconds)
+            health.latency_ewma = self._ewma(health.latency_ewma, latency_seconds)
+
+            if latency_seconds > self.slow_call_seconds:
+                # Too slow to be useful: treat like a failure for breaker purposes
+                self.record_failure(name)
+                return
+
+        health.successes += 1
+        health.error_rate = self._ewma(health.error_rate, 0.0)
+        health.consecutive_failures = 0
+        health.probe_in_flight = False
+
+        if health.state != CLOSED:
+            health.state = CLOSED
+            health.opened_at = None
+
+    def record_failure(self, name: str) -> None:
+        """Record a failed call, opening the circuit if thresholds are crossed.
+
+        Args:
+            name: Provider name
+        """
+        health = self.providers[name]
+        health.failures += 1
+        health.error_rate = self._ewma(health.error_rate, 1.0)
+        health.consecutive_failures += 1
+        health.probe_in_flight = False
+
+        if health.state == HALF_OPEN or (
+            health.state == CLOSED
+            and (
+                health.consecutive_failures >= self.failure_threshold
+                or health.error_rate >= self.error_rate_threshold
+            )
+        ):
+            health.state = OPEN
+            health.opened_at = time.monotonic()
+
+    def record_cancelled(self, name: str) -> None:
+        """Record a call that was cancelled before finishing (e.g. a hedge loser).
+
+        Args:
+            name: Provider name
+        """
+        self.providers[name].probe_in_flight = False
+
+    def order(self, providers: Sequence[T], key: Any = None) -> list[T]:
+        """Order available providers healthiest-first.
+
+        Providers with open circuits are left out. Among the rest, the score
+        is the latency EWMA inflated by the error-rate EWMA. A provider with
+        no successful calls yet is scored at the mean latency of the others,
+        so it ties with a typical provider (and keeps its configured position
+        among them) rather than jumping ahead of providers with data, and its
+        error rate still counts against it. If every circuit is open, all
+        providers are returned in configured order as a last resort.
+
+        Args:
+            providers: Provider objects
+            key: Function mapping a provider object to its name
+
+        Returns:
+            Ordered list of providers to try
+        """
+        key = key or (lambda p: p.provider_name)
+        available = [p for p in providers if self.is_available(key(p))]
+
+        if not available:
+            return list(providers)
+
+        known = [
+            health.latency_ewma
+            for health in (self.providers[key(p)] for p in available)
+            if health.latency_ewma is not None
+        ]
+        neutral = sum(known) / len(known) if known else 1.0
+
+        def score(provider: T) -> tuple[float, int]:
+            health = self.providers[key(provider)]
+            latency = health.latency_ewma if health.latency_ewma is not None else neutral
+            return latency * (1 + 4 * health.error_rate), health.priority
+
+        return sorted(available, key=score)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Get health state of every provider, in configured order."""
+        return [health.to_dict() for health in self.providers.values()]
+
+    def _cooldown_expired(self, health: ProviderHealth) -> bool:
+        """Check whether an open circuit may be probed again."""
+        return (
+            health.opened_at is not None
+            and time.monotonic() - health.opened_at >= self.open_seconds
+        )
+
+    def _ewma(self, previous: Optional[float], sample: float) -> float:
+        """Fold a sample into an exponentially weighted moving average."""
+        if previous is None:
+            return sample
+        return self.alpha * sample + (1 - self.alpha) * previous
@@ -21,6 +21,8 @@ from src.api.routes import (
 from src.config import get_settings
 from src.core.exceptions import APEException
 from src.core.logging import get_logger, setup_logging
+from src.services.extraction_pool import shutdown_extraction_pool
+from src.services.stream_checkpoint import cancel_live_streams
 
 # Setup logging
 setup_logging()
@@ -41,6 +43,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down APE")
+    await cancel_live_streams()  # Saves partial output of in-flight chat streams
+    await shutdown_extraction_pool()
 
 
 # Create FastAPI application
@@ -1,6 +1,6 @@
 """Conversation model."""
 
-from sqlalchemy import Column, ForeignKey, String
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -18,6 +18,16 @@ class Conversation(BaseModel):
     title = Column(String(255))
     model = Column(String(50), default="auto")
 
+    # Running totals, maintained by MessageRepository.create
+    total_input_tokens = Column(Integer, default=0, server_default="0", nullable=False)
+    total_output_tokens = Column(Integer, default=0, server_default="0", nullable=False)
+    message_count = Column(Integer, default=0, server_default="0", nullable=False)
+
+    # Rolling summary of turns that no longer fit the context budget.
+    # summary_until is the created_at of the last message folded in.
+    summary = Column(Text)
+    summary_until = Column(DateTime)
+
     # Relationships
     user = relationship("User", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
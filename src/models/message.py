@@ -1,6 +1,6 @@
 """Message model."""
 
-from sqlalchemy import Column, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -20,18 +20,19 @@ class Message(BaseModel):
     )
     role = Column(String(20), nullable=False)  # 'user', 'assistant', 'system'
     content = Column(Text, nullable=False)
-    tokens_used = Column(Integer, default=0)
+    input_tokens = Column(Integer, default=0, server_default="0", nullable=False)
+    output_tokens = Column(Integer, default=0, server_default="0", nullable=False)
+    tokens_used = Column(Integer, default=0)  # input_tokens + output_tokens
     model_used = Column(String(50))
 
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
 
-    @property
-    def input_tokens(self) -> int:
-        """Alias for tokens_used (for backward compatibility)."""
-        return 0  # User messages don't consume input tokens from our perspective
 
-    @property
-    def output_tokens(self) -> int:
-        """Get output tokens (assistant messages use tokens)."""
-        return self.tokens_used if self.role == "assistant" else 0
+# Serves recent-history windows and keyset pagination (newest first, id breaks ties)
+Index(
+    "ix_messages_conversation_id_created_at",
+    Message.conversation_id,
+    Message.created_at.desc(),
+    Message.id.desc(),
+)
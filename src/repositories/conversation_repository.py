@@ -3,10 +3,12 @@
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import desc, select
+from sqlalchemy import desc, or_, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from src.models.conversation import Conversation
+from src.models.message import Message
 
 
 class ConversationRepository:
@@ -108,8 +110,10 @@ class ConversationRepository:
         return False
 
     @staticmethod
-    async def verify_ownership(db: AsyncSession, conversation_id: UUID, user_id: UUID) -> bool:
-        """Verify user owns conversation.
+    async def get_user_conversation(
+        db: AsyncSession, conversation_id: UUID, user_id: UUID
+    ) -> Optional[Conversation]:
+        """Get a conversation if the user owns it.
 
         Args:
             db: Database session
@@ -117,11 +121,79 @@ class ConversationRepository:
             user_id: User ID
 
         Returns:
-            True if user owns conversation, False otherwise
+            Conversation if found and owned by the user, None otherwise
         """
         result = await db.execute(
             select(Conversation).where(
                 Conversation.id == conversation_id, Conversation.user_id == user_id
             )
         )
-        return result.scalar_one_or_none() is not None
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_with_history(
+        db: AsyncSession,
+        conversation_id: UUID,
+        user_id: UUID,
+        limit: Optional[int] = None,
+    ) -> tuple[Optional[Conversation], list[Message]]:
+        """Get an owned conversation and its unsummarized history in one query.
+
+        The ownership check and the history read are a single statement: the
+        conversation is outer-joined to a lateral window of its messages
+        created after the summary watermark (``summary_until``).
+
+        Args:
+            db: Database session
+            conversation_id: Conversation ID
+            user_id: User ID
+            limit: Optional maximum number of recent messages to return
+
+        Returns:
+            Tuple of (conversation or None if not found/not owned,
+            messages in chronological order)
+        """
+        recent = (
+            select(Message)
+            .where(
+                Message.conversation_id == Conversation.id,
+                or_(
+                    Conversation.summary_until.is_(None),
+                    Message.created_at > Conversation.summary_until,
+                ),
+            )
+            .order_by(Message.created_at.desc(), Message.id.desc())
+        )
+        if limit:
+            recent = recent.limit(limit)
+        recent = recent.lateral()
+        window = aliased(Message, recent)
+
+        result = await db.execute(
+            select(Conversation, window)
+            .outerjoin(recent, true())
+            .where(Conversation.id == conversation_id, Conversation.user_id == user_id)
+            .order_by(window.created_at, window.id)
+        )
+        rows = result.all()
+        if not rows:
+            return None, []
+
+        return rows[0][0], [message for _, message in rows if message is not None]
+
+    @staticmethod
+    async def verify_ownership(db: AsyncSession, conversation_id: UUID, user_id: UUID) -> bool:
+        """Verify user owns conversation.
+
+        Args:
+            db: Database session
+            conversation_id: Conversation ID
+            user_id: User ID
+
+        Returns:
+            True if user owns conversation, False otherwise
+        """
+        conversation = await ConversationRepository.get_user_conversation(
+            db, conversation_id, user_id
+        )
+        return conversation is not None
@@ -1,12 +1,15 @@
 """Message repository for chat operations."""
 
+import uuid
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased
 
+from src.models.conversation import Conversation
 from src.models.message import Message
 
 
@@ -21,31 +24,106 @@ class MessageRepository:
         content: str,
         input_tokens: int = 0,
         output_tokens: int = 0,
+        commit: bool = True,
     ) -> Message:
-        """Create a new message.
+        """Create a new message and add it to the conversation's running totals.
 
         Args:
             db: Database session
             conversation_id: ID of conversation
             role: Message role ('user', 'assistant', 'system')
             content: Message content
-            input_tokens: Number of input tokens (for tracking)
-            output_tokens: Number of output tokens (stored in tokens_used)
+            input_tokens: Number of prompt tokens billed for the message
+            output_tokens: Number of completion tokens billed for the message
+            commit: Commit the transaction (False leaves it to the caller)
 
         Returns:
             Created message
         """
-        # Store total tokens in tokens_used field
-        message = Message(
-            conversation_id=conversation_id,
-            role=role,
-            content=content,
-            tokens_used=input_tokens + output_tokens,
+        messages = await MessageRepository.create_many(
+            db,
+            conversation_id,
+            [
+                {
+                    "role": role,
+                    "content": content,
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                }
+            ],
+            commit=commit,
         )
-        db.add(message)
-        await db.commit()
-        await db.refresh(message)
-        return message
+        return messages[0]
+
+    @staticmethod
+    async def create_many(
+        db: AsyncSession,
+        conversation_id: UUID,
+        messages: list[dict],
+        conversation_values: Optional[dict] = None,
+        commit: bool = True,
+    ) -> list[Message]:
+        """Create messages and update the conversation's running totals.
+
+        One multi-row INSERT ... RETURNING plus one UPDATE of the conversation,
+        committed together. RETURNING hands back the stored rows, so no
+        refresh round trip is needed.
+
+        Args:
+            db: Database session
+            conversation_id: ID of conversation
+            messages: Dicts with role and content, plus optional input_tokens,
+                output_tokens, id and created_at
+            conversation_values: Extra conversation columns to set in the same
+                UPDATE (e.g. summary, summary_until)
+            commit: Commit the transaction (False leaves it to the caller)
+
+        Returns:
+            Created messages, in the order given
+        """
+        now = datetime.utcnow()
+        rows = []
+        for message in messages:
+            input_tokens = message.get("input_tokens", 0)
+            output_tokens = message.get("output_tokens", 0)
+            created_at = message.get("created_at") or now
+            rows.append(
+                {
+                    "id": message.get("id") or uuid.uuid4(),
+                    "conversation_id": conversation_id,
+                    "role": message["role"],
+                    "content": message["content"],
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "tokens_used": input_tokens + output_tokens,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+
+        result = await db.scalars(
+            insert(Message).returning(Message, sort_by_parameter_order=True), rows
+        )
+        created = list(result.all())
+
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(
+                total_input_tokens=Conversation.total_input_tokens
+                + sum(row["input_tokens"] for row in rows),
+                total_output_tokens=Conversation.total_output_tokens
+                + sum(row["output_tokens"] for row in rows),
+                message_count=Conversation.message_count + len(rows),
+                updated_at=now,
+                **(conversation_values or {}),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        if commit:
+            await db.commit()
+        return created
 
     @staticmethod
     async def get_conversation_messages(
@@ -61,30 +139,82 @@ class MessageRepository:
         Returns:
             List of messages
         """
-        query = (
-            select(Message)
-            .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at)
-        )
-
         if limit:
-            # Get most recent N messages, but return them in chronological order
-            # First get most recent IDs
-            subquery = (
-                select(Message.id)
+            # Most recent N in one query (newest-first index scan), re-sorted chronologically
+            recent = (
+                select(Message)
                 .where(Message.conversation_id == conversation_id)
-                .order_by(Message.created_at.desc())
+                .order_by(Message.created_at.desc(), Message.id.desc())
                 .limit(limit)
+                .subquery()
+            )
+            window = aliased(Message, recent)
+            query = select(window).order_by(window.created_at, window.id)
+        else:
+            query = (
+                select(Message)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at, Message.id)
             )
-            result = await db.execute(subquery)
-            message_ids = [row[0] for row in result.all()]
-
-            # Then get those messages in chronological order
-            query = select(Message).where(Message.id.in_(message_ids)).order_by(Message.created_at)
 
         result = await db.execute(query)
         return list(result.scalars().all())
 
+    @staticmethod
+    async def get_message_page(
+        db: AsyncSession,
+        conversation_id: UUID,
+        limit: int = 50,
+        before: Optional[UUID] = None,
+        after: Optional[UUID] = None,
+    ) -> tuple[list[Message], bool]:
+        """Get one page of a conversation using keyset pagination.
+
+        Pages are anchored on a message id: ``before`` walks back towards the
+        start of the conversation, ``after`` walks forward. Without a cursor
+        the most recent page is returned. The cursor's (created_at, id) is
+        resolved inside the same statement, so each page is one index range
+        scan regardless of how deep it is.
+
+        Args:
+            db: Database session
+            conversation_id: Conversation ID
+            limit: Page size
+            before: Return messages older than this message
+            after: Return messages newer than this message
+
+        Returns:
+            Tuple of (messages in chronological order, whether more messages
+            exist beyond the page in the direction of travel)
+        """
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        position = tuple_(Message.created_at, Message.id)
+
+        cursor_id = after or before
+        if cursor_id is not None:
+            cursor = aliased(Message)
+            anchor = (
+                select(cursor.created_at, cursor.id)
+                .where(cursor.id == cursor_id, cursor.conversation_id == conversation_id)
+                .scalar_subquery()
+            )
+            query = query.where(position > anchor if after else position < anchor)
+
+        if after:
+            query = query.order_by(Message.created_at, Message.id)
+        else:
+            query = query.order_by(Message.created_at.desc(), Message.id.desc())
+
+        # Fetch one extra row to learn whether another page exists
+        result = await db.execute(query.limit(limit + 1))
+        messages = list(result.scalars().all())
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+
+        if not after:
+            messages.reverse()
+        return messages, has_more
+
     @staticmethod
     async def get_by_id(db: AsyncSession, message_id: UUID) -> Optional[Message]:
         """Get message by ID.
@@ -103,23 +233,39 @@ class MessageRepository:
     async def get_token_count(db: AsyncSession, conversation_id: UUID) -> dict:
         """Get total token count for a conversation.
 
+        Reads the running totals on the conversation row.
+
         Args:
             db: Database session
             conversation_id: Conversation ID
 
         Returns:
-            Dict with input_tokens, output_tokens, total_tokens
+            Dict with input_tokens, output_tokens, total_tokens, message_count
         """
-        messages = await MessageRepository.get_conversation_messages(db, conversation_id)
+        result = await db.execute(
+            select(
+                Conversation.total_input_tokens,
+                Conversation.total_output_tokens,
+                Conversation.message_count,
+            ).where(Conversation.id == conversation_id)
+        )
+        return MessageRepository.token_stats(result.one_or_none())
+
+    @staticmethod
+    def token_stats(conversation: Optional[object]) -> dict:
+        """Build token stats from a conversation's running totals.
 
-        # Calculate totals using properties
-        input_tokens = sum(m.input_tokens for m in messages)
-        output_tokens = sum(m.output_tokens for m in messages)
-        total_tokens = sum(m.tokens_used or 0 for m in messages)
+        Args:
+            conversation: Conversation (or row with the same total columns), or None
 
+        Returns:
+            Dict with input_tokens, output_tokens, total_tokens, message_count
+        """
+        input_tokens = conversation.total_input_tokens if conversation else 0
+        output_tokens = conversation.total_output_tokens if conversation else 0
         return {
             "input_tokens": input_tokens,
             "output_tokens": output_tokens,
-            "total_tokens": total_tokens,
-            "message_count": len(messages),
+            "total_tokens": input_tokens + output_tokens,
+            "message_count": conversation.message_count if conversation else 0,
         }
@@ -7,16 +7,16 @@ import tempfile
 from typing import List, Dict, Any, Optional
 from uuid import UUID
 
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.exceptions import ValidationError
 from src.models.batch_job import BatchJob, BatchFile
-from sqlalchemy import select, func
-from typing import List
 from src.models.user import User
 from src.repositories.user_repository import UserRepository
-from src.services.extraction_service import ExtractionService
+from src.services.extraction_service import get_extraction_service
 from src.services.processing_status import processing_tracker
+from src.services.upload_spool import remove_spool_file
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +27,7 @@ class BatchProcessingService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.user_repo = UserRepository(db)
-        self.extraction_service = ExtractionService()
+        self.extraction_service = get_extraction_service()
 
     async def create_batch_job(
         self, user_id: UUID, batch_name: str, files: List[Dict[str, Any]]
@@ -108,14 +108,20 @@ class BatchProcessingService:
         semaphore = asyncio.Semaphore(3)  # Max 3 concurrent file processing
         tasks = []
 
-        async def process_single_file(batch_file):
+        # Spooled uploads are listed on the job; pair them with their rows
+        uploads: Dict[tuple, List[Dict[str, Any]]] = {}
+        for file_info in batch_job.files or []:
+            uploads.setdefault((file_info["filename"], file_info["size"]), []).append(file_info)
+
+        async def process_single_file(batch_file, file_info):
             async with semaphore:
-                await self._process_batch_file(batch_file, batch_job_id)
+                await self._process_batch_file(batch_file, batch_job_id, file_info)
 
         # Create tasks for all files
         for batch_file in files:
             # batch_file is already a BatchFile object from SQLAlchemy
-            tasks.append(process_single_file(batch_file))
+            matches = uploads.get((batch_file.filename, batch_file.file_size))
+            tasks.append(process_single_file(batch_file, matches.pop(0) if matches else None))
 
         # Wait for all files to complete
         await asyncio.gather(*tasks, return_exceptions=True)
@@ -125,28 +131,49 @@ class BatchProcessingService:
 
         logger.info(f"Completed batch processing for job {batch_job_id}")
 
-    async def _process_batch_file(self, batch_file: BatchFile, batch_job_id: UUID) -> None:
+    async def _process_batch_file(
+        self,
+        batch_file: BatchFile,
+        batch_job_id: UUID,
+        file_info: Optional[Dict[str, Any]] = None,
+    ) -> None:
         """Process a single file within a batch.
 
         Args:
             batch_file: The batch file to process
             batch_job_id: Parent batch job ID
+            file_info: The file's entry in the job's file list (spooled upload path and hash)
         """
+        temp_path = (file_info or {}).get("temp_path")
         try:
             # Update file status
             batch_file.status = "processing"
-            batch_file.current_step = "Initializing"
+            batch_file.current_step = "Extracting data"
             await self.db.commit()
 
-            # For now, we'll simulate file processing
-            # In a real implementation, this would handle file upload and processing
-            # Since we don't have the actual file content yet, we'll mark as completed
-            # The actual implementation will be in the API route
+            if not temp_path or not os.path.exists(temp_path):
+                raise FileNotFoundError(f"Upload for {batch_file.filename} is no longer available")
+
+            job_id = processing_tracker.create_job(batch_file.filename, batch_file.file_size)
+            result = await self.extraction_service.extract_text(
+                temp_path, job_id, content_sha256=file_info.get("sha256")
+            )
 
-            batch_file.status = "completed"
-            batch_file.progress = 100.0
-            batch_file.result = {"message": f"File {batch_file.filename} processed successfully"}
-            batch_file.current_step = "Completed"
+            job = processing_tracker.get_job(job_id)
+            if job:
+                batch_file.aws_services_used = list(job.aws_services_used)
+                batch_file.cost_estimate = job.cost_estimate
+
+            error = result.get("metadata", {}).get("error")
+            if error:
+                batch_file.status = "failed"
+                batch_file.error = str(error)
+                batch_file.current_step = "Failed"
+            else:
+                batch_file.status = "completed"
+                batch_file.progress = 100.0
+                batch_file.result = result
+                batch_file.current_step = "Completed"
 
             await self.db.commit()
 
@@ -158,6 +185,10 @@ class BatchProcessingService:
             batch_file.error = str(e)
             await self.db.commit()
 
+        finally:
+            if temp_path:
+                remove_spool_file(temp_path)
+
     async def _update_batch_completion_status(self, batch_job_id: UUID) -> None:
         """Update the overall batch job completion status.
 
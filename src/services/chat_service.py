@@ -1,15 +1,29 @@
 """Chat service for conversation management."""
 
+import asyncio
 import logging
+from datetime import datetime
 from typing import AsyncIterator, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.llm.base import LLMMessage
+from src.config import get_settings
+from src.db.session import SessionLocal
+from src.models.message import Message
 from src.repositories.conversation_repository import ConversationRepository
 from src.repositories.message_repository import MessageRepository
-from src.services.llm_service import get_llm_service
+from src.services.context_builder import BuiltContext, ContextBuilder
+from src.services.llm_service import LLMService, get_llm_service
+from src.services.stream_checkpoint import (
+    CANCELLED,
+    DONE,
+    ERROR,
+    LiveStream,
+    StreamCheckpoint,
+    register_live_stream,
+    unregister_live_stream,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,14 +31,17 @@ logger = logging.getLogger(__name__)
 class ChatService:
     """Service for managing chat conversations and AI responses."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, llm_service: Optional[LLMService] = None):
         """Initialize chat service.
 
         Args:
             db: Database session
+            llm_service: LLM service (defaults to the shared instance)
         """
         self.db = db
-        self.llm_service = get_llm_service()
+        self.settings = get_settings()
+        self.llm_service = llm_service or get_llm_service()
+        self.context_builder = ContextBuilder(self.llm_service)
 
     async def create_conversation(self, user_id: UUID, title: Optional[str] = None) -> UUID:
         """Create a new conversation.
@@ -44,15 +61,20 @@ class ChatService:
         conversation_id: UUID,
         user_id: UUID,
         content: str,
-        context_messages: int = 10,
+        context_messages: Optional[int] = None,
     ) -> dict:
         """Send a message and get AI response.
 
+        History is packed into the model's token budget by ContextBuilder.
+        The turn is one unit of work: a single read (ownership check plus
+        history), the LLM call, then one transaction that writes both
+        messages and the conversation totals.
+
         Args:
             conversation_id: Conversation ID
             user_id: User ID
             content: Message content
-            context_messages: Number of previous messages to include in context
+            context_messages: Optional cap on the number of history messages considered
 
         Returns:
             Dict with user message, assistant message, provider, model
@@ -60,43 +82,28 @@ class ChatService:
         Raises:
             ValueError: If conversation not found or user doesn't own it
         """
-        # Verify ownership
-        if not await ConversationRepository.verify_ownership(self.db, conversation_id, user_id):
-            raise ValueError("Conversation not found or access denied")
-
-        # Save user message
-        user_message = await MessageRepository.create(
-            self.db,
-            conversation_id=conversation_id,
-            role="user",
-            content=content,
-        )
-
-        # Get conversation history
-        history = await MessageRepository.get_conversation_messages(
-            self.db, conversation_id, limit=context_messages
+        user_row, context = await self._prepare_turn(
+            conversation_id, user_id, content, context_messages
         )
 
-        # Build LLM messages (excluding the just-added user message from history)
-        llm_messages = [
-            LLMMessage(role=msg.role, content=msg.content)
-            for msg in history[:-1]  # Exclude last message (the one we just added)
-        ]
-        # Add the current user message
-        llm_messages.append(LLMMessage(role="user", content=content))
-
         # Get AI response
         logger.info(f"Generating response for conversation {conversation_id}")
-        response = await self.llm_service.generate(llm_messages)
-
-        # Save assistant message
-        assistant_message = await MessageRepository.create(
-            self.db,
-            conversation_id=conversation_id,
-            role="assistant",
-            content=response.content,
-            input_tokens=response.input_tokens,
-            output_tokens=response.output_tokens,
+        try:
+            response = await self.llm_service.generate(context.messages)
+        except Exception:
+            # Keep the user's message even though it went unanswered
+            await self._save_turn(conversation_id, [user_row], context)
+            raise
+
+        assistant_row = {
+            "role": "assistant",
+            "content": response.content,
+            "input_tokens": response.input_tokens,
+            "output_tokens": response.output_tokens,
+            "created_at": datetime.utcnow(),
+        }
+        user_message, assistant_message = await self._save_turn(
+            conversation_id, [user_row, assistant_row], context
         )
 
         return {
@@ -111,15 +118,18 @@ class ChatService:
         conversation_id: UUID,
         user_id: UUID,
         content: str,
-        context_messages: int = 10,
+        context_messages: Optional[int] = None,
     ) -> AsyncIterator[str]:
         """Send a message and stream AI response.
 
+        Convenience wrapper around start_stream() for callers that only
+        need the text.
+
         Args:
             conversation_id: Conversation ID
             user_id: User ID
             content: Message content
-            context_messages: Number of previous messages to include
+            context_messages: Optional cap on the number of history messages considered
 
         Yields:
             Chunks of AI response
@@ -127,46 +137,195 @@ class ChatService:
         Raises:
             ValueError: If conversation not found or access denied
         """
-        # Verify ownership
-        if not await ConversationRepository.verify_ownership(self.db, conversation_id, user_id):
-            raise ValueError("Conversation not found or access denied")
+        live = await self.start_stream(conversation_id, user_id, content, context_messages)
+        async for _, chunk in live.subscribe():
+            yield chunk
+
+    async def start_stream(
+        self,
+        conversation_id: UUID,
+        user_id: UUID,
+        content: str,
+        context_messages: Optional[int] = None,
+    ) -> LiveStream:
+        """Send a message and start generating the AI response in the background.
+
+        Generation does not depend on the client staying connected. Chunks
+        are published to a LiveStream, checkpointed to Redis every
+        CHAT_STREAM_CHECKPOINT_CHUNKS chunks, and the turn is saved when the
+        stream completes, fails or is cancelled (partial output included).
+
+        Args:
+            conversation_id: Conversation ID
+            user_id: User ID
+            content: Message content
+            context_messages: Optional cap on the number of history messages considered
 
-        # Save user message
-        await MessageRepository.create(
-            self.db,
-            conversation_id=conversation_id,
-            role="user",
-            content=content,
+        Returns:
+            LiveStream to subscribe to; its message_id is the assistant message id
+
+        Raises:
+            ValueError: If conversation not found or access denied
+        """
+        user_row, context = await self._prepare_turn(
+            conversation_id, user_id, content, context_messages
         )
 
-        # Get conversation history
-        history = await MessageRepository.get_conversation_messages(
-            self.db, conversation_id, limit=context_messages
+        live = LiveStream(uuid4(), conversation_id, user_id)
+        checkpoint = StreamCheckpoint(
+            live.message_id,
+            conversation_id,
+            user_id,
+            every=self.settings.chat_stream_checkpoint_chunks,
+            ttl_seconds=self.settings.chat_stream_checkpoint_ttl_seconds,
         )
+        await checkpoint.start()
 
-        # Build LLM messages
-        llm_messages = [LLMMessage(role=msg.role, content=msg.content) for msg in history]
+        register_live_stream(live)
+        live.task = asyncio.create_task(self._run_stream(live, checkpoint, user_row, context))
+        return live
 
-        # Stream AI response
-        full_response = ""
-        async for chunk in self.llm_service.stream(llm_messages):
-            full_response += chunk
-            yield chunk
+    async def _run_stream(
+        self,
+        live: LiveStream,
+        checkpoint: StreamCheckpoint,
+        user_row: dict,
+        context: BuiltContext,
+    ) -> None:
+        """Generate a streamed response and save the turn however it ends.
+
+        Runs as a background task with its own database session, since the
+        request that started it may finish first.
+        """
+        chunks: list[str] = []
+        status, error = ERROR, None
+
+        try:
+            async for chunk in self.llm_service.stream(context.messages):
+                if not chunk:
+                    continue
+                chunks.append(chunk)
+                await live.publish(chunk)
+                await checkpoint.append(chunk)
+            status = DONE
+
+        except asyncio.CancelledError:
+            status = CANCELLED
+            raise
+
+        except Exception as e:
+            logger.error(f"Streaming failed for message {live.message_id}: {e}")
+            error = str(e)
+
+        finally:
+            rows = [user_row]
+            if chunks:
+                # Streams do not report usage, so token counts are estimated
+                counter = self.context_builder.counter
+                rows.append(
+                    {
+                        "id": live.message_id,
+                        "role": "assistant",
+                        "content": "".join(chunks),
+                        "input_tokens": sum(counter.count_message(m) for m in context.messages),
+                        "output_tokens": counter.count("".join(chunks)),
+                        "created_at": datetime.utcnow(),
+                    }
+                )
+
+            try:
+                async with SessionLocal() as db:
+                    await MessageRepository.create_many(
+                        db,
+                        live.conversation_id,
+                        rows,
+                        conversation_values=self._summary_values(context),
+                    )
+            except Exception as e:
+                logger.error(f"Failed to save streamed message {live.message_id}: {e}")
+
+            await checkpoint.finish(status, error)
+            await live.finish(status, error)
+            unregister_live_stream(live.message_id)
+            if status != DONE:
+                logger.info(
+                    f"Stream {live.message_id} ended as {status} after {len(chunks)} chunk(s)"
+                )
+
+    async def _prepare_turn(
+        self,
+        conversation_id: UUID,
+        user_id: UUID,
+        content: str,
+        context_messages: Optional[int] = None,
+    ) -> tuple[dict, BuiltContext]:
+        """Read the conversation and build the LLM context for a new message.
+
+        The ownership check and the history load are one query. The user's
+        message is not written yet; it is saved with the rest of the turn.
+
+        Args:
+            conversation_id: Conversation ID
+            user_id: User ID
+            content: Message content
+            context_messages: Optional cap on the number of history messages considered
+
+        Returns:
+            Tuple of (user message row to save, built context)
+
+        Raises:
+            ValueError: If conversation not found or access denied
+        """
+        conversation, history = await ConversationRepository.get_with_history(
+            self.db, conversation_id, user_id, limit=context_messages
+        )
+        if conversation is None:
+            raise ValueError("Conversation not found or access denied")
+
+        user_row = {
+            "id": uuid4(),
+            "role": "user",
+            "content": content,
+            "created_at": datetime.utcnow(),
+        }
+        pending = Message(conversation_id=conversation_id, **user_row)
 
-        # Save complete assistant message after streaming
-        await MessageRepository.create(
-            self.db,
-            conversation_id=conversation_id,
-            role="assistant",
-            content=full_response,
+        context = await self.context_builder.build(conversation, [*history, pending])
+        return user_row, context
+
+    async def _save_turn(
+        self, conversation_id: UUID, rows: list[dict], context: BuiltContext
+    ) -> list[Message]:
+        """Write a turn's messages and any summary update in one transaction.
+
+        Args:
+            conversation_id: Conversation ID
+            rows: Message rows to insert, chronological
+            context: Context the turn was answered with
+
+        Returns:
+            Created messages
+        """
+        return await MessageRepository.create_many(
+            self.db, conversation_id, rows, conversation_values=self._summary_values(context)
         )
 
-    async def get_conversation_with_messages(self, conversation_id: UUID, user_id: UUID) -> dict:
+    @staticmethod
+    def _summary_values(context: BuiltContext) -> dict:
+        """Get the conversation columns to update for a context's summary change."""
+        if context.summary is None:
+            return {}
+        return {"summary": context.summary, "summary_until": context.summary_until}
+
+    async def get_conversation_with_messages(
+        self, conversation_id: UUID, user_id: UUID, message_limit: Optional[int] = None
+    ) -> dict:
         """Get conversation with messages and stats.
 
         Args:
             conversation_id: Conversation ID
             user_id: User ID
+            message_limit: Only include the most recent N messages (None = all)
 
         Returns:
             Dict with conversation, messages, token_stats
@@ -174,13 +333,16 @@ class ChatService:
         Raises:
             ValueError: If conversation not found or access denied
         """
-        # Verify ownership
-        if not await ConversationRepository.verify_ownership(self.db, conversation_id, user_id):
+        conversation = await ConversationRepository.get_user_conversation(
+            self.db, conversation_id, user_id
+        )
+        if conversation is None:
             raise ValueError("Conversation not found or access denied")
 
-        conversation = await ConversationRepository.get_by_id(self.db, conversation_id)
-        messages = await MessageRepository.get_conversation_messages(self.db, conversation_id)
-        token_stats = await MessageRepository.get_token_count(self.db, conversation_id)
+        messages = await MessageRepository.get_conversation_messages(
+            self.db, conversation_id, limit=message_limit
+        )
+        token_stats = MessageRepository.token_stats(conversation)
 
         return {
             "conversation": conversation,
@@ -188,6 +350,59 @@ class ChatService:
             "token_stats": token_stats,
         }
 
+    async def get_message_page(
+        self,
+        conversation_id: UUID,
+        user_id: UUID,
+        limit: int = 50,
+        before: Optional[UUID] = None,
+        after: Optional[UUID] = None,
+    ) -> dict:
+        """Get one page of a conversation's messages.
+
+        Args:
+            conversation_id: Conversation ID
+            user_id: User ID
+            limit: Page size
+            before: Return messages older than this message id
+            after: Return messages newer than this message id
+
+        Returns:
+            Dict with messages (chronological) and has_more
+
+        Raises:
+            ValueError: If conversation not found or access denied
+        """
+        if not await ConversationRepository.verify_ownership(self.db, conversation_id, user_id):
+            raise ValueError("Conversation not found or access denied")
+
+        messages, has_more = await MessageRepository.get_message_page(
+            self.db, conversation_id, limit=limit, before=before, after=after
+        )
+        return {"messages": messages, "has_more": has_more}
+
+    async def get_message(self, conversation_id: UUID, user_id: UUID, message_id: UUID) -> Message:
+        """Get one message from a conversation the user owns.
+
+        Args:
+            conversation_id: Conversation ID
+            user_id: User ID
+            message_id: Message ID
+
+        Returns:
+            Message
+
+        Raises:
+            ValueError: If the conversation or message is not found or access is denied
+        """
+        if not await ConversationRepository.verify_ownership(self.db, conversation_id, user_id):
+            raise ValueError("Conversation not found or access denied")
+
+        message = await MessageRepository.get_by_id(self.db, message_id)
+        if message is None or message.conversation_id != conversation_id:
+            raise ValueError("Message not found")
+        return message
+
     async def list_conversations(self, user_id: UUID, limit: int = 50, offset: int = 0) -> list:
         """List user's conversations.
 
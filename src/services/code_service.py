@@ -99,13 +99,14 @@ Provide:
             LLMMessage(role="user", content=user_prompt),
         ]
 
-        response = await self.llm_service.generate(messages)
+        response = await self.llm_service.generate(messages, cache="code_review")
 
         return {
             "review": response.content,
             "language": language,
             "provider": response.provider,
             "model": response.model,
+            "cached": response.cached,
         }
 
     async def explain_code(
@@ -144,7 +145,7 @@ Provide:
             LLMMessage(role="user", content=user_prompt),
         ]
 
-        response = await self.llm_service.generate(messages)
+        response = await self.llm_service.generate(messages, cache="code_explain")
 
         return {
             "explanation": response.content,
@@ -152,6 +153,7 @@ Provide:
             "level": level,
             "provider": response.provider,
             "model": response.model,
+            "cached": response.cached,
         }
 
     async def fix_code(
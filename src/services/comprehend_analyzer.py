@@ -0,0 +1,277 @@
+"""Whole-document text analysis with AWS Comprehend.
+
+The synchronous Comprehend APIs take at most 5,000 bytes of UTF-8 per
+document, so text is split at sentence boundaries into chunks under that
+limit and sent through the batch APIs, 25 chunks per call. Entity, key
+phrase and sentiment analysis run concurrently. Offsets in the results are
+shifted back into whole-document coordinates, and per-chunk results are
+cached by content hash so repeated passages are not re-analyzed.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+from typing import Any, Optional
+
+from src.config import get_settings
+from src.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+MAX_CHUNK_BYTES = 4900  # Batch API limit is 5,000 bytes per document
+BATCH_SIZE = 25  # Documents per batch call
+CHUNK_CACHE_ENTRIES = 10000
+UNIT_CHARS = 100  # Comprehend bills in units of 100 characters...
+MIN_UNITS = 3  # ...with a minimum of 3 units per document
+THROTTLING_ERRORS = {"ThrottlingException", "TooManyRequestsException"}
+MAX_ATTEMPTS = 4
+
+# Sentence ends, or paragraph breaks for text without punctuation
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+WORD = re.compile(r"\S+\s*|\s+")
+
+# Analysis name -> (batch API method, result keys kept per chunk)
+ANALYSES = {
+    "entities": ("batch_detect_entities", ("Entities",)),
+    "key_phrases": ("batch_detect_key_phrases", ("KeyPhrases",)),
+    "sentiment": ("batch_detect_sentiment", ("Sentiment", "SentimentScore")),
+}
+
+# Shared across analyzers, since a service (and its analyzer) is created per request
+_chunk_cache: LRUCache[dict[str, Any]] = LRUCache(max_entries=CHUNK_CACHE_ENTRIES)
+
+
+def split_sentences(text: str) -> list[tuple[int, str]]:
+    """Split text into sentences, keeping trailing whitespace with each.
+
+    Returns:
+        (start offset, sentence) pairs covering the whole text
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        sentences.append((start, text[start : match.end()]))
+        start = match.end()
+    if start < len(text):
+        sentences.append((start, text[start:]))
+    return sentences
+
+
+def _split_oversized(start: int, sentence: str, max_bytes: int) -> list[tuple[int, str]]:
+    """Break a sentence over the byte limit at word boundaries (or inside huge words)."""
+    pieces = []
+    for match in WORD.finditer(sentence):
+        word, offset = match.group(), start + match.start()
+        while len(word.encode("utf-8")) > max_bytes:
+            # Cut on a character boundary at or below the byte limit
+            cut = len(word.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore"))
+            pieces.append((offset, word[:cut]))
+            word, offset = word[cut:], offset + cut
+        if word:
+            pieces.append((offset, word))
+    return pieces
+
+
+def chunk_text(text: str, max_bytes: int = MAX_CHUNK_BYTES) -> list[tuple[int, str]]:
+    """Pack sentences into chunks of at most max_bytes of UTF-8.
+
+    Args:
+        text: Whole document
+        max_bytes: Chunk size limit
+
+    Returns:
+        (start offset, chunk) pairs in document order; whitespace-only
+        chunks are dropped
+    """
+    chunks: list[tuple[int, str]] = []
+    current_start, current, current_bytes = 0, [], 0
+
+    def flush() -> None:
+        chunk = "".join(current)
+        if chunk.strip():
+            chunks.append((current_start, chunk))
+
+    for start, sentence in split_sentences(text):
+        pieces = [(start, sentence)]
+        if len(sentence.encode("utf-8")) > max_bytes:
+            pieces = _split_oversized(start, sentence, max_bytes)
+        for offset, piece in pieces:
+            piece_bytes = len(piece.encode("utf-8"))
+            if current and current_bytes + piece_bytes > max_bytes:
+                flush()
+                current, current_bytes = [], 0
+            if not current:
+                current_start = offset
+            current.append(piece)
+            current_bytes += piece_bytes
+    if current:
+        flush()
+    return chunks
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    """Get the AWS error code of a botocore ClientError."""
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code")
+    return None
+
+
+def _merge_sentiment(
+    chunks: list[tuple[int, str]], results: list[Optional[dict[str, Any]]]
+) -> tuple[str, dict[str, float]]:
+    """Average chunk sentiment scores weighted by chunk length."""
+    totals: dict[str, float] = {}
+    weight = 0
+    for (_, chunk), result in zip(chunks, results):
+        if not result:
+            continue
+        for label, score in result.get("SentimentScore", {}).items():
+            totals[label] = totals.get(label, 0.0) + score * len(chunk)
+        weight += len(chunk)
+    if not weight:
+        return "UNKNOWN", {}
+    scores = {label: round(total / weight, 6) for label, total in totals.items()}
+    return max(scores, key=scores.get).upper(), scores
+
+
+class ComprehendAnalyzer:
+    """Chunked, batched Comprehend analysis of whole documents."""
+
+    def __init__(
+        self,
+        client: Any,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[LRUCache[dict[str, Any]]] = None,
+    ):
+        """Initialize analyzer.
+
+        Args:
+            client: boto3 Comprehend client
+            max_concurrency: Batch calls in flight per document
+            cache: Per-chunk result cache (defaults to the process-wide one)
+        """
+        self.client = client
+        self.max_concurrency = max_concurrency or get_settings().comprehend_max_concurrency
+        self.cache = cache if cache is not None else _chunk_cache
+
+    async def analyze(self, text: str, language_code: str = "en") -> dict[str, Any]:
+        """Detect entities, key phrases and sentiment across a whole document.
+
+        Args:
+            text: Document text
+            language_code: Comprehend language code
+
+        Returns:
+            Dict with entities and key_phrases (offsets relative to text),
+            sentiment and sentiment_scores (length-weighted over chunks),
+            chunks, billed units and failed_chunks (chunks any analysis
+            could not process)
+        """
+        chunks = chunk_text(text)
+        if not chunks:
+            return {
+                "entities": [],
+                "key_phrases": [],
+                "sentiment": "UNKNOWN",
+                "sentiment_scores": {},
+                "chunks": 0,
+                "units": 0,
+                "failed_chunks": 0,
+            }
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        usage = {"units": 0, "failed": set()}
+        entities, key_phrases, sentiment = await asyncio.gather(
+            *(
+                self._analyze_chunks(name, chunks, language_code, semaphore, usage)
+                for name in ANALYSES
+            )
+        )
+
+        label, scores = _merge_sentiment(chunks, sentiment)
+        return {
+            "entities": self._shift(chunks, entities, "Entities"),
+            "key_phrases": self._shift(chunks, key_phrases, "KeyPhrases"),
+            "sentiment": label,
+            "sentiment_scores": scores,
+            "chunks": len(chunks),
+            "units": usage["units"],
+            "failed_chunks": len(usage["failed"]),
+        }
+
+    async def _analyze_chunks(
+        self,
+        name: str,
+        chunks: list[tuple[int, str]],
+        language_code: str,
+        semaphore: asyncio.Semaphore,
+        usage: dict[str, Any],
+    ) -> list[Optional[dict[str, Any]]]:
+        """Run one analysis over all chunks, serving repeats from the cache."""
+        method, keys = ANALYSES[name]
+        cache_keys = [
+            f"{name}:{language_code}:{hashlib.sha256(chunk.encode('utf-8')).hexdigest()}"
+            for _, chunk in chunks
+        ]
+        results: list[Optional[dict[str, Any]]] = [self.cache.get(key) for key in cache_keys]
+        missing = [index for index, result in enumerate(results) if result is None]
+
+        async def run_batch(indexes: list[int]) -> None:
+            texts = [chunks[index][1] for index in indexes]
+            async with semaphore:
+                response = await self._call_batch(method, texts, language_code)
+            usage["units"] += sum(max(MIN_UNITS, -(-len(t) // UNIT_CHARS)) for t in texts)
+
+            for item in response.get("ResultList", []):
+                index = indexes[item["Index"]]
+                result = {key: item[key] for key in keys if key in item}
+                results[index] = result
+                self.cache.set(cache_keys[index], result)
+            for error in response.get("ErrorList", []):
+                usage["failed"].add(indexes[error["Index"]])
+                logger.warning(
+                    f"Comprehend {name} failed for chunk {indexes[error['Index']]}: "
+                    f"{error.get('ErrorCode')} {error.get('ErrorMessage', '')}"
+                )
+
+        await asyncio.gather(
+            *(
+                run_batch(missing[start : start + BATCH_SIZE])
+                for start in range(0, len(missing), BATCH_SIZE)
+            )
+        )
+        return results
+
+    async def _call_batch(self, method: str, texts: list[str], language_code: str) -> dict:
+        """Call a batch API, backing off on throttling."""
+        delay = 0.5
+        attempt = 1
+        while True:
+            try:
+                return await asyncio.to_thread(
+                    getattr(self.client, method), TextList=texts, LanguageCode=language_code
+                )
+            except Exception as e:
+                if _error_code(e) not in THROTTLING_ERRORS or attempt >= MAX_ATTEMPTS:
+                    raise
+                logger.debug(f"Comprehend throttled (attempt {attempt}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay *= 2
+                attempt += 1
+
+    @staticmethod
+    def _shift(
+        chunks: list[tuple[int, str]], results: list[Optional[dict[str, Any]]], key: str
+    ) -> list[dict[str, Any]]:
+        """Concatenate per-chunk items with offsets moved into document coordinates."""
+        merged = []
+        for (start, _), result in zip(chunks, results):
+            for item in (result or {}).get(key, []):
+                item = dict(item)
+                if "BeginOffset" in item:
+                    item["BeginOffset"] += start
+                    item["EndOffset"] += start
+                merged.append(item)
+        return merged
@@ -0,0 +1,312 @@
+"""Token-aware context assembly for chat."""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Sequence
+
+from src.config import get_settings
+from src.llm.base import LLMMessage
+from src.models.conversation import Conversation
+from src.models.message import Message
+from src.services.llm_service import LLMService
+
+try:
+    import tiktoken
+
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+logger = logging.getLogger(__name__)
+
+# Context window per model (tokens); unknown models get DEFAULT_CONTEXT_WINDOW
+MODEL_CONTEXT_WINDOWS = {
+    "llama-3.1-8b-instant": 131072,
+    "anthropic.claude-3-5-sonnet-20241022-v2:0": 200000,
+    "gpt-4o-mini": 128000,
+    "gpt-4o": 128000,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Characters per token when no tokenizer is available. Llama and Claude
+# tokenizers are not shipped as Python packages, so they are approximated too.
+CHARS_PER_TOKEN = {"groq": 3.5, "bedrock": 3.5, "openai": 4.0}
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators added by chat templates
+
+# Share of the budget the message being answered can always claim, however
+# long the rolling summary is
+CURRENT_MESSAGE_MIN_SHARE = 0.25
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a user and an AI assistant.
+
+CURRENT SUMMARY:
+{summary}
+
+NEW MESSAGES:
+{messages}
+
+Write the updated summary. Keep facts, decisions, names, numbers and open questions; drop small talk.
+Stay under {max_words} words. Return only the summary text."""
+
+
+@dataclass
+class BuiltContext:
+    """LLM context for one chat turn."""
+
+    messages: list[LLMMessage]
+    # Set when overflow was folded into the rolling summary; the caller
+    # persists them with the rest of the turn
+    summary: Optional[str] = None
+    summary_until: Optional[datetime] = None
+
+
+class TokenCounter:
+    """Counts tokens the way a given provider's tokenizer would."""
+
+    def __init__(self, provider: str, model: str):
+        """Initialize counter.
+
+        Args:
+            provider: Provider name (e.g., "openai", "groq")
+            model: Model identifier
+        """
+        self.provider = provider
+        self.model = model
+        self.encoding = None
+
+        if HAS_TIKTOKEN and provider == "openai":
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("o200k_base")
+
+    def count(self, text: str) -> int:
+        """Count tokens in text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Token count (estimated when no exact tokenizer is available)
+        """
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return int(len(text) / CHARS_PER_TOKEN.get(self.provider, 3.5)) + 1
+
+    def count_message(self, message: LLMMessage) -> int:
+        """Count tokens for one chat message, including template overhead."""
+        return self.count(message.content) + MESSAGE_OVERHEAD_TOKENS
+
+
+class ContextBuilder:
+    """Packs conversation history into a per-model token budget.
+
+    History is packed newest first. Turns that no longer fit are folded into
+    a rolling summary stored on the conversation, and only messages after
+    the summary watermark (``Conversation.summary_until``) are ever loaded,
+    so each request costs O(budget) tokens however long the chat gets.
+    """
+
+    def __init__(
+        self,
+        llm_service: LLMService,
+        token_budget: Optional[int] = None,
+        summary_max_tokens: Optional[int] = None,
+    ):
+        """Initialize builder.
+
+        The budget is sized for the tightest configured provider, since any of
+        them may end up serving the request after a fallback.
+
+        Args:
+            llm_service: LLM service the request (and any summarization) is sent to
+            token_budget: Prompt token budget (defaults to CHAT_CONTEXT_TOKEN_BUDGET)
+            summary_max_tokens: Maximum length of the rolling summary
+        """
+        settings = get_settings()
+        budget = token_budget or settings.chat_context_token_budget
+        self.llm_service = llm_service
+        self.summary_max_tokens = summary_max_tokens or settings.chat_summary_max_tokens
+
+        tightest = None
+        for provider in llm_service.providers:
+            window = MODEL_CONTEXT_WINDOWS.get(provider.model, DEFAULT_CONTEXT_WINDOW)
+            available = window - provider.max_tokens
+            if available < budget or tightest is None:
+                budget = min(budget, available)
+                tightest = provider
+
+        self.budget = max(budget, 0)
+        self.counter = (
+            TokenCounter(tightest.provider_name, tightest.model)
+            if tightest
+            else TokenCounter("default", "")
+        )
+
+    def pack(
+        self, history: Sequence[Message], summary: Optional[str] = None
+    ) -> tuple[list[LLMMessage], list[Message]]:
+        """Select the newest messages that fit the budget.
+
+        The last message (the one being answered) is always included,
+        truncated if it alone exceeds the budget. The summary is cut first,
+        so the current message keeps at least CURRENT_MESSAGE_MIN_SHARE of
+        the budget.
+
+        Args:
+            history: Messages after the summary watermark, chronological
+            summary: Rolling summary of earlier turns
+
+        Returns:
+            Tuple of (LLM messages to send, older messages that did not fit)
+        """
+        if not history:
+            return [], []
+
+        current = LLMMessage(role=history[-1].role, content=history[-1].content)
+        current_tokens = self.counter.count_message(current)
+        reserved = min(current_tokens, int(self.budget * CURRENT_MESSAGE_MIN_SHARE))
+
+        prefix = []
+        if summary:
+            message = self._summary_message(summary)
+            allowed = self.budget - reserved
+            if self.counter.count_message(message) > allowed:
+                header = self.counter.count_message(self._summary_message(""))
+                message = self._summary_message(self._truncate(summary, allowed - header))
+            prefix.append(message)
+        remaining = self.budget - sum(self.counter.count_message(m) for m in prefix)
+
+        if current_tokens > remaining:
+            content = self._truncate(current.content, remaining - MESSAGE_OVERHEAD_TOKENS)
+            current = LLMMessage(role=current.role, content=content)
+            current_tokens = remaining
+        remaining -= current_tokens
+
+        packed: list[LLMMessage] = []
+        cutoff = len(history) - 1
+        for index in range(len(history) - 2, -1, -1):
+            message = LLMMessage(role=history[index].role, content=history[index].content)
+            tokens = self.counter.count_message(message)
+            if tokens > remaining:
+                break
+            packed.append(message)
+            remaining -= tokens
+            cutoff = index
+
+        packed.reverse()
+        return prefix + packed + [current], list(history[:cutoff])
+
+    async def build(
+        self,
+        conversation: Conversation,
+        history: Sequence[Message],
+        summarize: bool = True,
+    ) -> BuiltContext:
+        """Build the LLM context, folding overflow into the rolling summary.
+
+        Nothing is written here: an updated summary is returned for the
+        caller to store in the same transaction as the turn's messages.
+
+        Args:
+            conversation: Conversation being answered
+            history: Messages after the summary watermark, chronological,
+                ending with the message being answered
+            summarize: Fold turns that do not fit into the summary
+
+        Returns:
+            BuiltContext with the messages to send and any summary update
+        """
+        messages, overflow = self.pack(history, conversation.summary)
+        if not overflow or not summarize:
+            return BuiltContext(messages)
+
+        summary = await self._summarize(conversation.summary, overflow)
+        if summary is None:
+            # Overflow is dropped this time; it is retried on the next message
+            return BuiltContext(messages)
+
+        messages, _ = self.pack(history[len(overflow) :], summary)
+        return BuiltContext(messages, summary=summary, summary_until=overflow[-1].created_at)
+
+    async def _summarize(self, summary: Optional[str], overflow: Sequence[Message]) -> Optional[str]:
+        """Fold messages into the rolling summary with the LLM.
+
+        Messages are folded in batches sized so that each summarization
+        prompt, current summary included, fits the token budget.
+
+        Args:
+            summary: Current summary, if any
+            overflow: Messages to fold in, chronological
+
+        Returns:
+            Updated summary, or None if summarization failed
+        """
+        batch_budget = max(
+            self.budget - self.counter.count(SUMMARY_PROMPT) - self.summary_max_tokens, 1
+        )
+
+        batch: list[str] = []
+        used = 0
+        for message in overflow:
+            line = f"{message.role.upper()}: {message.content}"
+            if self.counter.count(line) > batch_budget:
+                line = self._truncate(line, batch_budget)
+            tokens = self.counter.count(line)
+
+            if batch and used + tokens > batch_budget:
+                summary = await self._fold(summary, batch)
+                if summary is None:
+                    return None
+                batch, used = [], 0
+            batch.append(line)
+            used += tokens
+
+        summary = await self._fold(summary, batch)
+        if summary is not None:
+            logger.info(f"Folded {len(overflow)} message(s) into conversation summary")
+        return summary
+
+    async def _fold(self, summary: Optional[str], lines: Sequence[str]) -> Optional[str]:
+        """Run one summarization call.
+
+        Args:
+            summary: Current summary, if any
+            lines: Transcript lines to fold in
+
+        Returns:
+            Updated summary, or None if the call failed
+        """
+        prompt = SUMMARY_PROMPT.format(
+            summary=summary or "(none yet)",
+            messages="\n".join(lines),
+            max_words=int(self.summary_max_tokens * 0.75),
+        )
+
+        try:
+            response = await self.llm_service.generate(
+                [LLMMessage(role="user", content=prompt)],
+                temperature=0,
+                max_tokens=self.summary_max_tokens,
+            )
+        except Exception as e:
+            logger.warning(f"Conversation summarization failed: {e}")
+            return None
+
+        return response.content.strip()
+
+    def _truncate(self, content: str, max_tokens: int) -> str:
+        """Cut content down to roughly max_tokens, keeping its head and tail."""
+        if self.counter.count(content) <= max_tokens:
+            return content
+
+        marker = "\n...[truncated]...\n"
+        ratio = max_tokens / max(self.counter.count(content), 1)
+        keep = max(int(len(content) * ratio) - len(marker), 0)
+        return content[: keep // 2] + marker + content[len(content) - keep // 2 :]
+
+    @staticmethod
+    def _summary_message(summary: str) -> LLMMessage:
+        """Wrap the rolling summary as a system message."""
+        return LLMMessage(role="system", content=f"Summary of the earlier conversation:\n{summary}")
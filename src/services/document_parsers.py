@@ -0,0 +1,105 @@
+"""Local document parsers run in extraction worker processes.
+
+Functions here are submitted to the extraction process pool, so they take
+and return picklable values only and import nothing from the application.
+"""
+
+import csv
+import io
+import os
+from typing import Any
+
+
+def pdf_page_count(file_path: str) -> int:
+    """Count the pages of a PDF."""
+    from PyPDF2 import PdfReader
+
+    return len(PdfReader(file_path).pages)
+
+
+def pdf_text_range(file_path: str, start: int, end: int) -> list[str]:
+    """Extract the text of pages [start, end) of a PDF.
+
+    Args:
+        file_path: Path to the PDF
+        start: First page (0-based)
+        end: Page after the last one
+
+    Returns:
+        Text of each page in the range, in order
+    """
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(file_path)
+    return [reader.pages[index].extract_text() or "" for index in range(start, end)]
+
+
+def docx_text(file_path: str, include_tables: bool = True) -> dict[str, Any]:
+    """Extract paragraph (and table) text from a DOCX file.
+
+    Args:
+        file_path: Path to the DOCX file
+        include_tables: Append table rows as " | "-separated lines
+
+    Returns:
+        Dict with text, paragraphs and table_count
+    """
+    from docx import Document
+
+    doc = Document(file_path)
+    lines = [paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip()]
+
+    if include_tables:
+        for table in doc.tables:
+            for row in table.rows:
+                lines.append(" | ".join(cell.text for cell in row.cells if cell.text.strip()))
+
+    return {
+        "text": "\n".join(lines).strip(),
+        "paragraphs": len(doc.paragraphs),
+        "table_count": len(doc.tables),
+    }
+
+
+def docx_text_from_bytes(content: bytes) -> str:
+    """Extract paragraph text from DOCX bytes."""
+    from docx import Document
+
+    doc = Document(io.BytesIO(content))
+    return "\n".join(paragraph.text for paragraph in doc.paragraphs)
+
+
+def xlsx_to_csv(file_path: str, output_dir: str) -> list[dict[str, Any]]:
+    """Write each worksheet of an XLSX workbook to its own CSV file.
+
+    Rows are streamed (read-only mode), so memory does not grow with the
+    sheet size. Empty sheets are skipped.
+
+    Args:
+        file_path: Path to the XLSX workbook
+        output_dir: Directory for the CSV files
+
+    Returns:
+        List of dicts with sheet (name) and path (CSV file), in workbook order
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    sheets = []
+    try:
+        for index, worksheet in enumerate(workbook.worksheets):
+            path = os.path.join(output_dir, f"sheet_{index}.csv")
+            written = 0
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                for row in worksheet.iter_rows(values_only=True):
+                    if any(value is not None for value in row):
+                        writer.writerow(["" if value is None else value for value in row])
+                        written += 1
+            if written:
+                sheets.append({"sheet": worksheet.title, "path": path})
+            else:
+                os.unlink(path)
+    finally:
+        workbook.close()
+    return sheets
@@ -0,0 +1,107 @@
+"""Single-pass entity extraction from document text.
+
+Every entity pattern is compiled once, at import, into one alternation of
+named groups, so a single scan over the text yields typed, non-overlapping
+spans: url, email, date, money, phone and name. At any position the first
+alternative that matches wins, which is why more specific patterns (a URL
+containing an "@", a date starting with a capitalized month) come before
+more general ones. Spans for a text are cached, so the rules of one
+instruction (filter_content, extract, ...) share one scan.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+CACHED_TEXTS = 32  # Texts whose spans are kept
+
+_MONTH = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?"
+    r"|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\.?"
+)
+_AMOUNT = r"\d[\d,]*(?:\.\d+)?"
+_CURRENCY = r"(?:USD|EUR|GBP|JPY|PHP|AUD|CAD|SGD)"
+# A capitalized word ("Mary-Jane", "O'Neil"), but not the month of a date
+_WORD = rf"(?!{_MONTH}\s+\d)(?:[A-Z]'[A-Z][a-z]+|[A-Z][a-z]+(?:-[A-Z]?[a-z]+)*)"
+
+ENTITY_PATTERNS = {
+    "url": r"\b(?:https?://|www\.)[^\s<>\"']*[^\s<>\"'.,;:!?)\]]",
+    "email": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b",
+    "date": (
+        r"\b(?:\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2})?)?"
+        r"|\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}"
+        rf"|{_MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}"
+        rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+{_MONTH},?\s+\d{{4}}"
+        rf"|{_MONTH}\s+\d{{4}})\b"
+    ),
+    "money": (
+        rf"(?:[$€£¥₱]\s?{_AMOUNT}(?:\s?(?:[kKmM]\b|million\b|billion\b))?"
+        rf"|\b{_CURRENCY}\s?{_AMOUNT}"
+        rf"|\b{_AMOUNT}\s?{_CURRENCY}\b)"
+    ),
+    "phone": (
+        r"(?<![\w+])(?:\+?\d{1,3}[-.\s]?\d{3}[-.\s]?\d{3,4}[-.\s]?\d{3,4}"
+        r"|\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})\b"
+    ),
+    # Capitalized words on one line, with an optional middle initial
+    "name": rf"\b{_WORD}(?:[ \t]+[A-Z]\.)?(?:[ \t]+{_WORD})+\b",
+}
+ENTITY_TYPES = tuple(ENTITY_PATTERNS)
+
+# Characters each pattern can start with. Python's re tries every
+# alternative at every position, so cheap guards let it reject most
+# positions (inside words, on spaces) without running the patterns.
+_FIRST_CHARS = {
+    "url": "hw",
+    "email": r"\w.%+\-",
+    "date": r"\dJFMASOND",
+    "money": r"$€£¥₱\dUEGJPACS",
+    "phone": r"+(\d",
+    "name": "A-Z",
+}
+_SCANNER = re.compile(
+    r"(?:\b|(?=[$€£¥₱(+]))(?:"
+    + "|".join(
+        f"(?P<{entity_type}>(?=[{_FIRST_CHARS[entity_type]}]){pattern})"
+        for entity_type, pattern in ENTITY_PATTERNS.items()
+    )
+    + ")"
+)
+
+
+@dataclass(frozen=True)
+class Entity:
+    """A typed span of the text."""
+
+    type: str
+    text: str
+    start: int
+    end: int
+
+
+@lru_cache(maxsize=CACHED_TEXTS)
+def _scan(text: str) -> Tuple[Entity, ...]:
+    return tuple(
+        Entity(match.lastgroup, match.group(), match.start(), match.end())
+        for match in _SCANNER.finditer(text)
+    )
+
+
+def extract_entities(text: str, types: Optional[Iterable[str]] = None) -> List[Entity]:
+    """Typed spans of a text, in order.
+
+    Args:
+        text: Document text
+        types: Entity types to keep (all of ENTITY_TYPES by default)
+
+    Returns:
+        Non-overlapping entities
+    """
+    if not text:
+        return []
+    entities = _scan(text)
+    if types is None:
+        return list(entities)
+    wanted = set(types)
+    return [entity for entity in entities if entity.type in wanted]
@@ -0,0 +1,301 @@
+"""Content-addressed cache of extraction results.
+
+Entries are keyed on the SHA-256 of the file bytes plus everything else
+that shapes the result (file format, which AWS services were available,
+extractor and library versions), so re-uploading the same document skips
+Textract and Comprehend entirely.
+
+Results are stored as zlib-compressed JSON blobs on local disk or in S3.
+Redis holds the index: one hash per entry (blob size), a sorted set of
+entries by last access, and the total stored size. When the total exceeds
+``extraction_cache_max_bytes`` the least recently used entries are evicted.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+from functools import lru_cache
+from importlib import metadata
+from typing import Any, Optional, Protocol
+
+from src.config import get_settings
+from src.db.redis import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of extraction results changes
+EXTRACTION_CACHE_VERSION = 4
+
+REDIS_KEY_PREFIX = "extraction:cache:"
+LRU_KEY = f"{REDIS_KEY_PREFIX}lru"
+BYTES_KEY = f"{REDIS_KEY_PREFIX}bytes"
+HASH_CHUNK_SIZE = 1024 * 1024
+EVICTION_BATCH = 32
+
+VERSIONED_LIBRARIES = ("PyPDF2", "python-docx", "boto3")
+
+
+class BlobStore(Protocol):
+    """Storage for compressed result blobs."""
+
+    def read(self, key: str) -> Optional[bytes]: ...
+
+    def write(self, key: str, data: bytes) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+class LocalBlobStore:
+    """Blobs as files under a directory, sharded by key prefix."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json.z")
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial blob
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStore:
+    """Blobs as objects under a prefix in an S3 bucket."""
+
+    def __init__(self, client: Any, bucket: str, prefix: str):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=f"{self.prefix}{key}")
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return response["Body"].read()
+
+    def write(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=f"{self.prefix}{key}", Body=data)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=f"{self.prefix}{key}")
+
+
+@lru_cache
+def library_versions() -> dict[str, str]:
+    """Versions of the parsing libraries whose output is cached."""
+    versions = {}
+    for name in VERSIONED_LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = "missing"
+    return versions
+
+
+def file_sha256(file_path: str) -> str:
+    """Hash a file in chunks.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex SHA-256 digest of the file bytes
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(content_sha256: str, options: dict[str, Any]) -> str:
+    """Combine a file hash with the options that shape its extraction result.
+
+    Args:
+        content_sha256: Hex SHA-256 of the file bytes
+        options: Extraction options (format, services used, ...)
+
+    Returns:
+        Hex SHA-256 cache key
+    """
+    payload = {
+        "sha256": content_sha256,
+        "options": options,
+        "version": EXTRACTION_CACHE_VERSION,
+        "libraries": library_versions(),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """Extraction result cache with size-bounded LRU eviction.
+
+    Redis or blob store failures are logged and treated as misses; the
+    cache never fails an extraction.
+    """
+
+    def __init__(self, store: BlobStore, max_bytes: int, enabled: bool = True):
+        """Initialize cache.
+
+        Args:
+            store: Blob storage for compressed results
+            max_bytes: Total compressed size kept before evicting
+            enabled: Whether lookups and stores happen at all
+        """
+        self.store = store
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    async def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Get a cached result.
+
+        Args:
+            key: Cache key (see cache_key)
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        try:
+            client = get_async_redis()
+            if not await client.exists(f"{REDIS_KEY_PREFIX}{key}"):
+                self.stats["misses"] += 1
+                return None
+
+            blob = await asyncio.to_thread(self.store.read, key)
+            if blob is None:
+                # Blob evicted (or lost) behind the index's back
+                await self._remove(key)
+                self.stats["misses"] += 1
+                return None
+
+            await client.zadd(LRU_KEY, {key: time.time()})
+            result = json.loads(zlib.decompress(blob))
+        except Exception as e:
+            logger.debug(f"Extraction cache lookup failed: {e}")
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return result
+
+    async def put(self, key: str, result: dict[str, Any]) -> None:
+        """Store a result, evicting old entries if the cache is over its size limit.
+
+        Args:
+            key: Cache key (see cache_key)
+            result: JSON-serializable extraction result
+        """
+        if not self.enabled:
+            return
+        try:
+            blob = zlib.compress(json.dumps(result, default=str).encode("utf-8"), 6)
+            await asyncio.to_thread(self.store.write, key, blob)
+
+            client = get_async_redis()
+            entry_key = f"{REDIS_KEY_PREFIX}{key}"
+            previous = await client.hget(entry_key, "size")
+            pipe = client.pipeline(transaction=True)
+            pipe.hset(entry_key, mapping={"size": len(blob), "created_at": time.time()})
+            pipe.zadd(LRU_KEY, {key: time.time()})
+            pipe.incrby(BYTES_KEY, len(blob) - int(previous or 0))
+            results = await pipe.execute()
+            self.stats["stores"] += 1
+
+            if results[-1] > self.max_bytes:
+                await self._evict(results[-1])
+        except Exception as e:
+            logger.debug(f"Extraction cache store failed: {e}")
+
+    async def _evict(self, total: int) -> None:
+        """Drop least recently used entries until the cache fits max_bytes."""
+        client = get_async_redis()
+        while total > self.max_bytes:
+            oldest = await client.zrange(LRU_KEY, 0, EVICTION_BATCH - 1)
+            if not oldest:
+                break
+            for key in oldest:
+                removed = await self._remove(key)
+                total -= removed
+                if removed:
+                    self.stats["evictions"] += 1
+                if total <= self.max_bytes:
+                    break
+        logger.info(f"Extraction cache evicted down to {total} bytes")
+
+    async def _remove(self, key: str) -> int:
+        """Remove one entry; returns the bytes freed (0 if another worker got there first)."""
+        client = get_async_redis()
+        # Only the worker whose ZREM succeeds deletes the blob and adjusts the total
+        if not await client.zrem(LRU_KEY, key):
+            await client.delete(f"{REDIS_KEY_PREFIX}{key}")
+            return 0
+
+        entry_key = f"{REDIS_KEY_PREFIX}{key}"
+        size = int(await client.hget(entry_key, "size") or 0)
+        await asyncio.to_thread(self.store.delete, key)
+        pipe = client.pipeline(transaction=True)
+        pipe.delete(entry_key)
+        pipe.decrby(BYTES_KEY, size)
+        await pipe.execute()
+        return size
+
+
+# Global instance
+_extraction_cache: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Get or create the shared extraction cache.
+
+    Blobs go to S3 when EXTRACTION_CACHE_BACKEND is "s3" (in S3_BUCKET_NAME),
+    otherwise under EXTRACTION_CACHE_DIR.
+
+    Returns:
+        Singleton ExtractionCache instance
+    """
+    global _extraction_cache
+    if _extraction_cache is None:
+        settings = get_settings()
+        if settings.extraction_cache_backend == "s3" and settings.s3_bucket_name:
+            import boto3
+
+            store: BlobStore = S3BlobStore(
+                boto3.client("s3", region_name=settings.s3_region),
+                settings.s3_bucket_name,
+                settings.extraction_cache_s3_prefix,
+            )
+        else:
+            store = LocalBlobStore(settings.extraction_cache_dir)
+        _extraction_cache = ExtractionCache(
+            store,
+            max_bytes=settings.extraction_cache_max_mb * 1024 * 1024,
+            enabled=settings.extraction_cache_enabled,
+        )
+    return _extraction_cache
@@ -0,0 +1,224 @@
+"""Shared process pool for CPU-bound document parsing.
+
+PyPDF2 and python-docx hold the GIL for the whole parse, so running them on
+the event loop (or in a thread) stalls every other request on the worker.
+They run here instead, in a bounded pool of spawned processes:
+- each task has a timeout; a task that overruns is abandoned and the pool
+  is recycled so the stuck process is killed;
+- workers run under an address-space limit and are replaced after
+  ``max_tasks_per_child`` tasks, so leaks and pathological files cannot
+  grow a worker without bound;
+- PDFs are parsed in page ranges across workers, with progress reported
+  to the processing tracker as each range completes.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from src.config import get_settings
+from src.services import document_parsers
+from src.services.processing_status import processing_tracker
+
+logger = logging.getLogger(__name__)
+
+PAGES_PER_TASK = 16  # Small enough for steady progress, large enough to amortize reopening
+
+
+class ExtractionWorkerError(Exception):
+    """A document parsing task could not be completed."""
+
+
+class ExtractionTimeoutError(ExtractionWorkerError):
+    """A document parsing task exceeded its timeout."""
+
+
+def _init_worker(memory_limit_bytes: int) -> None:
+    """Cap a worker's address space (Unix only)."""
+    if memory_limit_bytes <= 0:
+        return
+    try:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Could not limit extraction worker memory: {e}")
+
+
+class ExtractionPool:
+    """Bounded process pool with per-task timeouts and worker recycling."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_tasks_per_child: Optional[int] = None,
+        task_timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+    ):
+        """Initialize pool (processes are started on first use).
+
+        Args:
+            max_workers: Worker processes (defaults to EXTRACTION_POOL_WORKERS, or CPU count)
+            max_tasks_per_child: Tasks a worker runs before it is replaced
+            task_timeout: Seconds a task may run before it is abandoned
+            memory_limit_mb: Address-space limit per worker (0 disables)
+        """
+        settings = get_settings()
+        self.max_workers = (
+            max_workers or settings.extraction_pool_workers or min(os.cpu_count() or 1, 4)
+        )
+        self.max_tasks_per_child = (
+            max_tasks_per_child or settings.extraction_pool_max_tasks_per_child
+        )
+        self.task_timeout = task_timeout or settings.extraction_task_timeout_seconds
+        self.memory_limit_mb = (
+            settings.extraction_worker_memory_mb if memory_limit_mb is None else memory_limit_mb
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Tasks beyond the pool size wait here, so timeouts measure run time, not queueing
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self.stats = {"tasks": 0, "timeouts": 0, "recycles": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                # Forking would copy the event loop, sockets and connection pools
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.memory_limit_mb * 1024 * 1024,),
+                max_tasks_per_child=self.max_tasks_per_child,
+            )
+        return self._executor
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Replace a pool whose worker is stuck, killing its processes."""
+        if self._executor is not executor:
+            return  # Already replaced by another task
+        self._executor = None
+        self.stats["recycles"] += 1
+        # ProcessPoolExecutor cannot cancel a running task; terminating the
+        # processes is the only way to stop it
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        logger.warning(f"Recycled extraction pool ({len(processes)} worker(s) terminated)")
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Run a function in a worker process.
+
+        Args:
+            fn: Module-level (picklable) function
+            *args: Picklable arguments
+            timeout: Seconds the task may run (defaults to task_timeout)
+
+        Returns:
+            The function's return value
+
+        Raises:
+            ExtractionTimeoutError: If the task overran its timeout
+            ExtractionWorkerError: If the worker died (e.g. out of memory)
+        """
+        timeout = timeout or self.task_timeout
+        async with self._slots:
+            # A task caught in another task's recycle is retried once on the new pool
+            for attempt in range(2):
+                executor = self._get_executor()
+                future = asyncio.wrap_future(executor.submit(fn, *args))
+                self.stats["tasks"] += 1
+                try:
+                    return await asyncio.wait_for(future, timeout)
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    self._recycle(executor)
+                    raise ExtractionTimeoutError(
+                        f"{fn.__name__} did not finish within {timeout:g}s"
+                    ) from None
+                except BrokenProcessPool as e:
+                    self._recycle(executor)
+                    if attempt == 1:
+                        raise ExtractionWorkerError(f"Extraction worker died: {e}") from e
+                    logger.warning(f"Extraction worker died during {fn.__name__}, retrying")
+
+    async def extract_pdf_text(
+        self,
+        file_path: str,
+        job_id: Optional[str] = None,
+        progress_range: tuple[int, int] = (40, 75),
+    ) -> list[str]:
+        """Extract PDF text with page ranges parsed in parallel.
+
+        Args:
+            file_path: Path to the PDF
+            job_id: Processing job to report progress to
+            progress_range: Tracker progress (start, end) spanned while parsing
+
+        Returns:
+            Text of each page, in page order
+        """
+        page_count = await self.run(document_parsers.pdf_page_count, file_path)
+        if page_count == 0:
+            return []
+
+        ranges = [
+            (start, min(start + PAGES_PER_TASK, page_count))
+            for start in range(0, page_count, PAGES_PER_TASK)
+        ]
+        pages: list[Optional[list[str]]] = [None] * len(ranges)
+        done_pages = 0
+        low, high = progress_range
+
+        async def parse(index: int, start: int, end: int) -> tuple[int, list[str]]:
+            return index, await self.run(document_parsers.pdf_text_range, file_path, start, end)
+
+        tasks = [asyncio.create_task(parse(i, start, end)) for i, (start, end) in enumerate(ranges)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, texts = await finished
+                pages[index] = texts
+                done_pages += len(texts)
+                if job_id:
+                    processing_tracker.update_job(
+                        job_id,
+                        low + (high - low) * done_pages // page_count,
+                        f"Parsed {done_pages}/{page_count} pages",
+                    )
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return [text for chunk in pages for text in chunk or []]
+
+    async def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+
+# Global instance
+_extraction_pool: Optional[ExtractionPool] = None
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Get or create the shared extraction pool.
+
+    Returns:
+        Singleton ExtractionPool instance
+    """
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ExtractionPool()
+    return _extraction_pool
+
+
+async def shutdown_extraction_pool() -> None:
+    """Stop the shared pool's workers (on application shutdown)."""
+    if _extraction_pool is not None:
+        await _extraction_pool.shutdown()
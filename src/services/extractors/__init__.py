@@ -0,0 +1,20 @@
+"""Format extractors, loaded lazily through a registry."""
+
+from src.services.extractors.base import BaseExtractor, ExtractorSpec
+from src.services.extractors.registry import (
+    get_extractor,
+    get_spec,
+    register_extractor,
+    supported_extensions,
+    supported_mime_types,
+)
+
+__all__ = [
+    "BaseExtractor",
+    "ExtractorSpec",
+    "get_extractor",
+    "get_spec",
+    "register_extractor",
+    "supported_extensions",
+    "supported_mime_types",
+]
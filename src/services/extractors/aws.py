@@ -0,0 +1,47 @@
+"""Shared boto3 clients for extractors.
+
+boto3 clients are thread-safe and carry their own connection pools, so each
+service gets one client per process, created on first use, rather than one
+per extraction.
+"""
+
+import logging
+import threading
+from typing import Any, Optional
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_clients: dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def aws_configured() -> bool:
+    """Whether AWS credentials are configured."""
+    return bool(get_settings().aws_access_key_id)
+
+
+def get_aws_client(service: str) -> Optional[Any]:
+    """Get the shared client for an AWS service.
+
+    Args:
+        service: boto3 service name (e.g. "textract")
+
+    Returns:
+        boto3 client, or None if AWS is not configured or the client cannot be created
+    """
+    if not aws_configured():
+        return None
+    with _lock:
+        if service not in _clients:
+            try:
+                import boto3
+
+                _clients[service] = boto3.client(
+                    service, region_name=get_settings().aws_default_region
+                )
+            except Exception as e:
+                logger.error(f"AWS {service} client initialization failed: {e}")
+                return None
+        return _clients[service]
@@ -0,0 +1,82 @@
+"""Extractor interface and format declarations."""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class ExtractorSpec:
+    """What a format backend handles, declared without importing it.
+
+    Attributes:
+        name: Extractor name
+        target: "module:Class" of the BaseExtractor implementation
+        extensions: File extensions handled (lowercase, with the dot)
+        mime_types: Upload content types accepted for these extensions
+        capabilities: What results can include (text, tables, forms, ocr, entities, ...)
+        cost_per_unit: Estimated AWS cost when the AWS path is used (0 = local only)
+        cost_unit: What cost_per_unit is charged per (page, image, 100 characters, ...)
+    """
+
+    name: str
+    target: str
+    extensions: tuple[str, ...]
+    mime_types: tuple[str, ...]
+    capabilities: frozenset[str] = field(default_factory=frozenset)
+    cost_per_unit: float = 0.0
+    cost_unit: str = "file"
+
+
+class BaseExtractor(ABC):
+    """A format backend.
+
+    The registry creates one instance per process, on the first file of
+    its format, so expensive setup (clients, pipelines) belongs in
+    ``__init__``.
+    """
+
+    def __init__(self, spec: ExtractorSpec):
+        self.spec = spec
+
+    def cache_options(self) -> Dict[str, Any]:
+        """Options besides the file format that change this extractor's results."""
+        return {}
+
+    @abstractmethod
+    async def extract(self, file_path: str, job_id: Optional[str] = None) -> Dict[str, Any]:
+        """Extract a document.
+
+        Args:
+            file_path: Path to the document
+            job_id: Processing job to report progress and AWS cost to
+
+        Returns:
+            Dict with text, tables, forms, metadata, note and method
+        """
+
+
+def grid_table(name: str, rows: List[List[str]]) -> Optional[Dict[str, Any]]:
+    """Build a result table from rows of cell text, the first row being headers."""
+    rows = [row for row in rows if any(cell.strip() for cell in row)]
+    if not rows:
+        return None
+    width = max(len(row) for row in rows)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+
+    # Blank headers get positional names and repeats a suffix, so no column is lost
+    headers: List[str] = []
+    for i, header in enumerate(rows[0]):
+        header = header.strip() or f"column_{i + 1}"
+        if header in headers:
+            header = f"{header}_{i + 1}"
+        headers.append(header)
+    data_rows = rows[1:]
+
+    return {
+        "name": name,
+        "columns": headers,
+        "rows": [dict(zip(headers, row)) for row in data_rows],
+        "row_count": len(data_rows),
+        "column_count": len(headers),
+    }
@@ -0,0 +1,175 @@
+"""Image extraction: Textract OCR, local Tesseract OCR as the fallback."""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from src.config import get_settings
+from src.services import local_ocr
+from src.services.extraction_pool import get_extraction_pool
+from src.services.extractors.aws import get_aws_client
+from src.services.extractors.base import BaseExtractor, ExtractorSpec, grid_table
+from src.services.processing_status import processing_tracker
+
+logger = logging.getLogger(__name__)
+
+
+def _read_bytes(file_path: str) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def _ocr_result(
+    lines: List[Dict[str, Any]],
+    tables: List[Dict[str, Any]],
+    aws_service: str,
+    note: str,
+    method: str,
+) -> Dict[str, Any]:
+    """Build the result shared by both OCR backends from recognized lines."""
+    text = "\n".join(line["text"] for line in lines)
+    confidences = [line["confidence"] for line in lines]
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+    return {
+        "text": text,
+        "tables": tables,
+        "metadata": {
+            "pages": 1,
+            "confidence": round(avg_confidence, 2),
+            "lines": len(lines),
+            "line_confidences": [round(confidence, 2) for confidence in confidences],
+            "characters": len(text),
+            "has_text": bool(text.strip()),
+            "aws_service": aws_service,
+        },
+        "note": note,
+        "method": method,
+    }
+
+
+class ImageExtractor(BaseExtractor):
+    """PNG and JPEG images."""
+
+    def __init__(self, spec: ExtractorSpec):
+        super().__init__(spec)
+        settings = get_settings()
+        self.textract = get_aws_client("textract")
+        self.tesseract_version = (
+            local_ocr.tesseract_version() if settings.local_ocr_enabled else None
+        )
+        self.ocr_language = settings.local_ocr_language
+        self.ocr_tables = settings.local_ocr_detect_tables
+        self.ocr_max_side = settings.local_ocr_max_image_side
+        if self.textract is None and self.tesseract_version:
+            logger.info(f"Images will be read with local Tesseract {self.tesseract_version}")
+
+    def cache_options(self) -> Dict[str, Any]:
+        return {
+            "textract": self.textract is not None,
+            "tesseract": self.tesseract_version,
+            "ocr_language": self.ocr_language,
+            "ocr_tables": self.ocr_tables,
+        }
+
+    async def extract(self, file_path: str, job_id: Optional[str] = None) -> Dict[str, Any]:
+        engine = "AWS Textract" if self.textract is not None else "local OCR"
+        processing_tracker.update_job(job_id, 40, f"Processing image with {engine}")
+        result = await self._extract(file_path)
+        aws_cost = (
+            self.spec.cost_per_unit
+            if result.get("metadata", {}).get("aws_service") == "textract"
+            else 0
+        )
+        processing_tracker.update_job(job_id, 80, "OCR completed", "textract", aws_cost)
+        return result
+
+    async def _extract(self, file_path: str) -> Dict[str, Any]:
+        """Extract text and data from image using AWS Textract, or Tesseract locally."""
+        if self.textract is None:
+            if self.tesseract_version:
+                return await self._extract_locally(file_path)
+            return {
+                "text": "",
+                "tables": [],
+                "metadata": {"pages": 0, "confidence": 0.0, "error": "aws_textract_unavailable"},
+                "note": "AWS Textract not configured and local OCR (Tesseract) not installed. "
+                "Add AWS credentials or install the ocr extra to enable image processing.",
+                "method": "none",
+            }
+
+        try:
+            image_bytes = await asyncio.to_thread(_read_bytes, file_path)
+
+            # Call Textract
+            response = await asyncio.to_thread(
+                self.textract.detect_document_text, Document={"Bytes": image_bytes}
+            )
+
+            lines = [
+                {"text": block["Text"], "confidence": block["Confidence"]}
+                for block in response["Blocks"]
+                if block["BlockType"] == "LINE"
+            ]
+
+            # For now, return basic text extraction
+            # Advanced table/form detection would require AnalyzeDocument API
+            return _ocr_result(
+                lines,
+                [],
+                "textract",
+                "Image processed with AWS Textract OCR",
+                "aws_textract",
+            )
+
+        except Exception as e:
+            logger.error(f"AWS Textract error: {e}")
+            if self.tesseract_version:
+                # Fallback to local OCR
+                result = await self._extract_locally(file_path)
+                result["metadata"]["aws_service"] = "textract_error"
+                result["metadata"]["fallback"] = "local_processing"
+                return result
+            return {
+                "text": "",
+                "tables": [],
+                "metadata": {"pages": 0, "confidence": 0.0, "error": str(e)},
+                "note": f"AWS Textract processing failed: {str(e)}",
+                "method": "aws_textract_error",
+            }
+
+    async def _extract_locally(self, file_path: str) -> Dict[str, Any]:
+        """Pre-process and OCR an image with Tesseract in the extraction process pool."""
+        try:
+            ocr = await get_extraction_pool().run(
+                local_ocr.ocr_image,
+                file_path,
+                self.ocr_language,
+                self.ocr_tables,
+                self.ocr_max_side,
+            )
+        except Exception as e:
+            logger.error(f"Local OCR error: {e}")
+            return {
+                "text": "",
+                "tables": [],
+                "metadata": {"pages": 0, "confidence": 0.0, "error": str(e)},
+                "note": f"Local OCR processing failed: {str(e)}",
+                "method": "local_tesseract_error",
+            }
+
+        tables = [
+            table
+            for index, rows in enumerate(ocr["tables"])
+            if (table := grid_table(f"Table_{index + 1}", rows))
+        ]
+        logger.info(
+            f"Local OCR completed: {len(ocr['lines'])} lines, {len(tables)} tables, "
+            f"deskewed {ocr['skew']} degrees"
+        )
+        return _ocr_result(
+            ocr["lines"],
+            tables,
+            "none",
+            "Image processed with local Tesseract OCR",
+            "local_tesseract",
+        )
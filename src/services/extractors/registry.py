@@ -0,0 +1,156 @@
+"""Registry of format extractors.
+
+Formats are registered as ExtractorSpecs naming their implementation as
+"module:Class"; the module is only imported, and the extractor only
+constructed, when the first file of that format arrives. Adding a format
+means registering a spec here (or from a plugin via register_extractor),
+not changing the dispatcher.
+"""
+
+import importlib
+import logging
+import threading
+from typing import Dict, Optional
+
+from src.services.extractors.base import BaseExtractor, ExtractorSpec
+
+logger = logging.getLogger(__name__)
+
+_specs: Dict[str, ExtractorSpec] = {}  # By extension
+_instances: Dict[str, BaseExtractor] = {}  # By extractor name
+_lock = threading.Lock()
+
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+XLSX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+BUILTIN_EXTRACTORS = [
+    ExtractorSpec(
+        name="text",
+        target="src.services.extractors.text:TextExtractor",
+        extensions=(".txt",),
+        mime_types=("text/plain",),
+        capabilities=frozenset({"text", "entities", "key_phrases", "sentiment"}),
+        cost_per_unit=0.0003,  # Three Comprehend analyses at $0.0001 each
+        cost_unit="100 characters",
+    ),
+    ExtractorSpec(
+        name="markdown",
+        target="src.services.extractors.text:MarkdownExtractor",
+        extensions=(".md", ".markdown"),
+        mime_types=("text/markdown", "text/x-markdown"),
+        capabilities=frozenset({"text", "tables", "entities", "key_phrases", "sentiment"}),
+        cost_per_unit=0.0003,
+        cost_unit="100 characters",
+    ),
+    ExtractorSpec(
+        name="html",
+        target="src.services.extractors.text:HtmlExtractor",
+        extensions=(".html", ".htm"),
+        mime_types=("text/html",),
+        capabilities=frozenset({"text", "tables", "entities", "key_phrases", "sentiment"}),
+        cost_per_unit=0.0003,
+        cost_unit="100 characters",
+    ),
+    ExtractorSpec(
+        name="pdf",
+        target="src.services.extractors.pdf:PdfExtractor",
+        extensions=(".pdf",),
+        mime_types=("application/pdf",),
+        capabilities=frozenset({"text", "tables", "forms", "ocr"}),
+        cost_per_unit=0.0015,
+        cost_unit="page",
+    ),
+    ExtractorSpec(
+        name="docx",
+        target="src.services.extractors.word:DocxExtractor",
+        extensions=(".docx",),
+        mime_types=(DOCX_MIME_TYPE,),
+        capabilities=frozenset({"text", "tables", "forms"}),
+        cost_per_unit=0.0015,
+        cost_unit="document",
+    ),
+    ExtractorSpec(
+        name="csv",
+        target="src.services.extractors.spreadsheet:CsvExtractor",
+        extensions=(".csv",),
+        mime_types=("text/csv",),
+        capabilities=frozenset({"text", "tables", "profiling"}),
+        cost_per_unit=0.0003,  # Comprehend entities on the column names
+        cost_unit="file",
+    ),
+    ExtractorSpec(
+        name="xlsx",
+        target="src.services.extractors.spreadsheet:XlsxExtractor",
+        extensions=(".xlsx",),
+        mime_types=(XLSX_MIME_TYPE,),
+        capabilities=frozenset({"text", "tables", "profiling"}),
+    ),
+    ExtractorSpec(
+        name="image",
+        target="src.services.extractors.image:ImageExtractor",
+        extensions=(".png", ".jpg", ".jpeg"),
+        mime_types=("image/png", "image/jpeg", "image/jpg"),
+        capabilities=frozenset({"text", "tables", "ocr"}),
+        cost_per_unit=0.001,
+        cost_unit="image",
+    ),
+]
+
+
+def register_extractor(spec: ExtractorSpec) -> None:
+    """Register (or replace) the extractor for a spec's extensions.
+
+    Args:
+        spec: Format declaration
+    """
+    with _lock:
+        for extension in spec.extensions:
+            _specs[extension.lower()] = spec
+        _instances.pop(spec.name, None)
+
+
+def get_spec(extension: str) -> Optional[ExtractorSpec]:
+    """Get the format declaration for a file extension (e.g. ".pdf")."""
+    return _specs.get(extension.lower())
+
+
+def get_extractor(extension: str) -> Optional[BaseExtractor]:
+    """Get the extractor for a file extension, importing and creating it on first use.
+
+    Args:
+        extension: File extension, with the dot
+
+    Returns:
+        Shared extractor instance, or None if the format is not supported
+    """
+    spec = get_spec(extension)
+    if spec is None:
+        return None
+
+    extractor = _instances.get(spec.name)
+    if extractor is None:
+        with _lock:
+            extractor = _instances.get(spec.name)
+            if extractor is None:
+                module_name, class_name = spec.target.split(":")
+                extractor_class = getattr(importlib.import_module(module_name), class_name)
+                extractor = _instances[spec.name] = extractor_class(spec)
+                logger.info(f"Loaded {spec.name} extractor")
+    return extractor
+
+
+def supported_extensions() -> Dict[str, ExtractorSpec]:
+    """Registered extensions and their format declarations."""
+    return dict(_specs)
+
+
+def supported_mime_types() -> list[str]:
+    """Upload content types accepted by any registered extractor."""
+    seen: Dict[str, None] = {}
+    for spec in _specs.values():
+        seen.update(dict.fromkeys(spec.mime_types))
+    return list(seen)
+
+
+for _spec in BUILTIN_EXTRACTORS:
+    register_extractor(_spec)
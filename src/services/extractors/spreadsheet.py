@@ -0,0 +1,205 @@
+"""Tabular formats: CSV and XLSX.
+
+Rows are streamed into columnar storage (see table_store) and profiled in
+the extraction process pool; results carry each table's schema, profile
+and a preview.
+
+A table's column profile is stored on the table as "profile" (column name
+to profile, see table_profiler), where sorts and filters read column types
+from. ``metadata["inferred_data_types"]`` collects the same profiles for
+the whole result, by table name, for CSV and XLSX alike.
+"""
+
+import asyncio
+import logging
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from src.config import get_settings
+from src.services import document_parsers, table_profiler
+from src.services.extraction_pool import get_extraction_pool
+from src.services.extractors.aws import get_aws_client
+from src.services.extractors.base import BaseExtractor, ExtractorSpec
+from src.services.processing_status import processing_tracker
+from src.services.table_store import get_table_store
+
+logger = logging.getLogger(__name__)
+
+COMPREHEND_MIN_COST = 0.0003  # Minimum charge for one Comprehend request
+
+
+async def ingest_table(name: str, csv_path: str) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    """Store a CSV file as a table and profile its columns.
+
+    Returns:
+        Tuple of (result table with a preview of its rows and, when profiling
+        succeeded, its column profile; ingest details: delimiter)
+    """
+    stored = await asyncio.to_thread(
+        get_table_store().ingest_csv,
+        csv_path,
+        preview_rows=get_settings().extraction_preview_rows,
+    )
+    rows = stored["preview"]
+    columns = [column["name"] for column in stored["columns"]]
+    table = {
+        "name": name,
+        "columns": columns,
+        "rows": rows,
+        "row_count": stored["row_count"],
+        "column_count": len(columns),
+        "schema": stored["columns"],
+        "table_id": stored["table_id"],
+        "preview": len(rows) < stored["row_count"],
+    }
+    details: Dict[str, Any] = {"delimiter": stored["delimiter"]}
+
+    if stored["row_count"]:
+        # Profile every row of the stored table, off the event loop
+        try:
+            table["profile"] = await get_extraction_pool().run(
+                table_profiler.profile_arrow_file, get_table_store().path(stored["table_id"])
+            )
+        except Exception as e:
+            logger.warning(f"Column profiling failed for {name}: {e}")
+
+    return table, details
+
+
+def inferred_data_types(tables: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Column profiles of the profiled tables, by table name."""
+    return {table["name"]: table["profile"] for table in tables if table.get("profile")}
+
+
+def table_summary(table: Dict[str, Any]) -> List[str]:
+    """Text lines describing a table: its columns, size and first rows."""
+    columns, rows, row_count = table["columns"], table["rows"], table["row_count"]
+    lines = [f"Columns: {', '.join(columns)}", f"Total rows: {row_count}"]
+    lines.extend(
+        f"Row {i + 1}: {', '.join(str(row.get(col, '')) for col in columns)}"
+        for i, row in enumerate(rows[:5])
+    )
+    if row_count > 5:
+        lines.append(f"... and {row_count - 5} more rows")
+    return lines
+
+
+class CsvExtractor(BaseExtractor):
+    """CSV files."""
+
+    def __init__(self, spec: ExtractorSpec):
+        super().__init__(spec)
+        self.comprehend = get_aws_client("comprehend")
+
+    def cache_options(self) -> Dict[str, Any]:
+        return {"comprehend": self.comprehend is not None}
+
+    async def extract(self, file_path: str, job_id: Optional[str] = None) -> Dict[str, Any]:
+        processing_tracker.update_job(job_id, 40, "Processing CSV data")
+        try:
+            table, details = await ingest_table("CSV_Data", file_path)
+        except Exception as e:
+            raise Exception(f"Failed to extract CSV data: {e}")
+
+        if not table["row_count"]:
+            return {
+                "text": "",
+                "tables": [],
+                "metadata": {
+                    "pages": 1,
+                    "confidence": 1.0,
+                    "rows": 0,
+                    "columns": 0,
+                    "aws_service": "glue",
+                },
+                "note": "CSV file is empty",
+            }
+
+        metadata = {
+            "pages": 1,
+            "confidence": 1.0,
+            "rows": table["row_count"],
+            "columns": table["column_count"],
+            **details,
+            "inferred_data_types": inferred_data_types([table]),
+            "aws_service": "glue",
+        }
+        await self._analyze_columns(table["columns"], metadata, job_id)
+
+        return {
+            "text": "\n".join(table_summary(table)),
+            "tables": [table],
+            "metadata": metadata,
+            "note": "CSV data extracted and analyzed with AWS services",
+            "method": "aws_glue_parser",
+        }
+
+    async def _analyze_columns(
+        self, columns: List[str], metadata: Dict[str, Any], job_id: Optional[str]
+    ) -> None:
+        """Use AWS Comprehend to detect entities in the column names."""
+        if self.comprehend is None or not columns:
+            return
+        try:
+            entities_response = await asyncio.to_thread(
+                self.comprehend.detect_entities, Text=" ".join(columns), LanguageCode="en"
+            )
+            metadata["column_entities"] = entities_response.get("Entities", [])
+            logger.info("AWS Comprehend column analysis completed for CSV")
+
+        except Exception as e:
+            logger.warning(f"AWS Comprehend column analysis failed: {e}")
+            metadata["comprehend_error"] = str(e)
+
+        processing_tracker.update_job(
+            job_id, 70, "Analyzing columns with AWS Comprehend", "comprehend", COMPREHEND_MIN_COST
+        )
+
+
+class XlsxExtractor(BaseExtractor):
+    """Excel (XLSX) workbooks; each non-empty worksheet becomes a table."""
+
+    async def extract(self, file_path: str, job_id: Optional[str] = None) -> Dict[str, Any]:
+        processing_tracker.update_job(job_id, 40, "Reading workbook")
+        work_dir = tempfile.mkdtemp(prefix="xlsx-")
+        try:
+            # openpyxl holds the GIL while parsing, so sheets are converted in the pool
+            sheets = await get_extraction_pool().run(
+                document_parsers.xlsx_to_csv, file_path, work_dir
+            )
+
+            tables = []
+            for index, sheet in enumerate(sheets):
+                processing_tracker.update_job(
+                    job_id,
+                    50 + 40 * index // len(sheets),
+                    f"Processing sheet {index + 1}/{len(sheets)}",
+                )
+                table, details = await ingest_table(sheet["sheet"], sheet["path"])
+                if table["row_count"]:
+                    tables.append(table)
+        except Exception as e:
+            raise Exception(f"Failed to extract XLSX data: {e}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        text_lines: List[str] = []
+        for table in tables:
+            text_lines.append(f"Sheet: {table['name']}")
+            text_lines.extend(table_summary(table))
+
+        return {
+            "text": "\n".join(text_lines),
+            "tables": tables,
+            "metadata": {
+                "pages": len(tables),
+                "confidence": 1.0,
+                "sheets": [table["name"] for table in tables],
+                "rows": sum(table["row_count"] for table in tables),
+                "inferred_data_types": inferred_data_types(tables),
+                "aws_service": "none",
+            },
+            "note": "Workbook sheets extracted" if tables else "Workbook has no data",
+            "method": "xlsx_parser",
+        }
@@ -0,0 +1,250 @@
+"""Text-like formats: plain text, Markdown and HTML.
+
+Markup is reduced to plain text (tables are kept as tables), then the
+whole text is analyzed with Comprehend when AWS is configured.
+"""
+
+import asyncio
+import logging
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+from src.services.comprehend_analyzer import ComprehendAnalyzer
+from src.services.extractors.aws import get_aws_client
+from src.services.extractors.base import BaseExtractor, ExtractorSpec, grid_table
+from src.services.processing_status import processing_tracker
+
+logger = logging.getLogger(__name__)
+
+COMPREHEND_UNIT_COST = 0.0001  # Per 100-character unit, per analysis
+
+
+class TextExtractor(BaseExtractor):
+    """Plain text files."""
+
+    format_name = "text/plain"
+
+    def __init__(self, spec: ExtractorSpec):
+        super().__init__(spec)
+        client = get_aws_client("comprehend")
+        self.comprehend = ComprehendAnalyzer(client) if client is not None else None
+
+    def cache_options(self) -> Dict[str, Any]:
+        return {"comprehend": self.comprehend is not None}
+
+    def read(self, file_path: str) -> tuple[str, List[Dict[str, Any]]]:
+        """Read a document as plain text plus the tables found in it."""
+        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read(), []
+
+    async def extract(self, file_path: str, job_id: Optional[str] = None) -> Dict[str, Any]:
+        processing_tracker.update_job(job_id, 40, "Extracting text content")
+        try:
+            text, tables = await asyncio.to_thread(self.read, file_path)
+        except Exception as e:
+            raise Exception(f"Failed to read {self.spec.name} file: {e}")
+
+        metadata = {
+            "pages": 1,  # Text files are single page
+            "confidence": 1.0,  # Perfect extraction for text files
+            "lines": len(text.split("\n")),
+            "characters": len(text),
+            "format": self.format_name,
+            "aws_service": "comprehend" if self.comprehend else "none",
+        }
+        if tables:
+            metadata["tables_detected"] = len(tables)
+
+        # Use AWS Comprehend for advanced text analysis if available
+        if self.comprehend and text.strip():
+            try:
+                analysis = await self.comprehend.analyze(text)
+                metadata["entities"] = analysis["entities"]
+                metadata["key_phrases"] = analysis["key_phrases"]
+                metadata["sentiment"] = analysis["sentiment"]
+                metadata["sentiment_scores"] = analysis["sentiment_scores"]
+                metadata["comprehend_chunks"] = analysis["chunks"]
+                metadata["comprehend_units"] = analysis["units"]
+                if analysis["failed_chunks"]:
+                    metadata["comprehend_error"] = (
+                        f"{analysis['failed_chunks']} of {analysis['chunks']} chunks failed"
+                    )
+                logger.info(f"AWS Comprehend analysis completed for {self.spec.name} file")
+
+            except Exception as e:
+                logger.warning(f"AWS Comprehend analysis failed: {e}")
+                metadata["comprehend_error"] = str(e)
+
+            processing_tracker.update_job(
+                job_id,
+                70,
+                "Analyzing text with AWS Comprehend",
+                "comprehend",
+                metadata.get("comprehend_units", 0) * COMPREHEND_UNIT_COST,
+            )
+
+        return {
+            "text": text,
+            "tables": tables,
+            "forms": {},
+            "metadata": metadata,
+            "method": "aws_comprehend_parser" if self.comprehend else f"{self.spec.name}_parser",
+        }
+
+
+MARKDOWN_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+MARKDOWN_INLINE = [
+    (re.compile(r"!\[([^\]]*)\]\([^)]*\)"), r"\1"),  # Images -> alt text
+    (re.compile(r"\[([^\]]+)\]\([^)]*\)"), r"\1"),  # Links -> link text
+    (re.compile(r"(\*\*|__|~~|\*)(?=\S)(.+?)(?<=\S)\1"), r"\2"),  # Emphasis
+    (re.compile(r"`([^`]+)`"), r"\1"),  # Inline code
+]
+MARKDOWN_PREFIX = re.compile(r"^\s{0,3}(#{1,6}\s+|>\s?|[-*+]\s+|\d+[.)]\s+)")
+
+
+def _markdown_cells(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def markdown_to_text(markdown: str) -> tuple[str, List[Dict[str, Any]]]:
+    """Strip Markdown syntax, collecting pipe tables.
+
+    Returns:
+        Plain text (table rows as " | "-separated lines) and tables
+    """
+    lines = markdown.splitlines()
+    text_lines: List[str] = []
+    tables: List[Dict[str, Any]] = []
+    in_code = False
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.lstrip().startswith(("```", "~~~")):
+            in_code = not in_code
+            i += 1
+            continue
+        if in_code:
+            text_lines.append(line)
+            i += 1
+            continue
+
+        # A header row followed by a |---|---| separator starts a table
+        if "|" in line and i + 1 < len(lines) and MARKDOWN_TABLE_SEPARATOR.match(lines[i + 1]):
+            rows = [_markdown_cells(line)]
+            i += 2
+            while i < len(lines) and "|" in lines[i] and lines[i].strip():
+                rows.append(_markdown_cells(lines[i]))
+                i += 1
+            rows = [[_strip_inline(cell) for cell in row] for row in rows]
+            table = grid_table(f"Table_{len(tables) + 1}", rows)
+            if table:
+                tables.append(table)
+            text_lines.extend(" | ".join(cell for cell in row if cell) for row in rows)
+            continue
+
+        text_lines.append(_strip_inline(MARKDOWN_PREFIX.sub("", line)))
+        i += 1
+
+    return "\n".join(text_lines).strip(), tables
+
+
+def _strip_inline(text: str) -> str:
+    for pattern, replacement in MARKDOWN_INLINE:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class MarkdownExtractor(TextExtractor):
+    """Markdown files; pipe tables become result tables."""
+
+    format_name = "text/markdown"
+
+    def read(self, file_path: str) -> tuple[str, List[Dict[str, Any]]]:
+        markdown, _ = super().read(file_path)
+        return markdown_to_text(markdown)
+
+
+class _HtmlTextParser(HTMLParser):
+    """Collects visible text and tables from an HTML document."""
+
+    SKIPPED = {"script", "style", "noscript", "template", "svg"}
+    BLOCKS = set(
+        "p div br li tr h1 h2 h3 h4 h5 h6 section article header footer blockquote pre title".split()
+    )
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.tables: List[List[List[str]]] = []
+        self._skip_depth = 0
+        self._table_depth = 0
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in self.SKIPPED:
+            self._skip_depth += 1
+        elif tag == "table":
+            self._table_depth += 1
+            if self._table_depth == 1:
+                self.tables.append([])
+        elif tag == "tr" and self._table_depth == 1:
+            self._row = []
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+        if tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.SKIPPED:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag == "table":
+            self._table_depth = max(self._table_depth - 1, 0)
+        elif tag in ("td", "th") and self._cell is not None and self._row is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+            self.parts.append(" | ")
+        elif tag == "tr" and self._row is not None and self._table_depth == 1:
+            self.tables[-1].append(self._row)
+            self._row = None
+        if tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth:
+            return
+        self.parts.append(data)
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def text(self) -> str:
+        lines = (" ".join(line.split()).strip(" |") for line in "".join(self.parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+
+def html_to_text(html: str) -> tuple[str, List[Dict[str, Any]]]:
+    """Reduce HTML to its visible text and tables.
+
+    Returns:
+        Plain text (one line per block element) and tables
+    """
+    parser = _HtmlTextParser()
+    parser.feed(html)
+    parser.close()
+    tables = []
+    for rows in parser.tables:
+        table = grid_table(f"Table_{len(tables) + 1}", rows)
+        if table:
+            tables.append(table)
+    return parser.text(), tables
+
+
+class HtmlExtractor(TextExtractor):
+    """HTML files; scripts and styles are dropped, tables become result tables."""
+
+    format_name = "text/html"
+
+    def read(self, file_path: str) -> tuple[str, List[Dict[str, Any]]]:
+        html, _ = super().read(file_path)
+        return html_to_text(html)
@@ -0,0 +1,247 @@
+"""Response cache for LLM calls.
+
+Two tiers:
+1. Exact match: keyed on a SHA-256 of (provider, model, normalized messages,
+   temperature, max_tokens). Held in an in-process LRU and shared across
+   workers through Redis.
+2. Semantic (optional, temperature-0 calls only): the final user message is
+   embedded and compared against earlier prompts that share the same
+   provider, model, max_tokens and preceding messages. A close enough match
+   is served from cache.
+
+Callers opt in per request with ``LLMService.generate(..., cache="route_name")``.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from collections import defaultdict
+from typing import Any, Callable, Optional, Sequence
+
+from src.core.cache import LRUCache
+from src.db.redis import get_async_redis
+from src.llm.base import LLMMessage, LLMResponse
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "llm:cache:"
+EMBEDDING_DIMENSIONS = 512
+
+_TRAILING_SPACE = re.compile(r"[ \t]+\n")
+_WORD = re.compile(r"\w+")
+
+
+def normalize_content(content: str) -> str:
+    """Normalize message content without changing its meaning.
+
+    Only line endings and trailing whitespace are touched, so indentation in
+    pasted code is preserved.
+
+    Args:
+        content: Raw message content
+
+    Returns:
+        Normalized content
+    """
+    return _TRAILING_SPACE.sub("\n", content.replace("\r\n", "\n")).strip()
+
+
+def request_fingerprint(messages: Sequence[LLMMessage], **params: Any) -> str:
+    """Build a canonical hash for an LLM request.
+
+    Args:
+        messages: Conversation messages
+        **params: Request parameters that affect the output (provider, model,
+            temperature, max_tokens, ...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = {
+        "messages": [(msg.role, normalize_content(msg.content)) for msg in messages],
+        **params,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def hashed_embedding(text: str) -> "np.ndarray":
+    """Embed text as a normalized bag of hashed word unigrams and bigrams.
+
+    Cheap, local and deterministic; good at spotting prompts that differ only
+    in wording or whitespace.
+
+    Args:
+        text: Text to embed
+
+    Returns:
+        Unit-length float32 vector
+    """
+    words = _WORD.findall(text.lower())
+    vector = np.zeros(EMBEDDING_DIMENSIONS, dtype=np.float32)
+
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % EMBEDDING_DIMENSIONS
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class LLMResponseCache:
+    """Two-tier LLM response cache with hit/miss metrics."""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: int = 3600,
+        use_redis: bool = True,
+        semantic_enabled: bool = False,
+        semantic_threshold: float = 0.97,
+        embed: Optional[Callable[[str], Any]] = None,
+    ):
+        """Initialize cache.
+
+        Args:
+            max_entries: In-process entries per tier before LRU eviction
+            ttl_seconds: Time-to-live for cached responses
+            use_redis: Back the exact tier with Redis
+            semantic_enabled: Enable the embedding-similarity tier
+            semantic_threshold: Minimum cosine similarity for a semantic hit
+            embed: Embedding function (defaults to hashed_embedding)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self.semantic_enabled = semantic_enabled and HAS_NUMPY
+        self.semantic_threshold = semantic_threshold
+        self.embed = embed or hashed_embedding
+
+        self.exact: LRUCache[LLMResponse] = LRUCache(max_entries, ttl_seconds)
+        self.semantic: LRUCache[tuple[str, Any, LLMResponse]] = LRUCache(max_entries, ttl_seconds)
+
+        # Per-route counters: hits by tier, misses, stores
+        self.stats: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+        if semantic_enabled and not HAS_NUMPY:
+            logger.warning("numpy not installed - semantic LLM cache tier disabled")
+
+    async def lookup(
+        self,
+        messages: Sequence[LLMMessage],
+        targets: Sequence[dict[str, Any]],
+        route: str = "default",
+    ) -> Optional[LLMResponse]:
+        """Find a cached response for any of the candidate providers.
+
+        Args:
+            messages: Conversation messages
+            targets: Request parameters per candidate provider, in preference
+                order (provider, model, temperature, max_tokens)
+            route: Metrics label of the calling route
+
+        Returns:
+            Cached LLMResponse (with ``cached=True``), or None on a miss
+        """
+        keys = [request_fingerprint(messages, **target) for target in targets]
+
+        # Tier 1a: in-process exact match
+        for key in keys:
+            response = self.exact.get(key)
+            if response is not None:
+                return self._hit(response, route, "memory")
+
+        # Tier 1b: Redis exact match, one round trip for all candidates
+        if self.use_redis:
+            try:
+                values = await get_async_redis().mget([REDIS_KEY_PREFIX + key for key in keys])
+                for key, value in zip(keys, values):
+                    if value:
+                        response = LLMResponse.model_validate_json(value)
+                        self.exact.set(key, response)
+                        return self._hit(response, route, "redis")
+            except Exception as e:
+                logger.debug(f"LLM cache Redis lookup failed: {e}")
+
+        # Tier 2: semantic match on the final user message
+        if self.semantic_enabled and messages:
+            for target in targets:
+                if target.get("temperature") != 0:
+                    continue
+                response = self._semantic_lookup(messages, target)
+                if response is not None:
+                    return self._hit(response, route, "semantic")
+
+        self.stats[route]["misses"] += 1
+        return None
+
+    async def store(
+        self,
+        messages: Sequence[LLMMessage],
+        target: dict[str, Any],
+        response: LLMResponse,
+        route: str = "default",
+    ) -> None:
+        """Cache a fresh response.
+
+        Args:
+            messages: Conversation messages that produced the response
+            target: Request parameters of the provider that answered
+            response: Response to cache
+            route: Metrics label of the calling route
+        """
+        key = request_fingerprint(messages, **target)
+        self.exact.set(key, response)
+        self.stats[route]["stores"] += 1
+
+        if self.use_redis:
+            try:
+                await get_async_redis().set(
+                    REDIS_KEY_PREFIX + key, response.model_dump_json(), ex=self.ttl_seconds
+                )
+            except Exception as e:
+                logger.debug(f"LLM cache Redis store failed: {e}")
+
+        if self.semantic_enabled and messages and target.get("temperature") == 0:
+            scope = request_fingerprint(messages[:-1], **target)
+            vector = self.embed(normalize_content(messages[-1].content))
+            self.semantic.set(key, (scope, vector, response))
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get hit/miss counters per route plus tier sizes."""
+        return {
+            "routes": {route: dict(counters) for route, counters in self.stats.items()},
+            "exact_entries": len(self.exact),
+            "semantic_entries": len(self.semantic),
+            "evictions": self.exact.evictions + self.semantic.evictions,
+        }
+
+    def _semantic_lookup(
+        self, messages: Sequence[LLMMessage], target: dict[str, Any]
+    ) -> Optional[LLMResponse]:
+        """Find the most similar cached prompt within the same scope."""
+        scope = request_fingerprint(messages[:-1], **target)
+        candidates = [entry for entry in self.semantic.values() if entry[0] == scope]
+        if not candidates:
+            return None
+
+        query = self.embed(normalize_content(messages[-1].content))
+        similarities = np.stack([entry[1] for entry in candidates]) @ query
+        best = int(np.argmax(similarities))
+
+        if similarities[best] >= self.semantic_threshold:
+            return candidates[best][2]
+        return None
+
+    def _hit(self, response: LLMResponse, route: str, tier: str) -> LLMResponse:
+        """Count a hit and return a flagged copy of the cached response."""
+        self.stats[route][f"hits_{tier}"] += 1
+        return response.model_copy(update={"cached": True, "hedged": False, "hedge_cost_tokens": 0})
@@ -0,0 +1,268 @@
+"""Single-flight coalescing for identical in-flight LLM calls.
+
+Concurrent calls with the same request fingerprint share one upstream call:
+- generate(): every caller awaits the same task and receives its response.
+- stream(): one upstream stream is fanned out to every subscriber. Chunks
+  are buffered for the lifetime of the stream so late joiners replay from
+  the start.
+
+With Redis enabled, generate() calls are also coalesced across workers: the
+first worker takes a short-lived lock, and the others poll for the result it
+publishes, falling back to their own call if it never arrives. Results are
+published under the lock's token, so a worker only ever receives the
+result of the flight it saw in progress, never one from an earlier flight.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from src.db.redis import get_async_redis
+from src.llm.base import LLMResponse
+
+logger = logging.getLogger(__name__)
+
+REDIS_LOCK_PREFIX = "llm:flight:lock:"
+REDIS_RESULT_PREFIX = "llm:flight:result:"
+RESULT_TTL_MS = 30_000  # Long enough for waiting workers to pick the result up
+POLL_INTERVAL_SECONDS = 0.1
+
+# Delete the lock only if this worker still owns it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class _StreamFanout:
+    """One upstream stream shared by several subscribers."""
+
+    def __init__(self):
+        self.chunks: list[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    async def pump(self, upstream: AsyncIterator[str]) -> None:
+        """Read the upstream stream into the shared buffer."""
+        try:
+            async for chunk in upstream:
+                async with self._changed:
+                    self.chunks.append(chunk)
+                    self._changed.notify_all()
+        except BaseException as e:
+            self.error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            async with self._changed:
+                self.done = True
+                self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """Yield every chunk from the start, then follow the live stream."""
+        position = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: position < len(self.chunks) or self.done)
+                pending = self.chunks[position:]
+                finished = self.done
+
+            for chunk in pending:
+                yield chunk
+            position += len(pending)
+
+            if finished and position >= len(self.chunks):
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class SingleFlight:
+    """Coalesces identical concurrent LLM calls onto one upstream call."""
+
+    def __init__(
+        self,
+        use_redis: bool = False,
+        lock_ttl_ms: int = 60_000,
+        wait_timeout_seconds: float = 60.0,
+    ):
+        """Initialize coalescer.
+
+        Args:
+            use_redis: Also coalesce generate() calls across workers via Redis
+            lock_ttl_ms: Lifetime of the cross-worker lock (caps a crashed leader's hold)
+            wait_timeout_seconds: How long a worker waits for another worker's
+                result before making the call itself
+        """
+        self.use_redis = use_redis
+        self.lock_ttl_ms = lock_ttl_ms
+        self.wait_timeout_seconds = wait_timeout_seconds
+
+        self._calls: dict[str, asyncio.Task] = {}
+        self._streams: dict[str, _StreamFanout] = {}
+        self.stats: dict[str, int] = defaultdict(int)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[LLMResponse]]) -> LLMResponse:
+        """Run fn once for all concurrent callers with the same key.
+
+        The upstream call runs in its own task, so a caller that gives up
+        does not cancel it for the others.
+
+        Args:
+            key: Request fingerprint
+            fn: Makes the upstream call
+
+        Returns:
+            LLMResponse; copies handed to followers have ``coalesced=True``
+
+        Raises:
+            Exception: Whatever the upstream call raised
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.stats["followers"] += 1
+            logger.debug(f"Coalesced LLM call onto in-flight request {key[:12]}")
+            return self._follower_copy(await asyncio.shield(task))
+
+        self.stats["leaders"] += 1
+        runner = self._run_with_redis_lock(key, fn) if self.use_redis else fn()
+        task = asyncio.create_task(runner)
+        self._calls[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    async def stream(
+        self, key: str, fn: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """Share one upstream stream between all concurrent subscribers.
+
+        The upstream stream is cancelled once every subscriber has gone.
+
+        Args:
+            key: Request fingerprint
+            fn: Opens the upstream stream
+
+        Yields:
+            Chunks of generated text, from the start of the stream
+        """
+        fanout = self._streams.get(key)
+        if fanout is None:
+            self.stats["stream_leaders"] += 1
+            fanout = _StreamFanout()
+            self._streams[key] = fanout
+            fanout.task = asyncio.create_task(fanout.pump(fn()))
+            fanout.task.add_done_callback(lambda _: self._streams.pop(key, None))
+        else:
+            self.stats["stream_followers"] += 1
+            logger.debug(f"Joined in-flight LLM stream {key[:12]}")
+
+        fanout.subscribers += 1
+        try:
+            async for chunk in fanout.subscribe():
+                yield chunk
+        finally:
+            fanout.subscribers -= 1
+            if fanout.subscribers == 0 and not fanout.done:
+                fanout.task.cancel()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get coalescing counters plus the number of calls in flight."""
+        return {
+            **self.stats,
+            "in_flight_calls": len(self._calls),
+            "in_flight_streams": len(self._streams),
+        }
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished call (and mark its exception as retrieved)."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    @staticmethod
+    def _follower_copy(response: LLMResponse) -> LLMResponse:
+        """Flag a shared response; only the leader was billed for it."""
+        return response.model_copy(
+            update={"coalesced": True, "hedged": False, "hedge_cost_tokens": 0}
+        )
+
+    async def _run_with_redis_lock(
+        self, key: str, fn: Callable[[], Awaitable[LLMResponse]]
+    ) -> LLMResponse:
+        """Coalesce with other workers through a Redis lock.
+
+        Redis errors degrade to an uncoordinated local call.
+        """
+        lock_key = REDIS_LOCK_PREFIX + key
+        token = uuid.uuid4().hex
+
+        try:
+            client = get_async_redis()
+            acquired = await client.set(lock_key, token, nx=True, px=self.lock_ttl_ms)
+        except Exception as e:
+            logger.debug(f"LLM coalescing lock unavailable: {e}")
+            return await fn()
+
+        if not acquired:
+            response = await self._wait_for_remote(client, lock_key)
+            if response is not None:
+                self.stats["remote_followers"] += 1
+                return self._follower_copy(response)
+            return await fn()
+
+        try:
+            response = await fn()
+            try:
+                await client.set(
+                    REDIS_RESULT_PREFIX + token, response.model_dump_json(), px=RESULT_TTL_MS
+                )
+            except Exception as e:
+                logger.debug(f"LLM coalescing result publish failed: {e}")
+            return response
+        finally:
+            try:
+                await client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except Exception as e:
+                logger.debug(f"LLM coalescing lock release failed: {e}")
+
+    async def _wait_for_remote(self, client: Any, lock_key: str) -> Optional[LLMResponse]:
+        """Poll for the result published by the worker holding the lock.
+
+        The result is read under the token of the lock held now, so a result
+        left by an earlier flight of the same request is never returned.
+
+        Returns:
+            The published response, or None if the lock holder finished
+            without one (it failed), the lock was already gone or the wait
+            timed out
+        """
+        deadline = time.monotonic() + self.wait_timeout_seconds
+        try:
+            token = await client.get(lock_key)
+            if not token:
+                return None
+            result_key = REDIS_RESULT_PREFIX + token
+            while time.monotonic() < deadline:
+                value = await client.get(result_key)
+                if value:
+                    return LLMResponse.model_validate_json(value)
+                if await client.get(lock_key) != token:
+                    # Lock released between polls: the result may have just landed
+                    value = await client.get(result_key)
+                    return LLMResponse.model_validate_json(value) if value else None
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+        except Exception as e:
+            logger.debug(f"LLM coalescing wait failed: {e}")
+            return None
+
+        logger.warning(f"Timed out waiting for coalesced LLM result {lock_key[-12:]}")
+        return None
@@ -1,13 +1,18 @@
 """Multi-provider LLM service with automatic fallback."""
 
+import asyncio
 import logging
+import time
 from typing import Any, AsyncIterator, Optional
 
 from src.config import get_settings
 from src.llm.base import BaseLLMProvider, LLMMessage, LLMResponse
 from src.llm.bedrock_provider import BedrockProvider
 from src.llm.groq_provider import GroqProvider
+from src.llm.health import ProviderHealthMonitor
 from src.llm.openai_provider import OpenAIProvider
+from src.services.llm_cache import LLMResponseCache, request_fingerprint
+from src.services.llm_coalescing import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +20,7 @@ logger = logging.getLogger(__name__)
 class LLMService:
     """Multi-provider LLM service with automatic fallback.
 
-    Tries providers in order:
+    Configured providers, in default priority order:
     1. Groq (fast, cheap, good for development)
     2. AWS Bedrock (production-grade, Claude)
     3. OpenAI (reliable fallback)
@@ -23,6 +28,21 @@ class LLMService:
     If a provider fails, automatically tries the next one.
     This ensures high availability even if one service is down.
 
+    Each provider has a circuit breaker and latency/error-rate EWMAs
+    (see src.llm.health). Providers that keep failing or are too slow are
+    skipped until a probe request succeeds, and the rest are tried
+    healthiest-first.
+
+    With hedging enabled (LLM_HEDGING_ENABLED), a provider that has not
+    answered within its recent p95 latency gets the next provider started
+    in parallel; the first success wins and the other call is cancelled.
+
+    Routes that send repeatable prompts can opt in to the response cache
+    (see src.services.llm_cache) by passing ``cache="<route name>"``.
+
+    Identical concurrent calls are coalesced onto one provider call
+    (see src.services.llm_coalescing); pass ``coalesce=False`` to opt out.
+
     Usage:
         service = LLMService()
         response = await service.generate([
@@ -33,6 +53,7 @@ class LLMService:
     def __init__(self):
         """Initialize LLM service with available providers."""
         settings = get_settings()
+        self.settings = settings
         self.providers: list[BaseLLMProvider] = []
 
         # Initialize Groq if API key available
@@ -53,6 +74,7 @@ class LLMService:
                 bedrock = BedrockProvider(
                     model="anthropic.claude-3-5-sonnet-20241022-v2:0",
                     region_name=settings.aws_default_region,
+                    max_concurrency=settings.bedrock_max_concurrency,
                 )
                 self.providers.append(bedrock)
                 logger.info("Bedrock provider initialized")
@@ -74,16 +96,123 @@ class LLMService:
                 "GROQ_API_KEY, AWS credentials, or OPENAI_API_KEY"
             )
 
+        # Circuit breakers and latency/error EWMAs, used to order and skip providers
+        self.health = ProviderHealthMonitor(
+            [p.provider_name for p in self.providers],
+            alpha=settings.llm_health_ewma_alpha,
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            error_rate_threshold=settings.llm_breaker_error_rate_threshold,
+            open_seconds=settings.llm_breaker_open_seconds,
+            slow_call_seconds=settings.llm_breaker_slow_call_seconds,
+        )
+
+        # Response cache, used only by calls that opt in
+        self.cache: Optional[LLMResponseCache] = None
+        if settings.llm_cache_enabled:
+            self.cache = LLMResponseCache(
+                max_entries=settings.llm_cache_max_entries,
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                use_redis=settings.llm_cache_redis_enabled,
+                semantic_enabled=settings.llm_cache_semantic_enabled,
+                semantic_threshold=settings.llm_cache_semantic_threshold,
+            )
+
+        # Single-flight layer for identical in-flight requests
+        self.coalescer: Optional[SingleFlight] = None
+        if settings.llm_coalescing_enabled:
+            self.coalescer = SingleFlight(
+                use_redis=settings.llm_coalescing_redis_enabled,
+                lock_ttl_ms=settings.llm_coalescing_lock_ttl_ms,
+                wait_timeout_seconds=settings.llm_coalescing_wait_timeout_seconds,
+            )
+
         logger.info(f"LLM service initialized with {len(self.providers)} provider(s)")
 
     async def generate(self, messages: list[LLMMessage], **kwargs: Any) -> LLMResponse:
         """Generate a response using first available provider.
 
-        Tries providers in order until one succeeds.
+        Tries healthy providers, fastest first, until one succeeds. Providers
+        with an open circuit breaker are skipped. When hedging is enabled, a
+        slow provider is raced against the next one instead of waiting for it
+        to time out (see _generate_hedged).
 
         Args:
             messages: Conversation messages
-            **kwargs: Additional arguments (temperature, max_tokens, etc.)
+            **kwargs: Additional arguments (temperature, max_tokens, etc.).
+                ``hedge`` overrides the LLM_HEDGING_ENABLED setting per call.
+                ``cache`` opts in to the response cache; pass a route name
+                (or True) to label hit/miss metrics. ``coalesce=False`` opts
+                out of sharing an identical in-flight request.
+
+        Returns:
+            LLMResponse from successful provider (``cached`` set on cache
+            hits, ``coalesced`` when shared from an in-flight request)
+
+        Raises:
+            Exception: If all providers fail
+        """
+        route = kwargs.pop("cache", None)
+        if not route or self.cache is None:
+            return await self._coalesced_generate(messages, **kwargs)
+
+        route = route if isinstance(route, str) else "default"
+        targets = [self._cache_target(p, kwargs) for p in self.health.order(self.providers)]
+
+        cached = await self.cache.lookup(messages, targets, route)
+        if cached is not None:
+            logger.info(f"LLM cache hit for route {route} ({cached.provider})")
+            return cached
+
+        response = await self._coalesced_generate(messages, **kwargs)
+
+        provider = next(p for p in self.providers if p.provider_name == response.provider)
+        await self.cache.store(messages, self._cache_target(provider, kwargs), response, route)
+        return response
+
+    async def _coalesced_generate(self, messages: list[LLMMessage], **kwargs: Any) -> LLMResponse:
+        """Generate a response, sharing the call with identical in-flight requests.
+
+        Args:
+            messages: Conversation messages
+            **kwargs: Additional arguments (temperature, max_tokens, hedge, coalesce, etc.)
+
+        Returns:
+            LLMResponse from successful provider
+
+        Raises:
+            Exception: If all providers fail
+        """
+        coalesce = kwargs.pop("coalesce", True)
+        if not coalesce or self.coalescer is None:
+            return await self._generate(messages, **kwargs)
+
+        key = self._coalescing_key("generate", messages, kwargs)
+        return await self.coalescer.do(key, lambda: self._generate(messages, **kwargs))
+
+    @staticmethod
+    def _coalescing_key(mode: str, messages: list[LLMMessage], kwargs: dict[str, Any]) -> str:
+        """Get the single-flight key for a request.
+
+        The provider is chosen per call, so it is not part of the key; hedging
+        changes how a request is served but not what it asks for.
+
+        Args:
+            mode: "generate" or "stream"
+            messages: Conversation messages
+            kwargs: Call arguments
+
+        Returns:
+            Request fingerprint
+        """
+        params = {k: v for k, v in kwargs.items() if k != "hedge"}
+        return request_fingerprint(messages, mode=mode, **params)
+
+    async def _generate(self, messages: list[LLMMessage], **kwargs: Any) -> LLMResponse:
+        """Generate a response from the providers, bypassing the cache.
+
+        Args:
+            messages: Conversation messages
+            **kwargs: Additional arguments (temperature, max_tokens, hedge, etc.)
 
         Returns:
             LLMResponse from successful provider
@@ -91,16 +220,33 @@ class LLMService:
         Raises:
             Exception: If all providers fail
         """
+        hedge = kwargs.pop("hedge", self.settings.llm_hedging_enabled)
+
+        if hedge and len(self.providers) > 1:
+            return await self._generate_hedged(messages, **kwargs)
+
         last_error = None
+        candidates, last_resort = self._candidate_providers()
+
+        for provider in candidates:
+            if not self._acquire(provider, last_resort):
+                continue
 
-        for provider in self.providers:
             try:
                 logger.debug(f"Trying provider: {provider.provider_name}")
+                started = time.monotonic()
                 response = await provider.generate(messages, **kwargs)
+                self.health.record_success(provider.provider_name, time.monotonic() - started)
                 logger.info(f"Successfully generated response using {provider.provider_name}")
+                response.attempted_providers = [provider.provider_name]
                 return response
 
+            except asyncio.CancelledError:
+                self.health.record_cancelled(provider.provider_name)
+                raise
+
             except Exception as e:
+                self.health.record_failure(provider.provider_name)
                 logger.warning(
                     f"Provider {provider.provider_name} failed: {e}. Trying next provider..."
                 )
@@ -112,10 +258,224 @@ class LLMService:
         logger.error(error_msg)
         raise Exception(error_msg)
 
+    async def _generate_hedged(self, messages: list[LLMMessage], **kwargs: Any) -> LLMResponse:
+        """Generate a response, racing providers when the current one is slow.
+
+        Starts the first provider. If it has not answered within its hedge
+        delay (recent p95 latency, clamped to the configured bounds), the next
+        provider is started in parallel. A failure starts the next provider
+        immediately. The first successful response wins and every other
+        in-flight call is cancelled.
+
+        ``hedge_cost_tokens`` counts the tokens of losers that finished and
+        an estimate for cancelled ones: the prompt, plus an answer as long
+        as the winner's for providers whose calls keep running when
+        cancelled (Bedrock), since those are billed in full.
+
+        Args:
+            messages: Conversation messages
+            **kwargs: Additional arguments (temperature, max_tokens, etc.)
+
+        Returns:
+            LLMResponse from the winning provider, with hedging report fields set
+
+        Raises:
+            Exception: If all providers fail
+        """
+        remaining, last_resort = self._candidate_providers()
+        in_flight: dict[asyncio.Task, tuple[BaseLLMProvider, float]] = {}
+        attempted: list[str] = []
+        last_error = None
+
+        def launch() -> Optional[BaseLLMProvider]:
+            while remaining:
+                provider = remaining.pop(0)
+                if not self._acquire(provider, last_resort):
+                    continue
+
+                task = asyncio.create_task(provider.generate(messages, **kwargs))
+                in_flight[task] = (provider, time.monotonic())
+                attempted.append(provider.provider_name)
+                logger.debug(f"Hedged request started provider: {provider.provider_name}")
+                return provider
+            return None
+
+        current = launch()
+
+        try:
+            while in_flight:
+                timeout = self._hedge_delay(current) if remaining else None
+                done, _ = await asyncio.wait(
+                    in_flight.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Current provider is slower than its p95: start the next one alongside it
+                    logger.info(
+                        f"Provider {current.provider_name} exceeded hedge delay "
+                        f"({timeout:.2f}s), hedging with {remaining[0].provider_name}"
+                    )
+                    current = launch() or current
+                    continue
+
+                winner: Optional[LLMResponse] = None
+                losing_tokens = 0
+
+                for task in done:
+                    provider, started = in_flight.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        self.health.record_failure(provider.provider_name)
+                        logger.warning(f"Hedged provider {provider.provider_name} failed: {e}")
+                        last_error = e
+                        continue
+
+                    self.health.record_success(provider.provider_name, time.monotonic() - started)
+                    if winner is None:
+                        winner = response
+                    else:
+                        # Finished in the same tick as the winner; its tokens are already spent
+                        losing_tokens += response.total_tokens
+
+                if winner is not None:
+                    # Cancelled calls have at least been billed for their prompt; calls
+                    # that cannot be cancelled will also produce a whole answer
+                    prompt_tokens = self._estimate_prompt_tokens(messages)
+                    for provider, _ in in_flight.values():
+                        losing_tokens += prompt_tokens
+                        if not provider.supports_cancellation():
+                            losing_tokens += winner.output_tokens
+                    winner.hedged = len(attempted) > 1
+                    winner.hedge_cost_tokens = losing_tokens
+                    winner.attempted_providers = attempted
+                    logger.info(
+                        f"Hedged request won by {winner.provider} "
+                        f"(attempted: {', '.join(attempted)}, hedge cost: {losing_tokens} tokens)"
+                    )
+                    return winner
+
+                # Everything that finished failed; fall back to the next provider right away
+                if remaining:
+                    current = launch() or current
+
+        finally:
+            for task, (provider, _) in in_flight.items():
+                task.cancel()
+                self.health.record_cancelled(provider.provider_name)
+
+        error_msg = f"All {len(self.providers)} LLM provider(s) failed. Last error: {last_error}"
+        logger.error(error_msg)
+        raise Exception(error_msg)
+
+    @staticmethod
+    def _cache_target(provider: BaseLLMProvider, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Get the request parameters that identify a cacheable call to a provider.
+
+        Args:
+            provider: Provider that would serve the call
+            kwargs: Call arguments (provider defaults fill the gaps)
+
+        Returns:
+            Dict of provider, model, temperature and max_tokens
+        """
+        return {
+            "provider": provider.provider_name,
+            "model": provider.model,
+            "temperature": kwargs.get("temperature", provider.temperature),
+            "max_tokens": kwargs.get("max_tokens", provider.max_tokens),
+        }
+
+    def _candidate_providers(self) -> tuple[list[BaseLLMProvider], bool]:
+        """Get providers to try for one request, healthiest first.
+
+        Returns:
+            Tuple of (ordered providers, last_resort). ``last_resort`` is True
+            when every circuit is open, in which case all providers are tried
+            anyway rather than failing without a single attempt.
+        """
+        last_resort = not any(self.health.is_available(p.provider_name) for p in self.providers)
+        return self.health.order(self.providers), last_resort
+
+    def _acquire(self, provider: BaseLLMProvider, last_resort: bool) -> bool:
+        """Check the provider's circuit breaker right before calling it.
+
+        Args:
+            provider: Provider about to be called
+            last_resort: Whether breakers are being bypassed for this request
+
+        Returns:
+            True if the call may go ahead
+        """
+        if self.health.acquire(provider.provider_name):
+            return True
+        if last_resort:
+            return True
+
+        logger.debug(f"Skipping provider {provider.provider_name}: circuit open")
+        return False
+
+    def _hedge_delay(self, provider: BaseLLMProvider) -> float:
+        """Get how long to wait on a provider before hedging.
+
+        Args:
+            provider: Provider currently being waited on
+
+        Returns:
+            Delay in seconds
+        """
+        settings = self.settings
+        tracker = self.health.providers[provider.provider_name].latency
+        delay = tracker.percentile(settings.llm_hedge_percentile)
+        if delay is None:
+            delay = settings.llm_hedge_default_delay_ms / 1000
+
+        return min(
+            max(delay, settings.llm_hedge_min_delay_ms / 1000),
+            settings.llm_hedge_max_delay_ms / 1000,
+        )
+
+    @staticmethod
+    def _estimate_prompt_tokens(messages: list[LLMMessage]) -> int:
+        """Roughly estimate prompt tokens (about 4 characters per token).
+
+        Args:
+            messages: Conversation messages
+
+        Returns:
+            Estimated token count
+        """
+        return sum(len(msg.content) for msg in messages) // 4
+
     async def stream(self, messages: list[LLMMessage], **kwargs: Any) -> AsyncIterator[str]:
         """Stream a response using first available provider.
 
-        Tries providers in order until one succeeds.
+        Tries healthy providers in the same order as generate() until one
+        succeeds. Identical concurrent streams share one upstream stream
+        unless ``coalesce=False`` is passed.
+
+        Args:
+            messages: Conversation messages
+            **kwargs: Additional arguments
+
+        Yields:
+            Chunks of generated text
+
+        Raises:
+            Exception: If all providers fail
+        """
+        coalesce = kwargs.pop("coalesce", True)
+        if not coalesce or self.coalescer is None:
+            upstream = self._stream(messages, **kwargs)
+        else:
+            key = self._coalescing_key("stream", messages, kwargs)
+            upstream = self.coalescer.stream(key, lambda: self._stream(messages, **kwargs))
+
+        async for chunk in upstream:
+            yield chunk
+
+    async def _stream(self, messages: list[LLMMessage], **kwargs: Any) -> AsyncIterator[str]:
+        """Stream a response from the providers, falling back on failure.
 
         Args:
             messages: Conversation messages
@@ -128,18 +488,29 @@ class LLMService:
             Exception: If all providers fail
         """
         last_error = None
+        candidates, last_resort = self._candidate_providers()
+
+        for provider in candidates:
+            if not self._acquire(provider, last_resort):
+                continue
 
-        for provider in self.providers:
             try:
                 logger.debug(f"Trying stream provider: {provider.provider_name}")
 
                 async for chunk in provider.stream(messages, **kwargs):
                     yield chunk
 
+                # Stream duration depends on output length, so only the error rate is updated
+                self.health.record_success(provider.provider_name)
                 logger.info(f"Successfully streamed using {provider.provider_name}")
                 return  # Success, exit
 
+            except (asyncio.CancelledError, GeneratorExit):
+                self.health.record_cancelled(provider.provider_name)
+                raise
+
             except Exception as e:
+                self.health.record_failure(provider.provider_name)
                 logger.warning(
                     f"Stream provider {provider.provider_name} failed: {e}. Trying next provider..."
                 )
@@ -155,12 +526,42 @@ class LLMService:
         raise Exception(error_msg)
 
     def get_available_providers(self) -> list[str]:
-        """Get list of available provider names.
+        """Get names of providers currently accepting requests, in try order.
+
+        Providers whose circuit breaker is open are left out.
 
         Returns:
             List of provider names (e.g., ["groq", "bedrock"])
         """
-        return [p.provider_name for p in self.providers]
+        return [
+            p.provider_name
+            for p in self.health.order(self.providers)
+            if self.health.is_available(p.provider_name)
+        ]
+
+    def get_provider_health(self) -> list[dict[str, Any]]:
+        """Get circuit breaker and latency state for every provider.
+
+        Returns:
+            List of per-provider health dicts (see ProviderHealth.to_dict)
+        """
+        return self.health.snapshot()
+
+    def get_cache_stats(self) -> Optional[dict[str, Any]]:
+        """Get LLM response cache hit/miss metrics.
+
+        Returns:
+            Cache stats, or None if the cache is disabled
+        """
+        return self.cache.get_stats() if self.cache else None
+
+    def get_coalescing_stats(self) -> Optional[dict[str, Any]]:
+        """Get single-flight counters.
+
+        Returns:
+            Coalescing stats, or None if coalescing is disabled
+        """
+        return self.coalescer.get_stats() if self.coalescer else None
 
     async def process_instruction(self, instruction: str, data: Any) -> list[dict]:
         """Process natural language instruction to generate data transformation rules.
@@ -187,12 +588,16 @@ Analyze the instruction and determine its type:
 - FILTERING: Show only specific content or hide unwanted parts
 - TRANSFORMATION: Modify existing data (uppercase, format changes)
 
+Known entities (for "entity"/"entities" and "fields"): name, email, phone, url, date, money.
+Use a "pattern" regex only for anything else.
+
 Return ONLY a JSON array of transformation objects. No explanations, no markdown, just JSON.
 
 Format: [{{"type": "operation_name", "description": "what it does", "parameters": {{"key": "value"}}}}]
 
 Examples:
-- "extract email addresses": [{{"type": "extract", "description": "Extract email addresses", "parameters": {{"pattern": "\\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\\.[A-Z|a-z]{(2,)}\\b"}}}}]
+- "extract email addresses": [{{"type": "extract", "description": "Extract email addresses", "parameters": {{"entity": "email"}}}}]
+- "list the dates and amounts": [{{"type": "extract", "description": "Extract dates and amounts", "parameters": {{"entities": ["date", "money"]}}}}]
 - "show only name and email": [{{"type": "filter_content", "description": "Show only name and email information", "parameters": {{"fields": ["name", "email"]}}}}]
 - "show email": [{{"type": "filter_content", "description": "Show only email information", "parameters": {{"fields": ["email"]}}}}]
 - "convert to uppercase": [{{"type": "transform", "description": "Convert text to uppercase", "parameters": {{"operation": "uppercase"}}}}]
@@ -0,0 +1,301 @@
+"""Local OCR with Tesseract, run in extraction worker processes.
+
+Used for images when Textract is not configured (or fails). Tesseract
+reads clean, upright, bilevel text best, so images are pre-processed
+first: converted to grayscale, downscaled to a bounded size, deskewed
+(skew estimated from the ink's row profile) and binarized with Otsu's
+threshold.
+
+Like document_parsers, ocr_image is submitted to the extraction process
+pool, so it takes and returns picklable values only and imports nothing
+from the application. pytesseract and Pillow are optional dependencies
+(``pip install .[ocr]``) and also need the tesseract binary.
+"""
+
+from typing import Any, Optional
+
+import numpy as np
+
+MAX_SKEW_DEGREES = 10.0  # Steeper skew is taken to be intentional layout
+SKEW_COARSE_STEP = 0.5
+SKEW_FINE_STEP = 0.1
+MIN_DESKEW_DEGREES = 0.2  # Smaller corrections are not worth resampling for
+SKEW_SAMPLE_PIXELS = 200_000  # Ink pixels used to estimate skew
+CELL_GAP_RATIO = 1.5  # A gap this many line heights wide separates table cells
+TABLE_MIN_ROWS = 3  # Header plus two data rows
+
+
+def binarize(gray: np.ndarray) -> np.ndarray:
+    """Separate ink from background with Otsu's threshold.
+
+    Args:
+        gray: 2-D uint8 grayscale image
+
+    Returns:
+        Boolean array, True where there is ink. The minority class is
+        taken to be ink, so light text on a dark background works too.
+    """
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = histogram.sum()
+    if not total:
+        return np.zeros(gray.shape, dtype=bool)
+
+    levels = np.arange(256)
+    weight_dark = np.cumsum(histogram)
+    weight_light = total - weight_dark
+    sum_dark = np.cumsum(histogram * levels)
+    mean_dark = sum_dark / np.maximum(weight_dark, 1)
+    mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+    between_class = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    threshold = int(np.argmax(between_class))
+
+    ink = gray <= threshold
+    if ink.mean() > 0.5:
+        ink = ~ink
+    return ink
+
+
+def _profile_sharpness(ys: np.ndarray, xs: np.ndarray, degrees: float) -> float:
+    """How sharply ink rows peak when sheared by an angle (sum of squared row counts)."""
+    sheared = ys - xs * np.tan(np.radians(degrees))
+    rows = np.round(sheared - sheared.min()).astype(np.int64)
+    counts = np.bincount(rows).astype(np.float64)
+    return float(np.dot(counts, counts))
+
+
+def estimate_skew(ink: np.ndarray, max_degrees: float = MAX_SKEW_DEGREES) -> float:
+    """Estimate the angle of the text lines from the ink's row profile.
+
+    Text lines that run horizontally concentrate ink in few rows; the
+    angle whose shear gives the most concentrated row profile is the
+    skew. A coarse search is refined around its best angle.
+
+    Args:
+        ink: Boolean ink mask
+        max_degrees: Largest skew searched, either way
+
+    Returns:
+        Skew in degrees; positive when lines fall towards the right
+    """
+    ys, xs = np.nonzero(ink)
+    if len(ys) < 2:
+        return 0.0
+    if len(ys) > SKEW_SAMPLE_PIXELS:
+        step = len(ys) // SKEW_SAMPLE_PIXELS + 1
+        ys, xs = ys[::step], xs[::step]
+    ys, xs = ys.astype(np.float64), xs.astype(np.float64)
+
+    def best(angles: np.ndarray) -> float:
+        scores = [_profile_sharpness(ys, xs, angle) for angle in angles]
+        return float(angles[int(np.argmax(scores))])
+
+    coarse = best(np.arange(-max_degrees, max_degrees + SKEW_COARSE_STEP / 2, SKEW_COARSE_STEP))
+    fine = best(
+        np.arange(
+            coarse - SKEW_COARSE_STEP, coarse + SKEW_COARSE_STEP + SKEW_FINE_STEP / 2, SKEW_FINE_STEP
+        )
+    )
+    return round(fine, 2)
+
+
+def preprocess(image: Any, max_side: int) -> tuple[Any, float]:
+    """Prepare a Pillow image for Tesseract.
+
+    Args:
+        image: Pillow image
+        max_side: Longest side after downscaling, in pixels (0 = no limit)
+
+    Returns:
+        Tuple of (binarized "L" image with black text on white, skew corrected in degrees)
+    """
+    from PIL import Image, ImageOps
+
+    gray = ImageOps.exif_transpose(image).convert("L")
+    if max_side and max(gray.size) > max_side:
+        scale = max_side / max(gray.size)
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, Image.Resampling.LANCZOS)
+
+    ink = binarize(np.asarray(gray))
+    skew = estimate_skew(ink)
+    if abs(skew) >= MIN_DESKEW_DEGREES:
+        # Rotating counter-clockwise by the skew levels lines that fall to the right;
+        # corners exposed by the rotation are filled with the background shade
+        background = int(np.median(np.asarray(gray)))
+        gray = gray.rotate(
+            skew, resample=Image.Resampling.BICUBIC, expand=True, fillcolor=background
+        )
+        ink = binarize(np.asarray(gray))
+    else:
+        skew = 0.0
+
+    return Image.fromarray(np.where(ink, 0, 255).astype(np.uint8), mode="L"), skew
+
+
+def read_words(data: dict[str, list]) -> list[dict[str, Any]]:
+    """Pick the recognized words out of Tesseract's image_to_data output.
+
+    Args:
+        data: pytesseract.image_to_data(..., output_type=Output.DICT)
+
+    Returns:
+        Words in reading order, each with text, confidence (0-100), its
+        Tesseract line key (block, paragraph, line) and bounding box
+    """
+    words = []
+    for i, text in enumerate(data["text"]):
+        confidence = float(data["conf"][i])
+        if confidence < 0 or not str(text).strip():
+            continue
+        words.append(
+            {
+                "text": str(text).strip(),
+                "confidence": confidence,
+                "line": (data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+                "left": int(data["left"][i]),
+                "top": int(data["top"][i]),
+                "width": int(data["width"][i]),
+                "height": int(data["height"][i]),
+            }
+        )
+    return words
+
+
+def group_lines(words: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Join words into Tesseract's text lines.
+
+    Returns:
+        Lines in reading order, each with text and confidence (mean of its words)
+    """
+    lines: dict[tuple, list[dict[str, Any]]] = {}
+    for word in words:
+        lines.setdefault(word["line"], []).append(word)
+    return [
+        {
+            "text": " ".join(word["text"] for word in line),
+            "confidence": round(sum(word["confidence"] for word in line) / len(line), 2),
+        }
+        for line in lines.values()
+    ]
+
+
+def _visual_rows(words: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    """Group words into rows by vertical position.
+
+    Tesseract often reads table columns as separate blocks, so its own
+    lines cannot be used for tables: a word joins the current row when
+    its vertical centre falls within the row's extent.
+    """
+    rows: list[list[dict[str, Any]]] = []
+    bottom = -1
+    for word in sorted(words, key=lambda w: w["top"]):
+        centre = word["top"] + word["height"] / 2
+        if rows and centre <= bottom:
+            rows[-1].append(word)
+            bottom = max(bottom, word["top"] + word["height"])
+        else:
+            rows.append([word])
+            bottom = word["top"] + word["height"]
+    return [sorted(row, key=lambda w: w["left"]) for row in rows]
+
+
+def _cells(row: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Split a row at wide gaps into cells with their text and horizontal extent."""
+    height = float(np.median([word["height"] for word in row]))
+    cells: list[dict[str, Any]] = []
+    for word in row:
+        right = word["left"] + word["width"]
+        if cells and word["left"] - cells[-1]["right"] <= CELL_GAP_RATIO * height:
+            cells[-1]["text"] += " " + word["text"]
+            cells[-1]["right"] = right
+        else:
+            cells.append({"text": word["text"], "left": word["left"], "right": right})
+    return cells
+
+
+def _aligned(columns: list[list[int]], cells: list[dict[str, Any]]) -> bool:
+    """Whether each cell overlaps the horizontal extent of its column so far."""
+    return len(cells) == len(columns) and all(
+        cell["left"] <= right and cell["right"] >= left
+        for cell, (left, right) in zip(cells, columns)
+    )
+
+
+def detect_tables(words: list[dict[str, Any]]) -> list[list[list[str]]]:
+    """Find tables: runs of rows split into the same, aligned, columns.
+
+    Args:
+        words: Words from read_words
+
+    Returns:
+        Tables as rows of cell text, the first row being the header
+    """
+    tables: list[list[list[str]]] = []
+    current: list[list[str]] = []
+    columns: list[list[int]] = []
+
+    def close() -> None:
+        if len(current) >= TABLE_MIN_ROWS:
+            tables.append(list(current))
+        current.clear()
+        columns.clear()
+
+    for row in _visual_rows(words):
+        cells = _cells(row)
+        if len(cells) < 2:
+            close()
+            continue
+        if current and not _aligned(columns, cells):
+            close()
+        if not current:
+            columns.extend([cell["left"], cell["right"]] for cell in cells)
+        for column, cell in zip(columns, cells):
+            column[0] = min(column[0], cell["left"])
+            column[1] = max(column[1], cell["right"])
+        current.append([cell["text"] for cell in cells])
+    close()
+    return tables
+
+
+def ocr_image(
+    file_path: str,
+    language: str = "eng",
+    find_tables: bool = False,
+    max_side: int = 3000,
+) -> dict[str, Any]:
+    """Pre-process an image and read it with Tesseract.
+
+    Args:
+        file_path: Path to the image
+        language: Tesseract language code(s), e.g. "eng" or "eng+deu"
+        find_tables: Also look for tables in the word layout
+        max_side: Longest side after downscaling, in pixels (0 = no limit)
+
+    Returns:
+        Dict with lines (text and confidence), tables (rows of cell text),
+        skew (degrees corrected) and size (width, height as read)
+    """
+    import pytesseract
+    from PIL import Image
+
+    with Image.open(file_path) as image:
+        prepared, skew = preprocess(image, max_side)
+
+    data = pytesseract.image_to_data(prepared, lang=language, output_type=pytesseract.Output.DICT)
+    words = read_words(data)
+    return {
+        "lines": group_lines(words),
+        "tables": detect_tables(words) if find_tables else [],
+        "skew": skew,
+        "size": list(prepared.size),
+    }
+
+
+def tesseract_version() -> Optional[str]:
+    """Installed Tesseract version, or None if pytesseract, Pillow or the binary is missing."""
+    try:
+        import pytesseract
+
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return None
@@ -23,6 +23,7 @@ class ProcessingStatus:
     error: Optional[str] = None
     aws_services_used: list = None
     cost_estimate: float = 0.0
+    cached: bool = False  # Served from the extraction cache
 
     def __post_init__(self):
         if self.aws_services_used is None:
@@ -43,9 +44,10 @@ class ProcessingStatus:
         self.progress = progress
         self.current_step = step
 
-    def complete(self, result: Dict[str, Any] = None):
+    def complete(self, result: Dict[str, Any] = None, cached: bool = False):
         """Mark processing as completed."""
         self.status = "completed"
+        self.cached = cached
         self.progress = 100
         self.end_time = time.time()
         self.result = result
@@ -101,10 +103,10 @@ class ProcessingStatusTracker:
                 job.aws_services_used.append(aws_service)
             job.cost_estimate += cost_add
 
-    def complete_job(self, job_id: str, result: Dict[str, Any] = None):
+    def complete_job(self, job_id: str, result: Dict[str, Any] = None, cached: bool = False):
         """Mark job as completed."""
         if job_id in self.jobs:
-            self.jobs[job_id].complete(result)
+            self.jobs[job_id].complete(result, cached)
 
     def fail_job(self, job_id: str, error: str):
         """Mark job as failed."""
@@ -1,23 +1,27 @@
 """Research service using Firecrawl for web scraping."""
 
+import asyncio
 import logging
+import tempfile
 from typing import Any, Optional
 
 from firecrawl import FirecrawlApp
 
 from src.config import get_settings
 from src.llm.base import LLMMessage
+from src.services import document_parsers
+from src.services.extraction_pool import get_extraction_pool
 from src.services.llm_service import get_llm_service
 
 try:
-    import PyPDF2
+    import PyPDF2  # noqa: F401  (parsed in the extraction pool)
 
     HAS_PDF = True
 except ImportError:
     HAS_PDF = False
 
 try:
-    from docx import Document
+    from docx import Document  # noqa: F401  (parsed in the extraction pool)
 
     HAS_DOCX = True
 except ImportError:
@@ -74,20 +78,17 @@ class ResearchService:
             text_content = ""
 
             if filename.lower().endswith(".pdf") and HAS_PDF:
-                # Process PDF
-                from io import BytesIO
-
-                pdf_reader = PyPDF2.PdfReader(BytesIO(file_content))
-                for page in pdf_reader.pages:
-                    text_content += page.extract_text() + "\n"
+                # Parse pages in the extraction process pool, off the event loop
+                with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_file:
+                    await asyncio.to_thread(pdf_file.write, file_content)
+                    pdf_file.flush()
+                    pages = await get_extraction_pool().extract_pdf_text(pdf_file.name)
+                text_content = "\n".join(pages)
 
             elif filename.lower().endswith(".docx") and HAS_DOCX:
-                # Process DOCX
-                from io import BytesIO
-
-                doc = Document(BytesIO(file_content))
-                for paragraph in doc.paragraphs:
-                    text_content += paragraph.text + "\n"
+                text_content = await get_extraction_pool().run(
+                    document_parsers.docx_text_from_bytes, file_content
+                )
 
             elif filename.lower().endswith(".txt"):
                 # Process plain text
@@ -155,13 +156,14 @@ Be thorough but concise, and ensure your answer is well-supported."""
                 LLMMessage(role="user", content=user_prompt),
             ]
 
-            response = await self.llm_service.generate(messages)
+            response = await self.llm_service.generate(messages, cache="research")
             return {
                 "query": query,
                 "synthesis": response.content,
                 "sources": [],
                 "provider": response.provider,
                 "model": response.model,
+                "cached": response.cached,
                 "method": "ai_general",
             }
 
@@ -193,7 +195,7 @@ Provide a comprehensive answer that:
             LLMMessage(role="user", content=user_prompt),
         ]
 
-        response = await self.llm_service.generate(messages)
+        response = await self.llm_service.generate(messages, cache="research")
 
         return {
             "query": query,
@@ -204,4 +206,5 @@ Provide a comprehensive answer that:
             ],
             "provider": response.provider,
             "model": response.model,
+            "cached": response.cached,
         }
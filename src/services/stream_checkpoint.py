@@ -0,0 +1,241 @@
+"""Live and checkpointed state of streaming chat responses.
+
+A streaming assistant message is generated in the background, decoupled
+from the HTTP response that started it:
+- LiveStream holds the chunks in process; the response (and any resumed
+  connection on the same worker) subscribes to it.
+- StreamCheckpoint mirrors the chunks to Redis every N chunks, so another
+  worker can replay and tail the stream after a reconnect.
+
+Event ids are 1-based chunk positions, which is what clients send back in
+``Last-Event-ID``.
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from src.db.redis import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "chat:stream:"
+POLL_INTERVAL_SECONDS = 0.25
+STALE_SECONDS = 60  # A checkpoint not updated for this long belongs to a dead worker
+
+STREAMING = "streaming"
+DONE = "done"
+CANCELLED = "cancelled"
+ERROR = "error"
+
+# Streams being generated by this worker, by assistant message id
+_live_streams: dict[UUID, "LiveStream"] = {}
+
+
+class StreamCheckpoint:
+    """Redis mirror of one streaming message.
+
+    Redis failures are logged and swallowed; they must not break the stream.
+    """
+
+    def __init__(
+        self,
+        message_id: UUID,
+        conversation_id: UUID,
+        user_id: UUID,
+        every: int = 16,
+        ttl_seconds: int = 3600,
+    ):
+        """Initialize checkpoint.
+
+        Args:
+            message_id: Pre-assigned assistant message id
+            conversation_id: Conversation ID
+            user_id: Owner of the conversation
+            every: Flush to Redis after this many chunks
+            ttl_seconds: How long the checkpoint outlives the stream
+        """
+        self.message_id = message_id
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+        self.every = max(every, 1)
+        self.ttl_seconds = ttl_seconds
+        self._pending: list[str] = []
+
+    @property
+    def key(self) -> str:
+        return f"{REDIS_KEY_PREFIX}{self.message_id}"
+
+    async def start(self) -> None:
+        """Register the stream in Redis."""
+        await self._write(
+            {
+                "conversation_id": str(self.conversation_id),
+                "user_id": str(self.user_id),
+                "status": STREAMING,
+            }
+        )
+
+    async def append(self, chunk: str) -> None:
+        """Buffer a chunk, flushing every ``every`` chunks."""
+        self._pending.append(chunk)
+        if len(self._pending) >= self.every:
+            await self._write({"status": STREAMING})
+
+    async def finish(self, status: str, error: Optional[str] = None) -> None:
+        """Flush remaining chunks and record the final status."""
+        fields = {"status": status}
+        if error:
+            fields["error"] = error
+        await self._write(fields)
+
+    async def _write(self, fields: dict[str, str]) -> None:
+        """Flush pending chunks and update metadata in one pipeline."""
+        chunks, self._pending = self._pending, []
+        try:
+            pipe = get_async_redis().pipeline(transaction=True)
+            if chunks:
+                pipe.rpush(f"{self.key}:chunks", *chunks)
+            pipe.hset(self.key, mapping={**fields, "updated_at": str(time.time())})
+            pipe.expire(self.key, self.ttl_seconds)
+            pipe.expire(f"{self.key}:chunks", self.ttl_seconds)
+            await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Stream checkpoint for {self.message_id} failed: {e}")
+
+    @staticmethod
+    async def load(message_id: UUID) -> Optional[dict[str, str]]:
+        """Get a stream's checkpoint metadata.
+
+        Args:
+            message_id: Assistant message id
+
+        Returns:
+            Metadata (conversation_id, user_id, status, ...), or None if absent
+        """
+        try:
+            meta = await get_async_redis().hgetall(f"{REDIS_KEY_PREFIX}{message_id}")
+        except Exception as e:
+            logger.debug(f"Stream checkpoint lookup for {message_id} failed: {e}")
+            return None
+        return meta or None
+
+    @staticmethod
+    async def follow(message_id: UUID, after: int = 0) -> AsyncIterator[tuple[int, str]]:
+        """Replay checkpointed chunks after an event id, then tail until the stream ends.
+
+        Args:
+            message_id: Assistant message id
+            after: Last event id the client received
+
+        Yields:
+            Tuples of (event id, chunk)
+        """
+        key = f"{REDIS_KEY_PREFIX}{message_id}"
+        client = get_async_redis()
+        position = after
+
+        while True:
+            chunks = await client.lrange(f"{key}:chunks", position, -1)
+            for chunk in chunks:
+                position += 1
+                yield position, chunk
+
+            meta = await client.hgetall(key)
+            if not meta or meta.get("status") != STREAMING:
+                # Chunks flushed together with the final status
+                for chunk in await client.lrange(f"{key}:chunks", position, -1):
+                    position += 1
+                    yield position, chunk
+                return
+
+            if not chunks and time.time() - float(meta.get("updated_at", 0)) > STALE_SECONDS:
+                logger.warning(f"Abandoning stale stream checkpoint {message_id}")
+                return
+
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+class LiveStream:
+    """In-process buffer of a stream being generated by this worker."""
+
+    def __init__(self, message_id: UUID, conversation_id: UUID, user_id: UUID):
+        """Initialize live stream.
+
+        Args:
+            message_id: Pre-assigned assistant message id
+            conversation_id: Conversation ID
+            user_id: Owner of the conversation
+        """
+        self.message_id = message_id
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+        self.chunks: list[str] = []
+        self.status = STREAMING
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    async def publish(self, chunk: str) -> None:
+        """Add a chunk and wake subscribers."""
+        async with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    async def finish(self, status: str, error: Optional[str] = None) -> None:
+        """Mark the stream finished and wake subscribers."""
+        async with self._changed:
+            self.status = status
+            self.error = error
+            self._changed.notify_all()
+
+    async def subscribe(self, after: int = 0) -> AsyncIterator[tuple[int, str]]:
+        """Yield chunks after an event id, then follow the live stream.
+
+        Args:
+            after: Last event id the client received
+
+        Yields:
+            Tuples of (event id, chunk)
+        """
+        position = after
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: position < len(self.chunks) or self.status != STREAMING
+                )
+                pending = self.chunks[position:]
+                finished = self.status != STREAMING
+
+            for chunk in pending:
+                position += 1
+                yield position, chunk
+
+            if finished and position >= len(self.chunks):
+                return
+
+
+def register_live_stream(stream: LiveStream) -> None:
+    """Track a stream generated by this worker."""
+    _live_streams[stream.message_id] = stream
+
+
+def unregister_live_stream(message_id: UUID) -> None:
+    """Stop tracking a finished stream (its checkpoint remains in Redis)."""
+    _live_streams.pop(message_id, None)
+
+
+def get_live_stream(message_id: UUID) -> Optional[LiveStream]:
+    """Get a stream being generated by this worker."""
+    return _live_streams.get(message_id)
+
+
+async def cancel_live_streams() -> None:
+    """Cancel every in-flight generation (on shutdown); partial output is saved."""
+    tasks = [stream.task for stream in _live_streams.values() if stream.task]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,458 @@
+"""Row predicates for filter_rows, and lazily built indexes to answer them.
+
+A filter rule is either a single condition,
+    {"column": "status", "operation": "equals", "value": "paid"}
+or a tree of them under "where":
+    {"where": {"and": [{"column": "total", "operation": "gte", "value": 100},
+                       {"not": {"column": "region", "operation": "in",
+                                "value": ["north", "east"]}}]}}
+
+Conditions:
+- equals, not_equals, contains, starts_with, ends_with, in, not_in and
+  regex compare cells as case-insensitive strings (a missing cell as "");
+- gt, gte, lt, lte and between (inclusive [low, high]) compare numbers,
+  or ISO dates when the bound is a date; cells that do not parse fail.
+  On a column whose profile gives a date format (see
+  table_sort.column_types), cells are parsed with that format as well;
+- is_null and not_null test for missing or blank cells.
+A tree compiles once into one callable per rule. List-format rows have no
+column names and always pass.
+
+When the same rows are filtered on a column again, a hash index (for
+equals and in) or a sorted numeric index (for ranges) is built for it and
+narrows the rows the predicate is evaluated on, instead of scanning them
+all.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from src.services.table_sort import date_parser, to_number
+
+ColumnTypes = Dict[str, tuple[str, Optional[str]]]  # See table_sort.column_types
+
+OPERATION_ALIASES = {
+    "=": "equals",
+    "==": "equals",
+    "!=": "not_equals",
+    ">": "gt",
+    ">=": "gte",
+    "<": "lt",
+    "<=": "lte",
+}
+RANGE_OPERATIONS = {"gt", "gte", "lt", "lte", "between"}
+INDEX_MIN_ROWS = 1000  # Smaller tables are always scanned
+INDEXED_TABLES = 16  # Row lists whose indexes are kept
+
+RowPredicate = Callable[[Any], bool]
+Positions = List[int]
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _blank(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _number_or_date(value: Any) -> Callable[[Any], Optional[float]]:
+    """The parser a range bound is compared with: numbers, else ISO dates."""
+    if to_number(value) is not None:
+        return to_number
+    iso = date_parser(None)
+    if not _blank(value) and iso(value) is not None:
+        return iso
+    raise ValueError(f"range bound {value!r} is neither a number nor an ISO date")
+
+
+@dataclass(frozen=True)
+class _Range:
+    """Numeric bounds of a range condition, for sorted index lookups."""
+
+    low: Optional[float]
+    high: Optional[float]
+    low_inclusive: bool = True
+    high_inclusive: bool = True
+
+
+@dataclass(eq=False)
+class Condition:
+    """One test on one column."""
+
+    column: str
+    operation: str
+    value: Any
+    test: Callable[[Any], bool] = field(repr=False)
+    matches: Optional[List[str]] = None  # Lowercase texts a hash index can look up
+    range: Optional[_Range] = None  # Numeric bounds a sorted index can look up
+    # Builds the test for a cell date parser, for ranges with date bounds
+    dated: Optional[Callable[[Callable[[Any], Optional[float]]], Callable[[Any], bool]]] = field(
+        default=None, repr=False
+    )
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.column]
+
+    def describe(self) -> str:
+        if self.operation in ("is_null", "not_null"):
+            return f"{self.column} {self.operation}"
+        return f"{self.column} {self.operation} {self.value!r}"
+
+    def typed_test(self, types: Optional[ColumnTypes] = None) -> Callable[[Any], bool]:
+        """The cell test, parsing dates with the column's known format if it has one."""
+        known = (types or {}).get(self.column)
+        if self.dated is not None and known and known[0] == "date" and known[1]:
+            return self.dated(date_parser(known[1]))
+        return self.test
+
+    def bind(self, keys: Dict[str, Any], types: Optional[ColumnTypes] = None) -> RowPredicate:
+        key, test = keys[self.column], self.typed_test(types)
+        return lambda row: test(row.get(key))
+
+    def mask(self, frame: Any, types: Optional[ColumnTypes] = None) -> np.ndarray:
+        from src.services.transformation_columnar import factorize
+
+        test = self.typed_test(types)
+        if self.column in frame.columns:
+            values = frame[self.column].to_numpy(dtype=object)
+        else:
+            values = np.full(len(frame), None, dtype=object)
+        # Each distinct cell is tested once
+        codes, uniques = factorize(values)
+        tests = np.fromiter((test(value) for value in uniques), bool, len(uniques))
+        return tests[codes]
+
+    def candidates(self, index: "TableIndex", keys: Dict[str, Any]) -> Optional[set]:
+        key = keys[self.column]
+        if self.matches is not None:
+            return index.lookup(key, self.matches)
+        if self.range is not None:
+            return index.range(key, self.range)
+        return None
+
+
+@dataclass(eq=False)
+class AllOf:
+    children: List["Predicate"]
+
+    @property
+    def columns(self) -> List[str]:
+        return [column for child in self.children for column in child.columns]
+
+    def describe(self) -> str:
+        return "(" + " and ".join(child.describe() for child in self.children) + ")"
+
+    def bind(self, keys: Dict[str, Any], types: Optional[ColumnTypes] = None) -> RowPredicate:
+        tests = [child.bind(keys, types) for child in self.children]
+        if len(tests) == 2:
+            first, second = tests
+            return lambda row: first(row) and second(row)
+        return lambda row: all(test(row) for test in tests)
+
+    def mask(self, frame: Any, types: Optional[ColumnTypes] = None) -> np.ndarray:
+        mask = np.ones(len(frame), dtype=bool)
+        for child in self.children:
+            mask &= child.mask(frame, types)
+        return mask
+
+    def candidates(self, index: "TableIndex", keys: Dict[str, Any]) -> Optional[set]:
+        # Any indexed child bounds the rows; the predicate checks the rest
+        found = None
+        for child in self.children:
+            positions = child.candidates(index, keys)
+            if positions is not None:
+                found = positions if found is None else found & positions
+        return found
+
+
+@dataclass(eq=False)
+class AnyOf:
+    children: List["Predicate"]
+
+    @property
+    def columns(self) -> List[str]:
+        return [column for child in self.children for column in child.columns]
+
+    def describe(self) -> str:
+        return "(" + " or ".join(child.describe() for child in self.children) + ")"
+
+    def bind(self, keys: Dict[str, Any], types: Optional[ColumnTypes] = None) -> RowPredicate:
+        tests = [child.bind(keys, types) for child in self.children]
+        if len(tests) == 2:
+            first, second = tests
+            return lambda row: first(row) or second(row)
+        return lambda row: any(test(row) for test in tests)
+
+    def mask(self, frame: Any, types: Optional[ColumnTypes] = None) -> np.ndarray:
+        mask = np.zeros(len(frame), dtype=bool)
+        for child in self.children:
+            mask |= child.mask(frame, types)
+        return mask
+
+    def candidates(self, index: "TableIndex", keys: Dict[str, Any]) -> Optional[set]:
+        found: set = set()
+        for child in self.children:
+            positions = child.candidates(index, keys)
+            if positions is None:
+                return None  # A row matching this child could be anywhere
+            found |= positions
+        return found
+
+
+@dataclass(eq=False)
+class Not:
+    child: "Predicate"
+
+    @property
+    def columns(self) -> List[str]:
+        return self.child.columns
+
+    def describe(self) -> str:
+        return f"not {self.child.describe()}"
+
+    def bind(self, keys: Dict[str, Any], types: Optional[ColumnTypes] = None) -> RowPredicate:
+        test = self.child.bind(keys, types)
+        return lambda row: not test(row)
+
+    def mask(self, frame: Any, types: Optional[ColumnTypes] = None) -> np.ndarray:
+        return ~self.child.mask(frame, types)
+
+    def candidates(self, index: "TableIndex", keys: Dict[str, Any]) -> Optional[set]:
+        return None
+
+
+Predicate = Union[Condition, AllOf, AnyOf, Not]
+
+
+def _condition(spec: Dict[str, Any]) -> Condition:
+    column = spec.get("column", "")
+    if not column:
+        raise ValueError(f"filter condition needs a column, got {spec!r}")
+    operation = spec.get("operation", "equals")
+    operation = OPERATION_ALIASES.get(operation, operation)
+    value = spec.get("value", "")
+    matches = bounds = dated = None
+
+    if operation in ("equals", "not_equals", "contains", "starts_with", "ends_with"):
+        target = str(value).lower()
+        if operation in ("equals", "not_equals"):
+            test = lambda cell: _text(cell).lower() == target  # noqa: E731
+            matches = [target]
+        elif operation == "contains":
+            test = lambda cell: target in _text(cell).lower()  # noqa: E731
+        elif operation == "starts_with":
+            test = lambda cell: _text(cell).lower().startswith(target)  # noqa: E731
+        else:
+            test = lambda cell: _text(cell).lower().endswith(target)  # noqa: E731
+    elif operation in ("in", "not_in"):
+        if not isinstance(value, (list, tuple, set)):
+            raise ValueError(f"{operation} needs a list of values, got {value!r}")
+        targets = {str(item).lower() for item in value}
+        test = lambda cell: _text(cell).lower() in targets  # noqa: E731
+        matches = sorted(targets)
+    elif operation == "regex":
+        try:
+            pattern = re.compile(str(value), re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"invalid regex {value!r}: {e}")
+        test = lambda cell: pattern.search(_text(cell)) is not None  # noqa: E731
+    elif operation in ("is_null", "not_null"):
+        test = _blank
+    elif operation in RANGE_OPERATIONS:
+        test, bounds = _range_test(operation, value)
+        if bounds is None:
+            # Date bounds: cells may follow a format the column's profile knows
+            dated = lambda cells: _range_test(operation, value, cells)[0]  # noqa: E731
+    else:
+        raise ValueError(f"unknown filter operation {operation!r}")
+
+    if operation in ("not_equals", "not_in", "not_null"):
+        positive = test
+        test = lambda cell: not positive(cell)  # noqa: E731
+        matches = None
+    return Condition(column, operation, value, test, matches, bounds, dated)
+
+
+def _range_test(
+    operation: str, value: Any, cells: Optional[Callable[[Any], Optional[float]]] = None
+) -> tuple[Callable[[Any], bool], Optional[_Range]]:
+    """Test for a range condition, and its numeric bounds for sorted indexes.
+
+    Bounds are parsed as numbers or ISO dates; ``cells`` parses cells when
+    they need another parser than the bounds (dates in a known format).
+    """
+    if operation == "between":
+        if not isinstance(value, (list, tuple)) or len(value) != 2:
+            raise ValueError(f"between needs [low, high], got {value!r}")
+        parse = _number_or_date(value[0])
+        low, high = parse(value[0]), parse(value[1])
+        if high is None:
+            raise ValueError(f"between bounds {value!r} are not the same type")
+        read = cells or parse
+
+        def test(cell: Any) -> bool:
+            parsed = read(cell)
+            return parsed is not None and low <= parsed <= high
+
+        bounds = _Range(low, high)
+    else:
+        parse = _number_or_date(value)
+        bound = parse(value)
+        read = cells or parse
+        compare = {
+            "gt": lambda x: x > bound,
+            "gte": lambda x: x >= bound,
+            "lt": lambda x: x < bound,
+            "lte": lambda x: x <= bound,
+        }[operation]
+
+        def test(cell: Any) -> bool:
+            parsed = read(cell)
+            return parsed is not None and compare(parsed)
+
+        if operation in ("gt", "gte"):
+            bounds = _Range(bound, None, low_inclusive=operation == "gte")
+        else:
+            bounds = _Range(None, bound, high_inclusive=operation == "lte")
+
+    # Sorted indexes hold numbers, so date ranges are always scanned
+    return test, bounds if parse is to_number else None
+
+
+def compile_predicate(spec: Dict[str, Any]) -> Predicate:
+    """Compile a condition or an {"and"/"or": [...]} / {"not": ...} tree.
+
+    Raises:
+        ValueError: For malformed trees, unknown operations and bad values
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"filter predicate must be an object, got {spec!r}")
+    if "and" in spec or "or" in spec:
+        children = spec.get("and", spec.get("or"))
+        if not isinstance(children, list) or not children:
+            raise ValueError(f"filter group needs a non-empty list, got {children!r}")
+        compiled = [compile_predicate(child) for child in children]
+        if len(compiled) == 1:
+            return compiled[0]
+        return AllOf(compiled) if "and" in spec else AnyOf(compiled)
+    if "not" in spec:
+        return Not(compile_predicate(spec["not"]))
+    return _condition(spec)
+
+
+def compile_filter(params: Dict[str, Any]) -> Optional[Predicate]:
+    """The predicate of a filter_rows rule; None when it names no column."""
+    if "where" in params:
+        return compile_predicate(params["where"])
+    if not params.get("column", ""):
+        return None
+    return _condition(params)
+
+
+def bind(
+    predicate: Predicate, keys: Dict[str, Any], types: Optional[ColumnTypes] = None
+) -> RowPredicate:
+    """One callable testing a row, reading each column from its key in ``keys``.
+
+    ``types`` are the table's known column types (see table_sort.column_types).
+    """
+    test = predicate.bind(keys, types)
+    return lambda row: not isinstance(row, dict) or test(row)
+
+
+class TableIndex:
+    """Lazily built indexes over one list of rows, by row key.
+
+    A key's index is built the second time it is looked up: filtering a
+    table once is cheaper as a scan.
+    """
+
+    def __init__(self, rows: Sequence[Any]):
+        self.rows = rows
+        self._lookups: Dict[Any, int] = {}
+        self._hashes: Dict[Any, Dict[str, Positions]] = {}
+        self._sorted: Dict[Any, tuple[List[float], Positions]] = {}
+        self._list_rows: Optional[set] = None
+
+    @property
+    def _always(self) -> set:
+        """Positions of list rows: they pass every filter, so every lookup includes them."""
+        if self._list_rows is None:
+            self._list_rows = {i for i, row in enumerate(self.rows) if not isinstance(row, dict)}
+        return self._list_rows
+
+    def _wanted(self, key: Any, built: Dict[Any, Any]) -> bool:
+        if key in built:
+            return True
+        self._lookups[key] = self._lookups.get(key, 0) + 1
+        return self._lookups[key] > 1
+
+    def lookup(self, key: Any, texts: List[str]) -> Optional[set]:
+        """Positions of rows whose cell, as lowercase text, is one of ``texts``."""
+        if not self._wanted(key, self._hashes):
+            return None
+        if key not in self._hashes:
+            index: Dict[str, Positions] = {}
+            for i, row in enumerate(self.rows):
+                if isinstance(row, dict):
+                    index.setdefault(_text(row.get(key)).lower(), []).append(i)
+            self._hashes[key] = index
+        index = self._hashes[key]
+        found = set(self._always)
+        for text in texts:
+            found.update(index.get(text, ()))
+        return found
+
+    def range(self, key: Any, bounds: _Range) -> Optional[set]:
+        """Positions of rows whose cell is a number within ``bounds``."""
+        if not self._wanted(key, self._sorted):
+            return None
+        if key not in self._sorted:
+            entries = sorted(
+                (number, i)
+                for i, row in enumerate(self.rows)
+                if isinstance(row, dict) and (number := to_number(row.get(key))) is not None
+            )
+            self._sorted[key] = ([number for number, _ in entries], [i for _, i in entries])
+        numbers, positions = self._sorted[key]
+
+        start, end = 0, len(numbers)
+        if bounds.low is not None:
+            start = (bisect_left if bounds.low_inclusive else bisect_right)(numbers, bounds.low)
+        if bounds.high is not None:
+            end = (bisect_right if bounds.high_inclusive else bisect_left)(numbers, bounds.high)
+        return self._always.union(positions[start:end])
+
+
+class IndexRegistry:
+    """Indexes for the row lists filtered most recently.
+
+    Rows are identified by object, so a document kept and transformed again
+    (e.g. across the instructions of one session) reuses its indexes. The
+    registry holds the rows it indexes; row lists are never modified by the
+    pipeline.
+    """
+
+    def __init__(self, max_tables: int = INDEXED_TABLES, min_rows: int = INDEX_MIN_ROWS):
+        self.max_tables = max_tables
+        self.min_rows = min_rows
+        self._tables: "OrderedDict[int, TableIndex]" = OrderedDict()
+
+    def get(self, rows: Sequence[Any]) -> Optional[TableIndex]:
+        """The index for a row list, or None when it is too small to be worth one."""
+        if len(rows) < self.min_rows:
+            return None
+        index = self._tables.get(id(rows))
+        if index is None or index.rows is not rows or len(index.rows) != len(rows):
+            index = self._tables[id(rows)] = TableIndex(rows)
+        self._tables.move_to_end(id(rows))
+        while len(self._tables) > self.max_tables:
+            self._tables.popitem(last=False)
+        return index
@@ -0,0 +1,351 @@
+"""Column profiling for extracted tables.
+
+Profiles every row of a stored table with vectorized pyarrow / NumPy /
+pandas operations, one record batch at a time:
+- semantic type (int, float, bool, date, datetime, categorical, text);
+  string columns are classified from a uniform sample of their values
+  and then parsed in full to validate the choice and find min/max;
+- null rate, min/max and the most frequent values;
+- cardinality, counted exactly while small and estimated with
+  HyperLogLog beyond that.
+
+Runs in the extraction process pool, so it imports nothing from the
+application.
+"""
+
+from collections import Counter
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pandas.tseries.api import guess_datetime_format
+
+SAMPLE_SIZE = 20000  # String values per column used to pick a type
+PARSE_THRESHOLD = 0.95  # Share of sampled values that must parse as the type
+EXACT_CARDINALITY_LIMIT = 100000  # Distinct values tracked exactly before switching to HLL
+COUNTER_LIMIT = 50000  # Distinct values counted for top-k before pruning to heavy hitters
+DATETIME_PROBE_SIZE = 200  # Sampled values tried as dates before parsing the whole sample
+CATEGORICAL_MAX_VALUES = 50
+TOP_K = 5
+BOOL_VALUES = {"true", "false", "yes", "no", "t", "f", "y", "n", "0", "1"}
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality estimator over 64-bit hashes (about 0.8% error at p=14)."""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """Add a batch of uint64 hashes."""
+        if not len(hashes):
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        remainder = hashes << np.uint64(self.precision)
+        # Rank = position of the leftmost 1-bit in the remaining bits
+        width = 64 - self.precision
+        with np.errstate(divide="ignore"):
+            leading = 63 - np.floor(np.log2(remainder.astype(np.float64)))
+        rank = np.where(remainder == 0, width + 1, np.minimum(leading + 1, width + 1))
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def estimate(self) -> int:
+        """Estimated number of distinct hashes added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))  # Linear counting for small sets
+        return int(round(raw))
+
+
+class _ColumnProfile:
+    """Running state for one column across batches."""
+
+    def __init__(self, name: str, arrow_type: pa.DataType, rng: np.random.Generator):
+        self.name = name
+        self.arrow_type = arrow_type
+        self.rng = rng
+        self.rows = 0
+        self.nulls = 0
+        self.minimum: Any = None
+        self.maximum: Any = None
+        self.distinct: Optional[set] = set()
+        self.hll = HyperLogLog()
+        self.counts: Counter = Counter()
+        self.counts_exact = True
+        # Bottom-k sample: keep the values with the smallest random priorities
+        self.sample = np.array([], dtype=object)
+        self.priorities = np.array([], dtype=np.float64)
+        self.semantic_type = "unknown"
+        self.datetime_format: Optional[str] = None
+        # Second-pass state for string columns parsed as another type
+        self.invalid = 0
+        self._parsed_min: Any = None
+        self._parsed_max: Any = None
+
+    def update(self, column: pa.Array) -> None:
+        self.rows += len(column)
+        self.nulls += column.null_count
+        values = pc.drop_null(column)
+        if not len(values):
+            return
+        if pa.types.is_string(values.type) or pa.types.is_large_string(values.type):
+            values = pc.utf8_trim_whitespace(values)
+
+        if _orderable(values.type):
+            bounds = pc.min_max(values)
+            self._extend_bounds(bounds["min"].as_py(), bounds["max"].as_py())
+
+        self._count(values)
+        if pa.types.is_string(values.type) or pa.types.is_large_string(values.type):
+            self._sample(values)
+
+    def _count(self, values: pa.Array) -> None:
+        """Update cardinality and value counts."""
+        unique = pc.unique(values)
+        self.hll.add_hashes(pd.util.hash_array(unique.to_numpy(zero_copy_only=False)))
+        if self.distinct is not None:
+            self.distinct.update(unique.to_pylist())
+            if len(self.distinct) > EXACT_CARDINALITY_LIMIT:
+                self.distinct = None
+
+        counts = pc.value_counts(values)
+        self.counts.update(
+            dict(zip(counts.field("values").to_pylist(), counts.field("counts").to_pylist()))
+        )
+        if len(self.counts) > COUNTER_LIMIT:
+            # Keep the heavy hitters; counts of pruned values restart from zero
+            self.counts = Counter(dict(self.counts.most_common(COUNTER_LIMIT // 2)))
+            self.counts_exact = False
+
+    def _sample(self, values: pa.Array) -> None:
+        """Merge a batch into the uniform sample of non-null values."""
+        priorities = self.rng.random(len(values))
+        if len(values) > SAMPLE_SIZE:
+            keep = np.argpartition(priorities, SAMPLE_SIZE)[:SAMPLE_SIZE]
+            values, priorities = values.take(pa.array(keep)), priorities[keep]
+        sample = np.concatenate([self.sample, values.to_numpy(zero_copy_only=False)])
+        priorities = np.concatenate([self.priorities, priorities])
+        if len(sample) > SAMPLE_SIZE:
+            keep = np.argpartition(priorities, SAMPLE_SIZE)[:SAMPLE_SIZE]
+            sample, priorities = sample[keep], priorities[keep]
+        self.sample, self.priorities = sample, priorities
+
+    def _extend_bounds(self, low: Any, high: Any) -> None:
+        if low is not None and (self.minimum is None or low < self.minimum):
+            self.minimum = low
+        if high is not None and (self.maximum is None or high > self.maximum):
+            self.maximum = high
+
+    @property
+    def cardinality(self) -> int:
+        return len(self.distinct) if self.distinct is not None else self.hll.estimate()
+
+    def classify(self) -> None:
+        """Pick the semantic type from the Arrow type, or from the sample for strings."""
+        arrow_type = self.arrow_type
+        if pa.types.is_boolean(arrow_type):
+            self.semantic_type = "bool"
+        elif pa.types.is_integer(arrow_type):
+            self.semantic_type = "int"
+        elif pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+            self.semantic_type = "float"
+        elif pa.types.is_date(arrow_type):
+            self.semantic_type = "date"
+        elif pa.types.is_timestamp(arrow_type):
+            self.semantic_type = "datetime"
+        elif self.rows == self.nulls:
+            self.semantic_type = "unknown"
+        elif len(self.sample):
+            self.semantic_type = self._classify_strings()
+        else:
+            self.semantic_type = "text"
+
+    def _classify_strings(self) -> str:
+        sample = pd.Series(self.sample, dtype=object)
+        sample = sample[sample != ""]
+        if sample.empty:
+            return "text"
+
+        if sample.str.lower().isin(BOOL_VALUES).mean() >= PARSE_THRESHOLD and self.cardinality <= 4:
+            return "bool"
+
+        numbers = pd.to_numeric(sample, errors="coerce")
+        if numbers.notna().mean() >= PARSE_THRESHOLD:
+            parsed = numbers.dropna()
+            return "int" if np.all(np.mod(parsed, 1) == 0) else "float"
+
+        # A consistent format parses vectorized; mixed formats fall back to
+        # per-value parsing, so probe a few values before parsing them all
+        self.datetime_format = _datetime_format(sample)
+        probe = _parse_datetimes(sample.head(DATETIME_PROBE_SIZE), self.datetime_format)
+        if probe.notna().mean() >= PARSE_THRESHOLD:
+            dates = _parse_datetimes(sample, self.datetime_format)
+            if dates.notna().mean() >= PARSE_THRESHOLD:
+                parsed = dates.dropna()
+                return "date" if (parsed == parsed.dt.normalize()).all() else "datetime"
+
+        non_null = self.rows - self.nulls
+        if self.cardinality <= CATEGORICAL_MAX_VALUES and self.cardinality <= non_null / 2:
+            return "categorical"
+        return "text"
+
+    def needs_parse_pass(self) -> bool:
+        """String columns classified as numeric or temporal are parsed in full."""
+        is_string = pa.types.is_string(self.arrow_type) or pa.types.is_large_string(self.arrow_type)
+        return is_string and self.semantic_type in ("int", "float", "date", "datetime", "bool")
+
+    def parse(self, column: pa.Array) -> None:
+        """Second pass: parse string values as the chosen type for bounds and invalid counts."""
+        trimmed = pc.drop_null(pc.utf8_trim_whitespace(column))
+        values = pd.Series(trimmed.to_numpy(zero_copy_only=False))
+        values = values[values != ""]
+        if values.empty:
+            return
+
+        if self.semantic_type == "bool":
+            self.invalid += int((~values.str.lower().isin(BOOL_VALUES)).sum())
+            return
+        if self.semantic_type in ("int", "float"):
+            parsed = pd.to_numeric(values, errors="coerce")
+        else:
+            parsed = _parse_datetimes(values, self.datetime_format)
+
+        self.invalid += int(parsed.isna().sum())
+        parsed = parsed.dropna()
+        if not parsed.empty:
+            self._parsed_bounds(parsed.min(), parsed.max())
+
+    def _parsed_bounds(self, low: Any, high: Any) -> None:
+        if self._parsed_min is None or low < self._parsed_min:
+            self._parsed_min = low
+        if self._parsed_max is None or high > self._parsed_max:
+            self._parsed_max = high
+
+    def result(self) -> dict[str, Any]:
+        minimum, maximum = self.minimum, self.maximum
+        if self.needs_parse_pass():
+            minimum, maximum = self._parsed_min, self._parsed_max
+        elif self.semantic_type in ("text", "categorical", "unknown"):
+            minimum = maximum = None
+        if self.semantic_type == "int" and minimum is not None:
+            # Parsed strings come back as floats when any value was invalid
+            minimum, maximum = int(minimum), int(maximum)
+
+        profile = {
+            "type": self.semantic_type,
+            "storage_type": str(self.arrow_type),
+            "null_count": self.nulls,
+            "null_rate": round(self.nulls / self.rows, 4) if self.rows else 0.0,
+            "cardinality": self.cardinality,
+            "cardinality_exact": self.distinct is not None,
+            "min": _json_value(minimum, self.semantic_type),
+            "max": _json_value(maximum, self.semantic_type),
+            "top_values": [
+                {"value": _json_value(value, None), "count": count}
+                for value, count in self.counts.most_common(TOP_K)
+            ],
+            "top_values_exact": self.counts_exact,
+        }
+        if self.needs_parse_pass():
+            profile["invalid_count"] = self.invalid
+            if self.semantic_type in ("date", "datetime"):
+                # strptime format most values follow (None when they are ISO 8601 or mixed)
+                profile["format"] = self.datetime_format
+        return profile
+
+
+def _orderable(arrow_type: pa.DataType) -> bool:
+    return (
+        pa.types.is_integer(arrow_type)
+        or pa.types.is_floating(arrow_type)
+        or pa.types.is_temporal(arrow_type)
+        or pa.types.is_decimal(arrow_type)
+    )
+
+
+def _datetime_format(values: pd.Series) -> Optional[str]:
+    """Most common strftime format guessed from the first few values, if any."""
+    guesses = Counter(guess_datetime_format(value) for value in values.head(20))
+    guesses.pop(None, None)
+    return guesses.most_common(1)[0][0] if guesses else None
+
+
+def _parse_datetimes(values: pd.Series, fmt: Optional[str] = None) -> pd.Series:
+    """Parse strings as datetimes, NaT where they do not parse."""
+    try:
+        return pd.to_datetime(values, errors="coerce", format=fmt or "mixed")
+    except (ValueError, TypeError):
+        return pd.Series(pd.NaT, index=values.index)
+
+
+def _json_value(value: Any, semantic_type: Optional[str]) -> Any:
+    """Convert NumPy / pandas / datetime values to JSON-serializable ones."""
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if semantic_type == "date" and hasattr(value, "date"):
+        return value.date().isoformat()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def profile_batches(schema: pa.Schema, batches) -> dict[str, dict[str, Any]]:
+    """Profile a table given as a re-iterable sequence of record batches.
+
+    Args:
+        schema: Table schema
+        batches: Callable returning an iterator over the table's record batches
+            (called twice when string columns need a parsing pass)
+
+    Returns:
+        Profile per column name
+    """
+    rng = np.random.default_rng(0)
+    columns = [_ColumnProfile(field.name, field.type, rng) for field in schema]
+
+    for batch in batches():
+        for profile, column in zip(columns, batch.columns):
+            profile.update(column)
+
+    for profile in columns:
+        profile.classify()
+
+    to_parse = [i for i, profile in enumerate(columns) if profile.needs_parse_pass()]
+    if to_parse:
+        for batch in batches():
+            for index in to_parse:
+                columns[index].parse(batch.column(index))
+
+    return {profile.name: profile.result() for profile in columns}
+
+
+def profile_arrow_file(path: str) -> dict[str, dict[str, Any]]:
+    """Profile every row of an Arrow IPC file.
+
+    Args:
+        path: Path to the Arrow IPC file
+
+    Returns:
+        Profile per column name
+    """
+    with pa.memory_map(path, "r") as source:
+        reader = pa.ipc.open_file(source)
+
+        def batches():
+            return (reader.get_batch(i) for i in range(reader.num_record_batches))
+
+        return profile_batches(reader.schema, batches)
+
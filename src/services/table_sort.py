@@ -0,0 +1,389 @@
+"""Typed, multi-key sorting for table rows.
+
+Each sort key compares cells as the column's type:
+- number: parsed as floats ("1,200" and 1200 are the same value);
+- date: parsed with the format most of the column's values follow;
+- string: natural order, case-insensitive, with digit runs compared as
+  numbers ("item 2" before "item 10").
+A key's type is given in the rule or inferred per table: from the table's
+column profile or stored Arrow schema when they know the column (see
+column_types), and otherwise from a sample of its values. Missing and unparsable cells sort last whatever the direction,
+and rows with equal keys keep their order.
+
+Tables larger than a run are sorted externally: (key, row index) pairs are
+sorted a run at a time, spilled to disk and merged, so only one run of
+sort keys is held in memory.
+"""
+
+import heapq
+import math
+import os
+import pickle
+import re
+import tempfile
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from functools import total_ordering
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+SORT_TYPES = ("auto", "number", "date", "string")
+SAMPLE_SIZE = 1000  # Values per column used to infer a type
+PARSE_THRESHOLD = 0.95  # Share of sampled values that must parse as the type
+SPILL_CHUNK = 4096  # (key, index) pairs pickled together in a spilled run
+DATE_FORMATS = (
+    "%Y/%m/%d",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%d.%m.%Y",
+    "%d-%m-%Y",
+    "%m-%d-%Y",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+)
+NUMBER_ARROW_TYPES = ("int", "uint", "float", "double", "decimal")
+DATE_ARROW_TYPES = ("date", "timestamp")
+PROFILE_TYPES = {  # table_profiler semantic type -> sort type
+    "int": "number",
+    "float": "number",
+    "date": "date",
+    "datetime": "date",
+    "bool": "string",
+    "categorical": "string",
+    "text": "string",
+}
+
+_DIGITS = re.compile(r"(\d+)")
+_INVALID = (1,)  # Key part of a missing or unparsable cell: after every valid (0, value)
+
+KeyPart = Callable[[Any], tuple]
+
+
+@dataclass(frozen=True)
+class SortKey:
+    column: str
+    descending: bool = False
+    type: str = "auto"  # One of SORT_TYPES
+
+    def describe(self) -> str:
+        order = "desc" if self.descending else "asc"
+        return f"{self.column} {order}" + ("" if self.type == "auto" else f" as {self.type}")
+
+
+def parse_sort_keys(params: Dict[str, Any]) -> tuple[SortKey, ...]:
+    """Sort keys from sort_rows parameters.
+
+    Either "keys", a list of {"column", "order", "type"} dicts applied in
+    priority order, or a single "column" with "order" and "type".
+
+    Raises:
+        ValueError: For a key without a column or with an unknown type
+    """
+    specs = params.get("keys")
+    if specs is None:
+        specs = [params] if params.get("column", "") else []
+    keys = []
+    for spec in specs:
+        if not isinstance(spec, dict) or not spec.get("column", ""):
+            raise ValueError(f"sort key needs a column, got {spec!r}")
+        sort_type = spec.get("type", "auto")
+        if sort_type not in SORT_TYPES:
+            raise ValueError(f"unknown sort type {sort_type!r}")
+        keys.append(SortKey(spec["column"], spec.get("order", "asc") == "desc", sort_type))
+    return tuple(keys)
+
+
+def _missing(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def to_number(value: Any) -> Optional[float]:
+    """A cell as a float, or None when it is not a number."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        try:
+            number = float(str(value).strip().replace(",", ""))
+        except ValueError:
+            return None
+    return None if number != number else number  # NaN does not order
+
+
+def _ordinal(value: date) -> float:
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        seconds = value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1e6
+        return value.toordinal() + seconds / 86400
+    return float(value.toordinal())
+
+
+def date_parser(date_format: Optional[str]) -> Callable[[Any], Optional[float]]:
+    """Parse cells as dates (ISO 8601, or the given strptime format) to day ordinals."""
+
+    def parse(value: Any) -> Optional[float]:
+        if isinstance(value, date):
+            return _ordinal(value)
+        text = str(value).strip()
+        try:
+            return _ordinal(datetime.fromisoformat(text))
+        except ValueError:
+            pass
+        if date_format:
+            try:
+                return _ordinal(datetime.strptime(text, date_format))
+            except ValueError:
+                pass
+        return None
+
+    return parse
+
+
+def natural_key(value: Any) -> tuple:
+    """Case-insensitive key comparing digit runs as numbers.
+
+    Splitting on digit runs puts text at even and numbers at odd positions,
+    so two keys never compare a str with an int.
+    """
+    parts = _DIGITS.split(str(value).casefold())
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(parts))
+
+
+@total_ordering
+class _Descending:
+    """Inverts the order of a value that cannot be negated."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.value < self.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __reduce__(self):
+        return _Descending, (self.value,)
+
+
+def _parses(values: Sequence[Any], parse: Callable[[Any], Optional[float]]) -> bool:
+    """Whether enough values parse; stops as soon as too many have failed."""
+    allowed = len(values) - math.ceil(PARSE_THRESHOLD * len(values))
+    failed = 0
+    for value in values:
+        if parse(value) is None:
+            failed += 1
+            if failed > allowed:
+                return False
+    return True
+
+
+def infer_type(values: Sequence[Any]) -> tuple[str, Optional[str]]:
+    """Pick a sort type from sampled cells.
+
+    Returns:
+        Tuple of (number, date or string; the strptime format for dates
+        that are not ISO 8601, if any)
+    """
+    values = [value for value in values if not _missing(value)]
+    if not values:
+        return "string", None
+    if _parses(values, to_number):
+        return "number", None
+    for date_format in (None, *DATE_FORMATS):
+        if _parses(values, date_parser(date_format)):
+            return "date", date_format
+    return "string", None
+
+
+def sample(values: Sequence[Any], size: int = SAMPLE_SIZE) -> List[Any]:
+    """Up to ``size`` values spread evenly over a sequence."""
+    step = max(1, len(values) // size)
+    return list(islice(values, 0, None, step))[:size]
+
+
+def _arrow_type(arrow_type: str) -> Optional[str]:
+    if arrow_type.startswith(NUMBER_ARROW_TYPES):
+        return "number"
+    if arrow_type.startswith(DATE_ARROW_TYPES):
+        return "date"
+    return None
+
+
+def column_types(table: Dict[str, Any]) -> Dict[str, tuple[str, Optional[str]]]:
+    """Sort types known for a table's columns without looking at its rows.
+
+    Read from the table's column profile (see table_profiler), or else from
+    its stored Arrow schema, which only tells numbers and dates apart.
+
+    Returns:
+        Dict of column to (sort type, strptime format of dates that are not
+        ISO 8601, if any); columns of unknown type are left out
+    """
+    types: Dict[str, tuple[str, Optional[str]]] = {}
+    for field in table.get("schema") or []:
+        if isinstance(field, dict) and field.get("name") is not None:
+            sort_type = _arrow_type(str(field.get("type", "")))
+            if sort_type:
+                types[field["name"]] = (sort_type, None)
+    for column, profile in (table.get("profile") or {}).items():
+        sort_type = PROFILE_TYPES.get(profile.get("type")) if isinstance(profile, dict) else None
+        if sort_type:
+            types[column] = (sort_type, profile.get("format"))
+    return types
+
+
+def value_key(
+    key: SortKey, table: Dict[str, Any], values: Callable[[], Sequence[Any]]
+) -> KeyPart:
+    """Key part for one sort key on one table.
+
+    Args:
+        key: Sort key
+        table: Table metadata, for its column profile and stored schema
+        values: Returns the column's cells, called only when the table does
+            not say what type (or date format) the column has
+
+    Returns:
+        Function mapping a cell to (0, comparable value), or (1,) for cells
+        that are missing or do not parse as the key's type
+    """
+    sort_type, date_format = key.type, None
+    known = column_types(table).get(key.column)
+    if known and sort_type in ("auto", known[0]):
+        sort_type, date_format = known
+    elif sort_type in ("auto", "date"):
+        inferred, date_format = infer_type(sample(values()))
+        sort_type = inferred if sort_type == "auto" else sort_type
+
+    if sort_type == "string":
+        parts: Dict[str, tuple] = {}  # Columns repeat values, so key each text once
+
+        def part(value: Any) -> tuple:
+            if _missing(value):
+                return _INVALID
+            text = str(value)
+            cached = parts.get(text)
+            if cached is None:
+                natural = natural_key(text)
+                cached = parts[text] = (0, _Descending(natural) if key.descending else natural)
+            return cached
+
+        return part
+
+    parse = to_number if sort_type == "number" else date_parser(date_format)
+    sign = -1 if key.descending else 1
+
+    def part(value: Any) -> tuple:
+        parsed = None if _missing(value) else parse(value)
+        return _INVALID if parsed is None else (0, sign * parsed)
+
+    return part
+
+
+def row_key(
+    keys: Sequence[SortKey], table: Dict[str, Any], rows: Sequence[Any]
+) -> Callable[[Any], tuple]:
+    """Composite sort key for a table's rows.
+
+    Dict rows are read by column name; list rows by the column's position
+    in the table's columns (the first cell when it has none).
+    """
+    columns = table.get("columns") or []
+
+    def getter(column: str) -> Callable[[Any], Any]:
+        position = columns.index(column) if column in columns else 0
+
+        def get(row: Any) -> Any:
+            if isinstance(row, dict):
+                return row.get(column)
+            return row[position] if len(row) > position else None
+
+        return get
+
+    getters = [getter(key.column) for key in keys]
+    parts = [
+        value_key(key, table, lambda get=get: [get(row) for row in sample(rows)])
+        for key, get in zip(keys, getters)
+    ]
+    if len(parts) == 1:
+        part, get = parts[0], getters[0]
+        return lambda row: part(get(row))
+    pairs = list(zip(parts, getters))
+    return lambda row: tuple(part(get(row)) for part, get in pairs)
+
+
+def _write_run(directory: str, run: List[tuple]) -> str:
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        for start in range(0, len(run), SPILL_CHUNK):
+            pickle.dump(run[start : start + SPILL_CHUNK], f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str) -> Iterator[tuple]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                chunk = pickle.load(f)
+            except EOFError:
+                return
+            yield from chunk
+
+
+def external_sort(
+    rows: Sequence[Any], key: Callable[[Any], Any], run_rows: int
+) -> List[Any]:
+    """Stable sort of rows whose sort keys are spilled to disk a run at a time.
+
+    Args:
+        rows: Rows to sort
+        key: Sort key
+        run_rows: Rows sorted in memory per run
+
+    Returns:
+        The rows (not copies), sorted
+    """
+    with tempfile.TemporaryDirectory(prefix="sort-") as directory:
+        paths = []
+        for start in range(0, len(rows), run_rows):
+            # Row indexes break ties, which keeps the merge stable
+            run = sorted(
+                (key(rows[i]), i) for i in range(start, min(start + run_rows, len(rows)))
+            )
+            paths.append(_write_run(directory, run))
+            del run
+        return [rows[i] for _, i in heapq.merge(*(_read_run(path) for path in paths))]
+
+
+def sort_rows(
+    rows: Sequence[Any],
+    key: Callable[[Any], Any],
+    limit: Optional[int] = None,
+    run_rows: Optional[int] = None,
+) -> List[Any]:
+    """Sort rows, selecting only the first ``limit`` when given.
+
+    Args:
+        rows: Rows to sort
+        key: Sort key (directions are part of the key)
+        limit: Rows to keep; selected with a heap instead of a full sort
+        run_rows: Rows sorted in memory before sorting externally
+
+    Returns:
+        Sorted rows; equal keys keep their order
+    """
+    if limit is not None:
+        return heapq.nsmallest(limit, rows, key=key)
+    if run_rows and len(rows) > run_rows:
+        return external_sort(rows, key, run_rows)
+    return sorted(rows, key=key)
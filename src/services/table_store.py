@@ -0,0 +1,354 @@
+"""Columnar storage for extracted tables.
+
+Large CSVs are streamed block by block through pyarrow's CSV reader into an
+Arrow IPC file on disk, so memory stays bounded by the block size however
+many rows the file has. Extraction results carry the schema, column stats
+and a preview; the remaining rows are read back a page at a time from the
+memory-mapped file, or a record batch at a time (StoredRows) by exports and
+transformations that need the whole table.
+"""
+
+import csv
+import logging
+import os
+import time
+import uuid
+from typing import Any, Iterator, Optional
+
+from src.config import get_settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 4 * 1024 * 1024  # Bytes of CSV parsed per record batch
+SNIFF_BYTES = 64 * 1024
+
+
+class TableNotFoundError(Exception):
+    """A stored table no longer exists (expired or never written)."""
+
+
+def sniff_delimiter(file_path: str) -> str:
+    """Detect a CSV file's delimiter from its first bytes (defaults to a comma)."""
+    with open(file_path, "r", encoding="utf-8", errors="ignore", newline="") as f:
+        sample = f.read(SNIFF_BYTES)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return ","
+
+
+def _numeric(arrow_type: "pa.DataType") -> bool:
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+
+
+def _decode(value: bytes) -> str:
+    try:
+        return value.decode("utf-8")
+    except UnicodeDecodeError:
+        # Not UTF-8: most likely Latin-1 / Windows-1252, which decodes any byte
+        return value.decode("latin-1")
+
+
+def _text_schema(schema: "pa.Schema") -> "pa.Schema":
+    """The schema with binary columns (CSV text that is not valid UTF-8) as strings."""
+    for index, field in enumerate(schema):
+        if pa.types.is_binary(field.type) or pa.types.is_large_binary(field.type):
+            schema = schema.set(index, field.with_type(pa.string()))
+    return schema
+
+
+def _decode_binary(batch: "pa.RecordBatch", schema: "pa.Schema") -> "pa.RecordBatch":
+    """Decode a batch's binary columns to strings, per value."""
+    columns = [
+        (
+            pa.array([None if v is None else _decode(v) for v in column.to_pylist()], pa.string())
+            if column.type != field.type
+            else column
+        )
+        for column, field in zip(batch.columns, schema)
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def _json_column(column: Any) -> Any:
+    """A column with temporal and decimal values as strings, so they serialize as JSON."""
+    if pa.types.is_temporal(column.type) or pa.types.is_decimal(column.type):
+        return column.cast(pa.string())
+    return column
+
+
+def _json_rows(batch: "pa.RecordBatch") -> list[dict[str, Any]]:
+    """Convert a batch to row dicts holding only JSON-serializable values."""
+    columns = [_json_column(column) for column in batch.columns]
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names).to_pylist()
+
+
+class StoredRows:
+    """A stored table's rows, read from its memory-mapped file on demand.
+
+    Iterating yields row dicts one record batch at a time, so a whole table
+    is never held as dicts; arrow() hands columnar code the table itself.
+    The file stays open, so pruning it does not affect a reader.
+    """
+
+    def __init__(self, path: str):
+        self._reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+        self._length = sum(
+            self._reader.get_batch(index).num_rows
+            for index in range(self._reader.num_record_batches)
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for rows in self.batches():
+            yield from rows
+
+    def batches(self) -> Iterator[list[dict[str, Any]]]:
+        """Row dicts, a record batch at a time."""
+        for index in range(self._reader.num_record_batches):
+            yield _json_rows(self._reader.get_batch(index))
+
+    def arrow(self) -> "pa.Table":
+        """The rows as an Arrow table over the mapped file, valued like the row dicts."""
+        table = self._reader.read_all()
+        return pa.Table.from_arrays(
+            [_json_column(column) for column in table.columns], names=table.column_names
+        )
+
+
+class TableStore:
+    """Arrow IPC files for extracted tables, one per table id."""
+
+    def __init__(self, directory: Optional[str] = None, ttl_seconds: Optional[int] = None):
+        """Initialize store.
+
+        Args:
+            directory: Where table files live (defaults to EXTRACTION_TABLE_DIR)
+            ttl_seconds: Tables older than this are pruned on the next ingest
+        """
+        settings = get_settings()
+        self.directory = directory or settings.extraction_table_dir
+        self.ttl_seconds = ttl_seconds or settings.extraction_table_ttl_hours * 3600
+
+    def path(self, table_id: str) -> str:
+        # Table ids are generated here; reject anything else so ids cannot name other files
+        return os.path.join(self.directory, f"{uuid.UUID(table_id).hex}.arrow")
+
+    def ingest_csv(
+        self,
+        file_path: str,
+        delimiter: Optional[str] = None,
+        preview_rows: int = 100,
+    ) -> dict[str, Any]:
+        """Stream a CSV into a new Arrow IPC file.
+
+        Column types are inferred from the first block. If a later block
+        does not fit them (e.g. a numeric column with a stray "n/a"), the
+        file is re-read with every column as a string.
+
+        Args:
+            file_path: Path to the CSV
+            delimiter: Field delimiter (sniffed if omitted)
+            preview_rows: Rows to return inline
+
+        Returns:
+            Dict with table_id, delimiter, columns (name, type, null_count,
+            and min/max for numeric columns), row_count and preview (list of
+            row dicts)
+        """
+        if not HAS_PYARROW:
+            raise RuntimeError("pyarrow is required for CSV ingestion")
+
+        self.prune()
+        os.makedirs(self.directory, exist_ok=True)
+        delimiter = delimiter or sniff_delimiter(file_path)
+        table_id = uuid.uuid4().hex
+
+        try:
+            stats = self._write(file_path, table_id, delimiter, preview_rows, as_strings=False)
+        except pa.ArrowInvalid as e:
+            logger.info(f"CSV types changed after the first block ({e}); storing as strings")
+            stats = self._write(file_path, table_id, delimiter, preview_rows, as_strings=True)
+
+        return {"table_id": table_id, "delimiter": delimiter, **stats}
+
+    def _write(
+        self,
+        file_path: str,
+        table_id: str,
+        delimiter: str,
+        preview_rows: int,
+        as_strings: bool,
+    ) -> dict[str, Any]:
+        """Convert the CSV batch by batch, accumulating column stats."""
+        convert_options = pa_csv.ConvertOptions(strings_can_be_null=True)
+        if as_strings:
+            header = pa_csv.open_csv(
+                file_path,
+                read_options=pa_csv.ReadOptions(block_size=SNIFF_BYTES),
+                parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+            ).schema.names
+            # Read as binary so text that is not UTF-8 is decoded below instead of failing
+            convert_options = pa_csv.ConvertOptions(
+                column_types={name: pa.binary() for name in header}, strings_can_be_null=True
+            )
+
+        reader = pa_csv.open_csv(
+            file_path,
+            read_options=pa_csv.ReadOptions(block_size=BLOCK_SIZE),
+            parse_options=pa_csv.ParseOptions(delimiter=delimiter, newlines_in_values=True),
+            convert_options=convert_options,
+        )
+        schema = _text_schema(reader.schema)
+        row_count = 0
+        nulls = [0] * len(schema)
+        minimums: list[Any] = [None] * len(schema)
+        maximums: list[Any] = [None] * len(schema)
+        preview: list[dict[str, Any]] = []
+
+        path = self.path(table_id)
+        temp_path = f"{path}.tmp"
+        try:
+            with pa.OSFile(temp_path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+                for batch in reader:
+                    if batch.schema != schema:
+                        batch = _decode_binary(batch, schema)
+                    writer.write_batch(batch)
+                    row_count += batch.num_rows
+                    if len(preview) < preview_rows:
+                        preview.extend(_json_rows(batch.slice(0, preview_rows - len(preview))))
+
+                    for index, column in enumerate(batch.columns):
+                        nulls[index] += column.null_count
+                        if _numeric(column.type) and column.null_count < len(column):
+                            bounds = pc.min_max(column)
+                            low, high = bounds["min"].as_py(), bounds["max"].as_py()
+                            if minimums[index] is None or low < minimums[index]:
+                                minimums[index] = low
+                            if maximums[index] is None or high > maximums[index]:
+                                maximums[index] = high
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+        columns = []
+        for index, field in enumerate(schema):
+            column = {"name": field.name, "type": str(field.type), "null_count": nulls[index]}
+            if _numeric(field.type):
+                column["min"] = minimums[index]
+                column["max"] = maximums[index]
+            columns.append(column)
+
+        return {"columns": columns, "row_count": row_count, "preview": preview}
+
+    def read_rows(self, table_id: str, offset: int, limit: int) -> dict[str, Any]:
+        """Read a page of rows from a stored table.
+
+        Only the record batches overlapping the page are touched; the file
+        is memory-mapped, not loaded.
+
+        Args:
+            table_id: Table id from ingest_csv
+            offset: First row (0-based)
+            limit: Maximum rows to return
+
+        Returns:
+            Dict with rows (list of row dicts), total_rows and has_more
+
+        Raises:
+            TableNotFoundError: If the table file no longer exists
+        """
+        path = self.path(table_id)
+        if not os.path.exists(path):
+            raise TableNotFoundError(f"Table {table_id} not found")
+
+        with pa.memory_map(path, "r") as source:
+            reader = pa.ipc.open_file(source)
+            total_rows = 0
+            batches = []
+            end = offset + limit
+            for index in range(reader.num_record_batches):
+                batch = reader.get_batch(index)
+                batch_start, total_rows = total_rows, total_rows + batch.num_rows
+                if total_rows > offset and batch_start < end:
+                    start = max(offset - batch_start, 0)
+                    batches.append(batch.slice(start, min(end, total_rows) - batch_start - start))
+            rows = [row for batch in batches for row in _json_rows(batch)]
+
+        return {"rows": rows, "total_rows": total_rows, "has_more": end < total_rows}
+
+    def with_rows(self, data: dict[str, Any]) -> dict[str, Any]:
+        """An extraction result with every stored table's rows in place of its preview.
+
+        For callers that need whole tables (exports, transformations) rather
+        than a page. Stored tables get StoredRows, read as they are iterated;
+        tables kept whole in the result are left as they are.
+
+        Raises:
+            TableNotFoundError: If a previewed table no longer exists
+        """
+        tables = data.get("tables") or []
+        if not any(isinstance(t, dict) and t.get("table_id") and t.get("preview") for t in tables):
+            return data
+        loaded = []
+        for table in tables:
+            if isinstance(table, dict) and table.get("table_id") and table.get("preview"):
+                try:
+                    rows = StoredRows(self.path(table["table_id"]))
+                except FileNotFoundError:
+                    raise TableNotFoundError(f"Table {table['table_id']} not found")
+                table = {**table, "rows": rows, "preview": False}
+            loaded.append(table)
+        return {**data, "tables": loaded}
+
+    def touch(self, table_id: str) -> bool:
+        """Restart a table's TTL, e.g. when a cached result hands it out again.
+
+        Returns:
+            False if the table no longer exists
+        """
+        try:
+            os.utime(self.path(table_id))
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def prune(self) -> None:
+        """Delete tables older than the TTL."""
+        if not os.path.isdir(self.directory):
+            return
+        cutoff = time.time() - self.ttl_seconds
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.endswith(".arrow") and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+            except OSError as e:
+                logger.debug(f"Failed to prune table {entry.name}: {e}")
+
+
+# Global instance
+_table_store: Optional[TableStore] = None
+
+
+def get_table_store() -> TableStore:
+    """Get or create the shared table store.
+
+    Returns:
+        Singleton TableStore instance
+    """
+    global _table_store
+    if _table_store is None:
+        _table_store = TableStore()
+    return _table_store
@@ -0,0 +1,207 @@
+"""Textract response parsing.
+
+Textract returns a flat list of blocks linked by id (PAGE -> LINE -> WORD,
+TABLE -> CELL -> WORD, KEY -> VALUE -> WORD, ...). TextractDocument indexes
+the blocks and their relationships in one pass, so tables, merged cells and
+key/value pairs are rebuilt in time linear in the number of blocks.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TextractDocument:
+    """Indexed view over the blocks of one or more Textract responses."""
+
+    def __init__(self, blocks: Iterable[dict[str, Any]]):
+        """Index blocks by id, type and relationship.
+
+        Args:
+            blocks: Textract blocks (from every page of the response)
+        """
+        self.blocks: dict[str, dict[str, Any]] = {}
+        self.by_type: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        # block id -> relationship type -> related block ids
+        self.relations: dict[str, dict[str, list[str]]] = defaultdict(lambda: defaultdict(list))
+
+        for block in blocks:
+            block_id = block["Id"]
+            self.blocks[block_id] = block
+            self.by_type[block["BlockType"]].append(block)
+            for relationship in block.get("Relationships", []):
+                self.relations[block_id][relationship["Type"]].extend(relationship["Ids"])
+
+    def related(self, block_id: str, relationship_type: str) -> list[dict[str, Any]]:
+        """Get the blocks related to a block by one relationship type."""
+        ids = self.relations.get(block_id, {}).get(relationship_type, [])
+        return [self.blocks[i] for i in ids if i in self.blocks]
+
+    def text(self, block_id: str) -> str:
+        """Get the text of a block's WORD (and selection) children."""
+        parts = []
+        for child in self.related(block_id, "CHILD"):
+            if child["BlockType"] == "WORD":
+                parts.append(child.get("Text", ""))
+            elif child["BlockType"] == "SELECTION_ELEMENT":
+                parts.append(child.get("SelectionStatus", ""))
+        return " ".join(part for part in parts if part)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.by_type.get("PAGE", [])) or 1
+
+    def page_details(self, tables: Optional[list[dict[str, Any]]] = None) -> list[dict[str, Any]]:
+        """Summarize each page: line count, table count and average LINE confidence.
+
+        Args:
+            tables: Tables already rebuilt by tables(), to avoid rebuilding them
+
+        Returns:
+            One dict (page, lines, tables, confidence) per page, in page order
+        """
+        tables = self.tables() if tables is None else tables
+        confidences: dict[int, list[float]] = defaultdict(list)
+        for line in self.lines():
+            confidences[line.get("Page", 1)].append(line.get("Confidence", 0.0))
+        table_counts: dict[int, int] = defaultdict(int)
+        for table in tables:
+            table_counts[table["page"]] += 1
+
+        pages = {block.get("Page", 1) for block in self.by_type.get("PAGE", [])}
+        pages |= set(confidences) | set(table_counts)
+        return [
+            {
+                "page": page,
+                "lines": len(confidences[page]),
+                "tables": table_counts[page],
+                "confidence": (
+                    round(sum(confidences[page]) / len(confidences[page]), 2)
+                    if confidences[page]
+                    else 0
+                ),
+            }
+            for page in sorted(pages)
+        ]
+
+    def lines(self) -> list[dict[str, Any]]:
+        """Get LINE blocks in reading order."""
+        return self.by_type.get("LINE", [])
+
+    def tables(self) -> list[dict[str, Any]]:
+        """Rebuild every table.
+
+        Merged cells repeat their text in every grid position they span, so
+        a header spanning two columns labels both.
+
+        Returns:
+            List of table dicts (name, columns, rows, row_count,
+            column_count, raw_rows, page)
+        """
+        tables = []
+        for table_block in self.by_type.get("TABLE", []):
+            try:
+                table = self._table(table_block)
+            except (KeyError, TypeError) as e:
+                logger.warning(f"Failed to process Textract table {table_block.get('Id')}: {e}")
+                continue
+            if table:
+                tables.append(table)
+        return tables
+
+    def forms(self) -> dict[str, str]:
+        """Rebuild key/value pairs (pairs with an empty key or value are skipped)."""
+        forms = {}
+        for block in self.by_type.get("KEY_VALUE_SET", []):
+            if "KEY" not in block.get("EntityTypes", []):
+                continue
+
+            key = self.text(block["Id"])
+            value = " ".join(
+                text
+                for value_block in self.related(block["Id"], "VALUE")
+                if (text := self.text(value_block["Id"]))
+            )
+            if key and value:
+                forms[key] = value
+        return forms
+
+    def _table(self, table_block: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """Rebuild one table from its cells and merged cells."""
+        table_id = table_block["Id"]
+        cells = [c for c in self.related(table_id, "CHILD") if c["BlockType"] == "CELL"]
+        if not cells:
+            return None
+
+        grid: dict[tuple[int, int], str] = {}
+        row_count = column_count = 0
+        for cell in cells:
+            row, column = cell["RowIndex"], cell["ColumnIndex"]
+            grid[(row, column)] = self.text(cell["Id"])
+            row_count = max(row_count, row + cell.get("RowSpan", 1) - 1)
+            column_count = max(column_count, column + cell.get("ColumnSpan", 1) - 1)
+
+        for merged in self.related(table_id, "MERGED_CELL"):
+            text = " ".join(
+                t for cell in self.related(merged["Id"], "CHILD") if (t := self.text(cell["Id"]))
+            )
+            for row in range(merged["RowIndex"], merged["RowIndex"] + merged.get("RowSpan", 1)):
+                for column in range(
+                    merged["ColumnIndex"], merged["ColumnIndex"] + merged.get("ColumnSpan", 1)
+                ):
+                    grid[(row, column)] = text
+
+        rows = [
+            [grid.get((row, column), "") for column in range(1, column_count + 1)]
+            for row in range(1, row_count + 1)
+        ]
+        rows = [row for row in rows if any(row)]
+        if not rows:
+            return None
+
+        # First row is typically headers; blank headers get positional names and
+        # repeats (e.g. from a merged header) get a suffix so no column is lost
+        headers: list[str] = []
+        for i, header in enumerate(rows[0]):
+            name = header or f"column_{i + 1}"
+            if name in headers:
+                name = f"{name}_{i + 1}"
+            headers.append(name)
+        data_rows = rows[1:]
+
+        return {
+            "name": f"Table_{table_id}",
+            "columns": headers,
+            "rows": [dict(zip(headers, row)) for row in data_rows],
+            "row_count": len(data_rows),
+            "column_count": len(headers),
+            "raw_rows": rows,
+            "page": table_block.get("Page", 1),
+        }
+
+
+def parse_textract_blocks(blocks: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Parse Textract blocks into text, tables and forms.
+
+    Args:
+        blocks: Textract blocks (from every page of the response)
+
+    Returns:
+        Dict with text, tables, forms, confidence (average LINE confidence),
+        pages and page_details (per-page confidence and table counts)
+    """
+    document = TextractDocument(blocks)
+    lines = document.lines()
+    confidences = [line.get("Confidence", 0.0) for line in lines]
+    tables = document.tables()
+
+    return {
+        "text": "\n".join(line.get("Text", "") for line in lines),
+        "tables": tables,
+        "forms": document.forms(),
+        "confidence": round(sum(confidences) / len(confidences), 2) if confidences else 0,
+        "pages": document.page_count,
+        "page_details": document.page_details(tables),
+    }
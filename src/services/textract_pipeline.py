@@ -0,0 +1,233 @@
+"""Page-aware Textract analysis for PDFs.
+
+Synchronous AnalyzeDocument only accepts single-page PDFs of at most 10 MB,
+so documents are routed by size:
+- Small documents are split into single pages that are analyzed in
+  parallel (bounded by ``textract_max_concurrency``).
+- Large documents are uploaded to S3 and analyzed with the asynchronous
+  StartDocumentAnalysis job, whose results are paged with ``NextToken``.
+
+Either way the blocks of every page are merged into one parsed result.
+"""
+
+import asyncio
+import io
+import logging
+import os
+import time
+import uuid
+from typing import Any, Optional
+
+from src.config import get_settings
+from src.services.textract_parser import parse_textract_blocks
+
+logger = logging.getLogger(__name__)
+
+FEATURE_TYPES = ["TABLES", "FORMS"]
+SYNC_MAX_BYTES = 10 * 1024 * 1024  # AnalyzeDocument limit for inline bytes
+THROTTLING_ERRORS = {
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+    "LimitExceededException",
+}
+MAX_SYNC_ATTEMPTS = 4
+
+
+class TextractPipelineError(Exception):
+    """Textract analysis could not be completed."""
+
+
+class TextractPipeline:
+    """Runs Textract analysis for multi-page PDFs.
+
+    Clients are injected so tests can pass stubs (or moto clients).
+    """
+
+    def __init__(
+        self,
+        textract_client: Any,
+        s3_client: Optional[Any] = None,
+        bucket: Optional[str] = None,
+        sync_max_pages: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        job_timeout: Optional[float] = None,
+    ):
+        """Initialize pipeline.
+
+        Args:
+            textract_client: boto3 Textract client
+            s3_client: boto3 S3 client, needed for the asynchronous path
+            bucket: S3 bucket for asynchronous input (defaults to S3_BUCKET_NAME)
+            sync_max_pages: Largest page count analyzed page by page
+            max_concurrency: Synchronous page calls in flight
+            poll_interval: Initial delay between job status polls (seconds)
+            job_timeout: Give up on an asynchronous job after this long (seconds)
+        """
+        settings = get_settings()
+        self.textract = textract_client
+        self.s3 = s3_client
+        self.bucket = bucket or settings.s3_bucket_name
+        self.sync_max_pages = sync_max_pages or settings.textract_sync_max_pages
+        self.max_concurrency = max_concurrency or settings.textract_max_concurrency
+        self.poll_interval = poll_interval or settings.textract_poll_interval_seconds
+        self.job_timeout = job_timeout or settings.textract_job_timeout_seconds
+        self.s3_prefix = settings.textract_s3_prefix
+
+    @property
+    def async_available(self) -> bool:
+        return self.s3 is not None and bool(self.bucket)
+
+    async def analyze_pdf(self, file_path: str) -> dict[str, Any]:
+        """Analyze a PDF, choosing the synchronous or asynchronous path.
+
+        Args:
+            file_path: Path to the PDF
+
+        Returns:
+            Parsed result (see parse_textract_blocks) plus processing_method
+
+        Raises:
+            TextractPipelineError: If the document cannot be analyzed
+        """
+        reader = await asyncio.to_thread(_read_pdf, file_path)
+        page_count = len(reader.pages)
+
+        if page_count <= self.sync_max_pages:
+            pages = await asyncio.to_thread(_split_pdf, reader)
+        else:
+            pages = []
+
+        if pages and all(len(page) <= SYNC_MAX_BYTES for page in pages):
+            blocks = await self._analyze_pages(pages)
+            method = "analyze_document_per_page"
+        elif self.async_available:
+            blocks = await self._analyze_async(file_path)
+            method = "start_document_analysis"
+        else:
+            raise TextractPipelineError(
+                f"{page_count}-page PDF is too large for synchronous analysis "
+                "and no S3 bucket is configured for asynchronous analysis"
+            )
+
+        result = parse_textract_blocks(blocks)
+        result["pages"] = max(result["pages"], page_count)
+        result["processing_method"] = method
+        logger.info(f"Textract analyzed {page_count} page(s) via {method}")
+        return result
+
+    async def _analyze_pages(self, pages: list[bytes]) -> list[dict[str, Any]]:
+        """Analyze single-page PDFs in parallel and merge their blocks in page order."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def analyze(page_number: int, page_bytes: bytes) -> list[dict[str, Any]]:
+            async with semaphore:
+                response = await self._call_sync(page_bytes)
+            blocks = response.get("Blocks", [])
+            # Each call sees a one-page document; restore the real page number
+            for block in blocks:
+                block["Page"] = page_number
+            return blocks
+
+        results = await asyncio.gather(
+            *(analyze(number, page) for number, page in enumerate(pages, start=1))
+        )
+        return [block for blocks in results for block in blocks]
+
+    async def _call_sync(self, document: bytes) -> dict[str, Any]:
+        """Call AnalyzeDocument, backing off on throttling."""
+        delay = 0.5
+        attempt = 1
+        while True:
+            try:
+                return await asyncio.to_thread(
+                    self.textract.analyze_document,
+                    Document={"Bytes": document},
+                    FeatureTypes=FEATURE_TYPES,
+                )
+            except Exception as e:
+                if _error_code(e) not in THROTTLING_ERRORS or attempt >= MAX_SYNC_ATTEMPTS:
+                    raise
+                logger.debug(f"Textract throttled (attempt {attempt}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay *= 2
+                attempt += 1
+
+    async def _analyze_async(self, file_path: str) -> list[dict[str, Any]]:
+        """Upload to S3, run an asynchronous analysis job and collect every result page."""
+        key = f"{self.s3_prefix}{uuid.uuid4()}/{os.path.basename(file_path)}"
+        await asyncio.to_thread(self.s3.upload_file, file_path, self.bucket, key)
+        try:
+            started = await asyncio.to_thread(
+                self.textract.start_document_analysis,
+                DocumentLocation={"S3Object": {"Bucket": self.bucket, "Name": key}},
+                FeatureTypes=FEATURE_TYPES,
+            )
+            job_id = started["JobId"]
+            response = await self._wait_for_job(job_id)
+
+            blocks = list(response.get("Blocks", []))
+            next_token = response.get("NextToken")
+            while next_token:
+                response = await asyncio.to_thread(
+                    self.textract.get_document_analysis, JobId=job_id, NextToken=next_token
+                )
+                blocks.extend(response.get("Blocks", []))
+                next_token = response.get("NextToken")
+            return blocks
+        finally:
+            try:
+                await asyncio.to_thread(self.s3.delete_object, Bucket=self.bucket, Key=key)
+            except Exception as e:
+                logger.warning(f"Failed to delete Textract input s3://{self.bucket}/{key}: {e}")
+
+    async def _wait_for_job(self, job_id: str) -> dict[str, Any]:
+        """Poll a job until it finishes; returns its first result page."""
+        deadline = time.monotonic() + self.job_timeout
+        delay = self.poll_interval
+
+        while True:
+            response = await asyncio.to_thread(self.textract.get_document_analysis, JobId=job_id)
+            status = response.get("JobStatus")
+            if status in ("SUCCEEDED", "PARTIAL_SUCCESS"):
+                if status == "PARTIAL_SUCCESS":
+                    logger.warning(f"Textract job {job_id} partially succeeded")
+                return response
+            if status == "FAILED":
+                raise TextractPipelineError(
+                    f"Textract job {job_id} failed: {response.get('StatusMessage', 'unknown')}"
+                )
+            if time.monotonic() + delay > deadline:
+                raise TextractPipelineError(f"Textract job {job_id} timed out")
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, 30.0)
+
+
+def _read_pdf(file_path: str):
+    """Open a PDF for page access."""
+    from PyPDF2 import PdfReader
+
+    return PdfReader(file_path)
+
+
+def _split_pdf(reader) -> list[bytes]:
+    """Split a PDF into single-page PDF documents."""
+    from PyPDF2 import PdfWriter
+
+    pages = []
+    for page in reader.pages:
+        writer = PdfWriter()
+        writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        pages.append(buffer.getvalue())
+    return pages
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    """Get the AWS error code of a botocore ClientError."""
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code")
+    return None
@@ -0,0 +1,205 @@
+"""Columnar kernels for table transformations.
+
+Large tables are converted to pandas frames once per plan, transformed with
+vectorized kernels and converted back to row dicts only when the result
+leaves the pipeline. Columns are always created with the object
+dtype (pandas would otherwise infer string columns), so cell values keep
+their Python types (ints stay ints, None stays None) and results are
+identical to the row-by-row path.
+
+Only regular tables qualify: every row a dict with the same keys.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.services import table_sort
+from src.services.table_sort import SortKey
+
+
+def to_frame(rows: Sequence[Any]) -> Optional[pd.DataFrame]:
+    """Convert rows to a frame, or None if the rows are not regular dicts.
+
+    Args:
+        rows: Table rows
+
+    Returns:
+        Frame with one object column per key, in the first row's key order
+    """
+    if not rows or not isinstance(rows[0], dict):
+        return None
+    keys = rows[0].keys()
+    for row in rows:
+        if not isinstance(row, dict) or row.keys() != keys:
+            return None
+    return pd.DataFrame(
+        {column: _object_array([row[column] for row in rows]) for column in keys},
+        index=pd.RangeIndex(len(rows)),
+        dtype=object,
+    )
+
+
+def from_arrow(table: Any) -> pd.DataFrame:
+    """Convert an Arrow table to a frame, without building row dicts.
+
+    Args:
+        table: Arrow table whose values are what the table's rows hold
+            (see table_store.StoredRows.arrow)
+
+    Returns:
+        Frame with one object column per Arrow column
+    """
+    return pd.DataFrame(
+        {
+            name: _object_array(column.to_pylist())
+            for name, column in zip(table.column_names, table.columns)
+        },
+        index=pd.RangeIndex(table.num_rows),
+        dtype=object,
+    )
+
+
+def to_rows(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a frame back to row dicts."""
+    if not len(frame.columns):
+        return [{} for _ in range(len(frame))]
+    columns = list(frame.columns)
+    values = [frame[column].to_numpy(dtype=object) for column in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def _object_array(values: Sequence[Any]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _constant(value: Any, length: int) -> np.ndarray:
+    array = np.empty(length, dtype=object)
+    array[:] = [value] * length
+    return array
+
+
+def project(frame: pd.DataFrame, pairs: Sequence[tuple[Any, Any]]) -> pd.DataFrame:
+    """Build a frame of (output, source) columns; missing sources become None."""
+    columns = {}
+    for out, source in pairs:
+        if source in frame.columns:
+            columns[out] = frame[source].to_numpy(dtype=object)
+        else:
+            columns[out] = _constant(None, len(frame))
+    return pd.DataFrame(columns, index=frame.index, dtype=object)
+
+
+def rename(frame: pd.DataFrame, mapping: Dict[str, str]) -> pd.DataFrame:
+    """Rename columns the way a dict comprehension renames keys.
+
+    Columns renamed to the same name collapse into one, at the first
+    one's position with the last one's values.
+    """
+    names = [mapping.get(column, column) for column in frame.columns]
+    if len(set(names)) == len(names):
+        return frame.set_axis(names, axis=1)
+    return project(frame, {name: column for name, column in zip(names, frame.columns)}.items())
+
+
+def factorize(values: np.ndarray) -> tuple[np.ndarray, List[Any]]:
+    """Codes and distinct values of an object column, to key or test each value once.
+
+    pd.factorize folds every missing value (None, NaN, NaT) into a single
+    NaN; here each kind keeps its own code and is its own distinct value,
+    so key and test functions see the cells the row path sees.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    uniques = list(uniques)
+    missing = codes < 0
+    if missing.any():
+        kinds: Dict[type, int] = {}
+        missing_codes = []
+        for value in values[missing]:
+            code = kinds.get(type(value))
+            if code is None:
+                code = kinds[type(value)] = len(uniques)
+                uniques.append(value)
+            missing_codes.append(code)
+        codes = codes.copy()
+        codes[missing] = missing_codes
+    return codes, uniques
+
+
+def sort_order(
+    frame: pd.DataFrame,
+    keys: Sequence[SortKey],
+    table: Dict[str, Any],
+    limit: Optional[int] = None,
+) -> np.ndarray:
+    """Positions of the rows sorted on typed keys, as the row path sorts them.
+
+    Each key's distinct values are keyed once with table_sort's key
+    functions and ranked; the rows are then ordered by rank with stable
+    sorts from the last key to the first, so equal keys keep their order
+    and the first ``limit`` positions are the rows a top-k selection gives.
+    """
+    ranks = []
+    for key in keys:
+        if key.column in frame.columns:
+            values = frame[key.column].to_numpy(dtype=object)
+        else:
+            values = _constant(None, len(frame))
+        codes, uniques = factorize(values)
+        part = table_sort.value_key(key, table, lambda values=values: table_sort.sample(values))
+        unique_keys = [part(value) for value in uniques]
+
+        # Dense ranks: distinct values with equal keys ("1" and "1.0") tie
+        rank = np.empty(len(uniques), dtype=np.int64)
+        current, previous = -1, None
+        for position in sorted(range(len(uniques)), key=unique_keys.__getitem__):
+            if current < 0 or unique_keys[position] != previous:
+                current += 1
+                previous = unique_keys[position]
+            rank[position] = current
+        ranks.append(rank[codes])
+
+    order = np.arange(len(frame))
+    for rank in reversed(ranks):
+        order = order[np.argsort(rank[order], kind="stable")]
+    return order if limit is None else order[:limit]
+
+
+def change_case(frame: pd.DataFrame, operation: str) -> pd.DataFrame:
+    """Upper- or lowercase every string cell; other values are left as they are."""
+    columns = {}
+    for column in frame.columns:
+        values = frame[column].to_numpy(dtype=object)
+        series = pd.Series(values, dtype=object)
+        if pd.api.types.infer_dtype(values, skipna=False) == "string":
+            changed = series.str.upper() if operation == "uppercase" else series.str.lower()
+            columns[column] = changed.to_numpy(dtype=object)
+        else:
+            method = str.upper if operation == "uppercase" else str.lower
+            columns[column] = _object_array(
+                [method(value) if isinstance(value, str) else value for value in values]
+            )
+    return pd.DataFrame(columns, index=frame.index, dtype=object)
+
+
+def concat(frames: Sequence[pd.DataFrame], columns: Sequence[Any]) -> pd.DataFrame:
+    """Stack frames under a shared set of columns; absent columns are filled with ""."""
+    aligned = [
+        pd.DataFrame(
+            {
+                column: (
+                    frame[column].to_numpy(dtype=object)
+                    if column in frame.columns
+                    else _constant("", len(frame))
+                )
+                for column in columns
+            },
+            index=pd.RangeIndex(len(frame)),
+            dtype=object,
+        )
+        for frame in frames
+    ]
+    return pd.concat(aligned, ignore_index=True)
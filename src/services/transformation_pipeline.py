@@ -0,0 +1,792 @@
+"""Compiled transformation pipelines.
+
+A list of TransformationRules is planned once into stages, and the plan is
+reused for every document the same rules are applied to:
+- Scan: consecutive select/rename/filter/limit rules, fused into a single
+  lazy pass over each table's rows. A selection and the renames after it
+  compose into one projection, filters run before the projection (so only
+  surviving rows are rebuilt) and a limit stops the scan as soon as enough
+  rows have been produced. Rows are never copied between rules. Filters
+  are predicate trees compiled by table_filter; a filter that reads a
+  table's input rows is narrowed by indexes when the rows were filtered
+  before. Renames carry a table's column profile and schema along, so
+  later filters and sorts still know each column's type.
+- Sort: a stable sort on one or more typed keys (see table_sort). A limit
+  after it (past any select/rename) turns it into a top-k selection, and
+  a filter right after it runs before it. Tables larger than a sort run
+  are sorted externally.
+- Case and Merge: upper/lowercasing and merging tables.
+- Document: whole-document operations (text extraction, filtering, ...)
+  handled by TransformationService.
+
+With the "auto" or "columnar" engine, large regular tables run on columnar
+kernels (transformation_columnar) instead of row by row: a table is
+converted to a pandas frame at the first stage that benefits, stays a
+frame across stages, and is converted back to rows only before a document
+operation or when the plan returns. Tables read from the table store
+(StoredRows) become frames built straight from their Arrow files, without
+passing through row dicts.
+
+Results match applying the rules one at a time, including which tables
+each rule skips (tables without columns for select/rename, without rows
+for filter/limit/sort).
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from src.services import table_filter, table_sort
+from src.services.table_filter import IndexRegistry, Predicate, TableIndex
+from src.services.table_store import StoredRows
+from src.services.table_sort import SortKey
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()  # Projection source for a column that no input key provides
+
+DocumentOperation = Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]
+RowFunction = Callable[[Any], Any]
+
+
+@dataclass(frozen=True)
+class SelectColumns:
+    columns: tuple[str, ...]
+
+    def describe(self) -> str:
+        return f"select({', '.join(self.columns)})"
+
+
+@dataclass(frozen=True)
+class RenameColumns:
+    mapping: tuple[tuple[str, str], ...]
+
+    def describe(self) -> str:
+        return "rename(" + ", ".join(f"{old} -> {new}" for old, new in self.mapping) + ")"
+
+
+@dataclass(frozen=True)
+class FilterRows:
+    predicate: Predicate  # Compiled by table_filter
+
+    def describe(self) -> str:
+        return f"filter({self.predicate.describe()})"
+
+
+@dataclass(frozen=True)
+class LimitRows:
+    limit: int
+
+    def describe(self) -> str:
+        return f"limit({self.limit})"
+
+
+RowOperation = Union[SelectColumns, RenameColumns, FilterRows, LimitRows]
+
+
+class _RowProgram:
+    """Row steps for one table, with renames and selections composed.
+
+    Mapping rules accumulate into a pending mapping of dict rows: either a
+    rename of every key, or (after a selection) a projection of
+    (output, source) pairs. Filters and limits are placed before the
+    pending mapping when they can be expressed on its input, so the
+    mapping is only emitted when something needs its output.
+    """
+
+    def __init__(self):
+        self.steps: List[tuple[str, Any]] = []
+        self.renames: Optional[Dict[str, str]] = None
+        self.projection: Optional[List[tuple[str, Any]]] = None
+        self.list_steps: List[List[int]] = []  # Index selections for list-format rows
+
+    def rename(self, mapping: Dict[str, str]) -> None:
+        if self.projection is not None:
+            self.projection = [(mapping.get(out, out), src) for out, src in self.projection]
+            return
+        if self.renames is not None:
+            # Renames of every key collide differently when composed, so they run in turn
+            self.flush()
+        self.renames = dict(mapping)
+
+    def select(self, columns: List[str], selected: List[str]) -> None:
+        if self.projection is not None:
+            sources = dict(self.projection)
+            self.projection = [(column, sources.get(column, _MISSING)) for column in selected]
+        else:
+            sources = {column: self._source(column) for column in selected}
+            if any(source is None for source in sources.values()):
+                self.flush()
+                sources = {column: column for column in selected}
+            self.renames = None
+            self.projection = list(sources.items())
+        keep = set(selected)
+        self.list_steps.append([i for i, column in enumerate(columns) if column in keep])
+
+    def filter(self, op: FilterRows, types: Optional[table_filter.ColumnTypes] = None) -> None:
+        columns = op.predicate.columns
+        keys = {column: self._source(column) for column in columns}
+        if any(key is None for key in keys.values()):
+            self.flush()
+            keys = {column: column for column in columns}
+        self.steps.append(("filter", (op.predicate, keys, types)))
+
+    def limit(self, limit: int) -> None:
+        # Mappings produce one row per row, so the limit can run before them
+        self.steps.append(("limit", limit))
+
+    def _source(self, column: str) -> Any:
+        """The input key holding a column's value after the pending mapping, if unambiguous."""
+        if self.projection is not None:
+            sources = dict(self.projection)
+            return sources.get(column)
+        if self.renames is None:
+            return column
+        candidates = [key for key, renamed in self.renames.items() if renamed == column]
+        if column not in self.renames:
+            candidates.append(column)
+        return candidates[0] if len(candidates) == 1 else None
+
+    def flush(self) -> None:
+        """Emit the pending mapping as a step."""
+        if self.projection is not None:
+            dict_map = _projector(self.projection)
+        elif self.renames is not None:
+            dict_map = _renamer(self.renames)
+        elif not self.list_steps:
+            return
+        else:
+            dict_map = None
+        self.steps.append(("map", _row_mapper(dict_map, self.list_steps)))
+        self.renames = self.projection = None
+        self.list_steps = []
+
+    def run(self, rows: Sequence[Any], index: Optional[TableIndex] = None) -> List[Any]:
+        self.flush()
+        source = rows
+        if index is not None and self.steps and self.steps[0][0] == "filter":
+            # The first filter reads the input rows, so indexes can narrow them down
+            predicate, keys, _ = self.steps[0][1]
+            positions = predicate.candidates(index, keys)
+            if positions is not None:
+                source = [rows[i] for i in sorted(positions)]
+        stream: Iterator[Any] = iter(source)
+        for kind, arg in self.steps:
+            if kind == "filter":
+                stream = filter(table_filter.bind(*arg), stream)
+            elif kind == "map":
+                stream = map(arg, stream)
+            elif arg >= 0:
+                stream = islice(stream, arg)
+            else:
+                # A negative limit drops rows from the end, which needs them all
+                stream = iter(list(stream)[:arg])
+        return list(stream)
+
+
+def _projector(projection: List[tuple[str, Any]]) -> RowFunction:
+    return lambda row: {out: row.get(src) for out, src in projection}
+
+
+def _renamer(renames: Dict[str, str]) -> RowFunction:
+    get = renames.get
+    return lambda row: {get(key, key): value for key, value in row.items()}
+
+
+def _row_mapper(dict_map: Optional[RowFunction], list_steps: List[List[int]]) -> RowFunction:
+    def apply(row: Any) -> Any:
+        if isinstance(row, dict):
+            return dict_map(row) if dict_map is not None else row
+        for indices in list_steps:
+            row = [row[i] for i in indices if i < len(row)]
+        return row
+
+    return apply
+
+
+@dataclass
+class FrameTable:
+    """A table held as a pandas frame while a plan runs."""
+
+    table: Dict[str, Any]  # Table metadata; its "rows" are stale until materialized
+    frame: Any
+    rows: Optional[List[Any]] = None  # The rows the frame was built from, while unchanged
+
+    def replace(self, frame: Any, **metadata: Any) -> "FrameTable":
+        return FrameTable({**self.table, **metadata}, frame)
+
+
+Table = Union[Dict[str, Any], FrameTable]
+
+
+def _metadata(table: Table) -> Dict[str, Any]:
+    return table.table if isinstance(table, FrameTable) else table
+
+
+def _renamed_types(table: Dict[str, Any], mapping: Dict[str, str]) -> Dict[str, Any]:
+    """A table's column profile and schema under renamed columns."""
+    renamed: Dict[str, Any] = {}
+    if table.get("profile"):
+        renamed["profile"] = {
+            mapping.get(column, column): profile for column, profile in table["profile"].items()
+        }
+    if table.get("schema"):
+        renamed["schema"] = [
+            (
+                {**field, "name": mapping.get(field.get("name"), field.get("name"))}
+                if isinstance(field, dict)
+                else field
+            )
+            for field in table["schema"]
+        ]
+    return renamed
+
+
+def _stored(table: Table) -> Any:
+    return table.get("rows") if isinstance(table, dict) else None
+
+
+def _columnar():
+    """The columnar kernels, imported on first use (pandas is heavy)."""
+    from src.services import transformation_columnar
+
+    return transformation_columnar
+
+
+class _Engine:
+    """Chooses, table by table, between the row path and columnar kernels.
+
+    Modes: "rows" never converts, "columnar" converts every regular table,
+    "auto" converts regular tables of at least ``min_rows`` rows unless
+    the stage's work is bounded by a limit anyway.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        min_rows: int,
+        sort_run_rows: Optional[int] = None,
+        indexes: Optional[IndexRegistry] = None,
+    ):
+        self.mode = mode
+        self.min_rows = min_rows
+        self.sort_run_rows = sort_run_rows
+        self.indexes = indexes
+        self._irregular: set[int] = set()  # Row lists known not to fit a frame
+
+    def columnar(self, table: Table, bounded: bool = False, force: bool = False) -> Table:
+        """The table as a frame when the columnar path is worth it, otherwise unchanged."""
+        if isinstance(table, FrameTable) or self.mode == "rows":
+            return table
+        rows = table.get("rows")
+        if not rows or id(rows) in self._irregular:
+            return table
+        if self.mode == "auto" and not force and (bounded or len(rows) < self.min_rows):
+            return table
+
+        frame = _columnar().to_frame(rows)
+        if frame is None:
+            self._irregular.add(id(rows))
+            return table
+        return FrameTable(table, frame, rows)
+
+    def load(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Bring stored tables (rows read from the table store) into the plan.
+
+        The columnar modes build a stored table's frame straight from its
+        Arrow file; the row path reads it into row dicts.
+        """
+        tables = data.get("tables")
+        if not tables or not any(isinstance(_stored(table), StoredRows) for table in tables):
+            return data
+        loaded: List[Table] = []
+        for table in tables:
+            rows = _stored(table)
+            if not isinstance(rows, StoredRows):
+                loaded.append(table)
+            elif self.mode == "rows" or not len(rows):
+                loaded.append({**table, "rows": list(rows)})
+            else:
+                loaded.append(FrameTable(table, _columnar().from_arrow(rows.arrow())))
+        return {**data, "tables": loaded}
+
+    def materialize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert any frames in the document back to row dicts."""
+        tables = data.get("tables")
+        if not tables or not any(isinstance(table, FrameTable) for table in tables):
+            return data
+        return {**data, "tables": [self._rows_table(table) for table in tables]}
+
+    @staticmethod
+    def _rows_table(table: Table) -> Dict[str, Any]:
+        if not isinstance(table, FrameTable):
+            return table
+        rows = table.rows if table.rows is not None else _columnar().to_rows(table.frame)
+        return {**table.table, "rows": rows}
+
+
+@dataclass
+class ScanStage:
+    """Fused select/rename/filter/limit rules, run as one pass per table."""
+
+    operations: List[RowOperation]
+
+    def describe(self) -> str:
+        return "Scan: " + " -> ".join(op.describe() for op in self.operations)
+
+    @property
+    def bounded(self) -> bool:
+        """Whether a limit caps the rows read before any filter can reject rows."""
+        for op in self.operations:
+            if isinstance(op, FilterRows):
+                return False
+            if isinstance(op, LimitRows):
+                return op.limit >= 0
+        return False
+
+    def run(self, data: Dict[str, Any], engine: _Engine) -> Dict[str, Any]:
+        if not data.get("tables"):
+            return data
+        tables = []
+        for table in data["tables"]:
+            table = engine.columnar(table, bounded=self.bounded)
+            if isinstance(table, FrameTable):
+                tables.append(self.apply_frame(table))
+            else:
+                tables.append(self.apply(table, engine.indexes))
+        return {**data, "tables": tables}
+
+    def apply(
+        self, table: Dict[str, Any], indexes: Optional[IndexRegistry] = None
+    ) -> Dict[str, Any]:
+        columns = table.get("columns")
+        rows = table.get("rows")
+        program = _RowProgram()
+        types: Dict[str, Any] = {}  # Profile and schema under the renames so far
+        reshaped = selected = counted = False
+
+        for op in self.operations:
+            if isinstance(op, (SelectColumns, RenameColumns)):
+                if not columns:
+                    continue
+                reshaped = True
+                if isinstance(op, SelectColumns):
+                    keep = set(op.columns)
+                    new_columns = [column for column in columns if column in keep]
+                    program.select(columns, new_columns)
+                    columns = new_columns
+                    selected = True
+                else:
+                    mapping = dict(op.mapping)
+                    program.rename(mapping)
+                    columns = [mapping.get(column, column) for column in columns]
+                    types.update(_renamed_types({**table, **types}, mapping))
+            elif rows:
+                counted = True
+                if isinstance(op, FilterRows):
+                    program.filter(op, table_sort.column_types({**table, **types}))
+                else:
+                    program.limit(op.limit)
+
+        if not (reshaped or counted):
+            return table
+
+        index = indexes.get(rows) if indexes is not None and rows else None
+        new_rows = program.run(rows or [], index)
+        transformed = {**table, **types, "rows": new_rows}
+        if reshaped:
+            transformed["columns"] = columns
+        if selected:
+            transformed["column_count"] = len(columns)
+        if counted:
+            transformed["row_count"] = len(new_rows)
+        return transformed
+
+    def apply_frame(self, table: FrameTable) -> FrameTable:
+        kernels = _columnar()
+        columns = table.table.get("columns")
+        frame = table.frame
+        has_rows = len(frame) > 0
+        types: Dict[str, Any] = {}  # Profile and schema under the renames so far
+        reshaped = selected = counted = False
+
+        for op in self.operations:
+            if isinstance(op, (SelectColumns, RenameColumns)):
+                if not columns:
+                    continue
+                reshaped = True
+                if isinstance(op, SelectColumns):
+                    keep = set(op.columns)
+                    columns = [column for column in columns if column in keep]
+                    frame = kernels.project(frame, [(column, column) for column in columns])
+                    selected = True
+                else:
+                    mapping = dict(op.mapping)
+                    frame = kernels.rename(frame, mapping)
+                    columns = [mapping.get(column, column) for column in columns]
+                    types.update(_renamed_types({**table.table, **types}, mapping))
+            elif has_rows:
+                counted = True
+                if isinstance(op, FilterRows):
+                    known = table_sort.column_types({**table.table, **types})
+                    frame = frame[op.predicate.mask(frame, known)]
+                else:
+                    frame = frame.iloc[: op.limit]
+
+        if not (reshaped or counted):
+            return table
+
+        metadata: Dict[str, Any] = dict(types)
+        if reshaped:
+            metadata["columns"] = columns
+        if selected:
+            metadata["column_count"] = len(columns)
+        if counted:
+            metadata["row_count"] = len(frame)
+        return table.replace(frame, **metadata)
+
+
+@dataclass
+class SortStage:
+    """Stable, typed multi-key sort; top-k when followed by a limit."""
+
+    keys: tuple[SortKey, ...]
+    limit: Optional[int] = None
+
+    @property
+    def columns(self) -> str:
+        return ", ".join(key.column for key in self.keys)
+
+    def describe(self) -> str:
+        keys = ", ".join(key.describe() for key in self.keys)
+        if self.limit is None:
+            return f"Sort: {keys}"
+        return f"TopK: {keys}, keep {self.limit}"
+
+    def run(self, data: Dict[str, Any], engine: _Engine) -> Dict[str, Any]:
+        if not data.get("tables"):
+            return data
+        tables = []
+        for table in data["tables"]:
+            table = engine.columnar(table)
+            if isinstance(table, FrameTable):
+                tables.append(self.apply_frame(table))
+            else:
+                tables.append(self.apply(table, engine.sort_run_rows))
+        return {**data, "tables": tables}
+
+    def apply(self, table: Dict[str, Any], run_rows: Optional[int] = None) -> Dict[str, Any]:
+        rows = table.get("rows")
+        if not rows:
+            return table
+
+        try:
+            key = table_sort.row_key(self.keys, table, rows)
+            new_rows = table_sort.sort_rows(rows, key, self.limit, run_rows)
+        except Exception as e:
+            logger.warning(f"Failed to sort table: {e}")
+            if self.limit is None:
+                return table  # Keep original if sorting fails
+            new_rows = rows[: self.limit]
+
+        transformed = {**table, "rows": new_rows}
+        if self.limit is not None:
+            transformed["row_count"] = len(new_rows)
+        return transformed
+
+    def apply_frame(self, table: FrameTable) -> FrameTable:
+        if not len(table.frame):
+            return table
+        order = _columnar().sort_order(table.frame, self.keys, table.table, self.limit)
+        frame = table.frame.iloc[order]
+        if self.limit is None:
+            return table.replace(frame)
+        return table.replace(frame, row_count=len(frame))
+
+
+CASE_OPERATIONS = {"uppercase", "lowercase"}
+
+
+def _change_row_case(row: Any, operation: str) -> Any:
+    if not isinstance(row, dict):
+        return row
+    change = str.upper if operation == "uppercase" else str.lower
+    return {key: change(value) if isinstance(value, str) else value for key, value in row.items()}
+
+
+@dataclass
+class CaseStage:
+    """Upper- or lowercase the document text or, without text, every table cell."""
+
+    operation: str
+
+    def describe(self) -> str:
+        return f"Case: {self.operation}"
+
+    def run(self, data: Dict[str, Any], engine: _Engine) -> Dict[str, Any]:
+        operation = self.operation
+        if operation not in CASE_OPERATIONS:
+            return data
+        if data.get("text"):
+            text = data["text"]
+            return {**data, "text": text.upper() if operation == "uppercase" else text.lower()}
+        if not data.get("tables"):
+            return data
+
+        tables: List[Table] = []
+        for table in data["tables"]:
+            table = engine.columnar(table)
+            if isinstance(table, FrameTable):
+                tables.append(table.replace(_columnar().change_case(table.frame, operation)))
+            elif table.get("rows"):
+                rows = [_change_row_case(row, operation) for row in table["rows"]]
+                tables.append({**table, "rows": rows})
+            else:
+                tables.append(table)
+        return {**data, "tables": tables}
+
+
+@dataclass
+class MergeStage:
+    """Combine every table into one, under the union of their columns."""
+
+    def describe(self) -> str:
+        return "Merge: all tables"
+
+    def run(self, data: Dict[str, Any], engine: _Engine) -> Dict[str, Any]:
+        tables = data.get("tables")
+        if not tables or len(tables) < 2:
+            return data
+
+        # Columns in the order they are first seen
+        columns = list(
+            dict.fromkeys(
+                column for table in tables for column in _metadata(table).get("columns", [])
+            )
+        )
+        merged = {
+            "name": "Merged Data",
+            "columns": columns,
+            "rows": [],
+            "row_count": 0,
+            "column_count": len(columns),
+        }
+
+        total_rows = sum(
+            len(table.frame) if isinstance(table, FrameTable) else len(table.get("rows") or [])
+            for table in tables
+        )
+        force = total_rows >= engine.min_rows or any(isinstance(t, FrameTable) for t in tables)
+        with_rows = [
+            engine.columnar(table, force=force)
+            for table in tables
+            if (len(table.frame) if isinstance(table, FrameTable) else table.get("rows"))
+        ]
+        if with_rows and all(isinstance(table, FrameTable) for table in with_rows):
+            frame = _columnar().concat([table.frame for table in with_rows], columns)
+            return {**data, "tables": [FrameTable({**merged, "row_count": len(frame)}, frame)]}
+
+        rows = []
+        for table in engine.materialize(data)["tables"]:
+            for row in table.get("rows", []):
+                if isinstance(row, dict):
+                    # Ensure all columns are present
+                    rows.append({column: row.get(column, "") for column in columns})
+                else:
+                    rows.append(row)
+        return {**data, "tables": [{**merged, "rows": rows, "row_count": len(rows)}]}
+
+
+@dataclass
+class DocumentStage:
+    """A whole-document operation, run on row dicts."""
+
+    operation: str
+    handler: DocumentOperation
+    parameters: Dict[str, Any]
+
+    def describe(self) -> str:
+        return f"Document: {self.operation}({json.dumps(self.parameters, default=str)})"
+
+    def run(self, data: Dict[str, Any], engine: _Engine) -> Dict[str, Any]:
+        return self.handler(engine.materialize(data), self.parameters)
+
+
+Stage = Union[ScanStage, SortStage, CaseStage, MergeStage, DocumentStage]
+
+ENGINES = ("auto", "rows", "columnar")
+COLUMNAR_MIN_ROWS = 20_000
+SORT_RUN_ROWS = 250_000
+
+
+class TransformationPlan:
+    """Planned rules, reusable for any number of documents."""
+
+    def __init__(self, stages: List[Stage], rule_count: int, notes: List[str], skipped: List[str]):
+        self.stages = stages
+        self.rule_count = rule_count
+        self.notes = notes  # How rules were combined
+        self.skipped = skipped  # Rules that are not applied, and why
+
+    def execute(
+        self,
+        data: Dict[str, Any],
+        engine: str = "rows",
+        columnar_min_rows: int = COLUMNAR_MIN_ROWS,
+        sort_run_rows: Optional[int] = SORT_RUN_ROWS,
+        indexes: Optional[IndexRegistry] = None,
+    ) -> Dict[str, Any]:
+        """Apply the plan to a document.
+
+        The input is not modified. A stage that fails is logged and
+        skipped, leaving the data as the previous stage produced it.
+        Rules that were skipped, when planning or here, are listed in the
+        result's "transformation_notes" so callers can tell them apart
+        from rules that matched nothing.
+
+        Args:
+            data: Extracted document data; stored tables may hold StoredRows
+            engine: "auto", "rows" or "columnar" (see _Engine)
+            columnar_min_rows: Smallest table "auto" runs on columnar kernels
+            sort_run_rows: Rows sorted in memory before a sort spills to disk
+                (None to always sort in memory)
+            indexes: Row indexes kept between executions (None to always scan)
+
+        Returns:
+            Transformed data, with tables as {"columns", "rows"} dicts
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown transformation engine: {engine}")
+        run = _Engine(engine, columnar_min_rows, sort_run_rows, indexes)
+        skipped = list(self.skipped)
+        result = run.load(data)
+        for stage in self.stages:
+            try:
+                result = stage.run(result, run)
+            except Exception as e:
+                logger.error(f"Failed to apply transformation stage {stage.describe()}: {e}")
+                skipped.append(f"{stage.describe()} skipped: {e}")
+                # Continue with other transformations
+                continue
+        result = run.materialize(result)
+        result = result if result is not data else data.copy()
+        if skipped:
+            result["transformation_notes"] = skipped
+        else:
+            result.pop("transformation_notes", None)  # From an earlier round
+        return result
+
+    def explain(self) -> str:
+        """Describe the plan, one stage per line."""
+        lines = [f"TransformationPlan: {self.rule_count} rules in {len(self.stages)} stages"]
+        lines.extend(f"  {i}. {stage.describe()}" for i, stage in enumerate(self.stages, 1))
+        lines.extend(f"  note: {note}" for note in self.notes)
+        lines.extend(f"  skipped: {rule}" for rule in self.skipped)
+        return "\n".join(lines)
+
+
+def plan_key(rules: Sequence[Any]) -> tuple:
+    """Cache key identifying a rule list by its operations and parameters."""
+    return tuple(
+        (rule.operation, json.dumps(rule.parameters, sort_keys=True, default=str)) for rule in rules
+    )
+
+
+def _row_operation(operation: str, params: Dict[str, Any]) -> Optional[RowOperation]:
+    """Parse a row rule; None when its parameters make it a no-op."""
+    if operation == "select_columns":
+        return SelectColumns(tuple(params.get("columns", [])))
+    if operation == "rename_columns":
+        return RenameColumns(tuple(params.get("mapping", {}).items()))
+    if operation == "filter_rows":
+        predicate = table_filter.compile_filter(params)
+        return FilterRows(predicate) if predicate is not None else None
+    limit = params.get("limit", 10)
+    if not isinstance(limit, int) or isinstance(limit, bool):
+        raise ValueError(f"limit must be an integer, got {limit!r}")
+    return LimitRows(limit)
+
+
+ROW_OPERATIONS = {"select_columns", "rename_columns", "filter_rows", "limit_rows"}
+
+
+def compile_rules(
+    rules: Sequence[Any], document_operations: Dict[str, DocumentOperation]
+) -> TransformationPlan:
+    """Plan a list of rules.
+
+    Args:
+        rules: TransformationRules, in the order they apply
+        document_operations: Handlers for whole-document operations, by name
+
+    Returns:
+        Reusable plan
+    """
+    stages: List[Stage] = []
+    notes: List[str] = []
+    skipped: List[str] = []
+
+    for rule in rules:
+        operation, params = rule.operation, rule.parameters or {}
+        try:
+            if operation in ROW_OPERATIONS:
+                op = _row_operation(operation, params)
+                if op is None:
+                    skipped.append(f"{operation} without a column has no effect")
+                    continue
+                _place_row_operation(stages, op, notes)
+            elif operation == "sort_rows":
+                keys = table_sort.parse_sort_keys(params)
+                if not keys:
+                    skipped.append("sort_rows without a column has no effect")
+                    continue
+                stages.append(SortStage(keys))
+            elif operation == "transform":
+                stages.append(CaseStage(params.get("operation", "")))
+            elif operation == "merge_tables":
+                stages.append(MergeStage())
+            elif operation in document_operations:
+                stages.append(DocumentStage(operation, document_operations[operation], params))
+            else:
+                logger.warning(f"Unknown transformation operation: {operation}")
+                skipped.append(f"unknown operation {operation} skipped")
+        except Exception as e:
+            logger.error(f"Failed to plan transformation {operation}: {e}")
+            skipped.append(f"{operation} skipped: {e}")
+
+    return TransformationPlan(stages, len(rules), notes, skipped)
+
+
+def _place_row_operation(stages: List[Stage], op: RowOperation, notes: List[str]) -> None:
+    """Add a row rule to the plan, merging it into the stage it can run in."""
+    last = stages[-1] if stages else None
+
+    if isinstance(op, LimitRows) and op.limit >= 0:
+        # A limit after a sort, past 1:1 mappings, selects the top k while sorting
+        sort = last
+        if isinstance(last, ScanStage) and len(stages) > 1:
+            only_mappings = all(
+                isinstance(o, (SelectColumns, RenameColumns)) for o in last.operations
+            )
+            sort = stages[-2] if only_mappings else None
+        if isinstance(sort, SortStage):
+            sort.limit = op.limit if sort.limit is None else min(sort.limit, op.limit)
+            notes.append(f"{op.describe()} merged into the sort on {sort.columns}")
+            return
+
+    if isinstance(op, FilterRows) and isinstance(last, SortStage) and last.limit is None:
+        # Filtering keeps the relative order of rows, so it commutes with a stable sort
+        before = stages[-2] if len(stages) > 1 else None
+        if isinstance(before, ScanStage):
+            before.operations.append(op)
+        else:
+            stages.insert(len(stages) - 1, ScanStage([op]))
+        notes.append(f"{op.describe()} moved before the sort on {last.columns}")
+        return
+
+    if isinstance(last, ScanStage):
+        last.operations.append(op)
+    else:
+        stages.append(ScanStage([op]))
@@ -1,11 +1,61 @@
 """Data transformation engine for applying transformation rules."""
 
 import logging
+import re
+from bisect import bisect_right
+from itertools import accumulate
 from typing import Dict, Any, List
 from dataclasses import dataclass
 
+from src.config import get_settings
+from src.core.cache import LRUCache
+from src.services.entity_extractor import ENTITY_TYPES, extract_entities
+from src.services.table_filter import IndexRegistry
+from src.services.transformation_pipeline import (
+    DocumentOperation,
+    TransformationPlan,
+    compile_rules,
+    plan_key,
+)
+
 logger = logging.getLogger(__name__)
 
+PLAN_CACHE_ENTRIES = 256
+
+# filter_content field names, by the entity type they show or hide
+FIELD_ENTITIES = {
+    "name": "name",
+    "email": "email",
+    "phone": "phone",
+    "contact": "phone",
+    "url": "url",
+    "website": "url",
+    "link": "url",
+    "date": "date",
+    "money": "money",
+    "amount": "money",
+    "price": "money",
+}
+FIELD_LABELS = {
+    "name": "Name",
+    "email": "Email",
+    "phone": "Phone",
+    "url": "URL",
+    "date": "Date",
+    "money": "Amount",
+}
+NAME_DISQUALIFIERS = [
+    "college",
+    "university",
+    "school",
+    "education",
+    "skills",
+    "experience",
+    "contact",
+    "phone",
+    "email",
+]
+
 
 @dataclass
 class TransformationRule:
@@ -19,6 +69,15 @@ class TransformationRule:
 class TransformationService:
     """Applies data transformation rules to extracted document data."""
 
+    def __init__(self):
+        """Initialize transformation service."""
+        settings = get_settings()
+        self.engine = settings.transformation_engine
+        self.columnar_min_rows = settings.transformation_columnar_min_rows
+        self.sort_run_rows = settings.transformation_sort_run_rows
+        self._plans: LRUCache[TransformationPlan] = LRUCache(max_entries=PLAN_CACHE_ENTRIES)
+        self._indexes = IndexRegistry()
+
     def apply_transformations(
         self, data: Dict[str, Any], rules: List[TransformationRule]
     ) -> Dict[str, Any]:
@@ -31,232 +90,34 @@ class TransformationService:
         Returns:
             Transformed data
         """
-        transformed_data = data.copy()
-
-        for rule in rules:
-            try:
-                logger.info(f"Applying transformation: {rule.operation}")
-
-                if rule.operation == "select_columns":
-                    transformed_data = self._select_columns(transformed_data, rule.parameters)
-                elif rule.operation == "rename_columns":
-                    transformed_data = self._rename_columns(transformed_data, rule.parameters)
-                elif rule.operation == "filter_rows":
-                    transformed_data = self._filter_rows(transformed_data, rule.parameters)
-                elif rule.operation == "sort_rows":
-                    transformed_data = self._sort_rows(transformed_data, rule.parameters)
-                elif rule.operation == "limit_rows":
-                    transformed_data = self._limit_rows(transformed_data, rule.parameters)
-                elif rule.operation == "create_table_from_text":
-                    transformed_data = self._create_table_from_text(
-                        transformed_data, rule.parameters
-                    )
-                elif rule.operation == "merge_tables":
-                    transformed_data = self._merge_tables(transformed_data, rule.parameters)
-                elif rule.operation == "extract":
-                    transformed_data = self._extract_data(transformed_data, rule.parameters)
-                elif rule.operation == "transform":
-                    transformed_data = self._transform_data(transformed_data, rule.parameters)
-                elif rule.operation == "filter_content":
-                    transformed_data = self._filter_content(transformed_data, rule.parameters)
-                else:
-                    logger.warning(f"Unknown transformation operation: {rule.operation}")
-
-            except Exception as e:
-                logger.error(f"Failed to apply transformation {rule.operation}: {e}")
-                # Continue with other transformations
-                continue
-
-        return transformed_data
-
-    def _select_columns(self, data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
-        """Select specific columns from tables."""
-        columns_to_keep = params.get("columns", [])
-
-        if not data.get("tables"):
-            return data
-
-        transformed_tables = []
-        for table in data["tables"]:
-            if not table.get("columns"):
-                transformed_tables.append(table)
-                continue
-
-            # Filter columns
-            column_indices = []
-            new_columns = []
-
-            for i, col in enumerate(table["columns"]):
-                if col in columns_to_keep:
-                    column_indices.append(i)
-                    new_columns.append(col)
-
-            # Filter rows to keep only selected columns
-            new_rows = []
-            for row in table.get("rows", []):
-                if isinstance(row, dict):
-                    # Dict format
-                    new_row = {col: row.get(col) for col in new_columns}
-                else:
-                    # List format
-                    new_row = [row[i] for i in column_indices if i < len(row)]
-                new_rows.append(new_row)
-
-            transformed_table = table.copy()
-            transformed_table["columns"] = new_columns
-            transformed_table["rows"] = new_rows
-            transformed_table["column_count"] = len(new_columns)
-
-            transformed_tables.append(transformed_table)
-
-        result = data.copy()
-        result["tables"] = transformed_tables
-        return result
-
-    def _rename_columns(self, data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
-        """Rename columns in tables."""
-        column_mapping = params.get("mapping", {})
-
-        if not data.get("tables"):
-            return data
-
-        transformed_tables = []
-        for table in data["tables"]:
-            if not table.get("columns"):
-                transformed_tables.append(table)
-                continue
-
-            # Rename columns
-            new_columns = [column_mapping.get(col, col) for col in table["columns"]]
-
-            # Update column references in rows if they're dict format
-            new_rows = []
-            for row in table.get("rows", []):
-                if isinstance(row, dict):
-                    new_row = {column_mapping.get(k, k): v for k, v in row.items()}
-                    new_rows.append(new_row)
-                else:
-                    new_rows.append(row)  # List format unchanged
-
-            transformed_table = table.copy()
-            transformed_table["columns"] = new_columns
-            transformed_table["rows"] = new_rows
-
-            transformed_tables.append(transformed_table)
-
-        result = data.copy()
-        result["tables"] = transformed_tables
-        return result
-
-    def _filter_rows(self, data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
-        """Filter rows based on criteria."""
-        filter_column = params.get("column", "")
-        filter_value = params.get("value", "")
-        filter_operation = params.get("operation", "equals")  # equals, contains, greater_than, etc.
-
-        if not data.get("tables") or not filter_column:
-            return data
-
-        transformed_tables = []
-        for table in data["tables"]:
-            if not table.get("rows"):
-                transformed_tables.append(table)
-                continue
-
-            filtered_rows = []
-            for row in table["rows"]:
-                if isinstance(row, dict):
-                    cell_value = str(row.get(filter_column, "")).lower()
-                    filter_val_lower = str(filter_value).lower()
-
-                    should_keep = False
-                    if filter_operation == "equals":
-                        should_keep = cell_value == filter_val_lower
-                    elif filter_operation == "contains":
-                        should_keep = filter_val_lower in cell_value
-                    elif filter_operation == "starts_with":
-                        should_keep = cell_value.startswith(filter_val_lower)
-                    else:
-                        should_keep = True  # Keep all if unknown operation
-
-                    if should_keep:
-                        filtered_rows.append(row)
-                else:
-                    # For list format, we can't easily filter by column name
-                    filtered_rows.append(row)
-
-            transformed_table = table.copy()
-            transformed_table["rows"] = filtered_rows
-            transformed_table["row_count"] = len(filtered_rows)
-
-            transformed_tables.append(transformed_table)
-
-        result = data.copy()
-        result["tables"] = transformed_tables
-        return result
-
-    def _sort_rows(self, data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
-        """Sort rows by column values."""
-        sort_column = params.get("column", "")
-        sort_order = params.get("order", "asc")  # asc or desc
-
-        if not data.get("tables") or not sort_column:
-            return data
-
-        transformed_tables = []
-        for table in data["tables"]:
-            if not table.get("rows"):
-                transformed_tables.append(table)
-                continue
-
-            try:
-                # Sort rows
-                sorted_rows = sorted(
-                    table["rows"],
-                    key=lambda row: (
-                        str(row.get(sort_column, ""))
-                        if isinstance(row, dict)
-                        else str(row[0] if row else "")
-                    ),
-                    reverse=(sort_order == "desc"),
-                )
-
-                transformed_table = table.copy()
-                transformed_table["rows"] = sorted_rows
-
-                transformed_tables.append(transformed_table)
-            except Exception as e:
-                logger.warning(f"Failed to sort table: {e}")
-                transformed_tables.append(table)  # Keep original if sorting fails
-
-        result = data.copy()
-        result["tables"] = transformed_tables
-        return result
-
-    def _limit_rows(self, data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
-        """Limit the number of rows in tables."""
-        limit = params.get("limit", 10)
-
-        if not data.get("tables"):
-            return data
+        return self.compile(rules).execute(
+            data, self.engine, self.columnar_min_rows, self.sort_run_rows, self._indexes
+        )
 
-        transformed_tables = []
-        for table in data["tables"]:
-            if not table.get("rows"):
-                transformed_tables.append(table)
-                continue
+    def compile(self, rules: List[TransformationRule]) -> TransformationPlan:
+        """Get the plan for a list of rules, planning it on first use.
 
-            limited_rows = table["rows"][:limit]
-
-            transformed_table = table.copy()
-            transformed_table["rows"] = limited_rows
-            transformed_table["row_count"] = len(limited_rows)
-
-            transformed_tables.append(transformed_table)
+        Args:
+            rules: List of transformation rules
 
-        result = data.copy()
-        result["tables"] = transformed_tables
-        return result
+        Returns:
+            Plan shared by every request with the same rules
+        """
+        key = plan_key(rules)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = compile_rules(rules, self._document_operations())
+            self._plans.set(key, plan)
+            logger.info(plan.explain())
+        return plan
+
+    def _document_operations(self) -> Dict[str, DocumentOperation]:
+        """Handlers for rules that work on the whole document rather than table rows."""
+        return {
+            "create_table_from_text": self._create_table_from_text,
+            "extract": self._extract_data,
+            "filter_content": self._filter_content,
+        }
 
     def _create_table_from_text(
         self, data: Dict[str, Any], params: Dict[str, Any]
@@ -299,127 +160,54 @@ class TransformationService:
         }
 
         result = data.copy()
-        if "tables" not in result:
-            result["tables"] = []
-        result["tables"].append(new_table)
-
-        return result
-
-    def _merge_tables(self, data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
-        """Merge multiple tables into one."""
-        if not data.get("tables") or len(data["tables"]) < 2:
-            return data
-
-        # Simple merge - combine all tables with same columns
-        merged_table = {
-            "name": "Merged Data",
-            "columns": [],
-            "rows": [],
-            "row_count": 0,
-            "column_count": 0,
-        }
-
-        # Collect all unique columns
-        all_columns = set()
-        for table in data["tables"]:
-            all_columns.update(table.get("columns", []))
-
-        merged_table["columns"] = list(all_columns)
-        merged_table["column_count"] = len(all_columns)
-
-        # Merge rows
-        for table in data["tables"]:
-            for row in table.get("rows", []):
-                if isinstance(row, dict):
-                    # Ensure all columns are present
-                    merged_row = {}
-                    for col in merged_table["columns"]:
-                        merged_row[col] = row.get(col, "")
-                    merged_table["rows"].append(merged_row)
-                else:
-                    # Convert list to dict if possible
-                    merged_table["rows"].append(row)
-
-        merged_table["row_count"] = len(merged_table["rows"])
-
-        result = data.copy()
-        result["tables"] = [merged_table]  # Replace with merged table
+        result["tables"] = [*result.get("tables", []), new_table]
 
         return result
 
     def _extract_data(self, data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract specific data patterns from text."""
+        """Extract entities (by type) or a custom regex pattern from the text."""
+        entity_types = params.get("entities") or params.get("entity") or []
+        if isinstance(entity_types, str):
+            entity_types = [entity_types]
         pattern = params.get("pattern", "")
         text = data.get("text", "")
 
-        if not pattern or not text:
+        if not (entity_types or pattern) or not text:
             return data
 
-        import re
-
-        matches = re.findall(pattern, text)
-
-        if matches:
-            # Create a new table with extracted data
-            extracted_table = {
-                "name": "Extracted Data",
-                "columns": ["extracted_value"],
-                "rows": [{"extracted_value": match} for match in matches],
-                "row_count": len(matches),
-                "column_count": 1,
-            }
-
-            result = data.copy()
-            if "tables" not in result:
-                result["tables"] = []
-            result["tables"].append(extracted_table)
-            return result
-
-        return data
-
-    def _transform_data(self, data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
-        """Apply general transformations to data."""
-        operation = params.get("operation", "")
-
-        if operation == "uppercase" and data.get("text"):
-            result = data.copy()
-            result["text"] = data["text"].upper()
-            return result
-
-        elif operation == "lowercase" and data.get("text"):
-            result = data.copy()
-            result["text"] = data["text"].lower()
-            return result
+        if entity_types:
+            unknown = set(entity_types) - set(ENTITY_TYPES)
+            if unknown:
+                raise ValueError(f"Unknown entity types: {', '.join(sorted(unknown))}")
+            entities = extract_entities(text, entity_types)
+            if len(entity_types) > 1:
+                columns = ["entity_type", "extracted_value"]
+                rows = [
+                    {"entity_type": entity.type, "extracted_value": entity.text}
+                    for entity in entities
+                ]
+            else:
+                columns = ["extracted_value"]
+                rows = [{"extracted_value": entity.text} for entity in entities]
+        else:
+            columns = ["extracted_value"]
+            rows = [{"extracted_value": match} for match in re.findall(pattern, text)]
 
-        # For table transformations
-        if data.get("tables"):
-            transformed_tables = []
-            for table in data["tables"]:
-                if operation == "uppercase" and table.get("rows"):
-                    # Transform all string values to uppercase
-                    transformed_rows = []
-                    for row in table["rows"]:
-                        if isinstance(row, dict):
-                            transformed_row = {}
-                            for key, value in row.items():
-                                if isinstance(value, str):
-                                    transformed_row[key] = value.upper()
-                                else:
-                                    transformed_row[key] = value
-                            transformed_rows.append(transformed_row)
-                        else:
-                            transformed_rows.append(row)
-                    transformed_table = table.copy()
-                    transformed_table["rows"] = transformed_rows
-                    transformed_tables.append(transformed_table)
-                else:
-                    transformed_tables.append(table)
+        if not rows:
+            return data
 
-            result = data.copy()
-            result["tables"] = transformed_tables
-            return result
+        # Create a new table with extracted data
+        extracted_table = {
+            "name": "Extracted Data",
+            "columns": columns,
+            "rows": rows,
+            "row_count": len(rows),
+            "column_count": len(columns),
+        }
 
-        return data
+        result = data.copy()
+        result["tables"] = [*result.get("tables", []), extracted_table]
+        return result
 
     def _filter_content(self, data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
         """Filter content to show only specific fields or hide unwanted content."""
@@ -433,89 +221,24 @@ class TransformationService:
         if not text:
             return data
 
-        import re
+        # One scan gives the spans of every requested field
+        shown = [FIELD_ENTITIES[f.lower()] for f in fields_to_show if f.lower() in FIELD_ENTITIES]
+        entities = extract_entities(text, shown)
 
-        # Extract specific fields from the entire text
         extracted_info = {}
-
-        if fields_to_show:
-            # Process each field type individually
-            for field in fields_to_show:
-                field_lower = field.lower()
-
-                if field_lower == "name":
-                    # Enhanced name detection patterns - prioritize longer, more complete names
-                    name_patterns = [
-                        r"\b([A-Z][a-z]+\s+[A-Z]\.\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b",  # First M. Last (with middle names)
-                        r"\b([A-Z][a-z]+\s+[A-Z][a-z]+\s+[A-Z][a-z]+)\b",  # First Middle Last
-                        r"\b([A-Z][a-z]+\s+[A-Z]\.\s+[A-Z][a-z]+)\b",  # First M. Last
-                        r"\b([A-Z][a-z]+\s+[A-Z][a-z]+)\b",  # First Last
-                        r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)\b",  # Multiple words starting with caps
-                    ]
-
-                    all_matches = []
-                    for pattern in name_patterns:
-                        matches = re.findall(pattern, text)
-                        all_matches.extend(matches)
-
-                    if all_matches:
-                        # Filter out obvious non-names and sort by length (prefer longer names)
-                        valid_names = []
-                        for match in all_matches:
-                            match_lower = match.lower()
-                            # Skip if it contains disqualifying words
-                            disqualifiers = [
-                                "college",
-                                "university",
-                                "school",
-                                "education",
-                                "skills",
-                                "experience",
-                                "contact",
-                                "phone",
-                                "email",
-                            ]
-
-                            if not any(skip in match_lower for skip in disqualifiers):
-                                # Additional validation: should have at least 2 parts and not be too long
-                                parts = match.split()
-                                if 2 <= len(parts) <= 4:  # Reasonable name length
-                                    valid_names.append(match)
-
-                        if valid_names:
-                            # Sort by length (prefer more complete names) and take the first one
-                            valid_names.sort(key=len, reverse=True)
-                            extracted_info["name"] = valid_names[0]
-
-                elif field_lower == "email":
-                    # Email pattern
-                    email_pattern = r"\b([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})\b"
-                    matches = re.findall(email_pattern, text)
-                    if matches:
-                        extracted_info["email"] = matches[0]  # Take first email
-
-                elif field_lower in ["phone", "contact"]:
-                    # Phone pattern
-                    phone_pattern = r"\b(\+?\d{1,3}[-.\s]?\d{3}[-.\s]?\d{3,4}[-.\s]?\d{3,4})\b"
-                    matches = re.findall(phone_pattern, text)
-                    if matches:
-                        extracted_info["phone"] = matches[0]
+        for entity_type in dict.fromkeys(shown):
+            values = [entity.text for entity in entities if entity.type == entity_type]
+            if entity_type == "name":
+                values = _likely_names(values)
+            if values:
+                extracted_info[entity_type] = values[0]
 
         # Create filtered result
         if extracted_info:
             # Format as clean, readable text
-            filtered_lines = []
-            for field, value in extracted_info.items():
-                if field == "name":
-                    filtered_lines.append(f"Name: {value}")
-                elif field == "email":
-                    filtered_lines.append(f"Email: {value}")
-                elif field == "phone":
-                    filtered_lines.append(f"Phone: {value}")
-                else:
-                    filtered_lines.append(f"{field.title()}: {value}")
-
-            filtered_text = "\n".join(filtered_lines)
+            filtered_text = "\n".join(
+                f"{FIELD_LABELS[field]}: {value}" for field, value in extracted_info.items()
+            )
 
             result = data.copy()
             result["text"] = filtered_text
@@ -527,130 +250,23 @@ class TransformationService:
 
             return result
 
-        # Fallback: if no specific fields found, return original approach
+        # Fallback: keep the lines that hold none of the excluded fields
+        excluded = [
+            FIELD_ENTITIES[f.lower()] for f in fields_to_exclude if f.lower() in FIELD_ENTITIES
+        ]
         lines = text.split("\n")
-        filtered_lines = []
-
-        for line in lines:
-            line_lower = line.lower().strip()
-            should_include = True
-
-            if fields_to_exclude:
-                for field in fields_to_exclude:
-                    field_lower = field.lower()
-                    if field_lower == "phone" and any(
-                        indicator in line_lower for indicator in ["phone", "+63", "967", "contact"]
-                    ):
-                        should_include = False
-                        break
-                    elif field_lower == "email" and "@" in line:
-                        should_include = False
-                        break
-
-            if should_include and line.strip():
-                filtered_lines.append(line)
-
-        if filtered_lines:
-            filtered_text = "\n".join(filtered_lines)
-
-            result = data.copy()
-            result["text"] = filtered_text
-            result["filter_applied"] = True
-            result["original_lines"] = len(lines)
-            result["filtered_lines"] = len(filtered_lines)
-            result["filter_description"] = (
-                f"Filtered to show: {', '.join(fields_to_show) if fields_to_show else 'excluding: ' + ', '.join(fields_to_exclude)}"
-            )
-
-            return result
-
-        return data
-
-        text = data.get("text", "")
-        if not text:
-            return data
-
-        lines = text.split("\n")
-        filtered_lines = []
-
-        # Process each line
-        for line in lines:
-            line_lower = line.lower().strip()
-            should_include = True
-
-            if fields_to_show:
-                # Include only lines that match the requested fields
-                should_include = False
-
-                for field in fields_to_show:
-                    field_lower = field.lower()
-
-                    if field_lower == "name":
-                        # Look for name-like patterns (short lines, no special chars)
-                        if (
-                            len(line.strip()) < 50
-                            and not any(char in line for char in ["@", "+", "•", ":"])
-                            and not any(
-                                word in line_lower
-                                for word in [
-                                    "phone",
-                                    "email",
-                                    "contact",
-                                    "address",
-                                    "skills",
-                                    "education",
-                                ]
-                            )
-                        ):
-                            should_include = True
-                            break
-
-                    elif field_lower == "email":
-                        # Look for email patterns
-                        if "@" in line and any(
-                            domain in line_lower for domain in [".com", ".org", ".net", ".edu"]
-                        ):
-                            should_include = True
-                            break
-
-                    elif field_lower in ["phone", "contact"]:
-                        # Look for phone/contact patterns
-                        if any(
-                            indicator in line_lower
-                            for indicator in ["phone", "+", "contact", "mobile"]
-                        ):
-                            should_include = True
-                            break
-
-            elif fields_to_exclude:
-                # Exclude lines that match the fields to hide
-                for field in fields_to_exclude:
-                    field_lower = field.lower()
-
-                    if field_lower == "phone":
-                        if any(
-                            indicator in line_lower
-                            for indicator in ["phone", "+63", "967", "contact"]
-                        ):
-                            should_include = False
-                            break
-
-                    elif field_lower == "email":
-                        if "@" in line:
-                            should_include = False
-                            break
-
-            if should_include and line.strip():
-                filtered_lines.append(line)
+        line_starts = list(accumulate((len(line) + 1 for line in lines[:-1]), initial=0))
+        dropped = {
+            bisect_right(line_starts, entity.start) - 1
+            for entity in extract_entities(text, excluded)
+        }
+        filtered_lines = [line for i, line in enumerate(lines) if i not in dropped and line.strip()]
 
-        # Create filtered result
         if filtered_lines:
             filtered_text = "\n".join(filtered_lines)
 
             result = data.copy()
             result["text"] = filtered_text
-
-            # Add metadata about filtering
             result["filter_applied"] = True
             result["original_lines"] = len(lines)
             result["filtered_lines"] = len(filtered_lines)
@@ -662,63 +278,20 @@ class TransformationService:
 
         return data
 
-        text = data.get("text", "")
-        if not text:
-            return data
-
-        # For "show only" filtering, we need to identify and extract relevant sections
-        filtered_parts = []
-
-        if fields_to_show:
-            # Extract specific field information
-            for field in fields_to_show:
-                if field.lower() in ["name", "email"]:
-                    # Try to find name and email patterns in the text
-                    lines = text.split("\n")
-                    for line in lines:
-                        line_lower = line.lower().strip()
-                        if field.lower() == "name" and any(
-                            keyword in line_lower for keyword in ["rachel", "afif", "y.", "y "]
-                        ):
-                            # Look for name-like content
-                            if len(line.strip()) < 50 and not any(
-                                x in line_lower for x in ["@", "phone", "email", "contact"]
-                            ):
-                                filtered_parts.append(f"Name: {line.strip()}")
-                        elif field.lower() == "email" and "@" in line:
-                            # Extract email lines
-                            filtered_parts.append(f"Email: {line.strip()}")
-
-        elif fields_to_exclude:
-            # Remove specific field information
-            lines = text.split("\n")
-            for line in lines:
-                line_lower = line.lower()
-                should_exclude = False
-
-                for field in fields_to_exclude:
-                    if field.lower() == "phone" and any(
-                        keyword in line_lower for keyword in ["phone", "+63", "967"]
-                    ):
-                        should_exclude = True
-                        break
-
-                if not should_exclude:
-                    filtered_parts.append(line)
-
-        # Create filtered result
-        if filtered_parts:
-            filtered_text = "\n".join(filtered_parts)
 
-            result = data.copy()
-            result["text"] = filtered_text
-
-            # Add a note about filtering
-            result["filter_applied"] = True
-            result["filter_description"] = (
-                f"Filtered to show: {', '.join(fields_to_show) if fields_to_show else 'excluding: ' + ', '.join(fields_to_exclude)}"
-            )
-
-            return result
-
-        return data
+def _likely_names(candidates: List[str]) -> List[str]:
+    """Capitalized phrases that look like a person's name, most complete first."""
+    names = []
+    for candidate in candidates:
+        candidate_lower = candidate.lower()
+        # Skip if it contains disqualifying words
+        if any(skip in candidate_lower for skip in NAME_DISQUALIFIERS):
+            continue
+        parts = candidate.split()
+        if len(parts) > 4:
+            # A long run of capitalized words: its first three are the likeliest name
+            parts = parts[:3]
+        if len(parts) >= 2:
+            names.append(" ".join(parts))
+    # Sort by length (prefer more complete names); the sort keeps text order for ties
+    return sorted(names, key=len, reverse=True)
@@ -0,0 +1,99 @@
+"""Streaming uploads to disk.
+
+Uploaded files are copied to a spool file in fixed-size chunks rather than
+read into memory whole: the size limit is enforced as bytes arrive and the
+SHA-256 is computed on the way through, so memory per upload stays
+constant and the extractor gets a path (and hash) instead of a second copy
+of the content.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import UploadFile
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """An upload exceeded the size limit while it was being spooled."""
+
+
+@dataclass
+class SpooledUpload:
+    """An upload copied to disk."""
+
+    path: str
+    filename: str
+    content_type: Optional[str]
+    size: int
+    sha256: str
+
+    def cleanup(self) -> None:
+        """Delete the spool file."""
+        remove_spool_file(self.path)
+
+
+def remove_spool_file(path: str) -> None:
+    """Delete a spool file, logging (not raising) on failure."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Failed to clean up upload {path}: {e}")
+
+
+async def spool_upload(file: UploadFile, max_bytes: Optional[int] = None) -> SpooledUpload:
+    """Copy an upload to a spool file in chunks.
+
+    Args:
+        file: Uploaded file
+        max_bytes: Size limit (defaults to MAX_UPLOAD_MB)
+
+    Returns:
+        The spooled upload; the caller owns (and must clean up) its file
+
+    Raises:
+        UploadTooLargeError: If the upload is larger than max_bytes
+    """
+    settings = get_settings()
+    max_bytes = max_bytes or settings.max_upload_mb * 1024 * 1024
+    filename = file.filename or "uploaded_file"
+    suffix = os.path.splitext(filename)[1].lower()
+
+    digest = hashlib.sha256()
+    size = 0
+    spool = tempfile.NamedTemporaryFile(
+        delete=False, suffix=suffix, prefix="upload-", dir=settings.upload_spool_dir
+    )
+    try:
+        with spool:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"File '{filename}' too large. Maximum size: {max_bytes // (1024 * 1024)}MB"
+                    )
+                digest.update(chunk)
+                await asyncio.to_thread(spool.write, chunk)
+    except BaseException:
+        remove_spool_file(spool.name)
+        raise
+
+    return SpooledUpload(
+        path=spool.name,
+        filename=filename,
+        content_type=file.content_type,
+        size=size,
+        sha256=digest.hexdigest(),
+    )
@@ -80,3 +80,116 @@ async def auth_headers(client: TestClient) -> dict:
     access_token = data["access_token"]
 
     return {"Authorization": f"Bearer {access_token}"}
+
+
+class StubRedis:
+    """In-memory stand-in for the asyncio Redis client (strings, hashes, sorted sets).
+
+    Set ``fail`` to make every command raise, as an unreachable server would.
+    """
+
+    def __init__(self):
+        self.data: dict = {}
+        self.fail = False
+
+    def _check(self) -> None:
+        if self.fail:
+            raise ConnectionError("Redis unavailable")
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self._check()
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, nx=False, px=None, ex=None):
+        self._check()
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value)
+        return True
+
+    async def delete(self, *keys):
+        self._check()
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def exists(self, key):
+        self._check()
+        return int(key in self.data)
+
+    async def expire(self, key, seconds):
+        self._check()
+        return key in self.data
+
+    async def hget(self, key, field):
+        self._check()
+        return self.data.get(key, {}).get(field)
+
+    async def hset(self, key, mapping):
+        self._check()
+        self.data.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+        return len(mapping)
+
+    async def hgetall(self, key):
+        self._check()
+        return dict(self.data.get(key, {}))
+
+    async def incrby(self, key, amount):
+        self._check()
+        self.data[key] = str(int(self.data.get(key, 0)) + amount)
+        return int(self.data[key])
+
+    async def decrby(self, key, amount):
+        return await self.incrby(key, -amount)
+
+    async def zadd(self, key, mapping):
+        self._check()
+        self.data.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    async def zrange(self, key, start, end):
+        self._check()
+        members = sorted(self.data.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+        return [member for member, _ in members[start : None if end == -1 else end + 1]]
+
+    async def zrem(self, key, member):
+        self._check()
+        return int(self.data.get(key, {}).pop(member, None) is not None)
+
+    async def eval(self, script, numkeys, key, token):
+        # Only the compare-and-delete lock release script is used
+        self._check()
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    def pipeline(self, transaction=True):
+        return StubPipeline(self)
+
+
+class StubPipeline:
+    """Queues StubRedis commands and runs them on execute()."""
+
+    def __init__(self, client: StubRedis):
+        self.client = client
+        self.commands: list = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.client, name), args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        self.client._check()
+        return [await command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+@pytest.fixture
+def stub_redis() -> StubRedis:
+    """Empty in-memory Redis; patch it into the module under test."""
+    return StubRedis()
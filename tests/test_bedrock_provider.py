@@ -0,0 +1,81 @@
+"""Tests for Bedrock calls on the shared thread pool."""
+
+import asyncio
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.llm import bedrock_provider
+from src.llm.base import LLMMessage
+from src.llm.bedrock_provider import BedrockProvider
+
+
+class StubBedrock:
+    """bedrock-runtime client whose calls block until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = 0
+        self.finished = 0
+        self.lock = threading.Lock()
+
+    def invoke_model(self, modelId, body):
+        with self.lock:
+            self.started += 1
+        self.release.wait(5)
+        with self.lock:
+            self.finished += 1
+        payload = {
+            "content": [{"text": "hi"}],
+            "usage": {"input_tokens": 3, "output_tokens": 1},
+            "stop_reason": "end_turn",
+        }
+        return {"body": io.BytesIO(json.dumps(payload).encode())}
+
+
+@pytest.fixture
+def provider(monkeypatch) -> tuple[BedrockProvider, StubBedrock]:
+    client = StubBedrock()
+    monkeypatch.setattr(bedrock_provider, "_get_client", lambda region, connections: client)
+    # A pool wider than the limit, so only the provider's slots hold calls back
+    monkeypatch.setattr(bedrock_provider, "_executor", ThreadPoolExecutor(max_workers=4))
+    yield BedrockProvider(max_concurrency=1), client
+    client.release.set()
+
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+class TestConcurrencyLimit:
+    """Test that max_concurrency bounds calls running on the pool."""
+
+    async def test_cancelled_caller_keeps_its_slot_until_the_call_ends(self, provider):
+        """Test that cancelling a caller does not let another call start beside its thread."""
+        provider, client = provider
+        messages = [LLMMessage(role="user", content="hello")]
+
+        first = asyncio.create_task(provider.generate(messages))
+        await wait_for(lambda: client.started == 1)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        second = asyncio.create_task(provider.generate(messages))
+        await asyncio.sleep(0.1)
+        assert client.started == 1  # Still running the abandoned call
+
+        client.release.set()
+        response = await asyncio.wait_for(second, 2)
+
+        assert response.content == "hi"
+        assert response.total_tokens == 4
+        assert client.finished == 2
+        assert provider.semaphore._value == 1
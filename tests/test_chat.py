@@ -1,5 +1,7 @@
 """Tests for chat endpoints."""
 
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -114,6 +116,120 @@ class TestChat:
         # Should have at least user and assistant messages
         assert len(data["messages"]) >= 2
 
+    def test_paginate_messages(self, client: TestClient, auth_headers: dict):
+        """Test keyset pagination through conversation messages."""
+        response = client.post(
+            "/api/v1/chat/conversations", json={"title": "Pagination Test"}, headers=auth_headers
+        )
+        conversation_id = response.json()["id"]
+
+        for question in ["What is Python?", "What is a list?"]:
+            client.post(
+                f"/api/v1/chat/conversations/{conversation_id}/messages",
+                json={"content": question},
+                headers=auth_headers,
+            )
+
+        url = f"/api/v1/chat/conversations/{conversation_id}/messages"
+
+        # Most recent page
+        response = client.get(f"{url}?limit=2", headers=auth_headers)
+        assert response.status_code == 200
+        latest = response.json()
+        assert len(latest["messages"]) == 2
+        assert latest["has_more"] is True
+        assert latest["messages"][-1]["role"] == "assistant"
+
+        # Scroll back from the oldest message on the page
+        oldest_id = latest["messages"][0]["id"]
+        response = client.get(f"{url}?limit=2&before={oldest_id}", headers=auth_headers)
+        assert response.status_code == 200
+        earlier = response.json()
+        assert len(earlier["messages"]) == 2
+        assert earlier["has_more"] is False
+        assert earlier["messages"][0]["content"] == "What is Python?"
+        assert {m["id"] for m in earlier["messages"]}.isdisjoint(
+            {m["id"] for m in latest["messages"]}
+        )
+
+        # And forward again
+        newest_earlier_id = earlier["messages"][-1]["id"]
+        response = client.get(f"{url}?limit=10&after={newest_earlier_id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert [m["id"] for m in response.json()["messages"]] == [
+            m["id"] for m in latest["messages"]
+        ]
+
+        # Conflicting cursors are rejected
+        response = client.get(
+            f"{url}?before={oldest_id}&after={oldest_id}", headers=auth_headers
+        )
+        assert response.status_code == 400
+
+    def test_get_conversation_message_limit(self, client: TestClient, auth_headers: dict):
+        """Test limiting messages returned with a conversation."""
+        response = client.post(
+            "/api/v1/chat/conversations", json={"title": "Limit Test"}, headers=auth_headers
+        )
+        conversation_id = response.json()["id"]
+
+        client.post(
+            f"/api/v1/chat/conversations/{conversation_id}/messages",
+            json={"content": "What is Python?"},
+            headers=auth_headers,
+        )
+
+        response = client.get(
+            f"/api/v1/chat/conversations/{conversation_id}?message_limit=1", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["messages"]) == 1
+        assert data["messages"][0]["role"] == "assistant"
+        assert data["token_stats"]["message_count"] == 2
+
+    def test_stream_message_and_resume(self, client: TestClient, auth_headers: dict):
+        """Test SSE streaming and resuming a stream by message id."""
+        response = client.post(
+            "/api/v1/chat/conversations", json={"title": "Stream Test"}, headers=auth_headers
+        )
+        conversation_id = response.json()["id"]
+
+        response = client.post(
+            f"/api/v1/chat/conversations/{conversation_id}/messages/stream",
+            json={"content": "Say hello"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = [e for e in response.text.split("\n\n") if e.strip()]
+        start = json.loads(events[0].split("data: ", 1)[1])
+        assert "event: start" in events[0]
+        message_id = start["message_id"]
+
+        chunks = [
+            json.loads(e.split("data: ", 1)[1])["content"]
+            for e in events
+            if e.startswith("id: ") and "event:" not in e
+        ]
+        assert len(chunks) > 0
+        assert events[-1] == "data: [DONE]"
+
+        # Resume after the first chunk: exactly the chunks after it are replayed
+        response = client.get(
+            f"/api/v1/chat/conversations/{conversation_id}/messages/{message_id}/stream",
+            headers={**auth_headers, "Last-Event-ID": "1"},
+        )
+        assert response.status_code == 200
+        resumed = [e for e in response.text.split("\n\n") if e.startswith("id: ")]
+        assert [int(e.split("\n", 1)[0][len("id: ") :]) for e in resumed] == list(
+            range(2, len(chunks) + 1)
+        )
+        assert [json.loads(e.split("data: ", 1)[1])["content"] for e in resumed] == chunks[1:]
+
     def test_unauthorized_access(self, client: TestClient):
         """Test accessing chat endpoints without authentication."""
         response = client.post("/api/v1/chat/conversations", json={"title": "Test"})
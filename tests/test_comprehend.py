@@ -0,0 +1,126 @@
+"""Tests for chunked Comprehend analysis."""
+
+import re
+
+from src.core.cache import LRUCache
+from src.services.comprehend_analyzer import MAX_CHUNK_BYTES, ComprehendAnalyzer, chunk_text
+
+
+class StubComprehend:
+    """Comprehend stand-in: every capitalized word is an entity, sentiment by keyword."""
+
+    def __init__(self):
+        self.calls = {"entities": [], "key_phrases": [], "sentiment": []}
+
+    def batch_detect_entities(self, TextList, LanguageCode):
+        self.calls["entities"].append(len(TextList))
+        return {
+            "ResultList": [
+                {
+                    "Index": index,
+                    "Entities": [
+                        {"Text": m.group(), "BeginOffset": m.start(), "EndOffset": m.end()}
+                        for m in re.finditer(r"\b[A-Z][a-z]+\b", text)
+                    ],
+                }
+                for index, text in enumerate(TextList)
+            ],
+            "ErrorList": [],
+        }
+
+    def batch_detect_key_phrases(self, TextList, LanguageCode):
+        self.calls["key_phrases"].append(len(TextList))
+        results, errors = [], []
+        for index, text in enumerate(TextList):
+            if "broken" in text:
+                errors.append({"Index": index, "ErrorCode": "INTERNAL_SERVER_ERROR"})
+            else:
+                results.append({"Index": index, "KeyPhrases": []})
+        return {"ResultList": results, "ErrorList": errors}
+
+    def batch_detect_sentiment(self, TextList, LanguageCode):
+        self.calls["sentiment"].append(len(TextList))
+        results = []
+        for index, text in enumerate(TextList):
+            positive = 0.9 if "great" in text else 0.1
+            results.append(
+                {
+                    "Index": index,
+                    "Sentiment": "POSITIVE" if positive > 0.5 else "NEUTRAL",
+                    "SentimentScore": {"Positive": positive, "Neutral": 1 - positive},
+                }
+            )
+        return {"ResultList": results, "ErrorList": []}
+
+
+class TestChunking:
+    """Test sentence-aligned chunking."""
+
+    def test_chunks_cover_text_within_byte_limit(self):
+        """Test that chunks respect the byte limit, end on sentences and map back to the text."""
+        text = " ".join(f"Sentence number {i} mentions café Zürich." for i in range(2000))
+        chunks = chunk_text(text)
+
+        assert len(chunks) > 1
+        for start, chunk in chunks:
+            assert len(chunk.encode("utf-8")) <= MAX_CHUNK_BYTES
+            assert text[start : start + len(chunk)] == chunk
+            assert chunk.rstrip().endswith(".")
+        assert "".join(chunk for _, chunk in chunks) == text
+
+    def test_oversized_sentence_is_split(self):
+        """Test text without sentence breaks, including a single huge word."""
+        text = "word " * 3000 + "x" * 12000
+        chunks = chunk_text(text, max_bytes=1000)
+
+        assert all(len(chunk.encode("utf-8")) <= 1000 for _, chunk in chunks)
+        assert "".join(chunk for _, chunk in chunks) == text
+
+
+class TestComprehendAnalyzer:
+    """Test batched whole-document analysis."""
+
+    async def test_whole_document_is_analyzed_in_batches(self):
+        """Test that entities past 5,000 characters are found at document offsets."""
+        text = "".join(
+            f"Entry {i} was filed by Alice. " if i % 500 else f"Entry {i} is great. "
+            for i in range(5000)
+        )
+        client = StubComprehend()
+        analyzer = ComprehendAnalyzer(client, max_concurrency=3, cache=LRUCache())
+
+        result = await analyzer.analyze(text)
+
+        chunks = len(chunk_text(text))
+        assert result["chunks"] == chunks > 25
+        assert client.calls["entities"] == [25] * (chunks // 25) + [chunks % 25]
+        last = result["entities"][-1]
+        assert last["BeginOffset"] > 5000
+        assert text[last["BeginOffset"] : last["EndOffset"]] == last["Text"] == "Alice"
+        assert result["sentiment"] == "NEUTRAL"
+        assert 0.1 < result["sentiment_scores"]["Positive"] < 0.5
+        assert result["failed_chunks"] == 0
+
+    async def test_repeated_chunks_are_cached(self):
+        """Test that a second analysis of the same text makes no calls."""
+        client = StubComprehend()
+        analyzer = ComprehendAnalyzer(client, cache=LRUCache())
+        text = "Bob wrote a great report. " * 400
+
+        first = await analyzer.analyze(text)
+        calls = sum(len(batches) for batches in client.calls.values())
+        second = await analyzer.analyze(text)
+
+        assert sum(len(batches) for batches in client.calls.values()) == calls
+        assert second["entities"] == first["entities"]
+        assert second["units"] == 0
+        assert second["sentiment"] == "POSITIVE"
+
+    async def test_failed_chunks_are_reported(self):
+        """Test that per-document batch errors are counted, not raised."""
+        analyzer = ComprehendAnalyzer(StubComprehend(), cache=LRUCache())
+
+        result = await analyzer.analyze("This part is fine. " * 300 + "This one is broken.")
+
+        assert result["failed_chunks"] == 1
+        assert result["key_phrases"] == []
@@ -0,0 +1,216 @@
+"""Tests for token-budgeted chat context assembly."""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm.base import LLMResponse
+from src.models.conversation import Conversation
+from src.models.message import Message
+from src.services.context_builder import CURRENT_MESSAGE_MIN_SHARE, ContextBuilder
+
+START = datetime(2024, 1, 1)
+
+
+class StubLLMService:
+    """Summarizes by counting what it was asked to fold, or fails."""
+
+    def __init__(self, fail: bool = False):
+        self.providers = [
+            SimpleNamespace(provider_name="groq", model="llama-3.1-8b-instant", max_tokens=1024)
+        ]
+        self.fail = fail
+        self.prompts: list[str] = []
+
+    async def generate(self, messages, **kwargs) -> LLMResponse:
+        self.prompts.append(messages[0].content)
+        if self.fail:
+            raise RuntimeError("LLM down")
+        return LLMResponse(content=f"summary {len(self.prompts)}", provider="groq", model="m")
+
+
+def history(*lengths: int) -> list[Message]:
+    """Alternating user/assistant messages of the given lengths in characters."""
+    return [
+        Message(
+            role="user" if index % 2 == 0 else "assistant",
+            content=f"{index}:" + "x" * length,
+            created_at=START + timedelta(minutes=index),
+        )
+        for index, length in enumerate(lengths)
+    ]
+
+
+def make_builder(budget: int = 200, service: StubLLMService = None) -> ContextBuilder:
+    return ContextBuilder(service or StubLLMService(), token_budget=budget, summary_max_tokens=50)
+
+
+def tokens(builder: ContextBuilder, messages) -> int:
+    return sum(builder.counter.count_message(m) for m in messages)
+
+
+class TestPack:
+    """Test selecting the newest messages that fit."""
+
+    def test_everything_fits(self):
+        """Test that a short history is sent whole, in order."""
+        builder = make_builder()
+        messages = history(10, 10, 10)
+
+        packed, overflow = builder.pack(messages)
+
+        assert [m.content for m in packed] == [m.content for m in messages]
+        assert overflow == []
+
+    def test_oldest_messages_overflow(self):
+        """Test that the newest messages are kept and older ones returned as overflow."""
+        builder = make_builder(budget=100)
+        messages = history(150, 150, 150, 150, 10)  # About 47 tokens each
+
+        packed, overflow = builder.pack(messages)
+
+        assert [m.content for m in packed] == [m.content for m in messages[3:]]
+        assert overflow == messages[:3]
+        assert tokens(builder, packed) <= builder.budget
+
+    def test_overflow_stops_at_the_first_gap(self):
+        """Test that an older short message is not packed past a long one."""
+        builder = make_builder(budget=100)
+        messages = history(10, 1000, 10)
+
+        packed, overflow = builder.pack(messages)
+
+        assert [m.content for m in packed] == [messages[2].content]
+        assert overflow == messages[:2]
+
+    def test_oversized_current_message_is_truncated(self):
+        """Test that the message being answered is always sent, cut to the budget."""
+        builder = make_builder(budget=100)
+
+        packed, overflow = builder.pack(history(10, 10, 2000))
+
+        assert len(packed) == 1
+        assert "...[truncated]..." in packed[0].content
+        assert packed[0].content.startswith("2:")
+        assert tokens(builder, packed) <= builder.budget
+        assert len(overflow) == 2
+
+    def test_summary_is_sent_first(self):
+        """Test that the rolling summary leads the context as a system message."""
+        builder = make_builder()
+
+        packed, _ = builder.pack(history(10, 10), summary="Earlier, the user asked about X.")
+
+        assert packed[0].role == "system"
+        assert packed[0].content.endswith("Earlier, the user asked about X.")
+        assert len(packed) == 3
+
+    def test_long_summary_leaves_the_current_message_its_share(self):
+        """Test that an over-budget summary is cut before the current message is."""
+        builder = make_builder(budget=100)
+        minimum = int(builder.budget * CURRENT_MESSAGE_MIN_SHARE)
+
+        packed, overflow = builder.pack(history(10, 2000), summary="s" * 2000)
+
+        summary, current = packed
+        assert "...[truncated]..." in summary.content
+        assert builder.counter.count_message(current) >= minimum - 1
+        assert current.content.startswith("1:")
+        assert tokens(builder, packed) <= builder.budget + 1
+        assert len(overflow) == 1
+
+    def test_short_current_message_is_not_truncated_by_a_long_summary(self):
+        """Test that the current message stays whole when it is within its share."""
+        builder = make_builder(budget=100)
+        messages = history(10, 20)
+
+        packed, _ = builder.pack(messages, summary="s" * 2000)
+
+        assert packed[-1].content == messages[-1].content
+
+
+class TestBuild:
+    """Test folding overflow into the rolling summary."""
+
+    async def test_no_overflow_leaves_the_summary_alone(self):
+        """Test that nothing is summarized while the history fits."""
+        service = StubLLMService()
+        builder = make_builder(service=service)
+
+        context = await builder.build(Conversation(), history(10, 10))
+
+        assert (context.summary, context.summary_until) == (None, None)
+        assert service.prompts == []
+
+    async def test_overflow_is_folded_with_the_chat_services_llm(self):
+        """Test that overflow is summarized through the builder's service and sent first."""
+        service = StubLLMService()
+        builder = make_builder(budget=400, service=service)
+        messages = history(*[300] * 6, 10)
+
+        context = await builder.build(Conversation(summary="old"), messages)
+
+        assert len(service.prompts) == 1
+        assert "old" in service.prompts[0]
+        assert context.summary == "summary 1"
+        assert context.messages[0].content.endswith("summary 1")
+        folded = len(messages) - len(context.messages)  # Summary replaces the folded turns
+        assert context.summary_until == messages[folded].created_at
+        assert tokens(builder, context.messages) <= builder.budget
+
+    async def test_large_overflow_is_folded_in_budget_sized_batches(self):
+        """Test that no summarization prompt exceeds the budget."""
+        service = StubLLMService()
+        builder = make_builder(budget=300, service=service)
+        messages = history(*[300] * 12, 10)
+
+        context = await builder.build(Conversation(), messages)
+
+        assert len(service.prompts) > 1
+        assert all(builder.counter.count(prompt) <= builder.budget for prompt in service.prompts)
+        assert all(f"summary {n}" in service.prompts[n] for n in range(1, len(service.prompts)))
+        assert context.summary == f"summary {len(service.prompts)}"
+
+    async def test_oversized_overflow_message_is_truncated_to_fit(self):
+        """Test that a single huge message is cut to fit its summarization prompt."""
+        service = StubLLMService()
+        builder = make_builder(budget=300, service=service)
+
+        await builder.build(Conversation(), history(5000, 10, 10))
+
+        assert builder.counter.count(service.prompts[0]) <= builder.budget
+        assert "...[truncated]..." in service.prompts[0]
+
+    async def test_failed_summarization_keeps_the_old_summary(self):
+        """Test that a failing LLM drops overflow for this turn without a summary update."""
+        service = StubLLMService(fail=True)
+        builder = make_builder(budget=100, service=service)
+        messages = history(150, 150, 150, 150, 10)
+
+        context = await builder.build(Conversation(summary="old"), messages)
+
+        assert (context.summary, context.summary_until) == (None, None)
+        assert context.messages[0].content.endswith("old")
+
+    async def test_summarize_false_skips_the_llm(self):
+        """Test that callers can opt out of folding."""
+        service = StubLLMService()
+        builder = make_builder(budget=100, service=service)
+
+        context = await builder.build(Conversation(), history(150, 150, 150, 10), summarize=False)
+
+        assert context.summary is None
+        assert service.prompts == []
+
+
+@pytest.mark.parametrize("budget, tightest", [(50, "groq"), (8000, "x")])
+def test_budget_is_capped_by_the_tightest_window(budget, tightest):
+    """Test that the budget never exceeds a provider's window minus its output."""
+    service = StubLLMService()
+    service.providers.append(SimpleNamespace(provider_name="x", model="unknown", max_tokens=4096))
+
+    builder = ContextBuilder(service, token_budget=budget)
+
+    assert builder.budget == min(budget, 8192 - 4096)
+    assert builder.counter.provider == tightest
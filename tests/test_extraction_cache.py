@@ -0,0 +1,171 @@
+"""Tests for the content-addressed extraction result cache."""
+
+import itertools
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import extraction_cache
+from src.services.extraction_cache import (
+    BYTES_KEY,
+    REDIS_KEY_PREFIX,
+    ExtractionCache,
+    LocalBlobStore,
+    cache_key,
+)
+from src.services.extraction_service import ExtractionService
+
+SHA = "ab" * 32
+
+
+class FailingBlobStore:
+    """Blob store whose every operation fails, like an unreachable bucket."""
+
+    def read(self, key):
+        raise OSError("blob store unavailable")
+
+    def write(self, key, data):
+        raise OSError("blob store unavailable")
+
+    def delete(self, key):
+        raise OSError("blob store unavailable")
+
+
+@pytest.fixture
+def cache(stub_redis, monkeypatch, tmp_path) -> ExtractionCache:
+    monkeypatch.setattr(extraction_cache, "get_async_redis", lambda: stub_redis)
+    # A strictly increasing clock, so LRU order never depends on timer resolution
+    clock = itertools.count(1)
+    monkeypatch.setattr(extraction_cache, "time", SimpleNamespace(time=lambda: next(clock)))
+    return ExtractionCache(LocalBlobStore(str(tmp_path / "blobs")), max_bytes=10_000)
+
+
+def result(size: int = 0) -> dict:
+    # Random hex compresses to a little over ``size`` bytes
+    return {"text": os.urandom(size).hex(), "tables": [], "metadata": {"pages": 1}}
+
+
+class TestCacheKey:
+    """Test what the cache key is made of."""
+
+    def test_same_inputs_same_key(self):
+        """Test that key composition does not depend on option order."""
+        first = cache_key(SHA, {"format": ".pdf", "textract": True})
+        second = cache_key(SHA, {"textract": True, "format": ".pdf"})
+
+        assert first == second
+        assert len(first) == 64
+
+    def test_everything_that_shapes_a_result_changes_the_key(self, monkeypatch):
+        """Test content, extractor options, cache version and library versions."""
+        base = cache_key(SHA, {"format": ".pdf", "textract": True})
+
+        assert cache_key("cd" * 32, {"format": ".pdf", "textract": True}) != base
+        assert cache_key(SHA, {"format": ".pdf", "textract": False}) != base
+        assert cache_key(SHA, {"format": ".docx", "textract": True}) != base
+
+        monkeypatch.setattr(
+            extraction_cache,
+            "EXTRACTION_CACHE_VERSION",
+            extraction_cache.EXTRACTION_CACHE_VERSION + 1,
+        )
+        assert cache_key(SHA, {"format": ".pdf", "textract": True}) != base
+        monkeypatch.undo()
+
+        versions = {**extraction_cache.library_versions(), "PyPDF2": "0.0.1"}
+        monkeypatch.setattr(extraction_cache, "library_versions", lambda: versions)
+        assert cache_key(SHA, {"format": ".pdf", "textract": True}) != base
+
+
+class TestExtractionCache:
+    """Test lookups, stores, LRU eviction and failure handling."""
+
+    async def test_miss_then_hit(self, cache: ExtractionCache):
+        """Test that a stored result is returned and counted."""
+        stored = result(100)
+
+        assert await cache.get("k1") is None
+        await cache.put("k1", stored)
+
+        assert await cache.get("k1") == stored
+        assert cache.stats == {"hits": 1, "misses": 1, "stores": 1, "evictions": 0}
+
+    async def test_evicts_least_recently_used_by_bytes(self, cache: ExtractionCache, stub_redis):
+        """Test that the oldest untouched entry goes once the total exceeds max_bytes."""
+        await cache.put("a", result(4000))
+        await cache.put("b", result(4000))
+        assert await cache.get("a") is not None  # "b" is now the least recently used
+
+        await cache.put("c", result(4000))
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") is not None
+        assert await cache.get("c") is not None
+        assert cache.stats["evictions"] == 1
+        assert not os.path.exists(cache.store._path("b"))
+        sizes = [int(stub_redis.data[f"{REDIS_KEY_PREFIX}{key}"]["size"]) for key in "ac"]
+        assert int(stub_redis.data[BYTES_KEY]) == sum(sizes) <= cache.max_bytes
+
+    async def test_replacing_an_entry_keeps_the_total(self, cache: ExtractionCache, stub_redis):
+        """Test that storing a key again counts only its new size."""
+        await cache.put("a", result(1000))
+        await cache.put("a", result(2000))
+
+        size = int(stub_redis.data[f"{REDIS_KEY_PREFIX}a"]["size"])
+        assert int(stub_redis.data[BYTES_KEY]) == size
+
+    async def test_lost_blob_is_a_miss(self, cache: ExtractionCache, stub_redis):
+        """Test that an index entry without its blob is dropped rather than served."""
+        await cache.put("a", result(100))
+        os.unlink(cache.store._path("a"))
+
+        assert await cache.get("a") is None
+        assert f"{REDIS_KEY_PREFIX}a" not in stub_redis.data
+        assert int(stub_redis.data[BYTES_KEY]) == 0
+
+    async def test_redis_failure_is_a_miss(self, cache: ExtractionCache, stub_redis):
+        """Test that an unreachable Redis never fails an extraction."""
+        await cache.put("a", result(100))
+        stub_redis.fail = True
+
+        assert await cache.get("a") is None
+        await cache.put("b", result(100))
+        assert cache.stats["misses"] == 1
+
+    async def test_blob_store_failure_is_a_miss(self, cache: ExtractionCache, stub_redis):
+        """Test that a failing blob store neither raises nor indexes the entry."""
+        cache.store = FailingBlobStore()
+
+        await cache.put("a", result(100))
+        stub_redis.data[f"{REDIS_KEY_PREFIX}b"] = {"size": "10"}
+
+        assert await cache.get("b") is None
+        assert f"{REDIS_KEY_PREFIX}a" not in stub_redis.data
+        assert cache.stats["stores"] == 0
+
+    async def test_disabled_cache_does_nothing(self, cache: ExtractionCache, stub_redis):
+        """Test that a disabled cache never touches Redis or the blob store."""
+        cache.enabled = False
+        stub_redis.fail = True
+
+        await cache.put("a", result(100))
+        assert await cache.get("a") is None
+        assert cache.stats["misses"] == 0
+
+
+class TestCacheability:
+    """Test which extraction results are cached."""
+
+    @pytest.mark.parametrize(
+        "metadata, cacheable",
+        [
+            ({"pages": 2, "aws_service": "textract"}, True),
+            ({"error": "Unsupported file"}, False),
+            ({"comprehend_error": "ThrottlingException"}, False),
+            ({"aws_service": "textract_error", "fallback": "local_processing"}, False),
+        ],
+    )
+    def test_errors_and_fallbacks_are_not_cached(self, metadata, cacheable):
+        """Test that failed or degraded results are left to be retried."""
+        assert ExtractionService._is_cacheable({"text": "", "metadata": metadata}) is cacheable
@@ -0,0 +1,47 @@
+"""Tests for the document parsing process pool."""
+
+import time
+from pathlib import Path
+
+import pytest
+from PyPDF2 import PdfWriter
+
+from src.services.extraction_pool import ExtractionPool, ExtractionTimeoutError
+from src.services.processing_status import processing_tracker
+
+
+@pytest.fixture
+async def pool():
+    """Two-worker pool, shut down after the test."""
+    pool = ExtractionPool(max_workers=2, task_timeout=30, memory_limit_mb=0)
+    yield pool
+    await pool.shutdown()
+
+
+class TestExtractionPool:
+    """Test page-parallel parsing, timeouts and recycling."""
+
+    async def test_pdf_pages_parsed_in_ranges_with_progress(self, pool, tmp_path: Path):
+        """Test that every page comes back in order and progress reaches the end."""
+        writer = PdfWriter()
+        for _ in range(40):
+            writer.add_blank_page(width=100, height=100)
+        pdf_path = tmp_path / "blank.pdf"
+        with open(pdf_path, "wb") as f:
+            writer.write(f)
+        job_id = processing_tracker.create_job("blank.pdf", pdf_path.stat().st_size)
+
+        pages = await pool.extract_pdf_text(str(pdf_path), job_id, progress_range=(40, 75))
+
+        assert len(pages) == 40
+        job = processing_tracker.get_job(job_id)
+        assert job.progress == 75
+        assert job.current_step == "Parsed 40/40 pages"
+
+    async def test_timeout_recycles_pool(self, pool):
+        """Test that an overrunning task is abandoned and the pool keeps working."""
+        with pytest.raises(ExtractionTimeoutError):
+            await pool.run(time.sleep, 10, timeout=0.5)
+
+        assert pool.stats["recycles"] == 1
+        assert await pool.run(sum, [1, 2, 3]) == 6
@@ -0,0 +1,199 @@
+"""Tests for the extractor registry and the text-like format backends."""
+
+import subprocess
+import sys
+from typing import Any, Dict, Optional
+
+import pytest
+from openpyxl import Workbook
+
+from src.services.extraction_service import ExtractionService
+from src.services.extractors import (
+    BaseExtractor,
+    ExtractorSpec,
+    get_extractor,
+    get_spec,
+    register_extractor,
+    registry,
+    supported_mime_types,
+)
+from src.services.extractors import spreadsheet
+from src.services.extractors.spreadsheet import CsvExtractor, XlsxExtractor
+from src.services.extractors.text import html_to_text, markdown_to_text
+from src.services.table_store import TableStore
+
+
+class EchoExtractor(BaseExtractor):
+    """Returns the file contents unchanged."""
+
+    async def extract(self, file_path: str, job_id: Optional[str] = None) -> Dict[str, Any]:
+        with open(file_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        return {"text": text, "tables": [], "metadata": {"pages": 1}, "method": "echo"}
+
+
+@pytest.fixture
+def echo_spec():
+    spec = ExtractorSpec(
+        name="echo",
+        target=f"{__name__}:EchoExtractor",
+        extensions=(".echo",),
+        mime_types=("text/x-echo",),
+        capabilities=frozenset({"text"}),
+    )
+    register_extractor(spec)
+    yield spec
+    with registry._lock:
+        registry._specs.pop(".echo", None)
+        registry._instances.pop("echo", None)
+
+
+class TestRegistry:
+    """Test format lookup and lazy loading."""
+
+    def test_backends_are_not_imported_up_front(self):
+        """Test that importing the dispatcher does not import any format backend."""
+        code = (
+            "import sys; import src.services.extraction_service; "
+            "print(sorted(m for m in sys.modules if m.startswith('src.services.extractors.')))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        for backend in ("pdf", "word", "image", "spreadsheet", "text"):
+            assert f"src.services.extractors.{backend}'" not in output
+
+    def test_extractor_is_created_once_on_first_use(self, echo_spec):
+        """Test that an extractor is constructed on first lookup and then shared."""
+        assert "echo" not in registry._instances
+
+        extractor = get_extractor(".ECHO")
+
+        assert isinstance(extractor, EchoExtractor)
+        assert extractor.spec is echo_spec
+        assert get_extractor(".echo") is extractor
+
+    def test_unknown_extension(self):
+        """Test that unsupported formats have no spec or extractor."""
+        assert get_spec(".exe") is None
+        assert get_extractor(".exe") is None
+
+    def test_mime_types_come_from_specs(self, echo_spec):
+        """Test that route validation sees every registered content type."""
+        mime_types = supported_mime_types()
+        assert "application/pdf" in mime_types
+        assert "text/x-echo" in mime_types
+        assert len(mime_types) == len(set(mime_types))
+
+
+class TestExtractionService:
+    """Test dispatch through the extraction service."""
+
+    async def test_dispatches_to_registered_extractor(self, echo_spec, tmp_path):
+        """Test that a plugin format is extracted without touching the dispatcher."""
+        path = tmp_path / "note.echo"
+        path.write_text("hello")
+        service = ExtractionService()
+        service.cache.enabled = False
+
+        result = await service.extract_text(str(path))
+
+        assert result["text"] == "hello"
+        assert result["metadata"]["file_format"] == "echo"
+        assert result["metadata"]["processing_method"] == "echo"
+        assert result["cached"] is False
+
+    async def test_unsupported_format(self, tmp_path):
+        """Test that an unregistered extension returns an error result."""
+        path = tmp_path / "program.exe"
+        path.write_bytes(b"MZ")
+
+        result = await ExtractionService().extract_text(str(path))
+
+        assert result["metadata"]["error"] == "unsupported_format"
+        assert ".pdf" in result["note"]
+
+
+class TestMarkup:
+    """Test Markdown and HTML reduction to text and tables."""
+
+    def test_markdown_tables_and_formatting(self):
+        """Test that pipe tables become tables and inline markup is stripped."""
+        text, tables = markdown_to_text(
+            "# Title\n\nSome **bold** and [a link](http://x).\n\n"
+            "| Name | Qty |\n|------|----:|\n| Apple | 3 |\n| Pear | 5 |\n\n"
+            "```\n| not | a table |\n```\n"
+        )
+
+        assert "Title" in text
+        assert "Some bold and a link." in text
+        assert "| not | a table |" in text
+        assert len(tables) == 1
+        assert tables[0]["columns"] == ["Name", "Qty"]
+        assert tables[0]["rows"] == [
+            {"Name": "Apple", "Qty": "3"},
+            {"Name": "Pear", "Qty": "5"},
+        ]
+
+    def test_html_text_and_tables(self):
+        """Test that scripts are dropped, blocks break lines and tables are kept."""
+        text, tables = html_to_text(
+            "<html><head><style>p {}</style><script>var x = 1;</script></head>"
+            "<body><h1>Report</h1><p>First</p><p>Second</p>"
+            "<table><tr><th>City</th><th></th></tr><tr><td>Oslo</td><td>7</td></tr></table>"
+            "</body></html>"
+        )
+
+        assert "var x" not in text
+        assert "p {}" not in text
+        assert text.splitlines()[:3] == ["Report", "First", "Second"]
+        assert tables[0]["columns"] == ["City", "column_2"]
+        assert tables[0]["rows"] == [{"City": "Oslo", "column_2": "7"}]
+
+
+class InlinePool:
+    """Extraction pool that runs work in the calling process."""
+
+    async def run(self, fn, *args):
+        return fn(*args)
+
+
+class TestSpreadsheets:
+    """Test that CSV and XLSX results carry column profiles in one shape."""
+
+    @pytest.fixture(autouse=True)
+    def local_storage(self, monkeypatch, tmp_path):
+        store = TableStore(str(tmp_path / "tables"), ttl_seconds=3600)
+        monkeypatch.setattr(spreadsheet, "get_table_store", lambda: store)
+        monkeypatch.setattr(spreadsheet, "get_extraction_pool", lambda: InlinePool())
+        monkeypatch.setattr(spreadsheet, "get_aws_client", lambda service: None)
+
+    async def test_csv_profile(self, tmp_path):
+        """Test that the table carries its profile and metadata lists it by table name."""
+        path = tmp_path / "orders.csv"
+        path.write_text("id,due\n1,03/15/2024\n2,01/02/2024\n")
+
+        result = await CsvExtractor(get_spec(".csv")).extract(str(path))
+
+        table = result["tables"][0]
+        assert table["profile"]["due"]["type"] == "date"
+        assert table["profile"]["due"]["format"] == "%m/%d/%Y"
+        assert result["metadata"]["inferred_data_types"] == {table["name"]: table["profile"]}
+
+    async def test_xlsx_profiles(self, tmp_path):
+        """Test that each sheet's profile is keyed by its table name, as for CSV."""
+        workbook = Workbook()
+        workbook.active.title = "Orders"
+        workbook.active.append(["id", "total"])
+        workbook.active.append([1, 9.5])
+        workbook.create_sheet("Notes").append(["note"])
+        workbook["Notes"].append(["late"])
+        path = tmp_path / "book.xlsx"
+        workbook.save(path)
+
+        result = await XlsxExtractor(get_spec(".xlsx")).extract(str(path))
+
+        profiles = result["metadata"]["inferred_data_types"]
+        assert set(profiles) == {"Orders", "Notes"}
+        assert profiles["Orders"]["total"]["type"] == "float"
+        assert all(profiles[table["name"]] == table["profile"] for table in result["tables"])
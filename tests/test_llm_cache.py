@@ -0,0 +1,171 @@
+"""Tests for the two-tier LLM response cache."""
+
+import pytest
+
+from src.llm.base import LLMMessage, LLMResponse
+from src.services import llm_cache
+from src.services.llm_cache import REDIS_KEY_PREFIX, LLMResponseCache, request_fingerprint
+
+GROQ = {"provider": "groq", "model": "llama", "temperature": 0, "max_tokens": 512}
+OPENAI = {"provider": "openai", "model": "gpt", "temperature": 0, "max_tokens": 512}
+
+
+def ask(question: str) -> list[LLMMessage]:
+    return [
+        LLMMessage(role="system", content="You answer briefly."),
+        LLMMessage(role="user", content=question),
+    ]
+
+
+def answer(content: str = "Paris", provider: str = "groq") -> LLMResponse:
+    return LLMResponse(content=content, provider=provider, model="llama", total_tokens=12)
+
+
+@pytest.fixture
+def redis(stub_redis, monkeypatch):
+    monkeypatch.setattr(llm_cache, "get_async_redis", lambda: stub_redis)
+    return stub_redis
+
+
+class TestExactTier:
+    """Test exact-match lookups in memory and through Redis."""
+
+    async def test_miss_then_hit(self, redis):
+        """Test that a stored response is found for the same request."""
+        cache = LLMResponseCache()
+        messages = ask("What is the capital of France?")
+
+        assert await cache.lookup(messages, [GROQ]) is None
+        await cache.store(messages, GROQ, answer())
+        hit = await cache.lookup(messages, [GROQ])
+
+        assert hit.content == "Paris"
+        assert cache.stats["default"] == {"misses": 1, "stores": 1, "hits_memory": 1}
+
+    async def test_whitespace_only_differences_hit(self, redis):
+        """Test that line endings and trailing spaces do not change the key."""
+        cache = LLMResponseCache()
+        await cache.store(ask("Line one\nLine two"), GROQ, answer())
+
+        assert await cache.lookup(ask("Line one  \r\nLine two\n"), [GROQ]) is not None
+
+    async def test_different_parameters_miss(self, redis):
+        """Test that temperature, max_tokens and model are part of the key."""
+        cache = LLMResponseCache()
+        messages = ask("What is the capital of France?")
+        await cache.store(messages, GROQ, answer())
+
+        for change in ({"temperature": 0.7}, {"max_tokens": 64}, {"model": "other"}):
+            assert await cache.lookup(messages, [{**GROQ, **change}]) is None
+
+    async def test_any_candidate_provider_can_hit(self, redis):
+        """Test that a response cached for a fallback provider serves the request."""
+        cache = LLMResponseCache()
+        messages = ask("What is the capital of France?")
+        await cache.store(messages, OPENAI, answer(provider="openai"))
+
+        hit = await cache.lookup(messages, [GROQ, OPENAI])
+
+        assert hit.provider == "openai"
+
+    async def test_other_worker_hits_through_redis(self, redis):
+        """Test that a response stored by one worker is found by another."""
+        messages = ask("What is the capital of France?")
+        await LLMResponseCache().store(messages, GROQ, answer())
+        other = LLMResponseCache()
+
+        hit = await other.lookup(messages, [GROQ])
+
+        assert hit.content == "Paris"
+        assert other.stats["default"]["hits_redis"] == 1
+        assert request_fingerprint(messages, **GROQ) in other.exact  # Promoted to memory
+
+    async def test_redis_failure_is_a_miss(self, redis):
+        """Test that an unreachable Redis neither raises nor serves a response."""
+        messages = ask("What is the capital of France?")
+        redis.fail = True
+        await LLMResponseCache().store(messages, GROQ, answer())
+        other = LLMResponseCache()
+
+        assert await other.lookup(messages, [GROQ]) is None
+        assert other.stats["default"] == {"misses": 1}
+
+    async def test_corrupt_redis_entry_is_a_miss(self, redis):
+        """Test that an unreadable Redis value is skipped."""
+        messages = ask("What is the capital of France?")
+        redis.data[REDIS_KEY_PREFIX + request_fingerprint(messages, **GROQ)] = "not json"
+
+        assert await LLMResponseCache().lookup(messages, [GROQ]) is None
+
+
+class TestSemanticTier:
+    """Test similarity lookups for deterministic calls."""
+
+    @pytest.fixture
+    def cache(self, redis) -> LLMResponseCache:
+        return LLMResponseCache(use_redis=False, semantic_enabled=True, semantic_threshold=0.9)
+
+    async def test_rewording_hits_at_temperature_zero(self, cache):
+        """Test that a prompt differing only in punctuation and case is served."""
+        await cache.store(ask("What is the capital of France?"), GROQ, answer())
+
+        hit = await cache.lookup(ask("what is the capital of france"), [GROQ])
+
+        assert hit.content == "Paris"
+        assert cache.stats["default"]["hits_semantic"] == 1
+
+    async def test_sampled_calls_are_never_matched(self, cache):
+        """Test that calls above temperature 0 are neither indexed nor matched."""
+        sampled = {**GROQ, "temperature": 0.7}
+        await cache.store(ask("What is the capital of France?"), sampled, answer())
+
+        assert len(cache.semantic) == 0
+        assert await cache.lookup(ask("what is the capital of france"), [sampled]) is None
+
+    async def test_different_context_is_not_matched(self, cache):
+        """Test that earlier messages must match exactly."""
+        await cache.store(ask("What is the capital of France?"), GROQ, answer())
+        messages = [
+            LLMMessage(role="system", content="Answer in French."),
+            LLMMessage(role="user", content="what is the capital of france"),
+        ]
+
+        assert await cache.lookup(messages, [GROQ]) is None
+
+    async def test_unrelated_prompt_is_not_matched(self, cache):
+        """Test that prompts below the similarity threshold miss."""
+        await cache.store(ask("What is the capital of France?"), GROQ, answer())
+
+        assert await cache.lookup(ask("Summarize this contract in three bullets"), [GROQ]) is None
+
+
+class TestHits:
+    """Test what a hit returns and how it is counted."""
+
+    async def test_hit_is_a_flagged_copy(self, redis):
+        """Test that hits are marked cached without touching the stored response."""
+        cache = LLMResponseCache(use_redis=False)
+        messages = ask("What is the capital of France?")
+        stored = answer().model_copy(update={"hedged": True, "hedge_cost_tokens": 40})
+        await cache.store(messages, GROQ, stored)
+
+        hit = await cache.lookup(messages, [GROQ])
+
+        assert (hit.cached, hit.hedged, hit.hedge_cost_tokens) == (True, False, 0)
+        assert (stored.cached, stored.hedged, stored.hedge_cost_tokens) == (False, True, 40)
+        assert cache.exact.get(request_fingerprint(messages, **GROQ)) is stored
+
+    async def test_stats_are_kept_per_route(self, redis):
+        """Test that each route has its own counters."""
+        cache = LLMResponseCache(use_redis=False)
+        messages = ask("What is the capital of France?")
+
+        await cache.lookup(messages, [GROQ], route="chat")
+        await cache.store(messages, GROQ, answer(), route="chat")
+        await cache.lookup(messages, [GROQ], route="extraction")
+        await cache.lookup(ask("Something else"), [GROQ], route="extraction")
+
+        assert cache.get_stats()["routes"] == {
+            "chat": {"misses": 1, "stores": 1},
+            "extraction": {"hits_memory": 1, "misses": 1},
+        }
@@ -0,0 +1,198 @@
+"""Tests for single-flight coalescing of LLM calls."""
+
+import asyncio
+
+import pytest
+
+from src.llm.base import LLMResponse
+from src.services import llm_coalescing
+from src.services.llm_coalescing import REDIS_LOCK_PREFIX, SingleFlight
+
+
+class Upstream:
+    """Counts upstream calls; each call blocks until released."""
+
+    def __init__(self, content: str = "answer"):
+        self.content = content
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def generate(self) -> LLMResponse:
+        self.calls += 1
+        await self.release.wait()
+        return LLMResponse(content=self.content, provider="groq", model="m", total_tokens=7)
+
+    async def stream(self):
+        self.calls += 1
+        for chunk in ("a", "b"):
+            yield chunk
+        await self.release.wait()
+        yield "c"
+
+
+class TestLocalCoalescing:
+    """Test coalescing within one worker."""
+
+    async def test_concurrent_callers_share_one_call(self):
+        """Test that followers get a flagged copy of the leader's response."""
+        flight, upstream = SingleFlight(), Upstream()
+
+        leader = asyncio.create_task(flight.do("k", upstream.generate))
+        follower = asyncio.create_task(flight.do("k", upstream.generate))
+        await asyncio.sleep(0)
+        upstream.release.set()
+        leader, follower = await leader, await follower
+
+        assert upstream.calls == 1
+        assert leader.content == follower.content == "answer"
+        assert (leader.coalesced, follower.coalesced) == (False, True)
+        assert flight.get_stats()["in_flight_calls"] == 0
+
+    async def test_sequential_calls_are_not_shared(self):
+        """Test that a finished call is not reused as a cache."""
+        flight, upstream = SingleFlight(), Upstream()
+        upstream.release.set()
+
+        await flight.do("k", upstream.generate)
+        second = await flight.do("k", upstream.generate)
+
+        assert upstream.calls == 2
+        assert second.coalesced is False
+
+    async def test_cancelled_caller_does_not_stop_the_call(self):
+        """Test that the leader giving up leaves the upstream call to the follower."""
+        flight, upstream = SingleFlight(), Upstream()
+
+        leader = asyncio.create_task(flight.do("k", upstream.generate))
+        follower = asyncio.create_task(flight.do("k", upstream.generate))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        upstream.release.set()
+
+        assert (await follower).content == "answer"
+        assert upstream.calls == 1
+
+    async def test_errors_reach_every_caller(self):
+        """Test that a failed upstream call fails the leader and its followers."""
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+        )
+
+        assert [str(result) for result in results] == ["upstream down"] * 2
+
+
+class TestStreamFanout:
+    """Test sharing one upstream stream between subscribers."""
+
+    async def test_subscribers_share_one_stream(self):
+        """Test that a late subscriber replays from the start of the shared stream."""
+        flight, upstream = SingleFlight(), Upstream()
+
+        async def read(stream):
+            return [chunk async for chunk in stream]
+
+        first = asyncio.create_task(read(flight.stream("k", upstream.stream)))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(read(flight.stream("k", upstream.stream)))
+        await asyncio.sleep(0.01)
+        upstream.release.set()
+
+        assert await first == await second == ["a", "b", "c"]
+        assert upstream.calls == 1
+        assert flight.stats["stream_followers"] == 1
+
+    async def test_upstream_is_cancelled_when_every_subscriber_leaves(self):
+        """Test that an abandoned shared stream stops reading upstream."""
+        flight, upstream = SingleFlight(), Upstream()
+
+        stream = flight.stream("k", upstream.stream)
+        assert await stream.__anext__() == "a"
+        fanout = flight._streams["k"]
+        await stream.aclose()
+        await asyncio.sleep(0.01)
+
+        assert fanout.task.cancelled()
+        assert flight.get_stats()["in_flight_streams"] == 0
+
+
+@pytest.fixture
+def workers(stub_redis, monkeypatch) -> tuple[SingleFlight, SingleFlight]:
+    monkeypatch.setattr(llm_coalescing, "get_async_redis", lambda: stub_redis)
+    monkeypatch.setattr(llm_coalescing, "POLL_INTERVAL_SECONDS", 0.01)
+    return SingleFlight(use_redis=True), SingleFlight(use_redis=True)
+
+
+class TestRedisCoalescing:
+    """Test coalescing across workers through a Redis lock."""
+
+    async def test_second_worker_waits_for_the_first(self, workers):
+        """Test that a worker arriving mid-flight gets the lock holder's result."""
+        first, second = workers
+        upstream, local = Upstream(), Upstream("not called")
+
+        leader = asyncio.create_task(first.do("k", upstream.generate))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(second.do("k", local.generate))
+        await asyncio.sleep(0.02)
+        upstream.release.set()
+
+        assert (await leader).coalesced is False
+        follower = await follower
+        assert (follower.content, follower.coalesced) == ("answer", True)
+        assert local.calls == 0
+        assert second.stats["remote_followers"] == 1
+
+    async def test_earlier_flight_result_is_not_served(self, workers, stub_redis):
+        """Test that a result published by a finished flight is not reused by the next one."""
+        first, second = workers
+        old = Upstream("old answer")
+        old.release.set()
+        await first.do("k", old.generate)
+
+        new, local = Upstream("new answer"), Upstream("not called")
+        leader = asyncio.create_task(first.do("k", new.generate))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(second.do("k", local.generate))
+        await asyncio.sleep(0.02)
+        new.release.set()
+
+        assert (await leader).content == "new answer"
+        assert (await follower).content == "new answer"
+        assert f"{REDIS_LOCK_PREFIX}k" not in stub_redis.data
+
+    async def test_failed_leader_lets_the_waiter_call(self, workers):
+        """Test that a worker whose lock holder fails makes the call itself."""
+        first, second = workers
+        local = Upstream("own answer")
+        local.release.set()
+
+        async def fail():
+            await asyncio.sleep(0.03)
+            raise RuntimeError("upstream down")
+
+        leader = asyncio.create_task(first.do("k", fail))
+        await asyncio.sleep(0.01)
+        follower = await second.do("k", local.generate)
+
+        with pytest.raises(RuntimeError):
+            await leader
+        assert (follower.content, follower.coalesced) == ("own answer", False)
+
+    async def test_redis_failure_calls_locally(self, workers, stub_redis):
+        """Test that an unreachable Redis degrades to an uncoordinated call."""
+        first, _ = workers
+        stub_redis.fail = True
+        upstream = Upstream()
+        upstream.release.set()
+
+        response = await first.do("k", upstream.generate)
+
+        assert (response.content, upstream.calls) == ("answer", 1)
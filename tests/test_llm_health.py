@@ -0,0 +1,178 @@
+"""Tests for LLM provider circuit breakers and adaptive ordering."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm import health as health_module
+from src.llm.health import CLOSED, HALF_OPEN, OPEN, LatencyTracker, ProviderHealthMonitor
+
+PROVIDERS = ["groq", "openai", "bedrock"]
+
+
+@pytest.fixture
+def clock(monkeypatch) -> SimpleNamespace:
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(health_module, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def monitor(clock) -> ProviderHealthMonitor:
+    return ProviderHealthMonitor(PROVIDERS, failure_threshold=3, open_seconds=30.0)
+
+
+def order(monitor: ProviderHealthMonitor) -> list[str]:
+    return monitor.order(PROVIDERS, key=lambda name: name)
+
+
+class TestOrdering:
+    """Test healthiest-first provider ordering."""
+
+    def test_no_data_keeps_configured_order(self, monitor):
+        """Test that a fresh monitor tries providers as configured."""
+        assert order(monitor) == PROVIDERS
+
+    def test_untested_and_failing_providers_do_not_jump_ahead(self, monitor):
+        """Test that a healthy primary stays first over untested and failing providers."""
+        for _ in range(10):
+            monitor.record_success("groq", 0.5)
+        monitor.record_failure("openai")
+        monitor.record_failure("openai")
+
+        assert monitor.providers["openai"].state == CLOSED
+        assert order(monitor) == ["groq", "bedrock", "openai"]
+
+    def test_faster_provider_moves_first(self, monitor):
+        """Test that latency EWMAs reorder providers with data."""
+        for _ in range(5):
+            monitor.record_success("groq", 2.0)
+            monitor.record_success("openai", 0.4)
+            monitor.record_success("bedrock", 1.0)
+
+        assert order(monitor) == ["openai", "bedrock", "groq"]
+
+    def test_error_rate_penalizes_providers_without_latency(self, monitor):
+        """Test that errors count even before any successful call."""
+        monitor.record_failure("groq")
+
+        assert order(monitor) == ["openai", "bedrock", "groq"]
+
+    def test_open_circuits_are_left_out(self, monitor):
+        """Test that open providers are skipped, unless every circuit is open."""
+        for _ in range(3):
+            monitor.record_failure("groq")
+        assert order(monitor) == ["openai", "bedrock"]
+
+        for name in ("openai", "bedrock"):
+            for _ in range(3):
+                monitor.record_failure(name)
+        assert order(monitor) == PROVIDERS
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions and the half-open probe slot."""
+
+    def test_consecutive_failures_open_the_circuit(self, monitor):
+        """Test that the failure threshold opens a circuit and blocks requests."""
+        monitor.record_failure("groq")
+        monitor.record_failure("groq")
+        assert monitor.providers["groq"].state == CLOSED
+
+        monitor.record_failure("groq")
+
+        assert monitor.providers["groq"].state == OPEN
+        assert monitor.acquire("groq") is False
+        assert monitor.is_available("groq") is False
+
+    def test_error_rate_opens_the_circuit(self, clock):
+        """Test that a high error-rate EWMA opens the circuit without a failure streak."""
+        monitor = ProviderHealthMonitor(PROVIDERS, alpha=0.5, failure_threshold=10)
+        monitor.record_failure("groq")  # Error rate 0.5
+
+        assert monitor.providers["groq"].state == OPEN
+
+    def test_half_open_hands_out_one_probe(self, monitor, clock):
+        """Test that after the cool-down exactly one request probes the provider."""
+        for _ in range(3):
+            monitor.record_failure("groq")
+        clock.now += 30.0
+
+        assert monitor.is_available("groq") is True
+        assert monitor.acquire("groq") is True
+        assert monitor.providers["groq"].state == HALF_OPEN
+        assert monitor.acquire("groq") is False
+        assert monitor.is_available("groq") is False
+
+    def test_probe_success_closes_the_circuit(self, monitor, clock):
+        """Test that a successful probe closes the circuit and resets the streak."""
+        for _ in range(3):
+            monitor.record_failure("groq")
+        clock.now += 30.0
+        monitor.acquire("groq")
+
+        monitor.record_success("groq", 0.2)
+
+        health = monitor.providers["groq"]
+        assert (health.state, health.consecutive_failures, health.opened_at) == (CLOSED, 0, None)
+        assert monitor.acquire("groq") is True
+
+    def test_probe_failure_reopens_the_circuit(self, monitor, clock):
+        """Test that a failed probe restarts the cool-down."""
+        for _ in range(3):
+            monitor.record_failure("groq")
+        clock.now += 30.0
+        monitor.acquire("groq")
+
+        monitor.record_failure("groq")
+
+        assert monitor.providers["groq"].state == OPEN
+        assert monitor.acquire("groq") is False
+        clock.now += 30.0
+        assert monitor.acquire("groq") is True
+
+    def test_cancelled_probe_frees_the_slot(self, monitor, clock):
+        """Test that a cancelled probe (e.g. a hedge loser) lets another request probe."""
+        for _ in range(3):
+            monitor.record_failure("groq")
+        clock.now += 30.0
+        monitor.acquire("groq")
+
+        monitor.record_cancelled("groq")
+
+        assert monitor.providers["groq"].state == HALF_OPEN
+        assert monitor.acquire("groq") is True
+
+    def test_slow_success_counts_as_failure(self, clock):
+        """Test that calls slower than slow_call_seconds feed the breaker as failures."""
+        monitor = ProviderHealthMonitor(PROVIDERS, failure_threshold=2, slow_call_seconds=5.0)
+        monitor.record_success("groq", 6.0)
+        monitor.record_success("groq", 6.0)
+
+        health = monitor.providers["groq"]
+        assert (health.state, health.successes, health.failures) == (OPEN, 0, 2)
+        assert health.latency_ewma == pytest.approx(6.0)
+
+
+class TestLatencyTracker:
+    """Test the rolling latency window used to pick hedge delays."""
+
+    def test_percentile_needs_min_samples(self):
+        """Test that percentiles appear once enough samples are recorded."""
+        tracker = LatencyTracker(window_size=10, min_samples=3)
+        tracker.record(1.0)
+        tracker.record(2.0)
+        assert tracker.percentile(95.0) is None
+
+        tracker.record(3.0)
+
+        assert tracker.percentile(50.0) == 2.0
+        assert tracker.percentile(95.0) == 3.0
+
+    def test_window_keeps_recent_samples(self):
+        """Test that old samples fall out of the window."""
+        tracker = LatencyTracker(window_size=3, min_samples=1)
+        for latency in (9.0, 1.0, 1.0, 1.0):
+            tracker.record(latency)
+
+        assert tracker.percentile(100.0) == 1.0
@@ -0,0 +1,219 @@
+"""Tests for LLMService provider selection and hedging."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from src.llm.base import BaseLLMProvider, LLMMessage, LLMResponse
+from src.llm.health import ProviderHealthMonitor
+from src.services.llm_cache import LLMResponseCache
+from src.services.llm_service import LLMService
+
+PROMPT = [LLMMessage(role="user", content="x" * 400)]  # About 100 tokens
+PROMPT_TOKENS = 100
+
+
+class StubProvider(BaseLLMProvider):
+    """Provider answering after a delay, or failing."""
+
+    def __init__(
+        self,
+        name: str,
+        delay: float = 0.0,
+        fail: bool = False,
+        output_tokens: int = 20,
+        cancellable: bool = True,
+    ):
+        super().__init__(model=f"{name}-model", temperature=0.0)
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.output_tokens = output_tokens
+        self.cancellable = cancellable
+        self.calls = 0
+        self.cancelled = 0
+
+    @property
+    def provider_name(self) -> str:
+        return self.name
+
+    def supports_cancellation(self) -> bool:
+        return self.cancellable
+
+    async def generate(self, messages: list[LLMMessage], **kwargs: Any) -> LLMResponse:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return LLMResponse(
+            content=f"from {self.name}",
+            provider=self.name,
+            model=self.model,
+            input_tokens=PROMPT_TOKENS,
+            output_tokens=self.output_tokens,
+            total_tokens=PROMPT_TOKENS + self.output_tokens,
+        )
+
+
+def make_service(*providers: StubProvider, **settings: Any) -> LLMService:
+    """An LLMService over stub providers, without reading the environment."""
+    service = LLMService.__new__(LLMService)
+    service.settings = SimpleNamespace(
+        **{
+            "llm_hedging_enabled": True,
+            "llm_hedge_percentile": 95.0,
+            "llm_hedge_default_delay_ms": 50,
+            "llm_hedge_min_delay_ms": 10,
+            "llm_hedge_max_delay_ms": 1000,
+            **settings,
+        }
+    )
+    service.providers = list(providers)
+    service.health = ProviderHealthMonitor([p.provider_name for p in providers])
+    service.cache = None
+    service.coalescer = None
+    return service
+
+
+class TestHedging:
+    """Test racing a slow provider against the next one."""
+
+    async def test_fast_primary_is_not_hedged(self):
+        """Test that a provider answering within its hedge delay runs alone."""
+        primary, secondary = StubProvider("primary", 0.001), StubProvider("secondary")
+        service = make_service(primary, secondary)
+
+        response = await service.generate(PROMPT)
+
+        assert response.provider == "primary"
+        assert (response.hedged, response.hedge_cost_tokens) == (False, 0)
+        assert response.attempted_providers == ["primary"]
+        assert secondary.calls == 0
+
+    async def test_slow_primary_loses_to_fast_secondary(self):
+        """Test that the hedge wins and the slow call is cancelled and charged its prompt."""
+        primary = StubProvider("primary", delay=5.0)
+        secondary = StubProvider("secondary", delay=0.01)
+        service = make_service(primary, secondary)
+
+        response = await service.generate(PROMPT)
+        await asyncio.sleep(0)  # Let the loser see its cancellation
+
+        assert response.provider == "secondary"
+        assert response.hedged is True
+        assert response.attempted_providers == ["primary", "secondary"]
+        assert response.hedge_cost_tokens == PROMPT_TOKENS
+        assert primary.cancelled == 1
+        assert service.health.providers["primary"].failures == 0
+        assert service.health.providers["secondary"].successes == 1
+
+    async def test_uncancellable_loser_is_charged_a_whole_answer(self):
+        """Test that a loser which keeps running when cancelled counts its estimated output."""
+        primary = StubProvider("primary", delay=5.0, cancellable=False)
+        secondary = StubProvider("secondary", delay=0.01, output_tokens=30)
+        service = make_service(primary, secondary)
+
+        response = await service.generate(PROMPT)
+
+        assert response.provider == "secondary"
+        assert response.hedge_cost_tokens == PROMPT_TOKENS + 30
+
+    async def test_primary_failing_within_the_delay_starts_the_next(self):
+        """Test that a failure falls through at once, without waiting for the hedge delay."""
+        primary = StubProvider("primary", delay=0.001, fail=True)
+        secondary = StubProvider("secondary", delay=0.001)
+        service = make_service(primary, secondary, llm_hedge_default_delay_ms=1000)
+
+        started = asyncio.get_running_loop().time()
+        response = await service.generate(PROMPT)
+
+        assert asyncio.get_running_loop().time() - started < 0.5
+        assert response.provider == "secondary"
+        assert response.attempted_providers == ["primary", "secondary"]
+        assert response.hedge_cost_tokens == 0
+        assert service.health.providers["primary"].failures == 1
+
+    async def test_every_provider_failing_raises(self):
+        """Test that the error names every provider once all of them fail."""
+        primary = StubProvider("primary", delay=0.02, fail=True)
+        secondary = StubProvider("secondary", delay=0.01, fail=True)
+        service = make_service(primary, secondary, llm_hedge_default_delay_ms=10)
+
+        with pytest.raises(Exception, match="All 2 LLM provider"):
+            await service.generate(PROMPT)
+
+        assert (primary.calls, secondary.calls) == (1, 1)
+        assert [h.failures for h in service.health.providers.values()] == [1, 1]
+
+    async def test_cancelled_request_cancels_every_attempt(self):
+        """Test that a caller giving up cancels both racing calls and frees their probes."""
+        primary = StubProvider("primary", delay=5.0)
+        secondary = StubProvider("secondary", delay=5.0)
+        service = make_service(primary, secondary, llm_hedge_default_delay_ms=10)
+
+        request = asyncio.create_task(service.generate(PROMPT))
+        await asyncio.sleep(0.05)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        await asyncio.sleep(0)
+
+        assert (primary.cancelled, secondary.cancelled) == (1, 1)
+        assert not any(h.probe_in_flight for h in service.health.providers.values())
+
+    async def test_hedging_can_be_turned_off_per_call(self):
+        """Test that hedge=False waits on each provider in turn."""
+        primary = StubProvider("primary", delay=0.05)
+        secondary = StubProvider("secondary")
+        service = make_service(primary, secondary, llm_hedge_default_delay_ms=10)
+
+        response = await service.generate(PROMPT, hedge=False)
+
+        assert response.provider == "primary"
+        assert secondary.calls == 0
+
+
+class TestResponseCache:
+    """Test the opt-in response cache around generate()."""
+
+    @pytest.fixture
+    def service(self) -> LLMService:
+        service = make_service(StubProvider("primary"), StubProvider("secondary"))
+        service.cache = LLMResponseCache(use_redis=False)
+        return service
+
+    async def test_repeat_call_is_served_from_cache(self, service):
+        """Test that a route's repeated prompt skips the providers."""
+        first = await service.generate(PROMPT, cache="chat")
+        second = await service.generate(PROMPT, cache="chat")
+
+        assert (first.cached, second.cached) == (False, True)
+        assert second.content == first.content
+        assert service.providers[0].calls == 1
+        assert service.get_cache_stats()["routes"]["chat"] == {
+            "misses": 1,
+            "stores": 1,
+            "hits_memory": 1,
+        }
+
+    async def test_calls_without_a_route_bypass_the_cache(self, service):
+        """Test that the cache is opt-in per call."""
+        await service.generate(PROMPT)
+        await service.generate(PROMPT)
+
+        assert service.providers[0].calls == 2
+        assert service.get_cache_stats()["routes"] == {}
+
+    async def test_call_parameters_are_part_of_the_key(self, service):
+        """Test that a different temperature is not served another call's answer."""
+        await service.generate(PROMPT, cache="chat", temperature=0.0)
+        response = await service.generate(PROMPT, cache="chat", temperature=0.7)
+
+        assert response.cached is False
+        assert service.providers[0].calls == 2
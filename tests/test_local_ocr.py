@@ -0,0 +1,200 @@
+"""Tests for local OCR pre-processing, line grouping and table detection."""
+
+import numpy as np
+import pytest
+
+from src.services import local_ocr
+from src.services.extractors import get_spec
+from src.services.extractors import image as image_extractor
+from src.services.extractors.image import ImageExtractor
+
+
+def skewed_lines(degrees: float) -> np.ndarray:
+    """Ink mask of dashed text-like lines falling by an angle."""
+    ink = np.zeros((600, 900), dtype=bool)
+    slope = np.tan(np.radians(degrees))
+    for baseline in range(60, 540, 36):
+        for x in range(40, 860):
+            if (x // 6) % 3:
+                y = int(baseline + x * slope)
+                ink[y : y + 3, x] = True
+    return ink
+
+
+def word(text: str, left: int, top: int, line: tuple = (1, 1, 1), confidence: float = 90.0):
+    return {
+        "text": text,
+        "confidence": confidence,
+        "line": line,
+        "left": left,
+        "top": top,
+        "width": 9 * len(text),
+        "height": 12,
+    }
+
+
+class TestPreprocessing:
+    """Test binarization and skew estimation."""
+
+    def test_binarize_dark_text_on_light(self):
+        """Test that Otsu's threshold separates ink from a noisy background."""
+        rng = np.random.default_rng(0)
+        ink = skewed_lines(0)
+        gray = np.where(ink, 40, 210) + rng.integers(-25, 25, ink.shape)
+
+        assert (local_ocr.binarize(gray.astype(np.uint8)) == ink).all()
+
+    def test_binarize_light_text_on_dark(self):
+        """Test that the minority class is taken as ink."""
+        ink = skewed_lines(0)
+        gray = np.where(ink, 240, 30).astype(np.uint8)
+
+        assert (local_ocr.binarize(gray) == ink).all()
+
+    @pytest.mark.parametrize("degrees", [-4.0, 0.0, 2.5, 7.0])
+    def test_estimate_skew(self, degrees: float):
+        """Test that the skew of the text lines is recovered to a tenth of a degree."""
+        assert local_ocr.estimate_skew(skewed_lines(degrees)) == pytest.approx(degrees, abs=0.1)
+
+    def test_blank_image_has_no_skew(self):
+        """Test that an image without ink is left alone."""
+        assert local_ocr.estimate_skew(np.zeros((50, 50), dtype=bool)) == 0.0
+
+
+class TestWordsAndLines:
+    """Test reading Tesseract's word data."""
+
+    def test_read_words_and_group_lines(self):
+        """Test that non-words are skipped and line confidence averages the words."""
+        data = {
+            "text": ["", "Total", "due", " ", "42.00"],
+            "conf": ["-1", "96", "90", "-1", "81.5"],
+            "block_num": [1, 1, 1, 1, 1],
+            "par_num": [1, 1, 1, 1, 1],
+            "line_num": [0, 1, 1, 1, 2],
+            "left": [0, 10, 60, 0, 10],
+            "top": [0, 10, 10, 0, 40],
+            "width": [500, 45, 27, 0, 45],
+            "height": [80, 12, 12, 0, 12],
+        }
+
+        lines = local_ocr.group_lines(local_ocr.read_words(data))
+
+        assert lines == [
+            {"text": "Total due", "confidence": 93.0},
+            {"text": "42.00", "confidence": 81.5},
+        ]
+
+
+class TestTableDetection:
+    """Test finding tables in the word layout."""
+
+    def test_aligned_rows_form_a_table(self):
+        """Test that rows split into aligned columns become a table, prose does not."""
+        words = [
+            word("Quarterly", 10, 0),
+            word("report", 100, 0),
+            # Columns read as separate Tesseract blocks, with ragged tops
+            word("Item", 10, 30, (2, 1, 1)),
+            word("Price", 220, 31, (3, 1, 1)),
+            word("Green", 10, 50, (2, 1, 2)),
+            word("tea", 64, 50, (2, 1, 2)),
+            word("4.50", 226, 52, (3, 1, 2)),
+            word("Coffee", 12, 70, (2, 1, 3)),
+            word("12.00", 220, 69, (3, 1, 3)),
+            word("Thanks", 10, 110, (4, 1, 1)),
+        ]
+
+        assert local_ocr.detect_tables(words) == [
+            [["Item", "Price"], ["Green tea", "4.50"], ["Coffee", "12.00"]]
+        ]
+
+    def test_misaligned_rows_are_not_a_table(self):
+        """Test that two-cell rows whose columns do not line up are ignored."""
+        words = [
+            word("A", 10, 0),
+            word("B", 200, 0),
+            word("C", 400, 20),
+            word("D", 600, 20),
+            word("E", 10, 40),
+            word("F", 200, 40),
+        ]
+
+        assert local_ocr.detect_tables(words) == []
+
+
+class StubTextract:
+    """Textract client returning fixed lines, or failing."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+
+    def detect_document_text(self, Document):
+        if self.fail:
+            raise RuntimeError("ThrottlingException")
+        return {
+            "Blocks": [
+                {"BlockType": "PAGE"},
+                {"BlockType": "LINE", "Text": "Item Price", "Confidence": 99.0},
+                {"BlockType": "LINE", "Text": "Tea 4.50", "Confidence": 95.0},
+            ]
+        }
+
+
+class StubPool:
+    """Extraction pool returning a fixed local OCR result."""
+
+    async def run(self, fn, *args, timeout=None):
+        assert fn is local_ocr.ocr_image
+        return {
+            "lines": [
+                {"text": "Item Price", "confidence": 91.0},
+                {"text": "Tea 4.50", "confidence": 85.0},
+            ],
+            "tables": [[["Item", "Price"], ["Tea", "4.50"], ["Coffee", "12.00"]]],
+            "skew": 1.5,
+            "size": [800, 600],
+        }
+
+
+class TestImageExtractor:
+    """Test that both OCR backends return the same result schema."""
+
+    @pytest.fixture
+    def extractor(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(image_extractor, "get_extraction_pool", lambda: StubPool())
+        extractor = ImageExtractor(get_spec(".png"))
+        extractor.tesseract_version = "5.3.0"
+        path = tmp_path / "scan.png"
+        path.write_bytes(b"\x89PNG")
+        return extractor, str(path)
+
+    async def test_local_result_matches_textract_schema(self, extractor):
+        """Test that callers can only tell the backends apart by method."""
+        extractor, path = extractor
+
+        extractor.textract = None
+        local = await extractor.extract(path)
+        extractor.textract = StubTextract()
+        remote = await extractor.extract(path)
+
+        assert local["method"] == "local_tesseract"
+        assert remote["method"] == "aws_textract"
+        assert local.keys() == remote.keys()
+        assert local["metadata"].keys() == remote["metadata"].keys()
+        assert local["text"] == remote["text"] == "Item Price\nTea 4.50"
+        assert local["metadata"]["line_confidences"] == [91.0, 85.0]
+        assert local["metadata"]["confidence"] == 88.0
+        assert local["tables"][0]["columns"] == ["Item", "Price"]
+        assert local["tables"][0]["row_count"] == 2
+
+    async def test_textract_failure_falls_back_to_local_ocr(self, extractor):
+        """Test that a Textract error is recovered locally and marked as a fallback."""
+        extractor, path = extractor
+        extractor.textract = StubTextract(fail=True)
+
+        result = await extractor.extract(path)
+
+        assert result["method"] == "local_tesseract"
+        assert result["metadata"]["aws_service"] == "textract_error"
+        assert result["metadata"]["fallback"] == "local_processing"
@@ -0,0 +1,125 @@
+"""Tests for message writes and conversation running totals."""
+
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from src.models.conversation import Conversation
+from src.repositories.conversation_repository import ConversationRepository
+from src.repositories.message_repository import MessageRepository
+from src.repositories.user_repository import UserRepository
+
+
+@pytest.fixture
+async def conversation(test_db):
+    """A fresh conversation, with the session it was created in."""
+    async with test_db() as db:
+        user = await UserRepository(db).create(f"repo-{uuid4()}@example.com", "not-a-hash")
+        conversation = await ConversationRepository.create(db, user.id, "Repository test")
+        yield db, conversation
+        await db.delete(user)
+        await db.commit()
+
+
+def turn(created_at: datetime) -> list[dict]:
+    return [
+        {"role": "user", "content": "Question", "created_at": created_at},
+        {
+            "role": "assistant",
+            "content": "Answer",
+            "input_tokens": 120,
+            "output_tokens": 30,
+            "created_at": created_at,
+        },
+    ]
+
+
+class TestCreateMany:
+    """Test the bulk insert used to save chat turns."""
+
+    async def test_returns_messages_in_the_order_given(self, conversation):
+        """Test that rows sharing a timestamp come back as given, with their ids."""
+        db, conversation = conversation
+        rows = turn(datetime.utcnow())
+        rows[0]["id"] = uuid4()
+
+        created = await MessageRepository.create_many(db, conversation.id, rows)
+
+        assert [(m.role, m.content) for m in created] == [
+            ("user", "Question"),
+            ("assistant", "Answer"),
+        ]
+        assert created[0].id == rows[0]["id"]
+        assert [m.tokens_used for m in created] == [0, 150]
+
+    async def test_updates_the_running_totals(self, conversation):
+        """Test that token and message counters accumulate across turns."""
+        db, conversation = conversation
+
+        await MessageRepository.create_many(db, conversation.id, turn(datetime.utcnow()))
+        await MessageRepository.create(db, conversation.id, "user", "Follow-up", input_tokens=5)
+
+        assert await MessageRepository.get_token_count(db, conversation.id) == {
+            "input_tokens": 125,
+            "output_tokens": 30,
+            "total_tokens": 155,
+            "message_count": 3,
+        }
+
+    async def test_sets_conversation_values_in_the_same_update(self, conversation):
+        """Test that a summary update is written with the turn."""
+        db, conversation = conversation
+        folded_until = datetime(2024, 1, 1)
+
+        await MessageRepository.create_many(
+            db,
+            conversation.id,
+            turn(datetime.utcnow()),
+            conversation_values={"summary": "Earlier turns", "summary_until": folded_until},
+        )
+
+        await db.refresh(conversation)
+        assert (conversation.summary, conversation.summary_until) == (
+            "Earlier turns",
+            folded_until,
+        )
+        assert conversation.message_count == 2
+
+    async def test_commit_false_leaves_the_transaction_open(self, conversation):
+        """Test that rolling back discards the messages and the counters together."""
+        db, conversation = conversation
+
+        await MessageRepository.create_many(
+            db, conversation.id, turn(datetime.utcnow()), commit=False
+        )
+        assert db.in_transaction()
+        await db.rollback()
+
+        assert await MessageRepository.get_conversation_messages(db, conversation.id) == []
+        stats = await MessageRepository.get_token_count(db, conversation.id)
+        assert (stats["message_count"], stats["total_tokens"]) == (0, 0)
+
+
+class TestTokenStats:
+    """Test token stats built from the running totals."""
+
+    def test_sums_input_and_output(self):
+        """Test that total_tokens is derived from the two counters."""
+        conversation = Conversation(total_input_tokens=40, total_output_tokens=2, message_count=3)
+
+        assert MessageRepository.token_stats(conversation) == {
+            "input_tokens": 40,
+            "output_tokens": 2,
+            "total_tokens": 42,
+            "message_count": 3,
+        }
+
+    def test_missing_conversation_is_empty(self):
+        """Test that an unknown conversation reports zeros."""
+        assert MessageRepository.token_stats(None) == {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "total_tokens": 0,
+            "message_count": 0,
+        }
@@ -0,0 +1,129 @@
+"""Tests for column profiling of extracted tables."""
+
+from pathlib import Path
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.services.table_profiler import HyperLogLog, profile_arrow_file, profile_batches
+from src.services.table_store import TableStore
+
+
+def profile_rows(columns: list[str], rows: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Profile row dicts as a table of string columns, as a CSV read as text would be."""
+    table = pa.table(
+        {
+            name: pa.array(
+                [None if row.get(name) in (None, "") else str(row.get(name)) for row in rows],
+                type=pa.string(),
+            )
+            for name in columns
+        }
+    )
+    return profile_batches(table.schema, lambda: iter(table.to_batches()))
+
+
+class TestHyperLogLog:
+    """Test the cardinality estimator."""
+
+    def test_estimate_within_error_bounds(self):
+        """Test small (linear counting) and large estimates."""
+        for distinct in (1000, 200000):
+            hll = HyperLogLog()
+            values = np.arange(distinct)
+            # Adding duplicates must not change the estimate
+            hll.add_hashes(pd.util.hash_array(values))
+            hll.add_hashes(pd.util.hash_array(values[: distinct // 2]))
+
+            assert abs(hll.estimate() - distinct) / distinct < 0.03
+
+
+class TestProfileRows:
+    """Test type inference and stats on string-valued tables."""
+
+    def test_semantic_types(self):
+        """Test that each column's type is picked from its values, not its storage type."""
+        rows = [
+            {
+                "id": str(i),
+                "price": f"{i * 1.5:.2f}",
+                "paid": "yes" if i % 2 else "no",
+                "day": f"2024-03-{i % 28 + 1:02d}",
+                "at": f"2024-03-01 10:{i % 60:02d}:00",
+                "region": ["north", "south", "east"][i % 3],
+                "note": f"free text {i}",
+            }
+            for i in range(300)
+        ]
+        profile = profile_rows(list(rows[0]), rows)
+
+        assert {name: column["type"] for name, column in profile.items()} == {
+            "id": "int",
+            "price": "float",
+            "paid": "bool",
+            "day": "date",
+            "at": "datetime",
+            "region": "categorical",
+            "note": "text",
+        }
+        assert profile["id"]["min"] == 0 and profile["id"]["max"] == 299
+        assert profile["day"]["min"] == "2024-03-01"
+        assert profile["day"]["max"] == "2024-03-28"
+        assert profile["day"]["format"] == "%Y-%m-%d"
+        assert profile["region"]["cardinality"] == 3
+        assert profile["region"]["min"] is None
+
+    def test_date_format_is_reported(self):
+        """Test that dates in a non-ISO format report the format they follow."""
+        rows = [{"due": f"{i % 12 + 1:02d}/{i % 28 + 1:02d}/2024"} for i in range(100)]
+
+        due = profile_rows(["due"], rows)["due"]
+
+        assert (due["type"], due["format"]) == ("date", "%m/%d/%Y")
+        assert (due["min"], due["max"]) == ("2024-01-01", "2024-12-28")
+
+    def test_nulls_invalid_values_and_top_values(self):
+        """Test null rate, unparseable values in a typed column, and top-k counts."""
+        amounts = [str(i) for i in range(97)] + ["n/a", "", None]
+        rows = [
+            {"amount": value, "status": "open" if i < 70 else "closed"}
+            for i, value in enumerate(amounts)
+        ]
+        profile = profile_rows(["amount", "status"], rows)
+
+        amount = profile["amount"]
+        assert amount["type"] == "int"
+        assert amount["null_count"] == 2
+        assert amount["null_rate"] == 0.02
+        assert amount["invalid_count"] == 1
+        assert amount["max"] == 96
+        assert profile["status"]["top_values"] == [
+            {"value": "open", "count": 70},
+            {"value": "closed", "count": 30},
+        ]
+        assert profile["status"]["top_values_exact"] is True
+
+
+class TestProfileArrowFile:
+    """Test profiling a stored table."""
+
+    def test_profiles_every_row_across_batches(self, tmp_path: Path, monkeypatch):
+        """Test that a value far past the first batch still counts."""
+        monkeypatch.setattr("src.services.table_store.BLOCK_SIZE", 256)
+        store = TableStore(str(tmp_path / "tables"), ttl_seconds=3600)
+        csv_path = tmp_path / "data.csv"
+        lines = ["n,code"] + [f"{i},C{i % 4}" for i in range(2000)] + ["-5,C9"]
+        csv_path.write_text("\n".join(lines) + "\n")
+        table_id = store.ingest_csv(str(csv_path))["table_id"]
+
+        profile = profile_arrow_file(store.path(table_id))
+
+        assert profile["n"]["type"] == "int"
+        assert profile["n"]["min"] == -5
+        assert profile["n"]["cardinality"] == 2001
+        assert profile["n"]["cardinality_exact"] is True
+        assert profile["code"]["type"] == "categorical"
+        assert profile["code"]["cardinality"] == 5
@@ -0,0 +1,152 @@
+"""Tests for columnar table storage."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from src.services.table_store import StoredRows, TableNotFoundError, TableStore
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> TableStore:
+    return TableStore(str(tmp_path / "tables"), ttl_seconds=3600)
+
+
+def write_csv(path: Path, lines: list[str]) -> str:
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+class TestTableStore:
+    """Test CSV ingestion and paged reads."""
+
+    def test_ingest_returns_schema_stats_and_preview(self, store: TableStore, tmp_path: Path):
+        """Test typed columns, null counts, numeric bounds and the preview size."""
+        lines = ["id;amount;label"] + [f"{i};{i * 2.5};row {i}" for i in range(10)] + ["10;;"]
+        result = store.ingest_csv(write_csv(tmp_path / "data.csv", lines), preview_rows=3)
+
+        assert result["delimiter"] == ";"
+        assert result["row_count"] == 11
+        assert result["columns"] == [
+            {"name": "id", "type": "int64", "null_count": 0, "min": 0, "max": 10},
+            {"name": "amount", "type": "double", "null_count": 1, "min": 0.0, "max": 22.5},
+            {"name": "label", "type": "string", "null_count": 1},
+        ]
+        assert result["preview"] == [
+            {"id": 0, "amount": 0.0, "label": "row 0"},
+            {"id": 1, "amount": 2.5, "label": "row 1"},
+            {"id": 2, "amount": 5.0, "label": "row 2"},
+        ]
+
+    def test_read_rows_pages_across_batches(self, store: TableStore, tmp_path: Path, monkeypatch):
+        """Test that pages spanning record batch boundaries come back intact."""
+        monkeypatch.setattr("src.services.table_store.BLOCK_SIZE", 64)
+        lines = ["n,square"] + [f"{i},{i * i}" for i in range(100)]
+        table_id = store.ingest_csv(write_csv(tmp_path / "squares.csv", lines))["table_id"]
+
+        page = store.read_rows(table_id, offset=45, limit=10)
+
+        assert [row["n"] for row in page["rows"]] == list(range(45, 55))
+        assert page["total_rows"] == 100
+        assert page["has_more"] is True
+        assert store.read_rows(table_id, offset=95, limit=10)["has_more"] is False
+
+    def test_type_change_after_first_block_falls_back_to_strings(
+        self, store: TableStore, tmp_path: Path, monkeypatch
+    ):
+        """Test that a late value that breaks the inferred type does not fail ingestion."""
+        monkeypatch.setattr("src.services.table_store.BLOCK_SIZE", 64)
+        lines = ["code"] + [str(i) for i in range(50)] + ["A-17"]
+        result = store.ingest_csv(write_csv(tmp_path / "codes.csv", lines))
+
+        assert result["columns"][0]["type"] == "string"
+        assert result["row_count"] == 51
+        assert store.read_rows(result["table_id"], 50, 1)["rows"] == [{"code": "A-17"}]
+
+    def test_missing_table(self, store: TableStore):
+        """Test reading a table that was pruned or never written."""
+        with pytest.raises(TableNotFoundError):
+            store.read_rows("0" * 32, 0, 10)
+
+    def test_touch_restarts_the_ttl(self, store: TableStore, tmp_path: Path):
+        """Test that a touched table survives pruning and a missing one reports False."""
+        result = store.ingest_csv(write_csv(tmp_path / "data.csv", ["a", "1"]))
+        path = store.path(result["table_id"])
+        expired = os.path.getmtime(path) - 2 * store.ttl_seconds
+        os.utime(path, (expired, expired))
+
+        assert store.touch(result["table_id"])
+        store.prune()
+
+        assert os.path.exists(path)
+        assert not store.touch("0" * 32)
+
+    def test_non_utf8_text_is_decoded(self, store: TableStore, tmp_path: Path):
+        """Test that a Latin-1 CSV is stored and previewed as strings, not bytes."""
+        path = tmp_path / "latin1.csv"
+        path.write_bytes("name,city\nJosé,São Paulo\nAna,Lima\n".encode("latin-1"))
+
+        result = store.ingest_csv(str(path))
+
+        assert [column["type"] for column in result["columns"]] == ["string", "string"]
+        assert result["preview"][0] == {"name": "José", "city": "São Paulo"}
+        assert store.read_rows(result["table_id"], 0, 2)["rows"] == result["preview"]
+        json.dumps(result)
+
+    def test_with_rows_replaces_previews(self, store: TableStore, tmp_path: Path):
+        """Test that exports and transformations get whole tables, not the preview."""
+        lines = ["n"] + [str(i) for i in range(10)]
+        stored = store.ingest_csv(write_csv(tmp_path / "n.csv", lines), preview_rows=3)
+        inline = {"name": "Table_1", "columns": ["a"], "rows": [{"a": 1}]}
+        data = {
+            "text": "",
+            "tables": [
+                {
+                    "name": "n",
+                    "columns": ["n"],
+                    "rows": stored["preview"],
+                    "table_id": stored["table_id"],
+                    "preview": True,
+                },
+                inline,
+            ],
+        }
+
+        loaded = store.with_rows(data)
+
+        assert isinstance(loaded["tables"][0]["rows"], StoredRows)
+        assert [row["n"] for row in loaded["tables"][0]["rows"]] == list(range(10))
+        assert loaded["tables"][0]["preview"] is False
+        assert loaded["tables"][1] is inline
+        assert len(data["tables"][0]["rows"]) == 3
+        os.unlink(store.path(stored["table_id"]))
+        with pytest.raises(TableNotFoundError):
+            store.with_rows(data)
+
+    def test_stored_rows_are_read_a_batch_at_a_time(
+        self, store: TableStore, tmp_path: Path, monkeypatch
+    ):
+        """Test that stored rows stream by record batch and match their Arrow table."""
+        monkeypatch.setattr("src.services.table_store.BLOCK_SIZE", 64)
+        lines = ["n,day"] + [f"{i},2024-01-{i % 28 + 1:02d}" for i in range(100)]
+        stored = store.ingest_csv(write_csv(tmp_path / "days.csv", lines))
+        rows = StoredRows(store.path(stored["table_id"]))
+
+        batches = list(rows.batches())
+
+        assert len(rows) == 100
+        assert len(batches) > 1
+        assert [row for batch in batches for row in batch] == list(rows)
+        assert rows.arrow().to_pylist() == list(rows)
+        assert batches[0][0] == {"n": 0, "day": "2024-01-01"}  # Dates as JSON strings
+
+    def test_stored_rows_outlive_pruning(self, store: TableStore, tmp_path: Path):
+        """Test that a table deleted while an export reads it is still read whole."""
+        stored = store.ingest_csv(write_csv(tmp_path / "n.csv", ["n", "1", "2"]))
+        rows = StoredRows(store.path(stored["table_id"]))
+
+        os.unlink(store.path(stored["table_id"]))
+
+        assert list(rows) == [{"n": 1}, {"n": 2}]
@@ -0,0 +1,204 @@
+"""Tests for Textract response parsing."""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+from PyPDF2 import PdfReader, PdfWriter
+
+from src.services.textract_parser import TextractDocument, parse_textract_blocks
+from src.services.textract_pipeline import TextractPipeline, TextractPipelineError
+
+FIXTURES = Path(__file__).parent / "fixtures" / "textract"
+
+
+@pytest.fixture
+def invoice_blocks() -> list[dict]:
+    """Blocks of a one-page invoice AnalyzeDocument response."""
+    with open(FIXTURES / "invoice_analyze_document.json") as f:
+        return json.load(f)["Blocks"]
+
+
+class TestTextractParser:
+    """Test table, form and text reconstruction."""
+
+    def test_text_and_pages(self, invoice_blocks: list[dict]):
+        """Test LINE text, page count and average confidence."""
+        parsed = parse_textract_blocks(invoice_blocks)
+
+        assert parsed["text"].splitlines() == [
+            "INVOICE",
+            "Invoice No: INV-1042",
+            "Date: 2024-03-01",
+            "Paid:",
+        ]
+        assert parsed["pages"] == 1
+        assert parsed["confidence"] == 97.75
+
+    def test_table_cells_read_word_children(self, invoice_blocks: list[dict]):
+        """Test that cell text comes from the cell's WORD children."""
+        table = parse_textract_blocks(invoice_blocks)["tables"][0]
+
+        assert table["raw_rows"][1:] == [["Widget", "2", "19.99"], ["Gadget", "1", "5.00"]]
+        assert table["row_count"] == 2
+        assert table["column_count"] == 3
+        assert table["page"] == 1
+
+    def test_merged_header_spans_columns(self, invoice_blocks: list[dict]):
+        """Test that a merged header labels every column it spans."""
+        table = parse_textract_blocks(invoice_blocks)["tables"][0]
+
+        assert table["raw_rows"][0] == ["Item", "Price", "Price"]
+        assert table["columns"] == ["Item", "Price", "Price_3"]
+        assert table["rows"][0] == {"Item": "Widget", "Price": "2", "Price_3": "19.99"}
+
+    def test_forms(self, invoice_blocks: list[dict]):
+        """Test key/value pairs, including a selection element value."""
+        forms = parse_textract_blocks(invoice_blocks)["forms"]
+
+        assert forms == {
+            "Invoice No:": "INV-1042",
+            "Date:": "2024-03-01",
+            "Paid:": "SELECTED",
+        }
+
+    def test_empty_response(self):
+        """Test a response without blocks."""
+        parsed = parse_textract_blocks([])
+
+        assert parsed == {
+            "text": "",
+            "tables": [],
+            "forms": {},
+            "confidence": 0,
+            "pages": 1,
+            "page_details": [],
+        }
+
+    def test_missing_relationship_targets_are_ignored(self, invoice_blocks: list[dict]):
+        """Test that ids pointing outside the response do not break parsing."""
+        blocks = [b for b in invoice_blocks if b["Id"] != "w11"]
+        document = TextractDocument(blocks)
+
+        assert document.text("c22") == ""
+        assert document.tables()[0]["raw_rows"][1] == ["Widget", "", "19.99"]
+
+
+def page_blocks(page_id: str, text: str, confidence: float) -> list[dict]:
+    """Blocks of a page holding one line of text."""
+    return [
+        {"BlockType": "PAGE", "Id": f"{page_id}-page", "Page": 1},
+        {
+            "BlockType": "LINE",
+            "Id": f"{page_id}-line",
+            "Text": text,
+            "Confidence": confidence,
+            "Page": 1,
+        },
+    ]
+
+
+class StubTextract:
+    """Textract stand-in: sync calls echo the page width, async jobs page their results."""
+
+    def __init__(self, job_pages: int = 0, results_per_call: int = 1):
+        self.sync_calls = 0
+        self.job_pages = job_pages
+        self.results_per_call = results_per_call
+        self.started = []
+        self.polls = 0
+
+    def analyze_document(self, Document, FeatureTypes):
+        self.sync_calls += 1
+        page = PdfReader(io.BytesIO(Document["Bytes"])).pages
+        assert len(page) == 1, "synchronous calls must receive single-page documents"
+        width = int(page[0].mediabox.width)
+        return {"Blocks": page_blocks(f"w{width}", f"width {width}", 90.0 + width % 10)}
+
+    def start_document_analysis(self, DocumentLocation, FeatureTypes):
+        self.started.append(DocumentLocation["S3Object"])
+        return {"JobId": "job-1"}
+
+    def get_document_analysis(self, JobId, NextToken=None):
+        if NextToken is None:
+            self.polls += 1
+            if self.polls < 2:
+                return {"JobStatus": "IN_PROGRESS"}
+        start = int(NextToken or 0)
+        end = min(start + self.results_per_call, self.job_pages)
+        blocks = []
+        for page in range(start + 1, end + 1):
+            for block in page_blocks(f"p{page}", f"page {page}", 95.0):
+                blocks.append({**block, "Page": page})
+        response = {"JobStatus": "SUCCEEDED", "Blocks": blocks}
+        if end < self.job_pages:
+            response["NextToken"] = str(end)
+        return response
+
+
+class StubS3:
+    def __init__(self):
+        self.objects = set()
+
+    def upload_file(self, file_path, bucket, key):
+        self.objects.add((bucket, key))
+
+    def delete_object(self, Bucket, Key):
+        self.objects.discard((Bucket, Key))
+
+
+def write_pdf(path: Path, pages: int) -> str:
+    """Write a blank PDF whose page N is 100 + N points wide."""
+    writer = PdfWriter()
+    for page in range(1, pages + 1):
+        writer.add_blank_page(width=100 + page, height=100)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+
+class TestTextractPipeline:
+    """Test routing between per-page and asynchronous analysis."""
+
+    async def test_small_pdf_is_analyzed_per_page(self, tmp_path: Path):
+        """Test that each page gets its own sync call and keeps its page number."""
+        textract = StubTextract()
+        pipeline = TextractPipeline(textract, sync_max_pages=5, max_concurrency=2)
+
+        result = await pipeline.analyze_pdf(write_pdf(tmp_path / "small.pdf", 3))
+
+        assert textract.sync_calls == 3
+        assert result["processing_method"] == "analyze_document_per_page"
+        assert result["pages"] == 3
+        assert result["text"].splitlines() == ["width 101", "width 102", "width 103"]
+        assert [(p["page"], p["confidence"]) for p in result["page_details"]] == [
+            (1, 91.0),
+            (2, 92.0),
+            (3, 93.0),
+        ]
+
+    async def test_large_pdf_uses_async_job_with_pagination(self, tmp_path: Path):
+        """Test the S3 + StartDocumentAnalysis path, following NextToken."""
+        textract = StubTextract(job_pages=4, results_per_call=1)
+        s3 = StubS3()
+        pipeline = TextractPipeline(
+            textract, s3, bucket="input-bucket", sync_max_pages=2, poll_interval=0.01
+        )
+
+        result = await pipeline.analyze_pdf(write_pdf(tmp_path / "large.pdf", 4))
+
+        assert textract.sync_calls == 0
+        assert textract.started[0]["Bucket"] == "input-bucket"
+        assert result["processing_method"] == "start_document_analysis"
+        assert result["pages"] == 4
+        assert result["text"].splitlines() == ["page 1", "page 2", "page 3", "page 4"]
+        assert s3.objects == set(), "staged input should be deleted"
+
+    async def test_large_pdf_without_bucket_fails(self, tmp_path: Path):
+        """Test that large PDFs need S3 for the asynchronous path."""
+        pipeline = TextractPipeline(StubTextract(), sync_max_pages=1)
+        pipeline.bucket = None
+
+        with pytest.raises(TextractPipelineError):
+            await pipeline.analyze_pdf(write_pdf(tmp_path / "large.pdf", 2))
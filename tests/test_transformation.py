@@ -0,0 +1,535 @@
+"""Tests for compiled transformation pipelines."""
+
+import copy
+
+import pytest
+
+from src.services import table_sort
+from src.services.entity_extractor import extract_entities
+from src.services.table_sort import SortKey
+from src.services.table_store import StoredRows, TableStore
+from src.services.transformation_service import TransformationRule, TransformationService
+
+
+def rule(operation: str, /, **parameters) -> TransformationRule:
+    return TransformationRule(operation=operation, parameters=parameters, description="")
+
+
+class CountingRows(list):
+    """Row list that counts how many rows are read from it."""
+
+    read = 0
+
+    def __iter__(self):
+        for row in super().__iter__():
+            self.read += 1
+            yield row
+
+
+@pytest.fixture
+def service() -> TransformationService:
+    return TransformationService()
+
+
+@pytest.fixture
+def orders() -> dict:
+    rows = [
+        {"id": "1", "customer": "Ann", "status": "Paid", "total": "30"},
+        {"id": "2", "customer": "Bob", "status": "open", "total": "12"},
+        {"id": "3", "customer": "Cy", "status": "paid", "total": "7"},
+        {"id": "4", "customer": "Di", "status": "paid", "total": "45"},
+        {"id": "5", "customer": "Ed", "status": "open", "total": "9"},
+    ]
+    return {
+        "text": "Orders",
+        "tables": [
+            {
+                "name": "Orders",
+                "columns": ["id", "customer", "status", "total"],
+                "rows": rows,
+                "row_count": len(rows),
+                "column_count": 4,
+            }
+        ],
+    }
+
+
+class TestScan:
+    """Test fused select/rename/filter/limit rules."""
+
+    def test_fused_rules(self, service, orders):
+        """Test that a chain of row rules gives the same table as applying them in turn."""
+        original = copy.deepcopy(orders)
+        rules = [
+            rule("select_columns", columns=["customer", "status", "total"]),
+            rule("rename_columns", mapping={"total": "amount"}),
+            rule("filter_rows", column="status", value="PAID"),
+            rule("rename_columns", mapping={"customer": "name"}),
+            rule("limit_rows", limit=2),
+        ]
+
+        result = service.apply_transformations(orders, rules)
+
+        assert result["tables"][0] == {
+            "name": "Orders",
+            "columns": ["name", "status", "amount"],
+            "rows": [
+                {"name": "Ann", "status": "Paid", "amount": "30"},
+                {"name": "Cy", "status": "paid", "amount": "7"},
+            ],
+            "row_count": 2,
+            "column_count": 3,
+        }
+        assert orders == original
+        assert "Scan: select" in service.compile(rules).explain()
+
+    def test_limit_stops_the_scan(self, service, orders):
+        """Test that rows after the limit is reached are never read."""
+        rows = CountingRows(orders["tables"][0]["rows"] * 1000)
+        orders["tables"][0]["rows"] = rows
+
+        result = service.apply_transformations(
+            orders,
+            [rule("filter_rows", column="status", value="open"), rule("limit_rows", limit=3)],
+        )
+
+        assert [row["id"] for row in result["tables"][0]["rows"]] == ["2", "5", "2"]
+        assert rows.read == 7
+
+    def test_tables_without_columns_or_rows_are_skipped(self, service):
+        """Test that select skips tables without columns and list rows pass filters."""
+        data = {
+            "tables": [
+                {"name": "raw", "rows": [["a", "b"], {"x": "1"}]},
+                {"name": "grid", "columns": ["x", "y"], "rows": [["1", "2"], {"x": "3", "y": "4"}]},
+            ]
+        }
+
+        result = service.apply_transformations(
+            data,
+            [rule("select_columns", columns=["y"]), rule("filter_rows", column="y", value="9")],
+        )
+
+        raw, grid = result["tables"]
+        assert raw == {"name": "raw", "rows": [["a", "b"]], "row_count": 1}
+        assert grid["columns"] == ["y"]
+        assert grid["rows"] == [["2"]]
+
+
+class TestFilter:
+    """Test predicate filters and their indexes."""
+
+    @pytest.mark.parametrize(
+        "params, expected",
+        [
+            ({"column": "total", "operation": "gt", "value": 10}, ["1", "2", "4"]),
+            ({"column": "total", "operation": "between", "value": [9, 30]}, ["1", "2", "5"]),
+            ({"column": "customer", "operation": "in", "value": ["ann", "ED"]}, ["1", "5"]),
+            ({"column": "customer", "operation": "regex", "value": "^(b|c)"}, ["2", "3"]),
+            ({"column": "note", "operation": "not_null"}, ["3"]),
+            (
+                {
+                    "where": {
+                        "or": [
+                            {"column": "customer", "operation": "starts_with", "value": "a"},
+                            {"column": "total", "operation": "<", "value": 10},
+                        ]
+                    }
+                },
+                ["1", "3", "5"],
+            ),
+            (
+                {
+                    "where": {
+                        "and": [
+                            {"column": "status", "value": "paid"},
+                            {"not": {"column": "total", "operation": "<=", "value": 7}},
+                        ]
+                    }
+                },
+                ["1", "4"],
+            ),
+        ],
+    )
+    def test_predicates(self, service, orders, params, expected):
+        """Test comparisons, ranges, in, regex, null checks and predicate trees."""
+        orders["tables"][0]["rows"][2]["note"] = "late"
+
+        result = service.apply_transformations(orders, [rule("filter_rows", **params)])
+
+        assert [row["id"] for row in result["tables"][0]["rows"]] == expected
+
+    def test_unknown_operations_are_noted(self, service, orders):
+        """Test that a filter with an unknown operation is skipped and reported."""
+        rules = [rule("filter_rows", column="status", value="paid", operation="resembles")]
+
+        result = service.apply_transformations(orders, rules)
+
+        assert result["tables"][0]["row_count"] == 5
+        assert result["transformation_notes"] == [
+            "filter_rows skipped: unknown filter operation 'resembles'"
+        ]
+        assert "unknown filter operation 'resembles'" in service.compile(rules).explain()
+
+        again = service.apply_transformations(result, [rule("limit_rows", limit=2)])
+        assert "transformation_notes" not in again
+
+    def test_repeated_filters_use_indexes(self, service, orders):
+        """Test that filtering the same rows again is answered from an index."""
+        rows = CountingRows(orders["tables"][0]["rows"] * 400)
+        orders["tables"][0]["rows"] = rows
+        rules = [rule("filter_rows", column="status", operation="in", value=["open"])]
+
+        scanned = service.apply_transformations(orders, rules)
+        service.apply_transformations(orders, rules)  # Builds the index
+        reads = rows.read
+        indexed = service.apply_transformations(orders, rules)
+
+        assert rows.read == reads
+        assert indexed == scanned
+        assert indexed["tables"][0]["row_count"] == 800
+
+    @pytest.mark.parametrize("engine", ["rows", "columnar"])
+    def test_ranges_use_the_profiled_date_format(self, service, engine):
+        """Test that date cells in the column's profiled format compare with ISO bounds."""
+        rows = [
+            {"id": "1", "due": "03/15/2024"},
+            {"id": "2", "due": "01/02/2024"},
+            {"id": "3", "due": "12/30/2023"},
+        ]
+        table = {"name": "t", "columns": ["id", "due"], "rows": rows}
+        profiled = {**table, "profile": {"due": {"type": "date", "format": "%m/%d/%Y"}}}
+        plan = service.compile(
+            [
+                rule("rename_columns", mapping={"due": "due_date"}),
+                rule("filter_rows", column="due_date", operation="gte", value="2024-01-01"),
+            ]
+        )
+
+        result = plan.execute({"tables": [profiled]}, engine=engine)["tables"][0]
+
+        assert [row["id"] for row in result["rows"]] == ["1", "2"]
+        assert list(result["profile"]) == ["due_date"]
+        assert plan.execute({"tables": [table]}, engine=engine)["tables"][0]["rows"] == []
+
+
+class TestSort:
+    """Test sort planning."""
+
+    def test_limit_after_sort_is_top_k(self, service, orders):
+        """Test that sort then limit (past a rename) is planned and run as a top-k."""
+        rules = [
+            rule("sort_rows", column="total", order="desc"),
+            rule("rename_columns", mapping={"total": "amount"}),
+            rule("limit_rows", limit=2),
+        ]
+
+        result = service.apply_transformations(orders, rules)
+
+        table = result["tables"][0]
+        assert [row["amount"] for row in table["rows"]] == ["45", "30"]
+        assert table["row_count"] == 2
+        plan = service.compile(rules).explain()
+        assert "TopK: total desc, keep 2" in plan
+        assert "limit" not in plan.split("note")[0]
+
+    def test_filter_after_sort_runs_first(self, service, orders):
+        """Test that a filter following a sort is planned before it."""
+        rules = [
+            rule("sort_rows", column="customer", order="desc"),
+            rule("filter_rows", column="status", value="open"),
+        ]
+
+        result = service.apply_transformations(orders, rules)
+
+        assert [row["customer"] for row in result["tables"][0]["rows"]] == ["Ed", "Bob"]
+        plan = service.compile(rules)
+        assert [stage.describe().split(":")[0] for stage in plan.stages] == ["Scan", "Sort"]
+
+    def test_typed_multi_key_sort(self, service):
+        """Test that keys sort as numbers, dates and natural strings, blanks last."""
+        rows = [
+            {"team": "b", "due": "03/02/2024", "score": "1,200", "file": "file10"},
+            {"team": "a", "due": "", "score": "15", "file": "File2"},
+            {"team": "b", "due": "25/01/2024", "score": "", "file": "file1"},
+            {"team": "a", "due": "12/12/2023", "score": "15", "file": "file3"},
+        ]
+        data = {"tables": [{"name": "t", "columns": list(rows[0]), "rows": rows}]}
+
+        def order(*keys):
+            rules = [rule("sort_rows", keys=[dict(zip(("column", "order"), k)) for k in keys])]
+            result = service.apply_transformations(data, rules)
+            return [row["file"] for row in result["tables"][0]["rows"]]
+
+        assert order(("score", "desc")) == ["file10", "File2", "file3", "file1"]
+        assert order(("team", "asc"), ("score", "desc"), ("file", "desc")) == [
+            "file3",
+            "File2",
+            "file10",
+            "file1",
+        ]
+        assert order(("due", "asc")) == ["file3", "file1", "file10", "File2"]
+        assert order(("file", "asc")) == ["file1", "File2", "file3", "file10"]
+
+    @pytest.mark.parametrize("engine", ["rows", "columnar"])
+    def test_profiled_types_are_used_before_sampling(self, service, engine):
+        """Test that a column's profile decides its sort type and date format."""
+        rows = [{"due": "03/02/2024"}, {"due": "02/03/2024"}, {"due": "01/04/2024"}]
+        table = {"name": "t", "columns": ["due"], "rows": rows}
+        profiled = {**table, "profile": {"due": {"type": "date", "format": "%m/%d/%Y"}}}
+        plan = service.compile([rule("sort_rows", column="due")])
+
+        def order(table):
+            result = plan.execute({"tables": [table]}, engine=engine)
+            return [row["due"] for row in result["tables"][0]["rows"]]
+
+        # Sampling reads these as day first; the profile says month first
+        assert order(table) == ["03/02/2024", "02/03/2024", "01/04/2024"]
+        assert order(profiled) == ["01/04/2024", "02/03/2024", "03/02/2024"]
+
+    def test_profiled_columns_are_not_sampled(self):
+        """Test that a key on a profiled column never reads the column's values."""
+
+        def values():
+            raise AssertionError("column was sampled")
+
+        table = {"profile": {"total": {"type": "int"}, "note": {"type": "text"}}}
+
+        total = table_sort.value_key(SortKey("total"), table, values)
+        note = table_sort.value_key(SortKey("note"), table, values)
+
+        assert total("15") < total("1,200") < total("") == total("n/a")
+        assert note("item 2") < note("Item 10")
+
+    def test_external_sort_matches_in_memory(self, service, orders):
+        """Test that sorting in spilled runs gives the same rows as sorting in memory."""
+        orders["tables"][0]["rows"] = orders["tables"][0]["rows"] * 7
+        plan = service.compile([rule("sort_rows", column="total", order="desc")])
+
+        external = plan.execute(orders, sort_run_rows=3)
+
+        assert external == plan.execute(orders, sort_run_rows=None)
+        assert [row["total"] for row in external["tables"][0]["rows"][:8]] == ["45"] * 7 + ["30"]
+
+    def test_bad_sort_keys_are_noted(self, service):
+        """Test that an unknown sort type skips the rule with a note."""
+        plan = service.compile([rule("sort_rows", column="total", type="roman")])
+
+        assert plan.stages == []
+        assert "unknown sort type" in plan.explain()
+
+
+class TestPlans:
+    """Test plan reuse and rule handling."""
+
+    def test_plans_are_cached_by_rules(self, service):
+        """Test that equal rule lists share a plan and different ones do not."""
+        first = service.compile([rule("limit_rows", limit=5)])
+
+        assert service.compile([rule("limit_rows", limit=5)]) is first
+        assert service.compile([rule("limit_rows", limit=6)]) is not first
+
+    def test_document_rules_and_bad_rules(self, service, orders):
+        """Test that unknown and invalid rules are skipped and the rest still apply."""
+        rules = [
+            rule("explode"),
+            rule("limit_rows", limit="3"),
+            rule("transform", operation="uppercase"),
+        ]
+
+        result = service.apply_transformations(orders, rules)
+
+        assert result["text"] == "ORDERS"
+        assert result["tables"][0]["row_count"] == 5
+        explain = service.compile(rules).explain()
+        assert "Case: uppercase" in explain
+        assert "unknown operation explode skipped" in explain
+        assert result["transformation_notes"] == [
+            "unknown operation explode skipped",
+            "limit_rows skipped: limit must be an integer, got '3'",
+        ]
+
+    def test_document_rules_leave_the_input_alone(self, service, orders):
+        """Test that a rule adding a table does not grow the caller's table list."""
+        rules = [rule("create_table_from_text", columns=["email"])]
+
+        result = service.apply_transformations(orders, rules)
+
+        assert len(result["tables"]) == 2
+        assert len(orders["tables"]) == 1
+
+
+class TestColumnar:
+    """Test that the columnar engine gives the same results as the row path."""
+
+    @pytest.mark.parametrize(
+        "rules",
+        [
+            [
+                rule("select_columns", columns=["customer", "status", "total"]),
+                rule("rename_columns", mapping={"total": "amount"}),
+                rule("filter_rows", column="status", value="PAID"),
+                rule("limit_rows", limit=2),
+            ],
+            [rule("sort_rows", column="total", order="desc"), rule("limit_rows", limit=3)],
+            [
+                rule(
+                    "sort_rows",
+                    keys=[{"column": "status"}, {"column": "customer", "order": "desc"}],
+                )
+            ],
+            [rule("filter_rows", column="customer", value="d", operation="contains")],
+            [
+                rule(
+                    "filter_rows",
+                    where={
+                        "or": [
+                            {"column": "total", "operation": "gte", "value": 30},
+                            {"column": "status", "operation": "regex", "value": "^o"},
+                        ]
+                    },
+                )
+            ],
+            [rule("transform", operation="lowercase"), rule("merge_tables")],
+            [rule("filter_rows", column="status", operation="is_null")],
+            [rule("filter_rows", where={"not": {"column": "customer", "operation": "not_null"}})],
+        ],
+    )
+    def test_engines_agree(self, service, orders, rules):
+        """Test that rules run on frames match the row-by-row result."""
+        orders.pop("text")
+        orders["tables"][0]["rows"].append(
+            {"id": "6", "customer": None, "status": None, "total": None}
+        )
+        orders["tables"].append({**orders["tables"][0], "name": "More"})
+        plan = service.compile(rules)
+
+        assert plan.execute(orders, engine="columnar") == plan.execute(orders, engine="rows")
+
+    def test_irregular_tables_stay_rows(self, service):
+        """Test that tables with list rows or mixed keys are not converted."""
+        data = {
+            "tables": [
+                {"name": "grid", "columns": ["x"], "rows": [["b"], ["a"]]},
+                {"name": "mixed", "columns": ["x"], "rows": [{"x": "b"}, {"x": "a", "y": "1"}]},
+            ]
+        }
+        plan = service.compile([rule("sort_rows", column="x")])
+
+        assert plan.execute(data, engine="columnar") == plan.execute(data, engine="rows")
+
+    @pytest.mark.parametrize(
+        "rules",
+        [
+            [
+                rule("filter_rows", column="total", operation="gte", value=30),
+                rule("sort_rows", column="customer"),
+            ],
+            [],
+        ],
+    )
+    def test_stored_tables_become_frames_without_row_dicts(
+        self, service, tmp_path, monkeypatch, rules
+    ):
+        """Test that the columnar engine reads a stored table as Arrow, not as row dicts."""
+        store = TableStore(str(tmp_path / "tables"))
+        lines = ["id,customer,total"] + [f"{i},c{i % 7},{i * 3}" for i in range(40)]
+        (tmp_path / "orders.csv").write_text("\n".join(lines) + "\n")
+        stored = store.ingest_csv(str(tmp_path / "orders.csv"), preview_rows=5)
+        data = {
+            "tables": [
+                {
+                    "name": "Orders",
+                    "columns": ["id", "customer", "total"],
+                    "rows": stored["preview"],
+                    "table_id": stored["table_id"],
+                    "preview": True,
+                }
+            ]
+        }
+        plan = service.compile(rules)
+        by_rows = plan.execute(store.with_rows(data), engine="rows")
+
+        monkeypatch.setattr(StoredRows, "batches", lambda self: pytest.fail("read as rows"))
+        by_frame = plan.execute(store.with_rows(data), engine="columnar")
+
+        assert by_frame == by_rows
+        assert len(by_rows["tables"][0]["rows"]) == (30 if rules else 40)
+
+    def test_unknown_engine(self, service, orders):
+        """Test that an unknown engine name is rejected."""
+        with pytest.raises(ValueError):
+            service.compile([rule("limit_rows", limit=1)]).execute(orders, engine="gpu")
+
+
+RESUME = """Maria Clara Santos
+Software Engineer, Ateneo University
+Email: maria.santos@example.com
+Phone: +63 917 555 0142
+Portfolio: https://maria.dev/projects
+Joined March 5, 2021 at $85,000 a year"""
+
+
+class TestContentRules:
+    """Test the entity-based filter_content and extract rules."""
+
+    def test_entities_are_typed_spans(self):
+        """Test that one scan finds every entity type, with dates ahead of names."""
+        entities = extract_entities(RESUME)
+
+        assert [(entity.type, entity.text) for entity in entities] == [
+            ("name", "Maria Clara Santos"),
+            ("name", "Software Engineer"),
+            ("name", "Ateneo University"),
+            ("email", "maria.santos@example.com"),
+            ("phone", "+63 917 555 0142"),
+            ("url", "https://maria.dev/projects"),
+            ("date", "March 5, 2021"),
+            ("money", "$85,000"),
+        ]
+        assert RESUME[entities[3].start : entities[3].end] == "maria.santos@example.com"
+
+    def test_filter_content_shows_fields(self, service):
+        """Test that shown fields are extracted into labelled lines."""
+        rules = [rule("filter_content", fields=["name", "email", "contact", "website"])]
+
+        result = service.apply_transformations({"text": RESUME}, rules)
+
+        assert result["text"] == (
+            "Name: Maria Clara Santos\n"
+            "Email: maria.santos@example.com\n"
+            "Phone: +63 917 555 0142\n"
+            "URL: https://maria.dev/projects"
+        )
+        assert result["extracted_fields"] == ["name", "email", "phone", "url"]
+
+    def test_filter_content_hides_fields(self, service):
+        """Test that excluded fields drop the lines holding them."""
+        rules = [rule("filter_content", exclude_fields=["phone", "email"])]
+
+        result = service.apply_transformations({"text": RESUME}, rules)
+
+        assert result["text"].splitlines() == [
+            "Maria Clara Santos",
+            "Software Engineer, Ateneo University",
+            "Portfolio: https://maria.dev/projects",
+            "Joined March 5, 2021 at $85,000 a year",
+        ]
+        assert result["filtered_lines"] == 4
+
+    def test_extract_entities_and_patterns(self, service):
+        """Test that extract takes entity types or a custom pattern."""
+        data = {"text": RESUME}
+
+        by_type = service.apply_transformations(data, [rule("extract", entities=["date", "money"])])
+        by_pattern = service.apply_transformations(data, [rule("extract", pattern=r"\d{3}")])
+
+        assert by_type["tables"][0]["rows"] == [
+            {"entity_type": "date", "extracted_value": "March 5, 2021"},
+            {"entity_type": "money", "extracted_value": "$85,000"},
+        ]
+        assert [row["extracted_value"] for row in by_pattern["tables"][0]["rows"]][:2] == [
+            "917",
+            "555",
+        ]
+        assert "tables" not in data
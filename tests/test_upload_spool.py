@@ -0,0 +1,46 @@
+"""Tests for streaming uploads to disk."""
+
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+
+from src.services import upload_spool
+from src.services.upload_spool import UploadTooLargeError, spool_upload
+
+
+def make_upload(content: bytes, filename: str = "report.PDF") -> UploadFile:
+    return UploadFile(io.BytesIO(content), filename=filename)
+
+
+class TestSpoolUpload:
+    """Test chunked spooling, hashing and the size limit."""
+
+    async def test_spools_in_chunks_and_hashes(self, monkeypatch):
+        """Test that a multi-chunk upload lands on disk intact with its hash."""
+        monkeypatch.setattr(upload_spool, "UPLOAD_CHUNK_SIZE", 1000)
+        content = os.urandom(10_500)
+
+        upload = await spool_upload(make_upload(content), max_bytes=20_000)
+        try:
+            assert upload.size == len(content)
+            assert upload.sha256 == hashlib.sha256(content).hexdigest()
+            assert upload.filename == "report.PDF"
+            assert upload.path.endswith(".pdf")
+            with open(upload.path, "rb") as f:
+                assert f.read() == content
+        finally:
+            upload.cleanup()
+        assert not os.path.exists(upload.path)
+
+    async def test_oversized_upload_is_rejected_and_removed(self, monkeypatch, tmp_path):
+        """Test that the limit is enforced mid-stream and the partial file is deleted."""
+        monkeypatch.setattr(upload_spool, "UPLOAD_CHUNK_SIZE", 1000)
+        monkeypatch.setattr(upload_spool.get_settings(), "upload_spool_dir", str(tmp_path))
+
+        with pytest.raises(UploadTooLargeError):
+            await spool_upload(make_upload(b"x" * 5000), max_bytes=2500)
+
+        assert list(tmp_path.iterdir()) == []